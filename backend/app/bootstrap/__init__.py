@@ -1,11 +1,28 @@
-from backend.app.bootstrap.collector import register_collector_routes
-from backend.app.bootstrap.common import register_common_routes
-from backend.app.bootstrap.development import register_development_routes
-from backend.app.bootstrap.production import register_production_routes
-
-__all__ = [
-    "register_collector_routes",
-    "register_common_routes",
-    "register_development_routes",
-    "register_production_routes",
-]
+"""
+Route registration entrypoints per runtime mode.
+
+The register functions are resolved on first attribute access and the domain
+``routes.py`` modules import their routers inside the register call, so
+importing ``backend.app.runtime`` from a worker or CLI script does not load
+any router (or the pandas/openpyxl/Playwright code behind them).
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "register_collector_routes": "backend.app.bootstrap.collector",
+    "register_common_routes": "backend.app.bootstrap.common",
+    "register_development_routes": "backend.app.bootstrap.development",
+    "register_production_routes": "backend.app.bootstrap.production",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_path = _EXPORTS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_path), name)
+    globals()[name] = value
+    return value
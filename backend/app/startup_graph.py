@@ -0,0 +1,187 @@
+"""
+Dependency-ordered startup steps for the FastAPI lifespan.
+
+Steps declare what they depend on; every step whose dependencies are done runs
+concurrently with its siblings.  Blocking steps finish before ``lifespan``
+yields (a failure aborts startup).  Deferred steps start once the server is
+accepting traffic; their failures are recorded instead of raised, and the ones
+marked ``required_for_ready`` keep ``/healthz/ready`` at 503 until they succeed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from modules.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+StepFunc = Callable[[], Awaitable[Any]]
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass
+class StartupStep:
+    name: str
+    func: StepFunc
+    after: Tuple[str, ...] = ()
+    deferred: bool = False
+    required_for_ready: bool = True
+    status: str = PENDING
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "status": self.status,
+            "seconds": round(self.seconds, 3),
+            "deferred": self.deferred,
+            "required_for_ready": self.required_for_ready,
+        }
+        if self.after:
+            payload["after"] = list(self.after)
+        if self.error:
+            payload["error"] = self.error
+        return payload
+
+
+@dataclass
+class StartupGraph:
+    steps: Dict[str, StartupStep] = field(default_factory=dict)
+    phase: str = "starting"
+    serving_after_seconds: Optional[float] = None
+    _started_at: float = field(default_factory=time.monotonic)
+    _deferred_task: Optional["asyncio.Task[None]"] = None
+
+    def add(
+        self,
+        name: str,
+        func: StepFunc,
+        *,
+        after: Iterable[str] = (),
+        deferred: bool = False,
+        required_for_ready: Optional[bool] = None,
+    ) -> None:
+        if name in self.steps:
+            raise ValueError(f"duplicate startup step: {name}")
+        after = tuple(after)
+        for dependency in after:
+            dep_step = self.steps.get(dependency)
+            if dep_step is None:
+                raise ValueError(f"startup step {name} depends on unknown step {dependency}")
+            if dep_step.deferred and not deferred:
+                raise ValueError(f"blocking step {name} cannot depend on deferred step {dependency}")
+        self.steps[name] = StartupStep(
+            name=name,
+            func=func,
+            after=after,
+            deferred=deferred,
+            # 阻塞步骤天然是就绪前提;延后步骤默认不阻塞就绪
+            required_for_ready=(not deferred) if required_for_ready is None else required_for_ready,
+        )
+
+    def seconds(self, name: str) -> float:
+        step = self.steps.get(name)
+        return step.seconds if step is not None else 0.0
+
+    async def _run_step(self, step: StartupStep, tasks: Dict[str, "asyncio.Task[bool]"], *, raise_errors: bool) -> bool:
+        if step.after:
+            results = await asyncio.gather(*(tasks[dependency] for dependency in step.after))
+            if not all(results):
+                step.status = SKIPPED
+                step.error = "dependency failed"
+                return False
+        step.status = RUNNING
+        started = time.monotonic()
+        try:
+            await step.func()
+        except Exception as exc:
+            step.seconds = time.monotonic() - started
+            step.status = FAILED
+            step.error = str(exc) or exc.__class__.__name__
+            if raise_errors:
+                raise
+            logger.warning("[Startup] Deferred step %s failed: %s", step.name, exc, exc_info=True)
+            return False
+        step.seconds = time.monotonic() - started
+        step.status = DONE
+        return True
+
+    async def _run(self, steps: List[StartupStep], *, raise_errors: bool) -> None:
+        tasks: Dict[str, "asyncio.Task[bool]"] = {}
+        for step in steps:
+            tasks[step.name] = asyncio.ensure_future(self._run_step(step, tasks, raise_errors=raise_errors))
+        # 已完成的前置步骤(上一阶段)以 done task 的形式提供给依赖方
+        for step in self.steps.values():
+            if step.name not in tasks:
+                done = asyncio.get_running_loop().create_future()
+                done.set_result(step.status == DONE)
+                tasks[step.name] = done  # type: ignore[assignment]
+        pending = [tasks[step.name] for step in steps]
+        try:
+            await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+
+    async def run_blocking(self, *, include_deferred: bool = False) -> None:
+        """Run every blocking step (plus deferred ones when ``include_deferred``) and raise on failure."""
+        steps = [step for step in self.steps.values() if include_deferred or not step.deferred]
+        try:
+            await self._run(steps, raise_errors=True)
+        except BaseException:
+            self.phase = "failed"
+            raise
+        self.serving_after_seconds = time.monotonic() - self._started_at
+        self.phase = "ready" if include_deferred else "serving"
+
+    def start_deferred(self) -> Optional["asyncio.Task[None]"]:
+        steps = [step for step in self.steps.values() if step.deferred and step.status == PENDING]
+        if not steps:
+            self.phase = "ready"
+            return None
+
+        async def _run_deferred() -> None:
+            await self._run(steps, raise_errors=False)
+            self.phase = "ready" if self.ready else "degraded"
+            logger.info(
+                "[Startup] Deferred steps finished in %.2fs: %s",
+                time.monotonic() - self._started_at,
+                {step.name: step.status for step in steps},
+            )
+
+        self._deferred_task = asyncio.create_task(_run_deferred())
+        return self._deferred_task
+
+    async def cancel_deferred(self) -> None:
+        task = self._deferred_task
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    @property
+    def ready(self) -> bool:
+        return self.phase in {"serving", "ready", "degraded"} and all(
+            step.status == DONE for step in self.steps.values() if step.required_for_ready
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "phase": self.phase,
+            "ready": self.ready,
+            "serving_after_seconds": (
+                round(self.serving_after_seconds, 3) if self.serving_after_seconds is not None else None
+            ),
+            "steps": {name: step.to_dict() for name, step in self.steps.items()},
+        }
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from backend.services.collection_runtime_health import (
     collect_collection_runtime_health,
 )
+from backend.services.dashboard_query_metrics import get_dashboard_query_metrics
 
 
 def register_system_routes(app, settings, app_version, get_db):
@@ -40,6 +41,7 @@ def register_system_routes(app, settings, app_version, get_db):
             "service": "西虹ERP系统API",
             "version": app_version,
             "timestamp": datetime.now().isoformat(),
+            "startup_phase": getattr(getattr(app.state, "startup_graph", None), "phase", None),
         }
 
     @app.get("/metrics", include_in_schema=False)
@@ -203,6 +205,7 @@ def register_system_routes(app, settings, app_version, get_db):
                 float(check.get("stale_hours") or -1),
                 labels={"table_name": check.get("table_name", "unknown"), "side": check.get("side", "unknown")},
             )
+        lines.extend(get_dashboard_query_metrics().render_prometheus())
 
         return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
 
@@ -238,6 +241,21 @@ def register_system_routes(app, settings, app_version, get_db):
             health_status["status"] = "unready"
             ready = False
 
+        startup_graph = getattr(app.state, "startup_graph", None)
+        if startup_graph is not None:
+            startup = startup_graph.snapshot()
+            startup_metrics = getattr(app.state, "startup_metrics", None) or {}
+            startup["metrics"] = {
+                key: round(value, 3)
+                for key, value in startup_metrics.items()
+                if isinstance(value, (int, float))
+            }
+            health_status["startup"] = startup
+            health_status["checks"]["startup"] = {"status": "ready" if startup["ready"] else startup["phase"]}
+            if not startup["ready"]:
+                health_status["status"] = "unready"
+                ready = False
+
         if runtime_mode == "collector":
             collector_health = collect_collection_runtime_health(app, settings)
             health_status["runtime_mode"] = collector_health["runtime_mode"]
@@ -20,6 +20,12 @@ from sqlalchemy.orm import selectinload
 from backend.models.database import get_async_db
 from backend.services.rbac_service import normalize_role_code
 from backend.services.auth_service import auth_service
+from backend.services.auth_principal_cache import (
+    AuthenticatedPrincipal,
+    lookup_principal,
+    principal_cache,
+    remember_principal,
+)
 from modules.core.db import DimUser, UserSession
 from modules.core.logger import get_logger
 
@@ -81,6 +87,9 @@ async def get_current_user(
     支持从 Cookie 和 Authorization Header 两种方式读取 token：
     - 优先从 Cookie 读取 (httpOnly Cookie，更安全)
     - 其次从 Header 读取 (向后兼容)
+
+    命中主体缓存时返回只读的 AuthenticatedPrincipal,不访问数据库;
+    需要修改用户记录的端点应改用 get_current_db_user。
     """
     token = extract_access_token(request, credentials)
 
@@ -100,6 +109,14 @@ async def get_current_user(
                 detail="Invalid token",
             )
 
+        session_id = payload.get("sid")
+        if not session_id:
+            session_id = hashlib.sha256(token.encode()).hexdigest()
+        principal = lookup_principal(user_id, session_id)
+        if principal is not None:
+            return principal
+        generation = principal_cache.generation
+
         result = await db.execute(
             select(DimUser)
             .where(DimUser.user_id == user_id)
@@ -118,9 +135,6 @@ async def get_current_user(
                 detail=f"Account is {user.status}, access denied",
             )
 
-        session_id = payload.get("sid")
-        if not session_id:
-            session_id = hashlib.sha256(token.encode()).hexdigest()
         session_result = await db.execute(
             select(UserSession).where(
                 UserSession.session_id == session_id,
@@ -139,6 +153,7 @@ async def get_current_user(
                 detail="Session has expired",
             )
 
+        remember_principal(user, session, generation)
         return user
     except HTTPException:
         raise
@@ -150,6 +165,27 @@ async def get_current_user(
         )
 
 
+async def get_current_db_user(
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """获取当前用户的 ORM 实例(绑定到本次请求的 db 会话),用于需要修改用户记录的端点。"""
+    if not isinstance(current_user, AuthenticatedPrincipal):
+        return current_user
+    result = await db.execute(
+        select(DimUser)
+        .where(DimUser.user_id == current_user.user_id)
+        .options(selectinload(DimUser.roles))
+    )
+    user = result.scalar_one_or_none()
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=401,
+            detail="User not found or inactive",
+        )
+    return user
+
+
 async def require_admin(
     current_user: DimUser = Depends(get_current_user),
 ):
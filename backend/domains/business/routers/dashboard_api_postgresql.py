@@ -15,17 +15,23 @@ from datetime import date as date_cls
 from datetime import datetime, timedelta, timezone
 import os
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.dependencies.auth import get_current_user
 from backend.models.database import AsyncSessionLocal, get_async_db
+from backend.services.dashboard_query_metrics import get_dashboard_query_metrics
 from backend.services.data_pipeline.dashboard_bootstrap import inspect_dashboard_assets
-from backend.services.postgresql_dashboard_service import _normalize_period_start, get_postgresql_dashboard_service
+from backend.services.postgresql_dashboard_service import (
+    _normalize_period_start,
+    get_postgresql_dashboard_service,
+    normalize_business_overview_module_requests,
+)
 from backend.utils.api_response import error_response, success_response
 from backend.utils.error_codes import ErrorCode
 from modules.core.logger import get_logger
@@ -62,6 +68,18 @@ _DASHBOARD_MODULE_ROUTE_PREFIXES = {
 }
 
 
+class BusinessOverviewBatchRequest(BaseModel):
+    granularity: Optional[str] = Field(None, description="daily/weekly/monthly")
+    period_key: str = Field(..., description="canonical period key (ISO date)")
+    platform_code: Optional[str] = Field(None, description="canonical platform code")
+    shop_id: Optional[str] = Field(None, description="canonical shop id")
+    modules: list[Union[str, Dict[str, Any]]] = Field(
+        ...,
+        min_length=1,
+        description="module names, or {module, key, options} objects",
+    )
+
+
 def _normalize_cache_params(params: Dict[str, Any]) -> Dict[str, str]:
     return {k: "" if v is None else str(v) for k, v in params.items()}
 
@@ -304,6 +322,33 @@ def _build_business_overview_meta(
     }
 
 
+async def _build_traffic_ranking_meta(
+    *,
+    granularity: str,
+    target_date: str,
+    platform_code: Optional[str],
+    shop_id: Optional[str],
+    cache_status: Optional[str],
+    data: Any,
+) -> dict[str, Any]:
+    """traffic_ranking 的 meta(含 identity_health),单独路由与 batch 中的 traffic_ranking 模块共用"""
+    meta = _build_business_overview_meta(
+        granularity=granularity,
+        period_key=_normalize_business_overview_period_key(granularity, target_date),
+        platform_code=platform_code,
+        shop_id=shop_id,
+        cache_status=cache_status,
+    )
+    service = get_postgresql_dashboard_service()
+    identity_health = await service.get_business_overview_identity_health(
+        granularity=granularity,
+        target_date=target_date,
+        platform=platform_code,
+    )
+    meta["identity_health"] = jsonable_encoder(identity_health)
+    return _apply_business_overview_empty_period_meta(meta, data)
+
+
 async def _try_attach_business_overview_freshness(
     meta: dict[str, Any],
     *,
@@ -339,6 +384,103 @@ async def _try_attach_business_overview_freshness(
     return meta
 
 
+def _validate_operational_metrics_granularity(granularity: Optional[str]) -> None:
+    if granularity and str(granularity).strip().lower() != "monthly":
+        raise ValueError("granularity must be monthly")
+
+
+def _build_period_module_meta(
+    *,
+    granularity: str,
+    target_date: str,
+    platform_code: Optional[str],
+    shop_id: Optional[str],
+    cache_status: Optional[str],
+    data: Any,
+) -> dict[str, Any]:
+    """comparison / shop_racing 的 meta,单独路由与 batch 共用"""
+    meta = _build_business_overview_meta(
+        granularity=granularity,
+        period_key=_normalize_business_overview_period_key(granularity, target_date),
+        platform_code=platform_code,
+        shop_id=shop_id,
+        cache_status=cache_status,
+    )
+    return _apply_business_overview_empty_period_meta(meta, data)
+
+
+async def _build_kpi_meta(
+    *,
+    granularity: str,
+    target_date: str,
+    platform_code: Optional[str],
+    shop_id: Optional[str],
+    cache_status: Optional[str],
+    data: Any,
+) -> dict[str, Any]:
+    """kpi 的 meta(含数据新鲜度),并按单独路由的约定挂到 data["meta"]"""
+    meta = _build_period_module_meta(
+        granularity=granularity,
+        target_date=target_date,
+        platform_code=platform_code,
+        shop_id=shop_id,
+        cache_status=cache_status,
+        data=data,
+    )
+    await _try_attach_business_overview_freshness(meta, platform_code=platform_code, shop_id=shop_id)
+    if isinstance(data, dict):
+        data["meta"] = meta
+    return meta
+
+
+def _build_operational_metrics_meta(
+    *,
+    target_date: str,
+    platform_code: Optional[str],
+    shop_id: Optional[str],
+    cache_status: Optional[str],
+    data: Any,
+) -> dict[str, Any]:
+    """operational_metrics 的 meta(固定月粒度,带上服务返回的 warnings)"""
+    meta = _build_period_module_meta(
+        granularity="monthly",
+        target_date=target_date,
+        platform_code=platform_code,
+        shop_id=shop_id,
+        cache_status=cache_status,
+        data=data,
+    )
+    data_meta = data.get("meta") if isinstance(data, dict) else None
+    if platform_code and isinstance(data_meta, dict) and isinstance(data_meta.get("warnings"), list):
+        for warning in data_meta["warnings"]:
+            if warning not in meta["warnings"]:
+                meta["warnings"].append(warning)
+    return meta
+
+
+async def _build_batch_module_meta(
+    module: str,
+    *,
+    granularity: str,
+    target_date: str,
+    platform_code: Optional[str],
+    shop_id: Optional[str],
+    cache_status: Optional[str],
+    data: Any,
+) -> Optional[dict[str, Any]]:
+    """batch 中单个模块的 meta,与对应单独路由使用同一套构造逻辑;无 meta 的模块返回 None"""
+    common = {"platform_code": platform_code, "shop_id": shop_id, "cache_status": cache_status, "data": data}
+    if module == "kpi":
+        return await _build_kpi_meta(granularity=granularity, target_date=target_date, **common)
+    if module in {"comparison", "shop_racing"}:
+        return _build_period_module_meta(granularity=granularity, target_date=target_date, **common)
+    if module == "traffic_ranking":
+        return await _build_traffic_ranking_meta(granularity=granularity, target_date=target_date, **common)
+    if module == "operational_metrics":
+        return _build_operational_metrics_meta(target_date=target_date, **common)
+    return None
+
+
 def _normalize_period_month_for_cache(period_month: Optional[str]) -> Optional[str]:
     if period_month is None:
         return None
@@ -356,11 +498,14 @@ async def _resolve_cached_payload(
     cache_params: Dict[str, Any],
     producer,
 ):
+    metrics = get_dashboard_query_metrics()
     if request and hasattr(request.app.state, "cache_service"):
         cache_service = request.app.state.cache_service
         cached = await cache_service.get(cache_type, **cache_params)
         if cached is not None:
+            metrics.observe_cache(cache_type, "HIT")
             return cached, "HIT"
+        metrics.observe_cache(cache_type, "MISS")
         payload = await cache_service.get_or_set_singleflight(
             cache_type,
             producer,
@@ -369,6 +514,7 @@ async def _resolve_cached_payload(
             **cache_params,
         )
         return payload, "MISS"
+    metrics.observe_cache(cache_type, "BYPASS")
     payload = await producer()
     return payload, "BYPASS"
 
@@ -474,23 +620,14 @@ async def get_business_overview_kpi_postgresql(
             _produce_payload,
         )
         if isinstance(payload, dict) and payload.get("success") is True and "data" in payload:
-            period_key = _normalize_business_overview_period_key(effective_granularity, effective_date)
-            payload["meta"] = _build_business_overview_meta(
+            payload["meta"] = await _build_kpi_meta(
                 granularity=effective_granularity,
-                period_key=period_key,
+                target_date=effective_date,
                 platform_code=effective_platform_code,
                 shop_id=shop_id,
                 cache_status=cache_status,
+                data=payload.get("data"),
             )
-            if isinstance(payload.get("meta"), dict):
-                _apply_business_overview_empty_period_meta(payload["meta"], payload.get("data"))
-                await _try_attach_business_overview_freshness(
-                    payload["meta"],
-                    platform_code=effective_platform_code,
-                    shop_id=shop_id,
-                )
-                if isinstance(payload.get("data"), dict):
-                    payload["data"]["meta"] = payload["meta"]
         return JSONResponse(content=payload, headers={"X-Cache": cache_status})
     except HTTPException:
         raise
@@ -544,16 +681,14 @@ async def get_business_overview_comparison_postgresql(
             _produce_payload,
         )
         if isinstance(payload, dict) and payload.get("success") is True and "data" in payload:
-            normalized_period_key = _normalize_business_overview_period_key(granularity, effective_period_key)
-            payload["meta"] = _build_business_overview_meta(
+            payload["meta"] = _build_period_module_meta(
                 granularity=granularity,
-                period_key=normalized_period_key,
+                target_date=effective_period_key,
                 platform_code=effective_platform_code,
                 shop_id=shop_id,
                 cache_status=cache_status,
+                data=payload.get("data"),
             )
-            if isinstance(payload.get("meta"), dict):
-                _apply_business_overview_empty_period_meta(payload["meta"], payload.get("data"))
         return JSONResponse(content=payload, headers={"X-Cache": cache_status})
     except HTTPException:
         raise
@@ -749,6 +884,99 @@ async def get_business_overview_bootstrap_postgresql(
         return error_response(ErrorCode.DATABASE_QUERY_ERROR, f"鏌ヨ澶辫触: {str(e)}", status_code=500)
 
 
+@router.post("/business-overview/batch")
+async def get_business_overview_batch_postgresql(
+    request: Request,
+    body: BusinessOverviewBatchRequest,
+):
+    try:
+        await _require_dashboard_assets_ready(request)
+        effective_granularity = (body.granularity or "monthly").strip().lower()
+        module_requests = normalize_business_overview_module_requests(body.modules)
+        # 与单独路由相同的参数校验:单独路由拒绝的输入,batch 同样拒绝
+        if any(module == "operational_metrics" for _key, module, _options in module_requests):
+            _validate_operational_metrics_granularity(body.granularity)
+        params = {
+            "granularity": effective_granularity,
+            "period_key": body.period_key,
+            "platform_code": body.platform_code,
+            "shop_id": body.shop_id,
+            "modules": json.dumps(
+                [{"key": key, "module": module, "options": options} for key, module, options in module_requests],
+                sort_keys=True,
+                default=str,
+            ),
+        }
+        cache_params = _normalize_cache_params(params)
+
+        async def _produce_payload():
+            service = get_postgresql_dashboard_service()
+            started = time.perf_counter()
+            result = await service.get_business_overview_batch(
+                modules=body.modules,
+                granularity=effective_granularity,
+                target_date=body.period_key,
+                platform=body.platform_code,
+                shop_id=body.shop_id,
+            )
+            total_ms = (time.perf_counter() - started) * 1000.0
+            if total_ms >= 1000:
+                stats = result.get("query_stats") or {}
+                logger.warning(
+                    "[slow_breakdown] /api/dashboard/business-overview/batch "
+                    f"total={total_ms:.2f}ms modules={len(module_requests)} "
+                    f"queries={stats.get('queries')} shared_hits={stats.get('shared_hits')} "
+                    f"granularity={effective_granularity} period_key={body.period_key} "
+                    f"platform={body.platform_code or ''}"
+                )
+            return json.loads(success_response(data=result).body.decode())
+
+        payload, cache_status = await _resolve_cached_payload(
+            request,
+            "dashboard_business_overview_batch",
+            cache_params,
+            _produce_payload,
+        )
+        if isinstance(payload, dict) and payload.get("success") is True and "data" in payload:
+            period_key = _normalize_business_overview_period_key(effective_granularity, body.period_key)
+            payload["meta"] = _build_business_overview_meta(
+                granularity=effective_granularity,
+                period_key=period_key,
+                platform_code=body.platform_code,
+                shop_id=body.shop_id,
+                cache_status=cache_status,
+            )
+            # 每个模块的 meta 与对应单独路由一致(空周期、数据新鲜度、identity_health、warnings 等)
+            data = payload.get("data")
+            modules = data.get("modules") if isinstance(data, dict) else None
+            if isinstance(modules, dict):
+                module_meta = {}
+                for key, module, _options in module_requests:
+                    if key not in modules:
+                        continue
+                    meta = await _build_batch_module_meta(
+                        module,
+                        granularity=effective_granularity,
+                        target_date=body.period_key,
+                        platform_code=body.platform_code,
+                        shop_id=body.shop_id,
+                        cache_status=cache_status,
+                        data=modules[key],
+                    )
+                    if meta is not None:
+                        module_meta[key] = meta
+                if module_meta:
+                    data["module_meta"] = module_meta
+        return JSONResponse(content=payload, headers={"X-Cache": cache_status})
+    except HTTPException:
+        raise
+    except ValueError as e:
+        return error_response(ErrorCode.PARAMETER_INVALID, str(e), status_code=400)
+    except Exception as e:
+        logger.error(f"PostgreSQL business overview batch query failed: {e}", exc_info=True)
+        return error_response(ErrorCode.DATABASE_QUERY_ERROR, f"查询失败: {str(e)}", status_code=500)
+
+
 # annual-summary removed pre-launch
 async def get_annual_summary_kpi_postgresql(
     request: Request,
@@ -821,16 +1049,14 @@ async def get_business_overview_shop_racing_postgresql(
             _produce_payload,
         )
         if isinstance(payload, dict) and payload.get("success") is True and "data" in payload:
-            normalized_period_key = _normalize_business_overview_period_key(granularity, effective_period_key)
-            payload["meta"] = _build_business_overview_meta(
+            payload["meta"] = _build_period_module_meta(
                 granularity=granularity,
-                period_key=normalized_period_key,
+                target_date=effective_period_key,
                 platform_code=effective_platform,
                 shop_id=shop_id,
                 cache_status=cache_status,
+                data=payload.get("data"),
             )
-            if isinstance(payload.get("meta"), dict):
-                _apply_business_overview_empty_period_meta(payload["meta"], payload.get("data"))
         return JSONResponse(content=payload, headers={"X-Cache": cache_status})
     except HTTPException:
         raise
@@ -881,23 +1107,14 @@ async def get_business_overview_traffic_ranking_postgresql(
             _produce_payload,
         )
         if isinstance(payload, dict) and payload.get("success") is True and "data" in payload:
-            period_key = _normalize_business_overview_period_key(granularity, target_date)
-            payload["meta"] = _build_business_overview_meta(
+            payload["meta"] = await _build_traffic_ranking_meta(
                 granularity=granularity,
-                period_key=period_key,
+                target_date=target_date,
                 platform_code=effective_platform,
                 shop_id=shop_id,
                 cache_status=cache_status,
+                data=payload.get("data"),
             )
-            if isinstance(payload.get("meta"), dict):
-                service = get_postgresql_dashboard_service()
-                identity_health = await service.get_business_overview_identity_health(
-                    granularity=granularity,
-                    target_date=target_date,
-                    platform=effective_platform,
-                )
-                payload["meta"]["identity_health"] = jsonable_encoder(identity_health)
-                _apply_business_overview_empty_period_meta(payload["meta"], payload.get("data"))
         return JSONResponse(content=payload, headers={"X-Cache": cache_status})
     except HTTPException:
         raise
@@ -958,8 +1175,7 @@ async def get_business_overview_operational_metrics_postgresql(
     try:
         await _require_dashboard_assets_ready(request)
         _reject_business_overview_legacy_params(request)
-        if granularity and str(granularity).strip().lower() != "monthly":
-            raise ValueError("granularity must be monthly")
+        _validate_operational_metrics_granularity(granularity)
         effective_platform_code = platform_code
         effective_month = _normalize_business_overview_period_key("monthly", period_key)
         params = {
@@ -986,26 +1202,13 @@ async def get_business_overview_operational_metrics_postgresql(
             _produce_payload,
         )
         if isinstance(payload, dict) and payload.get("success") is True and "data" in payload:
-            period_key = _normalize_business_overview_period_key("monthly", effective_month)
-            payload["meta"] = _build_business_overview_meta(
-                granularity="monthly",
-                period_key=period_key,
+            payload["meta"] = _build_operational_metrics_meta(
+                target_date=effective_month,
                 platform_code=effective_platform_code,
                 shop_id=shop_id,
                 cache_status=cache_status,
+                data=payload.get("data"),
             )
-            if isinstance(payload.get("meta"), dict):
-                _apply_business_overview_empty_period_meta(payload["meta"], payload.get("data"))
-                if effective_platform_code and isinstance(payload.get("data"), dict):
-                    data_meta = payload["data"].get("meta") if isinstance(payload["data"], dict) else None
-                    warnings = payload["meta"].get("warnings")
-                    if not isinstance(warnings, list):
-                        payload["meta"]["warnings"] = []
-                        warnings = payload["meta"]["warnings"]
-                    if isinstance(data_meta, dict) and isinstance(data_meta.get("warnings"), list):
-                        for warning in data_meta["warnings"]:
-                            if warning not in warnings:
-                                warnings.append(warning)
         return JSONResponse(content=payload, headers={"X-Cache": cache_status})
     except HTTPException:
         raise
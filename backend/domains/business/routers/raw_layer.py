@@ -19,7 +19,6 @@ from typing import Optional, Dict, Any, List
 from pydantic import BaseModel
 import io
 import json
-import pandas as pd
 from datetime import datetime
 
 from backend.models.database import get_db, get_async_db
@@ -5,18 +5,16 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select, text
-from typing import Optional, Dict, Any, List
-import io
+from sqlalchemy import exists, func, select
+from typing import Any, Dict, List
 import json
-import pandas as pd
 from datetime import datetime
 
-from backend.models.database import get_db, get_async_db
-from backend.utils.api_response import success_response, error_response
+from backend.dependencies.auth import get_current_user
+from backend.models.database import get_async_db
+from backend.services.streaming_export import ExportSpec, export_response
+from backend.utils.api_response import error_response
 from backend.utils.error_codes import ErrorCode, get_error_type
 from modules.core.db import CatalogFile, StagingOrders, StagingProductMetrics, FactProductMetric
 # [DELETED] v4.19.0: FactOrder 已删除
@@ -26,11 +24,126 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/api/raw-layer", tags=["原始数据层"])
 
 
+ORDER_HEADERS = ["平台代码", "店铺ID", "订单ID", "订单状态", "订单日期", "订单金额", "货币", "Staging ID", "创建时间"]
+METRIC_HEADERS = ["平台代码", "店铺ID", "SKU", "指标日期", "Staging ID", "创建时间"]
+
+
+def _json_payload(value: Any) -> Dict[str, Any]:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (TypeError, ValueError):
+            return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _first_per_key(model, key_columns: List[Any], *conditions):
+    """每个业务键只保留 id 最小的一条 staging 记录(与原先逐条比对时取第一条一致)"""
+    ranked = (
+        select(
+            model.id.label("id"),
+            func.row_number().over(partition_by=key_columns, order_by=model.id).label("rn"),
+        )
+        .where(*conditions)
+        .subquery()
+    )
+    return (
+        select(model)
+        .join(ranked, ranked.c.id == model.id)
+        .where(ranked.c.rn == 1)
+        .order_by(model.id)
+    )
+
+
+def _lost_orders_statement(file_id: int):
+    # 订单事实表 b_class.fact_{platform}_orders_{granularity} 只在 raw_data JSONB 中保存订单号,
+    # 没有可比对的 order_id 列,因此订单域导出该文件的全部 staging 订单(按业务键去重)
+    return _first_per_key(
+        StagingOrders,
+        [
+            func.coalesce(StagingOrders.platform_code, "unknown"),
+            func.coalesce(StagingOrders.shop_id, ""),
+            StagingOrders.order_id,
+        ],
+        StagingOrders.file_id == file_id,
+        StagingOrders.order_id.isnot(None),
+        StagingOrders.order_id != "",
+    )
+
+
+def _lost_metrics_statement(file_id: int):
+    platform_key = func.coalesce(StagingProductMetrics.platform_code, "unknown")
+    shop_key = func.coalesce(StagingProductMetrics.shop_id, "")
+    in_fact = exists().where(
+        FactProductMetric.source_catalog_id == file_id,
+        func.coalesce(FactProductMetric.platform_code, "unknown") == platform_key,
+        func.coalesce(FactProductMetric.shop_id, "") == shop_key,
+        FactProductMetric.platform_sku == StagingProductMetrics.platform_sku,
+    )
+    return _first_per_key(
+        StagingProductMetrics,
+        [platform_key, shop_key, StagingProductMetrics.platform_sku],
+        StagingProductMetrics.file_id == file_id,
+        StagingProductMetrics.platform_sku.isnot(None),
+        StagingProductMetrics.platform_sku != "",
+        ~in_fact,
+    )
+
+
+def _order_row(staging_order: StagingOrders) -> List[Any]:
+    order_data = _json_payload(staging_order.order_data)
+    return [
+        staging_order.platform_code or "unknown",
+        staging_order.shop_id or "",
+        staging_order.order_id,
+        order_data.get("status") or order_data.get("订单状态") or "",
+        order_data.get("order_date") or order_data.get("order_date_local") or order_data.get("订单日期") or "",
+        order_data.get("total_amount") or order_data.get("订单金额") or "",
+        order_data.get("currency") or order_data.get("货币") or "",
+        staging_order.id,
+        staging_order.created_at.isoformat() if staging_order.created_at else "",
+    ]
+
+
+def _metric_row(staging_metric: StagingProductMetrics) -> List[Any]:
+    metric_data = _json_payload(staging_metric.metric_data)
+    return [
+        staging_metric.platform_code or "unknown",
+        staging_metric.shop_id or "",
+        staging_metric.platform_sku,
+        metric_data.get("metric_date") or "",
+        staging_metric.id,
+        staging_metric.created_at.isoformat() if staging_metric.created_at else "",
+    ]
+
+
+def build_lost_data_export(catalog_record: CatalogFile) -> ExportSpec:
+    """丢失数据导出定义:staging 中存在、fact 中缺失的记录"""
+    data_domain = catalog_record.data_domain or "products"
+    filename = f"lost_data_{catalog_record.file_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if data_domain == "orders":
+        statement, headers, row_mapper = _lost_orders_statement(catalog_record.id), ORDER_HEADERS, _order_row
+    elif data_domain in ["products", "traffic", "analytics"]:
+        statement, headers, row_mapper = _lost_metrics_statement(catalog_record.id), METRIC_HEADERS, _metric_row
+    else:
+        statement, headers, row_mapper = None, METRIC_HEADERS, _metric_row
+    return ExportSpec(
+        statement=statement,
+        headers=headers,
+        row_mapper=row_mapper,
+        filename=filename,
+        sheet_name="丢失数据",
+        empty_headers=["提示"],
+        empty_row=["没有丢失数据"],
+    )
+
+
 @router.get("/export-lost-data/{file_id}")
 async def export_lost_data(
     file_id: int,
     header_row: int = Query(0, description="表头行(0-based)"),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
 ):
     """
     导出丢失数据到Excel(v4.13.0新增)
@@ -38,10 +151,14 @@ async def export_lost_data(
     功能:
     - 导出Staging->Fact丢失的数据详情
     - 支持orders/products/traffic/analytics/inventory域
-    - 导出为Excel格式
+    - 导出为Excel格式(服务端游标分块读取,边查询边写出)
+    
+    限制:
+    - orders域不与事实表比对(订单事实表没有独立的订单号列),导出的是该文件全部 staging 订单
+    - inventory域没有 staging 明细,固定返回"没有丢失数据"
     
     返回:
-    Excel文件流
+    Excel文件流;丢失记录超过 EXPORT_BACKGROUND_ROW_THRESHOLD 时返回 202 与后台导出任务信息
     """
     try:
         logger.info(f"[RawLayer] 导出丢失数据: file_id={file_id}")
@@ -60,151 +177,16 @@ async def export_lost_data(
                 status_code=404
             )
         
-        data_domain = catalog_record.data_domain or "products"
-        
-        # Step 2: 获取丢失数据详情(复用compareRawAndStaging的逻辑)
-        lost_in_fact_details = []
+        # Step 2: 丢失数据查询(staging 与 fact 的反连接在数据库中完成)
+        spec = build_lost_data_export(catalog_record)
         
-        if data_domain == "orders":
-            result = await db.execute(
-                select(StagingOrders).where(StagingOrders.file_id == file_id)
-            )
-            staging_orders = result.scalars().all()
-            
-            staging_order_ids = set()
-            for staging_order in staging_orders:
-                if staging_order.order_id:
-                    staging_order_ids.add((
-                        staging_order.platform_code or "unknown",
-                        staging_order.shop_id or "",
-                        staging_order.order_id
-                    ))
-            
-            result = await db.execute(
-                # [DELETED] v4.19.0: FactOrder 已删除,订单数据现在在 b_class.fact_{platform}_orders_{granularity}
-                # select(FactOrder).where(FactOrder.file_id == file_id)
-                text("SELECT 1 WHERE 1=0")  # 返回空结果
-            )
-            fact_orders = []  # [TODO] 查询 b_class.fact_{platform}_orders_{granularity} 表
-            
-            fact_order_ids = set()
-            for fact_order in fact_orders:
-                fact_order_ids.add((
-                    fact_order.platform_code or "unknown",
-                    fact_order.shop_id or "",
-                    fact_order.order_id
-                ))
-            
-            lost_order_ids = staging_order_ids - fact_order_ids
-            
-            for platform_code, shop_id, order_id in lost_order_ids:
-                staging_order = next(
-                    (so for so in staging_orders 
-                     if so.order_id == order_id and 
-                        (so.platform_code or "unknown") == platform_code and
-                        (so.shop_id or "") == shop_id),
-                    None
-                )
-                
-                if staging_order:
-                    order_data = staging_order.order_data
-                    if isinstance(order_data, str):
-                        try:
-                            order_data = json.loads(order_data)
-                        except:
-                            order_data = {}
-                    
-                    lost_in_fact_details.append({
-                        "平台代码": platform_code,
-                        "店铺ID": shop_id or "",
-                        "订单ID": order_id,
-                        "订单状态": order_data.get("status") or order_data.get("订单状态") or "",
-                        "订单日期": order_data.get("order_date") or order_data.get("order_date_local") or order_data.get("订单日期") or "",
-                        "订单金额": order_data.get("total_amount") or order_data.get("订单金额") or "",
-                        "货币": order_data.get("currency") or order_data.get("货币") or "",
-                        "Staging ID": staging_order.id,
-                        "创建时间": staging_order.created_at.isoformat() if staging_order.created_at else ""
-                    })
-        
-        elif data_domain in ["products", "traffic", "analytics"]:
-            result = await db.execute(
-                select(StagingProductMetrics).where(StagingProductMetrics.file_id == file_id)
-            )
-            staging_metrics = result.scalars().all()
-            
-            staging_metric_keys = set()
-            for staging_metric in staging_metrics:
-                if staging_metric.platform_sku:
-                    staging_metric_keys.add((
-                        staging_metric.platform_code or "unknown",
-                        staging_metric.shop_id or "",
-                        staging_metric.platform_sku
-                    ))
-            
-            result = await db.execute(
-                select(FactProductMetric).where(FactProductMetric.source_catalog_id == file_id)
-            )
-            fact_metrics = result.scalars().all()
-            
-            fact_metric_keys = set()
-            for fact_metric in fact_metrics:
-                fact_metric_keys.add((
-                    fact_metric.platform_code or "unknown",
-                    fact_metric.shop_id or "",
-                    fact_metric.platform_sku
-                ))
-            
-            lost_metric_keys = staging_metric_keys - fact_metric_keys
-            
-            for platform_code, shop_id, platform_sku in lost_metric_keys:
-                staging_metric = next(
-                    (sm for sm in staging_metrics 
-                     if sm.platform_sku == platform_sku and 
-                        (sm.platform_code or "unknown") == platform_code and
-                        (sm.shop_id or "") == shop_id),
-                    None
-                )
-                
-                if staging_metric:
-                    metric_data = staging_metric.metric_data
-                    if isinstance(metric_data, str):
-                        try:
-                            metric_data = json.loads(metric_data)
-                        except:
-                            metric_data = {}
-                    
-                    lost_in_fact_details.append({
-                        "平台代码": platform_code,
-                        "店铺ID": shop_id or "",
-                        "SKU": platform_sku,
-                        "指标日期": metric_data.get("metric_date") or "",
-                        "Staging ID": staging_metric.id,
-                        "创建时间": staging_metric.created_at.isoformat() if staging_metric.created_at else ""
-                    })
-        
-        # Step 3: 如果没有丢失数据,返回空文件
-        if not lost_in_fact_details:
-            df = pd.DataFrame(columns=["提示"])
-            df.loc[0] = ["没有丢失数据"]
-        else:
-            df = pd.DataFrame(lost_in_fact_details)
-        
-        # Step 4: 导出为Excel
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='丢失数据', index=False)
-        
-        output.seek(0)
-        
-        # Step 5: 返回文件流
-        filename = f"lost_data_{catalog_record.file_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename*=UTF-8''{filename}"
-            }
+        # Step 3: 流式导出,数据量超过阈值时转为后台任务
+        return await export_response(
+            db,
+            spec,
+            task_type="lost_data",
+            details={"file_id": file_id},
+            requested_by=getattr(current_user, "user_id", None),
         )
         
     except HTTPException:
@@ -218,4 +200,3 @@ async def export_lost_data(
             detail=str(e),
             status_code=500
         )
-
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.dependencies.auth import get_current_user, is_admin_user
 from backend.models.database import get_async_db
 from modules.core.db import TaskCenterTask
+from backend.services.streaming_export import can_download_export, resolve_export_artifact
 from backend.services.task_center_service import TaskCenterService
 from backend.utils.api_response import success_response
 
@@ -87,3 +90,29 @@ async def get_task_center_logs(
         raise HTTPException(status_code=404, detail="任务不存在")
     logs = await service.list_logs(task_id, limit=limit)
     return success_response(data={"items": logs})
+
+
+@router.get("/task-center/tasks/{task_id}/artifact")
+async def download_task_center_artifact(
+    task_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    service = TaskCenterService(db)
+    task = await service.get_task(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    if not can_download_export(
+        task,
+        user_id=getattr(current_user, "user_id", None),
+        is_admin=is_admin_user(current_user),
+    ):
+        raise HTTPException(status_code=403, detail="无权下载该导出文件")
+    artifact = resolve_export_artifact(task)
+    if artifact is None:
+        raise HTTPException(status_code=409, detail="导出文件尚未生成或已过期")
+    return FileResponse(
+        path=str(artifact.path),
+        media_type=artifact.media_type,
+        filename=artifact.filename,
+    )
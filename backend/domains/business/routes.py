@@ -1,29 +1,28 @@
-from backend.domains.business.routers import (
-    approval_center,
-    config_management,
-    dashboard_api_postgresql,
-    data_consistency,
-    data_flow,
-    database_design_validator,
-    expense_management,
-    hr_management,
-    inventory_domain,
-    inventory_overview,
-    monthly_profit_settlement,
-    mv,
-    performance_management,
-    profit_basis,
-    raw_layer,
-    raw_layer_export,
-    sales_campaign,
-    target_management,
-    task_center,
-    training,
-)
-from backend.domains.business.routers import employee_tasks, follow_investment
-
-
 def register_business_routes(app) -> None:
+    from backend.domains.business.routers import (
+        approval_center,
+        config_management,
+        dashboard_api_postgresql,
+        data_consistency,
+        data_flow,
+        database_design_validator,
+        expense_management,
+        hr_management,
+        inventory_domain,
+        inventory_overview,
+        monthly_profit_settlement,
+        mv,
+        performance_management,
+        profit_basis,
+        raw_layer,
+        raw_layer_export,
+        sales_campaign,
+        target_management,
+        task_center,
+        training,
+    )
+    from backend.domains.business.routers import employee_tasks, follow_investment
+
     app.include_router(dashboard_api_postgresql.router, tags=["Dashboard"])
     app.include_router(config_management.router, tags=["A类数据管理", "配置管理"])
     app.include_router(hr_management.router, tags=["HR管理"])
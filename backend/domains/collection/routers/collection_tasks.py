@@ -406,14 +406,31 @@ async def _mirror_collection_task_log(
     event_type: str,
     message: str,
     details: Optional[Dict[str, Any]] = None,
+    buffered: bool = False,
 ) -> None:
+    """
+    镜像一条采集日志到任务中心。
+
+    buffered=True 用于步骤进度等高频日志:交给 task_telemetry 缓冲批量写入,
+    不再每条日志单独提交一次;终态/告警类日志仍直接写入。
+    """
     from backend.services.task_center_service import TaskCenterService
+    from backend.services.task_telemetry_writer import TASK_TELEMETRY_BUFFERED
 
     try:
         service = TaskCenterService(db)
         task = await service.get_task(task_id)
         if task is None:
             return
+        if buffered and TASK_TELEMETRY_BUFFERED:
+            service.queue_log(
+                task_id,
+                level=level,
+                event_type=event_type,
+                message=message,
+                details_json=details,
+            )
+            return
         await service.append_log(
             task_id,
             level=level,
@@ -1350,6 +1367,7 @@ async def _collection_step_status_callback(
                     event_type="progress",
                     message=message,
                     details=details,
+                    buffered=True,
                 )
             if not diagnostic_only:
                 await connection_manager.send_progress(
@@ -1,7 +1,6 @@
-from backend.domains.collection.routers import account_alignment, collection, component_recorder
-
-
 def register_collection_routes(app, logger) -> None:
+    from backend.domains.collection.routers import account_alignment, collection, component_recorder
+
     app.include_router(collection.router, prefix="/api/collection", tags=["数据采集"])
     app.include_router(
         component_recorder.router, prefix="/api/collection", tags=["组件录制"]
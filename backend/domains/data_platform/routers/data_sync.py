@@ -25,7 +25,6 @@ import uuid
 import asyncio
 import copy
 import time
-import pandas as pd
 
 from backend.models.database import get_db, get_async_db, SessionLocal, AsyncSessionLocal
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -549,6 +548,7 @@ async def preview_file(
     v4.18.2: 迁移到异步会话(AsyncSession)
     """
     try:
+        import pandas as pd
         from backend.services.excel_parser import ExcelParser
         
         # 1. 获取文件信息([*] v4.18.2:使用 await)
@@ -1760,11 +1760,11 @@ async def process_batch_sync_background(
                 else:
                     error_msg = f"文件{file_name}({file_id})同步异常 ({error_type}): {error_str}"
                 
-                await progress_tracker.add_error(task_id, error_msg)
+                await progress_tracker.queue_error(task_id, error_msg)
                 logger.error(f"[BackgroundTask] {error_msg}", exc_info=True)
                 
                 # 更新进度(异步)
-                await progress_tracker.update_task(task_id, {
+                await progress_tracker.queue_update(task_id, {
                     "processed_files": processed_files,
                     "current_file": file_name,
                     "status": "processing"
@@ -1830,12 +1830,12 @@ async def process_batch_sync_background(
                         error_message = result.get('error') or result.get('detail') or f"同步失败(状态: {result.get('status', 'unknown')})"
                     
                     error_msg = f"文件{file_name}({file_id})同步失败: {error_message}"
-                    await progress_tracker.add_error(task_id, error_msg)
+                    await progress_tracker.queue_error(task_id, error_msg)
                     logger.error(f"[BackgroundTask] {error_msg}")
                 
                 # 更新进度(将跳过文件数存储在task_details中)(异步)
                 task_details = {"skipped_files": skipped_files}
-                await progress_tracker.update_task(task_id, {
+                await progress_tracker.queue_update(task_id, {
                     "processed_files": processed_files,
                     "total_rows": total_rows,
                     "processed_rows": valid_rows + quarantined_rows + error_rows,
@@ -1976,7 +1976,7 @@ async def process_batch_sync_background(
                         )
                         warnings = list(check.get("warnings") or [])
                         for warning in warnings:
-                            await progress_tracker.add_warning(task_id, warning)
+                            await progress_tracker.queue_warning(task_id, warning)
                         standardization_checks.append(
                             {
                                 "platform_code": platform_code,
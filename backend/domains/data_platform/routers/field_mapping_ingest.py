@@ -30,7 +30,11 @@ from backend.services.data_importer import (
 )
 from backend.services.data_standardizer import standardize_rows
 from backend.services.currency_extractor import get_currency_extractor
-from backend.services.data_ingestion_service import normalize_row_fields_for_domain
+from backend.services.data_ingestion_service import (
+    apply_row_normalization_plan,
+    get_row_normalization_plan,
+    normalize_row_fields_for_domain,
+)
 from backend.services.orders_ingestion_normalizer import (
     extend_orders_deduplication_fields,
     merge_hash_identity_values,
@@ -811,24 +815,25 @@ async def ingest_file(
                 )
                 
                 currency_extractor = get_currency_extractor()
-                normalized_rows = []
-                currency_codes = []
-                
-                for row in valid_rows:
-                    normalized_row = normalize_row_fields_for_domain(
+                normalized_rows = [
+                    normalize_row_fields_for_domain(
                         domain=domain or "products",
                         row=row,
                         currency_extractor=currency_extractor,
                     )
-                    normalized_rows.append(normalized_row)
-                    
-                    currency_code = currency_extractor.extract_currency_from_row(
-                        row,
-                        header_columns=None
-                    )
-                    currency_codes.append(currency_code)
-                
-                normalized_header_columns = currency_extractor.normalize_field_list(original_header_columns)
+                    for row in valid_rows
+                ]
+                # 货币代码按表头识别一次(同一文件各行表头相同)
+                _, currency_codes = apply_row_normalization_plan(
+                    domain or "products",
+                    valid_rows,
+                    currency_extractor=currency_extractor,
+                )
+                normalized_header_columns = get_row_normalization_plan(
+                    domain or "products",
+                    original_header_columns,
+                    currency_extractor=currency_extractor,
+                ).normalized_columns
 
                 imported = raw_data_importer.batch_insert_raw_data(
                     rows=normalized_rows,
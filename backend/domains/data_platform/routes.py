@@ -1,21 +1,20 @@
-from backend.domains.data_platform.routers import (
-    auto_ingest,
-    cloud_sync as cloud_sync_router,
-    data_migration,
-    data_pipeline,
-    data_quality,
-    data_quarantine,
-    data_sync,
-    data_sync_mapping_quality,
-    field_mapping,
-    field_mapping_dictionary,
-    field_mapping_templates,
-    management,
-    refresh_queue,
-)
-
-
 def register_data_platform_routes(app, logger) -> None:
+    from backend.domains.data_platform.routers import (
+        auto_ingest,
+        cloud_sync as cloud_sync_router,
+        data_migration,
+        data_pipeline,
+        data_quality,
+        data_quarantine,
+        data_sync,
+        data_sync_mapping_quality,
+        field_mapping,
+        field_mapping_dictionary,
+        field_mapping_templates,
+        management,
+        refresh_queue,
+    )
+
     app.include_router(management.router, prefix="/api/management", tags=["数据管理"])
     app.include_router(field_mapping.router, prefix="/api/field-mapping", tags=["字段映射"])
     app.include_router(
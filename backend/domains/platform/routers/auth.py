@@ -20,6 +20,7 @@ from backend.schemas.auth import (
 from modules.core.db import DimUser, DimRole, FactAuditLog, UserSession  # v4.12.0 SSOT迁移, v4.19.0会话管理
 from backend.services.audit_service import audit_service
 from backend.services.rbac_service import get_rbac_service
+from backend.services.streaming_export import ExportSpec, count_export_rows, export_response
 from backend.utils.api_response import success_response, error_response
 from backend.utils.error_codes import ErrorCode, get_error_type
 from backend.utils.config import get_settings  # [*] v6.0.0修复:导入 settings(Vulnerability 24)
@@ -51,7 +52,7 @@ except ImportError:
 settings = get_settings()
 
 # SSOT: 认证依赖已迁移至 backend.dependencies.auth，此处 re-export 保持向后兼容
-from backend.dependencies.auth import extract_access_token, get_current_user, require_admin  # noqa: F401
+from backend.dependencies.auth import extract_access_token, get_current_db_user, get_current_user, require_admin  # noqa: F401
 
 rbac_service = get_rbac_service()
 
@@ -867,7 +868,7 @@ async def get_current_user_info(current_user: DimUser = Depends(get_current_user
 async def update_current_user(
     user_update: UserUpdate,
     request: Request,  # [*] v6.0.0修复:添加 request 参数以获取真实IP和User-Agent(Vulnerability 27)
-    current_user: DimUser = Depends(get_current_user),
+    current_user: DimUser = Depends(get_current_db_user),
     db: AsyncSession = Depends(get_async_db)
 ):
     """更新当前用户信息"""
@@ -919,7 +920,7 @@ async def update_current_user(
 async def change_password(
     password_request: ChangePasswordRequest,  # [*] v6.0.0修复:重命名参数避免与 Request 冲突(Vulnerability 27)
     http_request: Request,  # [*] v6.0.0修复:添加 request 参数以获取真实IP和User-Agent(Vulnerability 27)
-    current_user: DimUser = Depends(get_current_user),
+    current_user: DimUser = Depends(get_current_db_user),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -1131,6 +1132,24 @@ async def get_audit_log_detail(
         )
 
 
+AUDIT_LOG_EXPORT_HEADERS = ["ID", "用户ID", "用户名", "操作", "资源", "资源ID", "IP地址", "用户代理", "创建时间", "详情"]
+
+
+def _audit_log_row(log: FactAuditLog) -> list:
+    return [
+        log.id,
+        log.user_id,
+        log.username,
+        log.action,
+        log.resource,
+        log.resource_id or "",
+        log.ip_address,
+        log.user_agent,
+        log.created_at.isoformat() if log.created_at else "",
+        str(log.details) if log.details else ""
+    ]
+
+
 @router.post("/audit-logs/export")
 async def export_audit_logs(
     request: AuditLogExportRequest,
@@ -1152,9 +1171,6 @@ async def export_audit_logs(
         await _export()
     
     try:
-        import io
-        import csv
-        
         # 构建查询条件
         conditions = []
         
@@ -1186,10 +1202,8 @@ async def export_audit_logs(
         
         query = query.limit(request.max_records)
         
-        result = await db.execute(query)
-        logs = result.scalars().all()
-        
-        if not logs:
+        total = await count_export_rows(db, query)
+        if not total:
             return error_response(
                 code=ErrorCode.DATA_NOT_FOUND,
                 message="没有可导出的审计日志",
@@ -1198,96 +1212,23 @@ async def export_audit_logs(
                 status_code=404
             )
         
-        # 导出为CSV或Excel
-        if request.format == "csv":
-            # CSV导出
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # 写入表头
-            writer.writerow(["ID", "用户ID", "用户名", "操作", "资源", "资源ID", "IP地址", "用户代理", "创建时间", "详情"])
-            
-            # 写入数据
-            for log in logs:
-                writer.writerow([
-                    log.id,
-                    log.user_id,
-                    log.username,
-                    log.action,
-                    log.resource,
-                    log.resource_id or "",
-                    log.ip_address,
-                    log.user_agent,
-                    log.created_at.isoformat() if log.created_at else "",
-                    str(log.details) if log.details else ""
-                ])
-            
-            from fastapi.responses import Response
-            return Response(
-                content=output.getvalue(),
-                media_type="text/csv",
-                headers={
-                    "Content-Disposition": f"attachment; filename=audit_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                }
-            )
-        else:
-            # Excel导出(需要openpyxl)
-            try:
-                from openpyxl import Workbook
-                from openpyxl.styles import Font, Alignment
-                
-                wb = Workbook()
-                ws = wb.active
-                ws.title = "审计日志"
-                
-                # 写入表头
-                headers = ["ID", "用户ID", "用户名", "操作", "资源", "资源ID", "IP地址", "用户代理", "创建时间", "详情"]
-                ws.append(headers)
-                
-                # 设置表头样式
-                for cell in ws[1]:
-                    cell.font = Font(bold=True)
-                    cell.alignment = Alignment(horizontal="center")
-                
-                # 写入数据
-                for log in logs:
-                    ws.append([
-                        log.id,
-                        log.user_id,
-                        log.username,
-                        log.action,
-                        log.resource,
-                        log.resource_id or "",
-                        log.ip_address,
-                        log.user_agent,
-                        log.created_at.isoformat() if log.created_at else "",
-                        str(log.details) if log.details else ""
-                    ])
-                
-                # 保存到内存
-                output = io.BytesIO()
-                wb.save(output)
-                output.seek(0)
-                
-                from fastapi.responses import Response
-                return Response(
-                    content=output.getvalue(),
-                    media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    headers={
-                        "Content-Disposition": f"attachment; filename=audit_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                    }
-                )
-            except ImportError:
-                # 如果没有openpyxl,降级为CSV
-                logger.warning("openpyxl未安装,降级为CSV格式导出")
-                return await export_audit_logs(
-                    AuditLogExportRequest(
-                        **request.model_dump(),
-                        format="csv"
-                    ),
-                    current_user,
-                    db
-                )
+        # 导出为CSV或Excel(流式写出,超过阈值转为后台任务)
+        spec = ExportSpec(
+            statement=query,
+            headers=AUDIT_LOG_EXPORT_HEADERS,
+            row_mapper=_audit_log_row,
+            filename=f"audit_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            format="csv" if request.format == "csv" else "xlsx",
+            sheet_name="审计日志",
+        )
+        return await export_response(
+            db,
+            spec,
+            task_type="audit_logs",
+            total_rows=total,
+            requested_by=getattr(current_user, "user_id", None),
+            admin_only=True,
+        )
         
     except Exception as e:
         logger.error(f"导出审计日志失败: {e}", exc_info=True)
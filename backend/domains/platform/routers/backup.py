@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pathlib import Path
 from datetime import datetime, timezone
+import asyncio
 import os
 
 from backend.models.database import get_async_db
@@ -225,7 +226,7 @@ async def download_backup(
             )
         
         # 验证备份文件完整性
-        is_valid, error_message = service.verify_backup(backup)
+        is_valid, error_message = await asyncio.to_thread(service.verify_backup, backup)
         if not is_valid:
             return error_response(
                 code=ErrorCode.DATA_CORRUPTED,
@@ -245,6 +246,15 @@ async def download_backup(
                 status_code=404
             )
         
+        # 引擎备份:流式输出 tar(数据库导出 + 文件归档 + 原始文件快照)
+        if service.is_engine_backup(backup):
+            from fastapi.responses import StreamingResponse
+            return StreamingResponse(
+                service.iter_backup_archive(backup),
+                media_type="application/x-tar",
+                headers={"Content-Disposition": f'attachment; filename="{backup_path.parent.name}.tar"'}
+            )
+        
         # 读取文件并返回
         from fastapi.responses import FileResponse
         return FileResponse(
@@ -301,7 +311,7 @@ async def restore_backup(
         
         # 多重安全防护检查
         # 1. 验证备份文件完整性
-        is_valid, error_message = service.verify_backup(backup)
+        is_valid, error_message = await asyncio.to_thread(service.verify_backup, backup)
         if not is_valid:
             return error_response(
                 code=ErrorCode.DATA_CORRUPTED,
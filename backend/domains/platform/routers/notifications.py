@@ -6,7 +6,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update, delete, and_, Integer
+from sqlalchemy import select, func, update, delete, and_, insert, union
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime, timezone
@@ -33,6 +33,7 @@ from backend.schemas.notification import (
 from backend.dependencies.auth import get_current_user, is_admin_user
 from backend.utils.api_response import success_response, error_response
 from backend.utils.error_codes import ErrorCode, get_error_type
+from backend.services.notification_read_model import get_notification_read_model
 from modules.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -75,6 +76,28 @@ def generate_notification_actions(notification_type: str, related_user_id: Optio
     return None
 
 
+def _notification_response(
+    notification: Notification,
+    related_username: Optional[str],
+    actions: Optional[List[NotificationAction]] = None,
+) -> NotificationResponse:
+    return NotificationResponse(
+        notification_id=notification.notification_id,
+        recipient_id=notification.recipient_id,
+        notification_type=notification.notification_type,
+        title=notification.title,
+        content=notification.content,
+        extra_data=notification.extra_data,
+        related_user_id=notification.related_user_id,
+        is_read=notification.is_read,
+        read_at=notification.read_at,
+        created_at=notification.created_at,
+        priority=getattr(notification, 'priority', None) or 'medium',  # v4.19.0
+        related_username=related_username,
+        actions=actions
+    )
+
+
 @router.get("", response_model=NotificationListResponse)
 async def get_notifications(
     page: int = Query(1, ge=1, description="页码"),
@@ -92,30 +115,20 @@ async def get_notifications(
     支持分页、过滤和排序
     v4.19.0: 新增优先级过滤和排序
     """
-    # 构建查询
-    query = select(Notification).where(
-        Notification.recipient_id == current_user.user_id
+    # v4.19.0: 优先级过滤(无效优先级值静默忽略,不报错)
+    if priority and priority.lower() not in ("high", "medium", "low"):
+        priority = None
+
+    # 通知与关联用户名一次查出(高优先级置顶,其次按时间倒序)
+    rows, total = await get_notification_read_model(db).list_page(
+        current_user.user_id,
+        is_read=is_read,
+        notification_type=notification_type,
+        priority=priority.lower() if priority else None,
+        offset=(page - 1) * page_size,
+        limit=page_size,
     )
     
-    # 应用过滤条件
-    if is_read is not None:
-        query = query.where(Notification.is_read == is_read)
-    
-    if notification_type:
-        query = query.where(Notification.notification_type == notification_type)
-    
-    # v4.19.0: 优先级过滤(带验证)
-    if priority:
-        valid_priorities = ["high", "medium", "low"]
-        if priority.lower() in valid_priorities:
-            query = query.where(Notification.priority == priority.lower())
-        # 无效优先级值静默忽略(不报错)
-    
-    # 计算总数
-    count_query = select(func.count()).select_from(query.subquery())
-    result = await db.execute(count_query)
-    total = result.scalar() or 0
-    
     # 获取未读数量
     unread_query = select(func.count()).where(
         and_(
@@ -126,55 +139,15 @@ async def get_notifications(
     result = await db.execute(unread_query)
     unread_count = result.scalar() or 0
     
-    # v4.19.0: 排序逻辑
-    # 优先级排序:high > medium > low
-    from sqlalchemy import case
-    priority_order = case(
-        (Notification.priority == "high", 1),
-        (Notification.priority == "medium", 2),
-        (Notification.priority == "low", 3),
-        else_=2  # 默认 medium
-    )
-    
-    if sort_by == "priority":
-        query = query.order_by(priority_order, Notification.created_at.desc())
-    else:
-        # 默认按时间排序,但高优先级置顶
-        query = query.order_by(priority_order, Notification.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    
-    result = await db.execute(query)
-    notifications = result.scalars().all()
-    
-    # 转换为响应模型
-    items = []
-    for n in notifications:
-        # 获取关联用户名(如果有)
-        related_username = None
-        if n.related_user_id:
-            user_result = await db.execute(
-                select(DimUser.username).where(DimUser.user_id == n.related_user_id)
-            )
-            related_username = user_result.scalar_one_or_none()
-        
-        # v4.19.0: 生成快速操作按钮
-        actions = generate_notification_actions(n.notification_type, n.related_user_id, current_user)
-        
-        items.append(NotificationResponse(
-            notification_id=n.notification_id,
-            recipient_id=n.recipient_id,
-            notification_type=n.notification_type,
-            title=n.title,
-            content=n.content,
-            extra_data=n.extra_data,
-            related_user_id=n.related_user_id,
-            is_read=n.is_read,
-            read_at=n.read_at,
-            created_at=n.created_at,
-            priority=getattr(n, 'priority', 'medium'),  # v4.19.0
-            related_username=related_username,
-            actions=actions
-        ))
+    # v4.19.0: 生成快速操作按钮
+    items = [
+        _notification_response(
+            n,
+            related_username,
+            generate_notification_actions(n.notification_type, n.related_user_id, current_user),
+        )
+        for n, related_username in rows
+    ]
     
     return NotificationListResponse(
         items=items,
@@ -235,72 +208,29 @@ async def get_notifications_grouped(
     
     v4.19.0: 返回每个类型的统计信息和最新通知
     """
-    # 按类型分组统计
-    group_query = select(
-        Notification.notification_type,
-        func.count(Notification.notification_id).label('total_count'),
-        func.sum(func.cast(~Notification.is_read, Integer)).label('unread_count')
-    ).where(
-        Notification.recipient_id == current_user.user_id
-    ).group_by(
-        Notification.notification_type
-    )
-    
-    result = await db.execute(group_query)
-    group_stats = result.all()
+    # 分组统计与每组最新通知(含关联用户名)一条查询完成
+    group_rows = await get_notification_read_model(db).grouped(current_user.user_id)
     
     groups = []
     total_count = 0
     total_unread = 0
     
-    for notification_type, count, unread in group_stats:
-        total_count += count
-        total_unread += unread or 0
+    for row in group_rows:
+        total_count += row.total_count
+        total_unread += row.unread_count
         
-        # 获取该类型的最新通知
-        latest_query = select(Notification).where(
-            and_(
-                Notification.recipient_id == current_user.user_id,
-                Notification.notification_type == notification_type
-            )
-        ).order_by(Notification.created_at.desc()).limit(1)
-        
-        result = await db.execute(latest_query)
-        latest = result.scalar_one_or_none()
-        
-        latest_response = None
-        if latest:
-            # 获取关联用户名
-            related_username = None
-            if latest.related_user_id:
-                user_result = await db.execute(
-                    select(DimUser.username).where(DimUser.user_id == latest.related_user_id)
-                )
-                related_username = user_result.scalar_one_or_none()
-            
-            # 生成快速操作
-            actions = generate_notification_actions(latest.notification_type, latest.related_user_id, current_user)
-            
-            latest_response = NotificationResponse(
-                notification_id=latest.notification_id,
-                recipient_id=latest.recipient_id,
-                notification_type=latest.notification_type,
-                title=latest.title,
-                content=latest.content,
-                extra_data=latest.extra_data,
-                related_user_id=latest.related_user_id,
-                is_read=latest.is_read,
-                read_at=latest.read_at,
-                created_at=latest.created_at,
-                related_username=related_username,
-                actions=actions
-            )
+        latest = row.latest
+        latest_response = _notification_response(
+            latest,
+            row.latest_related_username,
+            generate_notification_actions(latest.notification_type, latest.related_user_id, current_user),
+        )
         
         groups.append(NotificationGroupItem(
-            notification_type=notification_type,
-            type_label=NOTIFICATION_TYPE_LABELS.get(notification_type, notification_type),
-            total_count=count,
-            unread_count=unread or 0,
+            notification_type=row.notification_type,
+            type_label=NOTIFICATION_TYPE_LABELS.get(row.notification_type, row.notification_type),
+            total_count=row.total_count,
+            unread_count=row.unread_count,
             latest_notification=latest_response
         ))
     
@@ -321,39 +251,13 @@ async def get_notification(
     db: AsyncSession = Depends(get_async_db)
 ):
     """获取单个通知详情"""
-    query = select(Notification).where(
-        and_(
-            Notification.notification_id == notification_id,
-            Notification.recipient_id == current_user.user_id
-        )
-    )
-    result = await db.execute(query)
-    notification = result.scalar_one_or_none()
+    row = await get_notification_read_model(db).get(current_user.user_id, notification_id)
     
-    if not notification:
+    if row is None:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    # 获取关联用户名
-    related_username = None
-    if notification.related_user_id:
-        user_result = await db.execute(
-            select(DimUser.username).where(DimUser.user_id == notification.related_user_id)
-        )
-        related_username = user_result.scalar_one_or_none()
-    
-    return NotificationResponse(
-        notification_id=notification.notification_id,
-        recipient_id=notification.recipient_id,
-        notification_type=notification.notification_type,
-        title=notification.title,
-        content=notification.content,
-        extra_data=notification.extra_data,
-        related_user_id=notification.related_user_id,
-        is_read=notification.is_read,
-        read_at=notification.read_at,
-        created_at=notification.created_at,
-        related_username=related_username
-    )
+    notification, related_username = row
+    return _notification_response(notification, related_username)
 
 
 @router.put("/{notification_id}/read", response_model=MarkReadResponse)
@@ -713,32 +617,39 @@ async def create_notification(
     Returns:
         创建的通知对象
     """
-    # v4.19.0: 验证优先级
-    valid_priorities = ["high", "medium", "low"]
-    if priority.lower() not in valid_priorities:
-        priority = "medium"  # 无效值使用默认
-
-    sqlite_notification_id = None
-    bind = db.get_bind()
-    if bind is not None and bind.dialect.name == "sqlite":
-        max_id_result = await db.execute(select(func.max(Notification.notification_id)))
-        sqlite_notification_id = (max_id_result.scalar() or 0) + 1
-
+    # notification_id 由序列分配(SQLite 下为 rowid),不再 max()+1
     notification = Notification(
-        notification_id=sqlite_notification_id,
         recipient_id=recipient_id,
         notification_type=notification_type.value if isinstance(notification_type, NotificationType) else notification_type,
         title=title,
         content=content,
         extra_data=extra_data,
         related_user_id=related_user_id,
-        priority=priority.lower()
+        priority=_normalize_priority(priority)
     )
     db.add(notification)
     await db.flush()
     return notification
 
 
+def _normalize_priority(priority: str) -> str:
+    # v4.19.0: 验证优先级,无效值使用默认
+    priority = (priority or "medium").lower()
+    return priority if priority in ("high", "medium", "low") else "medium"
+
+
+async def _admin_user_ids(db: AsyncSession) -> List[int]:
+    """管理员用户ID(is_superuser=True 或角色为 admin),一条查询"""
+    admin_query = union(
+        select(DimUser.user_id).where(DimUser.is_superuser == True),
+        select(user_roles.c.user_id)
+        .join(DimRole, user_roles.c.role_id == DimRole.role_id)
+        .where(DimRole.role_code == "admin"),
+    )
+    result = await db.execute(admin_query)
+    return sorted(result.scalars().all())
+
+
 async def create_notifications_for_admins(
     db: AsyncSession,
     notification_type: NotificationType,
@@ -763,41 +674,26 @@ async def create_notifications_for_admins(
     Returns:
         创建的通知列表
     """
-    # 查询所有管理员(is_superuser=True 或角色为 admin)
-    from modules.core.db import DimRole, user_roles
-    
-    # 方法1:查询 is_superuser=True 的用户
-    superuser_query = select(DimUser.user_id).where(DimUser.is_superuser == True)
-    result = await db.execute(superuser_query)
-    admin_ids = set(result.scalars().all())
-    
-    # 方法2:查询角色为 admin 的用户
-    admin_role_query = (
-        select(user_roles.c.user_id)
-        .join(DimRole, user_roles.c.role_id == DimRole.role_id)
-        .where(DimRole.role_code == "admin")
-    )
-    result = await db.execute(admin_role_query)
-    admin_ids.update(result.scalars().all())
-    
+    admin_ids = await _admin_user_ids(db)
     if not admin_ids:
         logger.warning("[WARN] No admin users found for notification")
         return []
     
-    # 为每个管理员创建通知
-    notifications = []
-    for admin_id in admin_ids:
-        notification = await create_notification(
-            db=db,
-            recipient_id=admin_id,
-            notification_type=notification_type,
-            title=title,
-            content=content,
-            extra_data=extra_data,
-            related_user_id=related_user_id,
-            priority=priority
-        )
-        notifications.append(notification)
+    # 所有管理员的通知一条 INSERT ... RETURNING 写入
+    values = {
+        "notification_type": notification_type.value if isinstance(notification_type, NotificationType) else notification_type,
+        "title": title,
+        "content": content,
+        "extra_data": extra_data,
+        "related_user_id": related_user_id,
+        "priority": _normalize_priority(priority),
+        "is_read": False,
+    }
+    result = await db.execute(
+        insert(Notification).returning(Notification),
+        [{"recipient_id": admin_id, **values} for admin_id in admin_ids],
+    )
+    notifications = list(result.scalars().all())
     
     logger.info(f"[OK] Created {len(notifications)} notifications for admins")
     return notifications
@@ -844,25 +740,8 @@ async def notify_user_registered(
             connection_manager,
         )
         
-        # 获取所有管理员ID
-        admin_ids = set()
-        
-        # 查询 is_superuser=True 的用户
-        superuser_query = select(DimUser.user_id).where(DimUser.is_superuser == True)
-        result = await db.execute(superuser_query)
-        admin_ids.update(result.scalars().all())
-        
-        # 查询角色为 admin 的用户
-        admin_role_query = (
-            select(user_roles.c.user_id)
-            .join(DimRole, user_roles.c.role_id == DimRole.role_id)
-            .where(DimRole.role_code == "admin")
-        )
-        result = await db.execute(admin_role_query)
-        admin_ids.update(result.scalars().all())
-        
-        # 批量推送通知
-        if admin_ids and notifications:
+        # 批量推送通知(接收者即通知的管理员)
+        if notifications:
             for notification in notifications:
                 notification_msg = NotificationMessage(
                     notification_id=notification.notification_id,
@@ -12,8 +12,6 @@ from sqlalchemy.orm import selectinload
 from typing import Optional, List
 from datetime import datetime, timezone
 from pathlib import Path
-import io
-import csv
 
 from backend.models.database import get_async_db
 from backend.dependencies.auth import require_admin
@@ -23,6 +21,7 @@ from backend.schemas.system import (
     SystemLogFilterRequest,
     SystemLogExportRequest
 )
+from backend.services.streaming_export import ExportSpec, count_export_rows, export_response
 from modules.core.db import SystemLog, DimUser
 from backend.utils.api_response import success_response, pagination_response, error_response
 from backend.utils.error_codes import ErrorCode, get_error_type
@@ -166,6 +165,22 @@ async def get_system_log_detail(
         )
 
 
+SYSTEM_LOG_EXPORT_HEADERS = ["ID", "级别", "模块", "消息", "用户ID", "IP地址", "用户代理", "创建时间"]
+
+
+def _system_log_row(log: SystemLog) -> list:
+    return [
+        log.id,
+        log.level,
+        log.module,
+        log.message,
+        log.user_id or "",
+        log.ip_address or "",
+        log.user_agent or "",
+        log.created_at.isoformat() if log.created_at else ""
+    ]
+
+
 @router.post("/export")
 async def export_system_logs(
     request: SystemLogExportRequest,
@@ -211,10 +226,8 @@ async def export_system_logs(
         
         query = query.limit(request.max_records)
         
-        result = await db.execute(query)
-        logs = result.scalars().all()
-        
-        if not logs:
+        total = await count_export_rows(db, query)
+        if not total:
             return error_response(
                 code=ErrorCode.DATA_NOT_FOUND,
                 message="没有可导出的日志",
@@ -223,92 +236,23 @@ async def export_system_logs(
                 status_code=404
             )
         
-        # 导出为CSV或Excel
-        if request.format == "csv":
-            # CSV导出
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # 写入表头
-            writer.writerow(["ID", "级别", "模块", "消息", "用户ID", "IP地址", "用户代理", "创建时间"])
-            
-            # 写入数据
-            for log in logs:
-                writer.writerow([
-                    log.id,
-                    log.level,
-                    log.module,
-                    log.message,
-                    log.user_id or "",
-                    log.ip_address or "",
-                    log.user_agent or "",
-                    log.created_at.isoformat() if log.created_at else ""
-                ])
-            
-            from fastapi.responses import Response
-            return Response(
-                content=output.getvalue(),
-                media_type="text/csv",
-                headers={
-                    "Content-Disposition": f"attachment; filename=system_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                }
-            )
-        else:
-            # Excel导出(需要openpyxl)
-            try:
-                from openpyxl import Workbook
-                from openpyxl.styles import Font, Alignment
-                
-                wb = Workbook()
-                ws = wb.active
-                ws.title = "系统日志"
-                
-                # 写入表头
-                headers = ["ID", "级别", "模块", "消息", "用户ID", "IP地址", "用户代理", "创建时间"]
-                ws.append(headers)
-                
-                # 设置表头样式
-                for cell in ws[1]:
-                    cell.font = Font(bold=True)
-                    cell.alignment = Alignment(horizontal="center")
-                
-                # 写入数据
-                for log in logs:
-                    ws.append([
-                        log.id,
-                        log.level,
-                        log.module,
-                        log.message,
-                        log.user_id or "",
-                        log.ip_address or "",
-                        log.user_agent or "",
-                        log.created_at.isoformat() if log.created_at else ""
-                    ])
-                
-                # 保存到内存
-                output = io.BytesIO()
-                wb.save(output)
-                output.seek(0)
-                
-                from fastapi.responses import Response
-                return Response(
-                    content=output.getvalue(),
-                    media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    headers={
-                        "Content-Disposition": f"attachment; filename=system_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                    }
-                )
-            except ImportError:
-                # 如果没有openpyxl,降级为CSV
-                logger.warning("openpyxl未安装,降级为CSV格式导出")
-                return await export_system_logs(
-                    SystemLogExportRequest(
-                        **request.model_dump(),
-                        format="csv"
-                    ),
-                    db,
-                    current_user
-                )
+        # 导出为CSV或Excel(流式写出,超过阈值转为后台任务)
+        spec = ExportSpec(
+            statement=query,
+            headers=SYSTEM_LOG_EXPORT_HEADERS,
+            row_mapper=_system_log_row,
+            filename=f"system_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            format="csv" if request.format == "csv" else "xlsx",
+            sheet_name="系统日志",
+        )
+        return await export_response(
+            db,
+            spec,
+            task_type="system_logs",
+            total_rows=total,
+            requested_by=getattr(current_user, "user_id", None),
+            admin_only=True,
+        )
         
     except Exception as e:
         logger.error(f"导出系统日志失败: {e}", exc_info=True)
@@ -1,29 +1,28 @@
-from backend.domains.platform.routers import (
-    auth,
-    backup,
-    maintenance,
-    notification_config,
-    notifications,
-    reference,
-    rbac_admin,
-    rate_limit,
-    rate_limit_config,
-    security,
-    system,
-    system_logs,
-    system_monitoring,
-    tiktokshop_oauth,
-    users,
-)
-from backend.domains.collection.routers import (
-    main_accounts,
-    platform_shop_discoveries,
-    shop_account_aliases,
-    shop_accounts,
-)
-
-
 def register_platform_routes(app) -> None:
+    from backend.domains.platform.routers import (
+        auth,
+        backup,
+        maintenance,
+        notification_config,
+        notifications,
+        reference,
+        rbac_admin,
+        rate_limit,
+        rate_limit_config,
+        security,
+        system,
+        system_logs,
+        system_monitoring,
+        tiktokshop_oauth,
+        users,
+    )
+    from backend.domains.collection.routers import (
+        main_accounts,
+        platform_shop_discoveries,
+        shop_account_aliases,
+        shop_accounts,
+    )
+
     app.include_router(system_monitoring.router, prefix="/api", tags=["系统监控"])
     app.include_router(auth.router, prefix="/api", tags=["认证管理"])
     app.include_router(users.router, prefix="/api", tags=["用户管理"])
@@ -69,6 +69,7 @@ from backend.app.runtime import (
     resolve_runtime_mode as resolve_runtime_mode_impl,
 )
 from backend.app.system_routes import register_system_routes
+from backend.app.startup_graph import StartupGraph
 from backend.app.exception_handlers import (
     handle_erp_exception,
     handle_general_exception,
@@ -257,8 +258,23 @@ async def lifespan(app: FastAPI):
         except Exception as websocket_gate_err:
             logger.warning("[WS] Skip hook failed: %s", websocket_gate_err)
 
-    try:
-        # 1. 环境配置(<1秒)
+    # 启动依赖图:无依赖关系的步骤并发执行,非关键步骤延后到开始接收请求之后
+    graph = StartupGraph()
+    app.state.startup_graph = graph
+    app.state.startup_metrics = startup_metrics
+    app.state.collection_leader_lock_acquired = True
+    defer_non_critical = _env_flag("STARTUP_DEFER_NON_CRITICAL", default=True)
+
+    collection_enabled = should_start_collection_scheduler(background_role) and os.getenv(
+        "ENABLE_COLLECTION", "true"
+    ).lower() in ("true", "1")
+    queue_runner_enabled = should_start_collection_queue_runner(background_role) and os.getenv(
+        "ENABLE_COLLECTION", "true"
+    ).lower() in ("true", "1")
+    deployment_role = os.getenv("DEPLOYMENT_ROLE", "").lower()
+
+    # 1. 环境配置(<1秒)
+    async def _configure_postgres_path():
         step_start = time.time()
         postgres_path_configured = auto_configure_postgres_path(emit_output=False)
         startup_metrics["postgres_path"] = time.time() - step_start
@@ -271,11 +287,15 @@ async def lifespan(app: FastAPI):
                 f"[SKIP] PostgreSQL客户端工具未找到，跳过PATH配置 ({startup_metrics['postgres_path']:.2f}秒)"
             )
 
-        # 2. 数据库连接验证(<2秒)
+    # 2. 数据库连接验证(<2秒)
+    def _select_one():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    async def _verify_database_connection():
         step_start = time.time()
         try:
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            await asyncio.to_thread(_select_one)
             startup_metrics["postgres_connect"] = time.time() - step_start
             logger.info(
                 f"[OK] 数据库连接验证成功 ({startup_metrics['postgres_connect']:.2f}秒)"
@@ -285,145 +305,152 @@ async def lifespan(app: FastAPI):
             logger.error(f"[ERROR] 数据库连接失败: {e}")
             raise
 
-        try:
-            legacy_artifacts = collect_legacy_shop_artifacts_for_active_shops(
-                project_root,
-                settings.DATABASE_URL,
+    def _check_legacy_shop_artifacts():
+        legacy_artifacts = collect_legacy_shop_artifacts_for_active_shops(
+            project_root,
+            settings.DATABASE_URL,
+        )
+        if legacy_artifacts:
+            logger.warning(
+                "[WARNING] 检测到 %s 个店铺级会话历史残留；当前运行不会使用它们，但建议清理",
+                len(legacy_artifacts),
             )
-            if legacy_artifacts:
+            for artifact in legacy_artifacts[:10]:
+                logger.warning("[WARNING] legacy shop artifact: %s", artifact)
+            if len(legacy_artifacts) > 10:
                 logger.warning(
-                    "[WARNING] 检测到 %s 个店铺级会话历史残留；当前运行不会使用它们，但建议清理",
-                    len(legacy_artifacts),
+                    "[WARNING] ... 其余 %s 个路径已省略",
+                    len(legacy_artifacts) - 10,
                 )
-                for artifact in legacy_artifacts[:10]:
-                    logger.warning("[WARNING] legacy shop artifact: %s", artifact)
-                if len(legacy_artifacts) > 10:
-                    logger.warning(
-                        "[WARNING] ... 其余 %s 个路径已省略",
-                        len(legacy_artifacts) - 10,
-                    )
+
+    async def _legacy_shop_artifacts():
+        try:
+            await asyncio.to_thread(_check_legacy_shop_artifacts)
         except Exception as legacy_artifact_error:
             logger.warning(
                 "[WARNING] 遗留店铺会话残留检查失败: %s",
                 legacy_artifact_error,
             )
 
-        # 3. 数据库表验证(<3秒)
-        # [SCHEMA MIGRATION] 生产环境:只验证,不创建;开发环境:可以使用 init_db()
-        step_start = time.time()
-        try:
-            from backend.models.database import verify_schema_completeness
+    # 3. 数据库表验证(<3秒)
+    # [SCHEMA MIGRATION] 生产环境:只验证,不创建;开发环境:可以使用 init_db()
+    def _verify_schema():
+        from backend.models.database import verify_schema_completeness
 
-            if settings.ENVIRONMENT == "production":
-                # 生产环境:验证表结构完整性,不创建表
-                result = verify_schema_completeness()
-
-                if not result["all_tables_exist"]:
-                    missing_tables = result["missing_tables"][:10]
-                    logger.error(
-                        f"[ERROR] 生产环境表结构不完整！缺失表 ({len(result['missing_tables'])} 张): "
-                        f"{', '.join(missing_tables)}"
-                    )
-                    if len(result["missing_tables"]) > 10:
-                        logger.error(
-                            f"[ERROR] ... 还有 {len(result['missing_tables']) - 10} 张表缺失"
-                        )
-                    logger.error("[ERROR] 请运行: alembic upgrade heads")
-                    raise RuntimeError(
-                        f"Schema incompleteness: {len(result['missing_tables'])} tables missing"
-                    )
+        step_start = time.time()
+        if settings.ENVIRONMENT == "production":
+            # 生产环境:验证表结构完整性,不创建表
+            result = verify_schema_completeness()
 
-                if not result.get("all_critical_columns_exist", True):
-                    missing_columns = result.get("missing_columns", [])[:10]
+            if not result["all_tables_exist"]:
+                missing_tables = result["missing_tables"][:10]
+                logger.error(
+                    f"[ERROR] 生产环境表结构不完整！缺失表 ({len(result['missing_tables'])} 张): "
+                    f"{', '.join(missing_tables)}"
+                )
+                if len(result["missing_tables"]) > 10:
                     logger.error(
-                        f"[ERROR] 生产环境关键列缺失({len(result.get('missing_columns', []))} 列): "
-                        f"{', '.join(missing_columns)}"
-                    )
-                    if len(result.get("missing_columns", [])) > 10:
-                        logger.error(
-                            f"[ERROR] ... 还有 {len(result['missing_columns']) - 10} 个关键列缺失"
-                        )
-                    logger.error("[ERROR] 请运行: alembic upgrade heads")
-                    raise RuntimeError(
-                        f"Schema missing critical columns: {len(result.get('missing_columns', []))}"
+                        f"[ERROR] ... 还有 {len(result['missing_tables']) - 10} 张表缺失"
                     )
+                logger.error("[ERROR] 请运行: alembic upgrade heads")
+                raise RuntimeError(
+                    f"Schema incompleteness: {len(result['missing_tables'])} tables missing"
+                )
 
-                if result["migration_status"] not in ["up_to_date", "not_initialized"]:
-                    logger.error(
-                        f"[ERROR] Alembic 迁移状态异常: {result['migration_status']}"
-                    )
-                    logger.error(
-                        f"[ERROR] 当前版本: {result.get('current_revision', 'N/A')}"
-                    )
+            if not result.get("all_critical_columns_exist", True):
+                missing_columns = result.get("missing_columns", [])[:10]
+                logger.error(
+                    f"[ERROR] 生产环境关键列缺失({len(result.get('missing_columns', []))} 列): "
+                    f"{', '.join(missing_columns)}"
+                )
+                if len(result.get("missing_columns", [])) > 10:
                     logger.error(
-                        f"[ERROR] 最新版本: {result.get('head_revision', 'N/A')}"
-                    )
-                    logger.error("[ERROR] 请运行: alembic upgrade heads")
-                    raise RuntimeError(
-                        f"Migration status invalid: {result['migration_status']}"
+                        f"[ERROR] ... 还有 {len(result['missing_columns']) - 10} 个关键列缺失"
                     )
+                logger.error("[ERROR] 请运行: alembic upgrade heads")
+                raise RuntimeError(
+                    f"Schema missing critical columns: {len(result.get('missing_columns', []))}"
+                )
 
-                startup_metrics["table_init"] = time.time() - step_start
-                logger.info(
-                    f"[OK] 数据库表验证通过 ({result['actual_table_count']} 张表, "
-                    f"{startup_metrics['table_init']:.2f}秒)"
+            if result["migration_status"] not in ["up_to_date", "not_initialized"]:
+                logger.error(
+                    f"[ERROR] Alembic 迁移状态异常: {result['migration_status']}"
+                )
+                logger.error(
+                    f"[ERROR] 当前版本: {result.get('current_revision', 'N/A')}"
+                )
+                logger.error(
+                    f"[ERROR] 最新版本: {result.get('head_revision', 'N/A')}"
+                )
+                logger.error("[ERROR] 请运行: alembic upgrade heads")
+                raise RuntimeError(
+                    f"Migration status invalid: {result['migration_status']}"
                 )
-            else:
-                # 开发环境:允许 init_db(),但仍要求关键表结构与迁移状态完整,避免运行期500
-                init_db()
-                result = verify_schema_completeness()
 
-                if not result["all_tables_exist"]:
-                    missing_tables = result["missing_tables"][:10]
-                    logger.error(
-                        f"[ERROR] 开发环境表结构不完整, 缺失表 ({len(result['missing_tables'])} 张): "
-                        f"{', '.join(missing_tables)}"
-                    )
-                    logger.error("[ERROR] 请运行: alembic upgrade heads")
-                    raise RuntimeError(
-                        f"Development schema incompleteness: {len(result['missing_tables'])} tables missing"
-                    )
+            startup_metrics["table_init"] = time.time() - step_start
+            logger.info(
+                f"[OK] 数据库表验证通过 ({result['actual_table_count']} 张表, "
+                f"{startup_metrics['table_init']:.2f}秒)"
+            )
+        else:
+            # 开发环境:允许 init_db(),但仍要求关键表结构与迁移状态完整,避免运行期500
+            init_db()
+            result = verify_schema_completeness()
 
-                if not result.get("all_critical_columns_exist", True):
-                    missing_columns = result.get("missing_columns", [])[:10]
-                    logger.error(
-                        f"[ERROR] 开发环境关键列缺失({len(result.get('missing_columns', []))} 列): "
-                        f"{', '.join(missing_columns)}"
-                    )
-                    logger.error("[ERROR] 请运行: alembic upgrade heads")
-                    raise RuntimeError(
-                        f"Development schema missing critical columns: {len(result.get('missing_columns', []))}"
-                    )
+            if not result["all_tables_exist"]:
+                missing_tables = result["missing_tables"][:10]
+                logger.error(
+                    f"[ERROR] 开发环境表结构不完整, 缺失表 ({len(result['missing_tables'])} 张): "
+                    f"{', '.join(missing_tables)}"
+                )
+                logger.error("[ERROR] 请运行: alembic upgrade heads")
+                raise RuntimeError(
+                    f"Development schema incompleteness: {len(result['missing_tables'])} tables missing"
+                )
 
-                if result["migration_status"] not in ["up_to_date", "not_initialized"]:
-                    logger.error(
-                        f"[ERROR] 开发环境 Alembic 迁移状态异常: {result['migration_status']}"
-                    )
-                    logger.error(
-                        f"[ERROR] 当前版本: {result.get('current_revision', 'N/A')}"
-                    )
-                    logger.error(
-                        f"[ERROR] 最新版本: {result.get('head_revision', 'N/A')}"
-                    )
-                    logger.error("[ERROR] 请运行: alembic upgrade heads")
-                    raise RuntimeError(
-                        f"Development migration status invalid: {result['migration_status']}"
-                    )
+            if not result.get("all_critical_columns_exist", True):
+                missing_columns = result.get("missing_columns", [])[:10]
+                logger.error(
+                    f"[ERROR] 开发环境关键列缺失({len(result.get('missing_columns', []))} 列): "
+                    f"{', '.join(missing_columns)}"
+                )
+                logger.error("[ERROR] 请运行: alembic upgrade heads")
+                raise RuntimeError(
+                    f"Development schema missing critical columns: {len(result.get('missing_columns', []))}"
+                )
 
-                startup_metrics["table_init"] = time.time() - step_start
-                logger.info(
-                    f"[OK] 数据库表初始化完成(开发模式) ({startup_metrics['table_init']:.2f}秒)"
+            if result["migration_status"] not in ["up_to_date", "not_initialized"]:
+                logger.error(
+                    f"[ERROR] 开发环境 Alembic 迁移状态异常: {result['migration_status']}"
                 )
-        except Exception as e:
+                logger.error(
+                    f"[ERROR] 当前版本: {result.get('current_revision', 'N/A')}"
+                )
+                logger.error(
+                    f"[ERROR] 最新版本: {result.get('head_revision', 'N/A')}"
+                )
+                logger.error("[ERROR] 请运行: alembic upgrade heads")
+                raise RuntimeError(
+                    f"Development migration status invalid: {result['migration_status']}"
+                )
+
             startup_metrics["table_init"] = time.time() - step_start
+            logger.info(
+                f"[OK] 数据库表初始化完成(开发模式) ({startup_metrics['table_init']:.2f}秒)"
+            )
+
+    async def _verify_database_schema():
+        try:
+            await asyncio.to_thread(_verify_schema)
+        except Exception as e:
             if settings.ENVIRONMENT == "production":
                 # 生产环境必须失败,不继续启动
                 logger.error(f"[ERROR] 数据库验证失败: {e}")
-                raise
             else:
                 logger.error(f"[ERROR] 开发环境数据库验证失败: {e}")
-                raise
+            raise
 
+    async def _ensure_system_roles():
         try:
             from backend.models.database import AsyncSessionLocal
 
@@ -438,93 +465,91 @@ async def lifespan(app: FastAPI):
             logger.error(f"[ERROR] 系统角色补齐失败: {role_seed_error}")
             raise
 
-        # 4. 连接池预热(<2秒)
+    # 后台导出是进程内任务,重启前未完成的导出不会再推进;须在接收请求前标记
+    async def _recover_orphaned_exports():
+        try:
+            from backend.models.database import AsyncSessionLocal
+            from backend.services.streaming_export import fail_orphaned_export_jobs
+
+            async with AsyncSessionLocal() as session:
+                orphaned_count = await fail_orphaned_export_jobs(session)
+            if orphaned_count > 0:
+                logger.warning(f"[StreamingExport] 标记 {orphaned_count} 个中断的后台导出任务为失败")
+        except Exception as export_recover_err:
+            logger.warning(f"[StreamingExport] 中断导出任务标记失败(不影响主功能): {export_recover_err}")
+
+    # 4. Dashboard 资产检查(延后执行;路由层在报告缺失时会自行检查)
+    async def _dashboard_bootstrap():
         step_start = time.time()
         try:
-            dashboard_bootstrap_completed = False
             dashboard_bootstrap_report = await collect_dashboard_bootstrap_report(
                 settings.ENVIRONMENT
             )
-
-            # Expose readiness report for route-level graceful degradation.
+        except Exception as e:
+            startup_metrics["dashboard_bootstrap"] = time.time() - step_start
+            logger.error(
+                f"[ERROR] PostgreSQL Dashboard 资产初始化失败: {e}",
+                exc_info=True,
+            )
+            if settings.ENVIRONMENT == "production":
+                raise
+            logger.warning(
+                "[WARN] 已跳过 PostgreSQL Dashboard 资产初始化失败以继续启动开发服务。"
+                "如需禁用启动期自动初始化，请设置 AUTO_BOOTSTRAP_DASHBOARD_ASSETS_ON_STARTUP=false"
+            )
             try:
-                app.state.dashboard_assets_report = dashboard_bootstrap_report
-                app.state.dashboard_assets_ready = bool(dashboard_bootstrap_report.get("ready"))
-            except Exception:
-                app.state.dashboard_assets_report = {"ready": False, "error": "failed to persist report"}
+                app.state.dashboard_assets_report = {
+                    "ready": False,
+                    "error": f"startup bootstrap failed: {e}",
+                }
                 app.state.dashboard_assets_ready = False
-            startup_metrics["dashboard_bootstrap"] = time.time() - step_start
-            if dashboard_bootstrap_report.get("skipped"):
-                logger.info(
-                    "[SKIP] PostgreSQL Dashboard 资产启动期自动初始化已禁用 "
-                    "(AUTO_BOOTSTRAP_DASHBOARD_ASSETS_ON_STARTUP=false)"
-                )
-            elif dashboard_bootstrap_report.get("bootstrap_in_progress"):
-                logger.info(
-                    "[SKIP] PostgreSQL Dashboard 资产正在被其他实例初始化，避免并发竞争"
-                )
-            elif dashboard_bootstrap_report.get("bootstrapped"):
-                logger.info(
-                    "[OK] PostgreSQL Dashboard 资产已自动初始化 "
-                    f"({startup_metrics['dashboard_bootstrap']:.2f}秒, run_id={dashboard_bootstrap_report.get('run_id')})"
-                )
-            else:
-                logger.info(
-                    "[OK] PostgreSQL Dashboard 资产已就绪 "
-                    f"({startup_metrics['dashboard_bootstrap']:.2f}秒)"
-                )
+            except Exception:
+                pass
+            return
 
-            dashboard_bootstrap_completed = True
+        # Expose readiness report for route-level graceful degradation.
+        try:
+            app.state.dashboard_assets_report = dashboard_bootstrap_report
+            app.state.dashboard_assets_ready = bool(dashboard_bootstrap_report.get("ready"))
+        except Exception:
+            app.state.dashboard_assets_report = {"ready": False, "error": "failed to persist report"}
+            app.state.dashboard_assets_ready = False
+        startup_metrics["dashboard_bootstrap"] = time.time() - step_start
+        if dashboard_bootstrap_report.get("skipped"):
+            logger.info(
+                "[SKIP] PostgreSQL Dashboard 资产启动期自动初始化已禁用 "
+                "(AUTO_BOOTSTRAP_DASHBOARD_ASSETS_ON_STARTUP=false)"
+            )
+        elif dashboard_bootstrap_report.get("bootstrap_in_progress"):
+            logger.info(
+                "[SKIP] PostgreSQL Dashboard 资产正在被其他实例初始化，避免并发竞争"
+            )
+        elif dashboard_bootstrap_report.get("bootstrapped"):
+            logger.info(
+                "[OK] PostgreSQL Dashboard 资产已自动初始化 "
+                f"({startup_metrics['dashboard_bootstrap']:.2f}秒, run_id={dashboard_bootstrap_report.get('run_id')})"
+            )
+        else:
+            logger.info(
+                "[OK] PostgreSQL Dashboard 资产已就绪 "
+                f"({startup_metrics['dashboard_bootstrap']:.2f}秒)"
+            )
+
+    # 5. 连接池预热(<2秒,延后执行)
+    async def _warm_up_pool():
+        step_start = time.time()
+        try:
             warm_pool_target = max(1, min(2, settings.DB_POOL_SIZE))
-            warm_up_pool(pool_size=warm_pool_target)
+            await asyncio.to_thread(warm_up_pool, pool_size=warm_pool_target)
             startup_metrics["pool_warmup"] = time.time() - step_start
             logger.info(f"[OK] 连接池预热完成 ({startup_metrics['pool_warmup']:.2f}秒)")
         except Exception as e:
-            if not dashboard_bootstrap_completed:
-                startup_metrics["dashboard_bootstrap"] = time.time() - step_start
-                logger.error(
-                    f"[ERROR] PostgreSQL Dashboard 资产初始化失败: {e}",
-                    exc_info=True,
-                )
-                if settings.ENVIRONMENT != "production":
-                    logger.warning(
-                        "[WARN] 已跳过 PostgreSQL Dashboard 资产初始化失败以继续启动开发服务。"
-                        "如需禁用启动期自动初始化，请设置 AUTO_BOOTSTRAP_DASHBOARD_ASSETS_ON_STARTUP=false"
-                    )
-                    try:
-                        app.state.dashboard_assets_report = {
-                            "ready": False,
-                            "error": f"startup bootstrap failed: {e}",
-                        }
-                        app.state.dashboard_assets_ready = False
-                    except Exception:
-                        pass
-                    dashboard_bootstrap_completed = True
-                else:
-                    raise
             startup_metrics["pool_warmup"] = time.time() - step_start
             logger.warning(f"[WARN] 连接池预热失败: {e}")
 
-        startup_metrics["total"] = time.time() - startup_start
-
-        logger.info(
-            f"""
-╔══════════════════════════════════════════════════════════╗
-║          西虹ERP系统启动完成 - 性能报告                  ║
-╠══════════════════════════════════════════════════════════╣
-║  PostgreSQL客户端PATH: {startup_metrics['postgres_path']:>6.2f}秒                    ║
-║  数据库连接验证:     {startup_metrics['postgres_connect']:>6.2f}秒                      ║
-║  数据库表初始化:     {startup_metrics['table_init']:>6.2f}秒                      ║
-║  连接池预热:         {startup_metrics['pool_warmup']:>6.2f}秒                      ║
-╠══════════════════════════════════════════════════════════╣
-║  总启动时间:         {startup_metrics['total']:>6.2f}秒                      ║
-║  已注册路由:         {len(app.routes):>6}个                       ║
-╚══════════════════════════════════════════════════════════╝
-        """
-        )
-
-        # [*] v4.3.3新增:启动后台自动修复任务(零手动干预)
-        # v4.12.0修复:正确管理后台任务,避免关闭时的CancelledError
+    # [*] v4.3.3新增:启动后台自动修复任务(零手动干预)
+    # v4.12.0修复:正确管理后台任务,避免关闭时的CancelledError
+    async def _start_auto_repair():
         try:
             from backend.tasks.auto_repair_files import auto_repair_all_xls_files
 
@@ -534,36 +559,43 @@ async def lifespan(app: FastAPI):
         except Exception as repair_err:
             logger.debug(f"[SKIP] 后台修复任务未启动: {repair_err}")
 
-        # v4.6.3新增:初始化Redis缓存(可选,不影响主流程)
-        if should_start_cloud_sync_worker(background_role):
-            try:
-                startup_checks = run_cloud_sync_startup_checks_from_env()
-                app.state.cloud_sync_startup_checks = startup_checks
-                logger.info("[CloudSync] Startup checks status=%s details=%s", startup_checks["status"], startup_checks["checks"])
-                if startup_checks.get("status") == "error":
-                    raise RuntimeError(
-                        f"cloud sync startup checks failed: {startup_checks.get('checks')}"
-                    )
-                cloud_sync_runtime = build_cloud_sync_runtime_from_env()
-                app.state.cloud_sync_runtime = cloud_sync_runtime
-                if cloud_sync_runtime is None:
-                    logger.info("[CloudSync] Cloud sync worker not enabled")
-                else:
-                    started = await cloud_sync_runtime.start()
-                    if started:
-                        logger.info("[CloudSync] Cloud sync worker started")
-                    else:
-                        logger.warning(
-                            "[CloudSync] Cloud sync worker not started because runtime is not configured"
-                        )
-            except Exception as cloud_sync_err:
-                logger.error(
-                    f"[CloudSync] Failed to start cloud sync worker: {cloud_sync_err}"
+    async def _cloud_sync_startup_checks():
+        try:
+            startup_checks = run_cloud_sync_startup_checks_from_env()
+            app.state.cloud_sync_startup_checks = startup_checks
+            logger.info("[CloudSync] Startup checks status=%s details=%s", startup_checks["status"], startup_checks["checks"])
+            if startup_checks.get("status") == "error":
+                raise RuntimeError(
+                    f"cloud sync startup checks failed: {startup_checks.get('checks')}"
                 )
-                raise
-        else:
-            logger.info("[CloudSync] Skipped for background role: %s", background_role)
+        except Exception as cloud_sync_err:
+            logger.error(
+                f"[CloudSync] Failed to start cloud sync worker: {cloud_sync_err}"
+            )
+            raise
+
+    async def _start_cloud_sync_runtime():
+        try:
+            cloud_sync_runtime = build_cloud_sync_runtime_from_env()
+            app.state.cloud_sync_runtime = cloud_sync_runtime
+            if cloud_sync_runtime is None:
+                logger.info("[CloudSync] Cloud sync worker not enabled")
+            else:
+                started = await cloud_sync_runtime.start()
+                if started:
+                    logger.info("[CloudSync] Cloud sync worker started")
+                else:
+                    logger.warning(
+                        "[CloudSync] Cloud sync worker not started because runtime is not configured"
+                    )
+        except Exception as cloud_sync_err:
+            logger.error(
+                f"[CloudSync] Failed to start cloud sync worker: {cloud_sync_err}"
+            )
+            raise
 
+    # v4.6.3新增:初始化Redis缓存(可选,不影响主流程)
+    async def _init_redis_cache():
         try:
             from backend.utils.redis_client import init_redis
 
@@ -576,39 +608,44 @@ async def lifespan(app: FastAPI):
                 cache_service = get_cache_service(redis_client=redis_client)
                 app.state.cache_service = cache_service
                 logger.info("[OK] 统一缓存服务已启用")
-                # [*] 4c8g 单机优化: 可选启动后缓存预热（不阻塞启动）
-                if os.getenv(
-                    "POSTGRESQL_DASHBOARD_CACHE_WARMUP_ENABLED", ""
-                ).lower() in ("true", "1", "yes"):
-                    delay_sec = int(
-                        os.getenv(
-                            "POSTGRESQL_DASHBOARD_CACHE_WARMUP_DELAY_SECONDS", "10"
-                        )
-                    )
 
-                    async def _warmup_after_startup():
-                        await asyncio.sleep(delay_sec)
-                        try:
-                            from backend.services.cache_warmup_service import (
-                                run_dashboard_cache_warmup,
-                            )
-
-                            result = await run_dashboard_cache_warmup()
-                            logger.info(f"[CacheWarmup] 启动预热结果: {result}")
-                        except Exception as warmup_err:
-                            logger.warning(
-                                f"[CacheWarmup] 启动预热异常(不阻塞): {warmup_err}",
-                                exc_info=True,
-                            )
+                from backend.services.auth_principal_cache import invalidation_bus
 
-                    asyncio.create_task(_warmup_after_startup())
-                    logger.info(
-                        f"[CacheWarmup] 已调度 PostgreSQL Dashboard 启动后预热(延迟 {delay_sec}s)"
-                    )
+                # 认证主体缓存依赖此订阅接收其他进程的失效广播
+                principal_task = invalidation_bus.start(redis_client)
+                if principal_task is not None:
+                    background_tasks.append(principal_task)
         except Exception as redis_err:
             logger.debug(f"[SKIP] Redis缓存未启用: {redis_err}")
 
-        # v4.19.0新增:初始化执行器管理器
+    # [*] 4c8g 单机优化: 可选启动后缓存预热（不阻塞启动）
+    async def _dashboard_cache_warmup():
+        if getattr(app.state, "cache_service", None) is None:
+            return
+        if os.getenv("POSTGRESQL_DASHBOARD_CACHE_WARMUP_ENABLED", "").lower() not in ("true", "1", "yes"):
+            return
+        delay_sec = int(
+            os.getenv("POSTGRESQL_DASHBOARD_CACHE_WARMUP_DELAY_SECONDS", "10")
+        )
+        logger.info(
+            f"[CacheWarmup] 已调度 PostgreSQL Dashboard 启动后预热(延迟 {delay_sec}s)"
+        )
+        await asyncio.sleep(delay_sec)
+        try:
+            from backend.services.cache_warmup_service import (
+                run_dashboard_cache_warmup,
+            )
+
+            result = await run_dashboard_cache_warmup()
+            logger.info(f"[CacheWarmup] 启动预热结果: {result}")
+        except Exception as warmup_err:
+            logger.warning(
+                f"[CacheWarmup] 启动预热异常(不阻塞): {warmup_err}",
+                exc_info=True,
+            )
+
+    # v4.19.0新增:初始化执行器管理器
+    async def _init_executor_manager():
         try:
             from backend.services.executor_manager import get_executor_manager
 
@@ -622,7 +659,8 @@ async def lifespan(app: FastAPI):
                 f"[ExecutorManager] 初始化失败(不影响主功能): {executor_err}"
             )
 
-        # v4.19.0新增:启动资源监控服务(可选,P2功能)
+    # v4.19.0新增:启动资源监控服务(可选,P2功能)
+    async def _start_resource_monitor():
         try:
             from backend.services.resource_monitor import get_resource_monitor
 
@@ -635,7 +673,8 @@ async def lifespan(app: FastAPI):
         except Exception as monitor_err:
             logger.warning(f"[ResourceMonitor] 启动失败(不影响主功能): {monitor_err}")
 
-        # v4.19.0新增:启动通知WebSocket清理任务
+    # v4.19.0新增:启动通知WebSocket清理任务
+    async def _start_websocket_cleanup():
         try:
             from backend.domains.platform.routers.notification_websocket import (
                 start_cleanup_task,
@@ -648,7 +687,8 @@ async def lifespan(app: FastAPI):
         except Exception as ws_err:
             logger.warning(f"[WS] WebSocket清理任务启动失败(不影响主功能): {ws_err}")
 
-        # [*] v4.19.5 新增:检查限流器存储连接
+    # [*] v4.19.5 新增:检查限流器存储连接
+    async def _check_rate_limit_storage():
         try:
             from backend.middleware.rate_limiter import check_redis_connection, limiter
 
@@ -669,47 +709,35 @@ async def lifespan(app: FastAPI):
                 f"[RateLimit] 存储连接检查失败(不影响主功能): {rate_limit_err}"
             )
 
-        # v4.7.0新增:标记中断的采集任务并初始化调度器
-        # collection scheduler + queue runner leader lock gating
-        enable_collection = should_start_collection_scheduler(background_role) and os.getenv("ENABLE_COLLECTION", "true").lower() in (
-            "true",
-            "1",
-        )
-        deployment_role = os.getenv("DEPLOYMENT_ROLE", "").lower()
-        leader_lock_acquired = True
-        if enable_collection and deployment_role != "cloud":
-            try:
-                from backend.services.collection_leader_lock import CollectionLeaderLock
-
-                lock = CollectionLeaderLock()
-                acquired = await lock.acquire()
-                app.state.collection_leader_lock = lock
-                leader_lock_acquired = bool(acquired)
-                app.state.collection_leader_lock_acquired = leader_lock_acquired
-                if not leader_lock_acquired:
-                    logger.info(
-                        "[CollectionLeaderLock] Leader lock not acquired; skip starting "
-                        "CollectionScheduler and CollectionQueueRunner"
-                    )
-            except Exception as lock_err:
-                logger.warning(
-                    f"[CollectionLeaderLock] Acquire failed (non-blocking): {lock_err}"
+    # v4.7.0新增:标记中断的采集任务并初始化调度器
+    # collection scheduler + queue runner leader lock gating
+    async def _acquire_collection_leader_lock():
+        if not collection_enabled or deployment_role == "cloud":
+            return
+        try:
+            from backend.services.collection_leader_lock import CollectionLeaderLock
+
+            lock = CollectionLeaderLock()
+            acquired = await lock.acquire()
+            app.state.collection_leader_lock = lock
+            app.state.collection_leader_lock_acquired = bool(acquired)
+            if not acquired:
+                logger.info(
+                    "[CollectionLeaderLock] Leader lock not acquired; skip starting "
+                    "CollectionScheduler and CollectionQueueRunner"
                 )
-                leader_lock_acquired = False
-                app.state.collection_leader_lock_acquired = False
-        else:
-            leader_lock_acquired = True
-            app.state.collection_leader_lock_acquired = True
+        except Exception as lock_err:
+            logger.warning(
+                f"[CollectionLeaderLock] Acquire failed (non-blocking): {lock_err}"
+            )
+            app.state.collection_leader_lock_acquired = False
 
+    # 重启恢复必须在接收请求前完成,避免新建任务被误标为中断
+    async def _recover_interrupted_runs():
         try:
             from backend.services.task_service import TaskService
-            from backend.services.collection_scheduler import (
-                CollectionScheduler,
-                APSCHEDULER_AVAILABLE,
-            )
             from backend.models.database import SessionLocal
 
-
             # [*] v4.18.2修复:使用run_in_executor包装同步数据库操作
             def _sync_mark_interrupted_tasks():
                 """同步标记中断任务(在线程池中执行)"""
@@ -727,19 +755,51 @@ async def lifespan(app: FastAPI):
             )
             if interrupted_count > 0:
                 logger.warning(f"[恢复] 标记 {interrupted_count} 个中断任务")
+        except Exception as recover_err:
+            logger.warning(f"[恢复] 中断任务标记失败(不影响主功能): {recover_err}")
 
-            # 按部署角色决定是否启动采集调度器（v4.19.x 本地与云端部署角色区分）
-            enable_collection = should_start_collection_scheduler(background_role) and os.getenv("ENABLE_COLLECTION", "true").lower() in (
-                "true",
-                "1",
+        if not (
+            queue_runner_enabled
+            and deployment_role != "cloud"
+            and app.state.collection_leader_lock_acquired
+        ):
+            return
+        try:
+            from backend.models.database import AsyncSessionLocal
+            from backend.services.collection_config_run_service import (
+                CollectionConfigRunService,
+            )
+
+            async with AsyncSessionLocal() as db:
+                run_service = CollectionConfigRunService(db)
+                recovered_runs = await run_service.mark_running_runs_failed(
+                    error_message="service restarted before config run completed"
+                )
+                if recovered_runs:
+                    logger.warning(
+                        "[QueueRunner] Marked %s running config runs as failed after restart",
+                        len(recovered_runs),
+                    )
+        except Exception as recover_err:
+            logger.warning(
+                f"[QueueRunner] Stale run recovery failed (non-blocking): {recover_err}"
+            )
+
+    async def _start_collection_scheduler():
+        try:
+            from backend.services.collection_scheduler import (
+                CollectionScheduler,
+                APSCHEDULER_AVAILABLE,
             )
-            deployment_role = os.getenv("DEPLOYMENT_ROLE", "").lower()
-            if not enable_collection or deployment_role == "cloud":
+            from backend.models.database import SessionLocal
+
+            # 按部署角色决定是否启动采集调度器（v4.19.x 本地与云端部署角色区分）
+            if not collection_enabled or deployment_role == "cloud":
                 logger.info(
                     "[调度器] 未启用采集调度器 (ENABLE_COLLECTION=false 或 DEPLOYMENT_ROLE=cloud)"
                 )
             # 初始化采集调度器
-            elif not leader_lock_acquired:
+            elif not app.state.collection_leader_lock_acquired:
                 logger.info(
                     "[CollectionLeaderLock] Leader lock not acquired; skip CollectionScheduler init/start/load schedules"
                 )
@@ -752,41 +812,6 @@ async def lifespan(app: FastAPI):
 
                 # 加载所有启用的定时配置
                 loaded_count = await scheduler.load_all_schedules()
-
-                # Startup reconcile: remove stale collection_config_* jobs from jobstore
-                try:
-                    from backend.models.database import AsyncSessionLocal
-                    from backend.services.collection_scheduler_reconcile import (
-                        reconcile_collection_schedules,
-                    )
-                    from modules.core.db import CollectionConfig
-                    from sqlalchemy import select
-
-                    async def list_enabled_config_crons() -> dict[int, str]:
-                        async with AsyncSessionLocal() as db:
-                            result = await db.execute(
-                                select(CollectionConfig.id, CollectionConfig.schedule_cron).where(
-                                    CollectionConfig.schedule_enabled == True,
-                                    CollectionConfig.is_active == True,
-                                    CollectionConfig.schedule_cron.isnot(None),
-                                )
-                            )
-                            rows = result.all()
-                            return {int(row[0]): str(row[1]) for row in rows}
-
-                    removed_count = await reconcile_collection_schedules(
-                        scheduler, list_enabled_config_crons
-                    )
-                    if removed_count:
-                        logger.info(
-                            "[CollectionScheduler] Reconciled jobstore: removed %s stale schedules",
-                            removed_count,
-                        )
-                except Exception as reconcile_err:
-                    logger.warning(
-                        "[CollectionScheduler] Startup reconcile failed (non-blocking): %s",
-                        reconcile_err,
-                    )
                 logger.info(f"[调度器] 已加载 {loaded_count} 个定时采集配置")
 
                 # 注册清理任务到调度器(每天凌晨3点执行)
@@ -854,29 +879,50 @@ async def lifespan(app: FastAPI):
         except Exception as scheduler_err:
             logger.warning(f"[调度器] 初始化失败(不影响主功能): {scheduler_err}")
 
+    # Startup reconcile: remove stale collection_config_* jobs from jobstore
+    async def _reconcile_collection_schedules():
+        scheduler = getattr(app.state, "collection_scheduler", None)
+        if scheduler is None:
+            return
         try:
-            enable_collection = should_start_collection_queue_runner(background_role) and os.getenv("ENABLE_COLLECTION", "true").lower() in (
-                "true",
-                "1",
+            from backend.models.database import AsyncSessionLocal
+            from backend.services.collection_scheduler_reconcile import (
+                reconcile_collection_schedules,
             )
-            deployment_role = os.getenv("DEPLOYMENT_ROLE", "").lower()
-            if enable_collection and deployment_role != "cloud" and leader_lock_acquired:
-                from backend.models.database import AsyncSessionLocal
-                from backend.services.collection_config_run_service import (
-                    CollectionConfigRunService,
-                )
-                from backend.services.collection_queue_runner import CollectionQueueRunner
+            from modules.core.db import CollectionConfig
+            from sqlalchemy import select
 
+            async def list_enabled_config_crons() -> dict[int, str]:
                 async with AsyncSessionLocal() as db:
-                    run_service = CollectionConfigRunService(db)
-                    recovered_runs = await run_service.mark_running_runs_failed(
-                        error_message="service restarted before config run completed"
-                    )
-                    if recovered_runs:
-                        logger.warning(
-                            "[QueueRunner] Marked %s running config runs as failed after restart",
-                            len(recovered_runs),
+                    result = await db.execute(
+                        select(CollectionConfig.id, CollectionConfig.schedule_cron).where(
+                            CollectionConfig.schedule_enabled == True,
+                            CollectionConfig.is_active == True,
+                            CollectionConfig.schedule_cron.isnot(None),
                         )
+                    )
+                    rows = result.all()
+                    return {int(row[0]): str(row[1]) for row in rows}
+
+            removed_count = await reconcile_collection_schedules(
+                scheduler, list_enabled_config_crons
+            )
+            if removed_count:
+                logger.info(
+                    "[CollectionScheduler] Reconciled jobstore: removed %s stale schedules",
+                    removed_count,
+                )
+        except Exception as reconcile_err:
+            logger.warning(
+                "[CollectionScheduler] Startup reconcile failed (non-blocking): %s",
+                reconcile_err,
+            )
+
+    async def _start_collection_queue_runner():
+        try:
+            if queue_runner_enabled and deployment_role != "cloud" and app.state.collection_leader_lock_acquired:
+                from backend.models.database import AsyncSessionLocal
+                from backend.services.collection_queue_runner import CollectionQueueRunner
 
                 queue_runner = CollectionQueueRunner(
                     session_factory=AsyncSessionLocal,
@@ -885,7 +931,7 @@ async def lifespan(app: FastAPI):
                 await queue_runner.start()
                 app.state.collection_queue_runner = queue_runner
                 logger.info("[QueueRunner] Collection config queue runner started")
-            elif enable_collection and deployment_role != "cloud" and not leader_lock_acquired:
+            elif queue_runner_enabled and deployment_role != "cloud":
                 logger.info(
                     "[CollectionLeaderLock] Leader lock not acquired; skip CollectionQueueRunner start"
                 )
@@ -894,6 +940,7 @@ async def lifespan(app: FastAPI):
                 f"[QueueRunner] Initialization failed (non-blocking): {queue_runner_err}"
             )
 
+    async def _summarize_collection_runtime():
         try:
             from backend.services.collection_runtime_health import (
                 collect_collection_runtime_health,
@@ -914,17 +961,113 @@ async def lifespan(app: FastAPI):
                 runtime_health_err,
             )
 
+    # 关键路径:数据库 -> 表结构 -> 角色/采集恢复;其余互不依赖的步骤与之并发
+    graph.add("postgres_path", _configure_postgres_path)
+    graph.add("postgres_connect", _verify_database_connection)
+    graph.add("table_init", _verify_database_schema, after=["postgres_connect"])
+    graph.add("system_roles", _ensure_system_roles, after=["table_init"])
+    graph.add("export_recovery", _recover_orphaned_exports, after=["table_init"])
+    graph.add("redis_cache", _init_redis_cache)
+    graph.add("executor_manager", _init_executor_manager)
+    graph.add("resource_monitor", _start_resource_monitor)
+    graph.add("websocket_cleanup", _start_websocket_cleanup)
+    graph.add("rate_limit_storage", _check_rate_limit_storage)
+    if should_start_cloud_sync_worker(background_role):
+        graph.add("cloud_sync_checks", _cloud_sync_startup_checks)
+    graph.add("collection_leader_lock", _acquire_collection_leader_lock, after=["table_init"])
+    graph.add("collection_recovery", _recover_interrupted_runs, after=["collection_leader_lock"])
+
+    # 延后步骤:服务开始接收请求后执行;带 required_for_ready 的步骤完成前 /healthz/ready 返回 503
+    graph.add("legacy_shop_artifacts", _legacy_shop_artifacts, after=["postgres_connect"], deferred=True)
+    graph.add(
+        "dashboard_bootstrap",
+        _dashboard_bootstrap,
+        after=["table_init"],
+        deferred=True,
+        required_for_ready=True,
+    )
+    graph.add("pool_warmup", _warm_up_pool, after=["postgres_connect"], deferred=True)
+    graph.add("auto_repair", _start_auto_repair, deferred=True)
+    graph.add("cache_warmup", _dashboard_cache_warmup, after=["redis_cache"], deferred=True)
+    if should_start_cloud_sync_worker(background_role):
+        graph.add(
+            "cloud_sync_runtime",
+            _start_cloud_sync_runtime,
+            after=["cloud_sync_checks"],
+            deferred=True,
+            required_for_ready=True,
+        )
+    graph.add(
+        "collection_scheduler",
+        _start_collection_scheduler,
+        after=["collection_recovery"],
+        deferred=True,
+        required_for_ready=True,
+    )
+    graph.add(
+        "schedule_reconcile",
+        _reconcile_collection_schedules,
+        after=["collection_scheduler"],
+        deferred=True,
+    )
+    graph.add(
+        "collection_queue_runner",
+        _start_collection_queue_runner,
+        after=["collection_recovery"],
+        deferred=True,
+        required_for_ready=True,
+    )
+    graph.add(
+        "collection_runtime_health",
+        _summarize_collection_runtime,
+        after=["collection_scheduler", "collection_queue_runner"],
+        deferred=True,
+    )
+
+    try:
+        if not should_start_cloud_sync_worker(background_role):
+            logger.info("[CloudSync] Skipped for background role: %s", background_role)
+
+        await graph.run_blocking(include_deferred=not defer_non_critical)
+
+        startup_metrics["total"] = time.time() - startup_start
+        startup_metrics["steps"] = graph.snapshot()["steps"]
+        deferred_count = sum(1 for step in graph.steps.values() if step.deferred and step.status == "pending")
+
+        logger.info(
+            f"""
+╔══════════════════════════════════════════════════════════╗
+║          西虹ERP系统启动完成 - 性能报告                  ║
+╠══════════════════════════════════════════════════════════╣
+║  PostgreSQL客户端PATH: {startup_metrics['postgres_path']:>6.2f}秒                    ║
+║  数据库连接验证:     {startup_metrics['postgres_connect']:>6.2f}秒                      ║
+║  数据库表初始化:     {startup_metrics['table_init']:>6.2f}秒                      ║
+║  连接池预热:         {startup_metrics['pool_warmup']:>6.2f}秒                      ║
+║  延后启动步骤:       {deferred_count:>6}个                       ║
+╠══════════════════════════════════════════════════════════╣
+║  总启动时间:         {startup_metrics['total']:>6.2f}秒                      ║
+║  已注册路由:         {len(app.routes):>6}个                       ║
+╚══════════════════════════════════════════════════════════╝
+        """
+        )
+
     except Exception as e:
         logger.error(f"[ERROR] 系统启动失败: {e}")
         raise
 
-        # Legacy dashboard scheduler notes retained for historical context only.
+    graph.start_deferred()
 
     yield
 
     # 关闭时执行
     logger.info("[关闭] 西虹ERP系统后端服务关闭")
 
+    # 尚未完成的延后启动步骤直接取消,避免与下面的资源释放并发
+    try:
+        await graph.cancel_deferred()
+    except Exception as e:
+        logger.debug(f"[关闭] 取消延后启动步骤时出现异常(可忽略): {e}")
+
     # v4.19.0新增:停止资源监控服务
     try:
         cloud_sync_runtime = getattr(app.state, "cloud_sync_runtime", None)
@@ -980,6 +1123,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"[CollectionLeaderLock] Release failed (non-blocking): {e}")
 
+    # 执行器与队列已停止,把任务遥测缓冲中尚未写入的进度/日志最后 flush 一次
+    try:
+        from backend.services.task_telemetry_writer import task_telemetry
+
+        await task_telemetry.flush()
+    except Exception as e:
+        logger.warning(f"[TaskTelemetry] Final flush failed on shutdown: {e}")
+
     # v4.12.0修复:正确取消后台任务,优雅处理CancelledError异常
     # 使用try-except包装整个关闭流程,避免CancelledError影响关闭
     try:
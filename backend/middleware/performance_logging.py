@@ -7,6 +7,7 @@ import time
 from typing import Callable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from backend.services.dashboard_query_metrics import get_dashboard_query_metrics
 from modules.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,6 +15,19 @@ logger = get_logger(__name__)
 # 慢请求阈值(毫秒)
 SLOW_REQUEST_THRESHOLD_MS = 1000  # 1秒
 
+# 记录延迟直方图的路由前缀(Prometheus /metrics)
+HISTOGRAM_ROUTE_PREFIXES = ("/api/dashboard/",)
+
+
+def _record_route_latency(request: Request, status_code: int, duration_ms: float) -> None:
+    path = request.url.path
+    if not path.startswith(HISTOGRAM_ROUTE_PREFIXES):
+        return
+    # 使用路由模板作为标签,避免路径参数导致标签基数膨胀
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", None) or path
+    get_dashboard_query_metrics().observe_request(endpoint, request.method, status_code, duration_ms / 1000)
+
 
 class PerformanceLoggingMiddleware(BaseHTTPMiddleware):
     """
@@ -23,6 +37,7 @@ class PerformanceLoggingMiddleware(BaseHTTPMiddleware):
     1. 记录API响应时间
     2. 记录慢请求(>1秒)
     3. 记录错误率(4xx/5xx)
+    4. Dashboard 路由记录延迟直方图
     """
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
@@ -67,6 +82,8 @@ class PerformanceLoggingMiddleware(BaseHTTPMiddleware):
                     f"状态码: {status_code} ({error_type}), 响应时间: {duration_ms:.2f}ms"
                 )
             
+            _record_route_latency(request, status_code, duration_ms)
+
             # 添加响应头(可选,用于前端监控)
             response.headers["X-Response-Time"] = f"{duration_ms:.2f}ms"
             
@@ -75,6 +92,7 @@ class PerformanceLoggingMiddleware(BaseHTTPMiddleware):
         except Exception as e:
             # 计算异常发生时的响应时间
             duration_ms = (time.time() - start_time) * 1000
+            _record_route_latency(request, 500, duration_ms)
             
             # 记录异常日志
             logger.error(
@@ -86,6 +86,8 @@ class CloudSyncLifecycleState(BaseModel):
 class CloudSyncReceiveLogState(BaseModel):
     last_receive_at: str | None = None
     last_written_rows: int | None = None
+    last_rows_per_second: float | None = None
+    last_bytes_per_second: float | None = None
     latest_business_date: str | None = None
     status: str | None = None
 
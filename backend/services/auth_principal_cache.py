@@ -0,0 +1,331 @@
+"""
+Short-TTL cache of authenticated principals for ``get_current_user``.
+
+A hit returns an ``AuthenticatedPrincipal`` (read-only, DimUser-compatible
+attributes) keyed by ``(user_id, session_id)`` without touching the database.
+Entries are dropped when they age past the TTL or the session expires, and
+eagerly whenever a transaction commits changes to ``DimUser``, ``DimRole``,
+``UserSession`` or ``user_roles``: SQLAlchemy session hooks collect the
+affected ids, apply them locally and publish them on a Redis channel that
+every API process subscribes to.
+
+Without a live Redis subscription other processes could revoke a session
+without us hearing about it, so the cache serves no hits in that state unless
+``AUTH_PRINCIPAL_CACHE_LOCAL_ONLY=1`` (single-process deployments).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from modules.core.db import DimRole, DimUser, UserSession
+from modules.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PRINCIPAL_CACHE_ENABLED = os.getenv("AUTH_PRINCIPAL_CACHE", "1").strip().lower() not in {"0", "false", "no"}
+PRINCIPAL_CACHE_LOCAL_ONLY = os.getenv("AUTH_PRINCIPAL_CACHE_LOCAL_ONLY", "0").strip().lower() in {"1", "true", "yes"}
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+INVALIDATION_CHANNEL = "xihong-erp:auth:principal-invalidate"
+# 订阅断开后的重连间隔(秒)
+RESUBSCRIBE_DELAY_SECONDS = 5.0
+
+_AUTH_TABLES = frozenset({"dim_users", "dim_roles", "user_roles", "user_sessions"})
+_PENDING_KEY = "auth_principal_invalidations"
+
+
+@dataclass(frozen=True)
+class PrincipalRole:
+    role_id: Optional[int]
+    role_code: Optional[str]
+    role_name: Optional[str]
+    permissions: Any = None
+    data_scope: Optional[str] = None
+    is_active: bool = True
+
+
+@dataclass(frozen=True)
+class AuthenticatedPrincipal:
+    """缓存命中时 get_current_user 返回的只读用户视图,字段与 DimUser 同名。"""
+
+    user_id: int
+    username: str
+    email: Optional[str]
+    full_name: Optional[str]
+    status: str
+    is_active: bool
+    is_superuser: bool
+    created_at: Optional[datetime]
+    last_login: Optional[datetime]
+    roles: Tuple[PrincipalRole, ...]
+    session_id: str
+    session_expires_at: datetime
+
+    @classmethod
+    def from_records(cls, user: Any, session: Any) -> "AuthenticatedPrincipal":
+        return cls(
+            user_id=int(user.user_id),
+            username=user.username,
+            email=getattr(user, "email", None),
+            full_name=getattr(user, "full_name", None),
+            status=user.status,
+            is_active=bool(user.is_active),
+            is_superuser=bool(getattr(user, "is_superuser", False)),
+            created_at=getattr(user, "created_at", None),
+            last_login=getattr(user, "last_login", None),
+            roles=tuple(
+                PrincipalRole(
+                    role_id=getattr(role, "role_id", None),
+                    role_code=getattr(role, "role_code", None),
+                    role_name=getattr(role, "role_name", None),
+                    permissions=getattr(role, "permissions", None),
+                    data_scope=getattr(role, "data_scope", None),
+                    is_active=bool(getattr(role, "is_active", True)),
+                )
+                for role in (getattr(user, "roles", None) or [])
+            ),
+            session_id=session.session_id,
+            session_expires_at=session.expires_at,
+        )
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[float, AuthenticatedPrincipal]]" = OrderedDict()
+        # 同步 Session 可能在线程池中提交,失效操作需要加锁
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, user_id: int, session_id: str) -> Optional[AuthenticatedPrincipal]:
+        key = (int(user_id), session_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            cached_at, principal = entry
+            if (
+                time.monotonic() - cached_at > self.ttl_seconds
+                or principal.session_expires_at <= datetime.now(timezone.utc)
+            ):
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, principal: AuthenticatedPrincipal, generation: int) -> bool:
+        """写入缓存;若读取数据库期间发生过失效(generation 变化),放弃写入以免缓存旧数据。"""
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entries[(principal.user_id, principal.session_id)] = (time.monotonic(), principal)
+            self._entries.move_to_end((principal.user_id, principal.session_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(
+        self,
+        *,
+        user_ids: Iterable[int] = (),
+        session_ids: Iterable[str] = (),
+        everything: bool = False,
+    ) -> None:
+        user_ids = {int(user_id) for user_id in user_ids}
+        session_ids = set(session_ids)
+        with self._lock:
+            self._generation += 1
+            if everything:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] in user_ids or key[1] in session_ids]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PrincipalInvalidationBus:
+    """通过 Redis pub/sub 在各 API 进程间广播失效消息。"""
+
+    def __init__(self, cache: PrincipalCache):
+        self.cache = cache
+        self.origin = uuid.uuid4().hex
+        self.connected = False
+        self._redis: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._publish_tasks: Set["asyncio.Future[Any]"] = set()
+
+    def start(self, redis: Any) -> Optional["asyncio.Task[None]"]:
+        if redis is None or (self._task is not None and not self._task.done()):
+            return None
+        self._redis = redis
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._listen())
+        return self._task
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # 订阅建立前或断线期间可能错过消息,连上后整体清空一次
+                self.cache.invalidate(everything=True)
+                self.connected = True
+                logger.info("[AuthCache] Subscribed to principal invalidation channel")
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.apply(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("[AuthCache] Invalidation subscription lost: %s", exc)
+            finally:
+                self.connected = False
+                self.cache.invalidate(everything=True)
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+
+    def apply(self, data: Any) -> None:
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if payload.get("origin") == self.origin:
+            return
+        self.cache.invalidate(
+            user_ids=payload.get("user_ids") or (),
+            session_ids=payload.get("session_ids") or (),
+            everything=bool(payload.get("all")),
+        )
+
+    def publish(self, *, user_ids: Iterable[int], session_ids: Iterable[str], everything: bool) -> None:
+        if self._redis is None or self._loop is None or self._loop.is_closed():
+            return
+        message = json.dumps(
+            {
+                "origin": self.origin,
+                "user_ids": sorted(int(user_id) for user_id in user_ids),
+                "session_ids": sorted(session_ids),
+                "all": everything,
+            }
+        )
+        coro = self._redis.publish(INVALIDATION_CHANNEL, message)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            future: "asyncio.Future[Any]" = self._loop.create_task(coro)
+        else:
+            # 同步 Session 在线程池中提交时,交回主事件循环发送
+            future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop), loop=self._loop)
+        self._publish_tasks.add(future)
+        future.add_done_callback(self._publish_done)
+
+    def _publish_done(self, future: "asyncio.Future[Any]") -> None:
+        self._publish_tasks.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning("[AuthCache] Failed to publish principal invalidation: %s", future.exception())
+
+
+principal_cache = PrincipalCache()
+invalidation_bus = PrincipalInvalidationBus(principal_cache)
+
+
+def cache_serving() -> bool:
+    return PRINCIPAL_CACHE_ENABLED and (invalidation_bus.connected or PRINCIPAL_CACHE_LOCAL_ONLY)
+
+
+def lookup_principal(user_id: int, session_id: str) -> Optional[AuthenticatedPrincipal]:
+    if not cache_serving():
+        return None
+    return principal_cache.get(user_id, session_id)
+
+
+def remember_principal(user: Any, session: Any, generation: int) -> None:
+    if not cache_serving():
+        return
+    principal_cache.put(AuthenticatedPrincipal.from_records(user, session), generation)
+
+
+def invalidate_principals(
+    *,
+    user_ids: Iterable[int] = (),
+    session_ids: Iterable[str] = (),
+    everything: bool = False,
+) -> None:
+    user_ids = set(user_ids)
+    session_ids = set(session_ids)
+    if not (user_ids or session_ids or everything):
+        return
+    principal_cache.invalidate(user_ids=user_ids, session_ids=session_ids, everything=everything)
+    invalidation_bus.publish(user_ids=user_ids, session_ids=session_ids, everything=everything)
+
+
+def _pending(session: Session) -> Dict[str, Any]:
+    return session.info.setdefault(_PENDING_KEY, {"user_ids": set(), "session_ids": set(), "all": False})
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_flushed_auth_changes(session: Session, _flush_context, _instances) -> None:
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, DimUser) and obj.user_id is not None:
+            _pending(session)["user_ids"].add(obj.user_id)
+        elif isinstance(obj, UserSession) and obj.session_id is not None:
+            _pending(session)["session_ids"].add(obj.session_id)
+        elif isinstance(obj, DimRole):
+            _pending(session)["all"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_auth_changes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in _AUTH_TABLES:
+        # 批量 UPDATE/DELETE 无法精确得知影响的行,整体失效(仅管理操作会走到这里)
+        _pending(orm_execute_state.session)["all"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_auth_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        invalidate_principals(
+            user_ids=pending["user_ids"],
+            session_ids=pending["session_ids"],
+            everything=pending["all"],
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_auth_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
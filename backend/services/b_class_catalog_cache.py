@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+b_class 目录缓存(B-Class Catalog Cache)
+
+入库热路径(PlatformTableManager / DynamicColumnManager / RawDataImporter)
+原先每批数据都要反射表名、查询 information_schema 列和 pg_indexes 索引定义。
+这里把 b_class schema 的表(含是否为分区父表)、列、索引定义作为一份带版本号的快照缓存在进程内:
+
+- 首次访问时用两条查询整体加载
+- 本进程执行的 DDL(CREATE/ALTER/DROP)通过引擎事件使对应表失效,下次访问只重载该表
+- 其他进程的 DDL 依靠 TTL(B_CLASS_CATALOG_CACHE_TTL_SECONDS)兜底整体重载;
+  入库失败时调用方也会主动 invalidate()
+
+稳态下(表、列、索引都已存在)入库路径不再发出任何目录查询。
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from modules.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+B_CLASS_SCHEMA = "b_class"
+CATALOG_CACHE_ENABLED = os.getenv("B_CLASS_CATALOG_CACHE", "1").strip().lower() not in {"0", "false", "no"}
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("B_CLASS_CATALOG_CACHE_TTL_SECONDS", "300"))
+
+_COLUMNS_SQL = """
+    SELECT c.relname, a.attname, c.relkind
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    WHERE n.nspname = 'b_class'
+      AND c.relkind IN ('r', 'p')
+"""
+_INDEXES_SQL = """
+    SELECT tablename, indexname, indexdef
+    FROM pg_indexes
+    WHERE schemaname = 'b_class'
+"""
+
+_DDL_PREFIXES = ("ALTER", "CREATE", "DROP")
+_DDL_TABLE_PATTERN = re.compile(
+    r'\b(?:TABLE|ON)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?(?:ONLY\s+)?(?:"?(\w+)"?\.)?"?(\w+)"?',
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class CatalogTable:
+    columns: FrozenSet[str]
+    partitioned: bool = False
+    indexes: Dict[str, str] = field(default_factory=dict)
+
+
+class BClassCatalogCache:
+    """
+    b_class 目录快照
+
+    所有读取方法都接收调用方的同步会话 db,只有在缓存缺失/过期/失效时才用它查询目录。
+    """
+
+    def __init__(self, ttl_seconds: float = CATALOG_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.schema_version = 0
+        self.loads = 0
+        self._tables: Dict[str, CatalogTable] = {}
+        self._stale_tables: Set[str] = set()
+        self._loaded_at: Optional[float] = None
+        # 同步会话在线程池中并发使用,目录状态需要加锁
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+    def table_exists(self, db, table_name: str) -> bool:
+        return self._get_table(db, table_name) is not None
+
+    def get_columns(self, db, table_name: str) -> Optional[FrozenSet[str]]:
+        """返回表的列名集合;表不在 b_class 中时返回 None。"""
+        table = self._get_table(db, table_name)
+        return table.columns if table is not None else None
+
+    def is_partitioned(self, db, table_name: str) -> bool:
+        table = self._get_table(db, table_name)
+        return table is not None and table.partitioned
+
+    def get_index_definition(self, db, table_name: str, index_name: str) -> Optional[str]:
+        table = self._get_table(db, table_name)
+        if table is None:
+            return None
+        return table.indexes.get(index_name)
+
+    def get_indexes(self, db, table_name: str) -> Dict[str, str]:
+        """返回表的 {索引名: 索引定义};表不存在时返回空字典。"""
+        table = self._get_table(db, table_name)
+        return dict(table.indexes) if table is not None else {}
+
+    # ------------------------------------------------------------------
+    # 失效
+    # ------------------------------------------------------------------
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        """使单表(或整个快照)失效,下次访问时重新查询。"""
+        with self._lock:
+            self.schema_version += 1
+            if table_name is None:
+                self._tables = {}
+                self._stale_tables.clear()
+                self._loaded_at = None
+            else:
+                self._stale_tables.add(table_name)
+
+    def on_ddl(self, statement: str) -> None:
+        """根据本进程执行的 DDL 语句使受影响的表失效。"""
+        head = statement.lstrip()[:16].upper()
+        if not head.startswith(_DDL_PREFIXES) or head.startswith("CREATE SCHEMA"):
+            return
+        match = _DDL_TABLE_PATTERN.search(statement)
+        if match:
+            schema, table_name = match.group(1), match.group(2)
+            if schema is None or schema.lower() == B_CLASS_SCHEMA:
+                self.invalidate(table_name)
+            return
+        # 例如 DROP INDEX b_class."uq_xxx_hash":无法定位到表,整体失效
+        if B_CLASS_SCHEMA in statement:
+            self.invalidate()
+
+    # ------------------------------------------------------------------
+    # 内部
+    # ------------------------------------------------------------------
+    def _get_table(self, db, table_name: str) -> Optional[CatalogTable]:
+        if not CATALOG_CACHE_ENABLED:
+            return self._load(db, only_table=table_name).get(table_name)
+
+        with self._lock:
+            expired = self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+            if not expired and table_name not in self._stale_tables:
+                return self._tables.get(table_name)
+            version = self.schema_version
+
+        only_table = None if expired else table_name
+        tables = self._load(db, only_table=only_table)
+        self._install(tables, only_table=only_table, version=version)
+        return tables.get(table_name)
+
+    def _load(self, db, only_table: Optional[str] = None) -> Dict[str, CatalogTable]:
+        params = {}
+        columns_sql, indexes_sql = _COLUMNS_SQL, _INDEXES_SQL
+        if only_table is not None:
+            columns_sql += " AND c.relname = :table_name"
+            indexes_sql += " AND tablename = :table_name"
+            params = {"table_name": only_table}
+
+        columns: Dict[str, Set[str]] = {}
+        partitioned: Set[str] = set()
+        for table_name, column_name, relkind in db.execute(text(columns_sql), params).fetchall():
+            columns.setdefault(table_name, set()).add(column_name)
+            if relkind == "p":
+                partitioned.add(table_name)
+        tables = {
+            name: CatalogTable(columns=frozenset(cols), partitioned=name in partitioned)
+            for name, cols in columns.items()
+        }
+        for table_name, index_name, index_def in db.execute(text(indexes_sql), params).fetchall():
+            if table_name in tables:
+                tables[table_name].indexes[index_name] = index_def or ""
+        return tables
+
+    def _install(self, tables: Dict[str, CatalogTable], only_table: Optional[str], version: int) -> None:
+        with self._lock:
+            self.loads += 1
+            # 加载期间又发生了 DDL:本次结果只供当前调用使用,不写入快照
+            if version != self.schema_version:
+                return
+            if only_table is None:
+                self._tables = tables
+                self._stale_tables.clear()
+                self._loaded_at = time.monotonic()
+                logger.debug(f"[BClassCatalog] 已加载目录快照: {len(tables)} 张表 (version={version})")
+                return
+            self._stale_tables.discard(only_table)
+            if only_table in tables:
+                self._tables[only_table] = tables[only_table]
+            else:
+                self._tables.pop(only_table, None)
+
+
+_catalog_cache = BClassCatalogCache()
+
+
+def get_b_class_catalog() -> BClassCatalogCache:
+    """获取进程级 b_class 目录缓存"""
+    return _catalog_cache
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _invalidate_catalog_on_ddl(conn, cursor, statement, parameters, context, executemany) -> None:
+    if statement:
+        _catalog_cache.on_ddl(statement)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+b_class 索引策略(B-Class Index Policy)
+
+b_class.fact_* 表原先统一建 11 个二级索引(platform/shop/domain/granularity/date/file/hash/
+currency + GIN(raw_data) + 两个 period 索引)。其中 platform_code/data_domain/granularity
+在单表内是常量,data_hash 已被唯一索引覆盖,currency_code 基数极低,
+这些索引几乎不会被查询使用,却让每一次 INSERT/UPSERT 都多维护一棵索引树。
+
+这里为每个数据域定义一份"入库友好"的索引画像:
+- (shop_id, metric_date) 组合索引,覆盖按店铺+日期的查询
+- (file_id):按文件删除/回溯统计
+- BRIN(ingest_timestamp):云同步按入库时间增量拉取,数据按时间追加,BRIN 体积极小
+- period 日期/时间范围索引(v4.18.0)
+- GIN(raw_data jsonb_path_ops) 仅对 B_CLASS_RAW_DATA_GIN_DOMAINS 中列出的数据域创建
+
+开启 B_CLASS_INDEX_POLICY=1 后新建表使用画像;已有表通过
+scripts/converge_b_class_indexes.py 收敛到画像(依据 pg_stat_user_indexes 的使用统计,
+仍在被扫描的旧索引默认保留)。
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from modules.core.logger import get_logger
+from backend.services.b_class_catalog_cache import get_b_class_catalog
+from backend.services.b_class_partition_manager import get_b_class_partition_manager
+
+logger = get_logger(__name__)
+
+INDEX_POLICY_ENABLED = os.getenv("B_CLASS_INDEX_POLICY", "0").strip().lower() in {"1", "true", "yes"}
+RAW_DATA_GIN_DOMAINS = frozenset(
+    domain.strip().lower()
+    for domain in os.getenv("B_CLASS_RAW_DATA_GIN_DOMAINS", "").split(",")
+    if domain.strip()
+)
+
+# 画像中的索引:(索引名后缀, 索引列定义);索引名为 ix_{table_name}_{后缀}
+_COMMON_PROFILE: Tuple[Tuple[str, str], ...] = (
+    ("shop_date", "(shop_id, metric_date)"),
+    ("file", "(file_id)"),
+    ("ingest_brin", "USING BRIN (ingest_timestamp)"),
+    ("period_date", "(period_start_date, period_end_date)"),
+    ("period_time", "(period_start_time, period_end_time) WHERE period_start_time IS NOT NULL"),
+)
+_RAW_DATA_GIN = ("raw_data_path", "USING GIN (raw_data jsonb_path_ops)")
+
+# 各数据域在通用画像之外的额外索引
+DOMAIN_PROFILES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "orders": (),
+    "products": (),
+    "analytics": (),
+    "services": (),
+    "inventory": (),
+}
+
+_INDEX_USAGE_SQL = """
+    SELECT
+        COALESCE(pt.relname, s.relname) AS table_name,
+        COALESCE(pi.relname, s.indexrelname) AS index_name,
+        SUM(s.idx_scan) AS scans,
+        SUM(pg_relation_size(s.indexrelid)) AS size_bytes,
+        BOOL_OR(x.indisunique OR x.indisprimary) AS is_unique
+    FROM pg_stat_user_indexes s
+    JOIN pg_index x ON x.indexrelid = s.indexrelid
+    LEFT JOIN pg_inherits ii ON ii.inhrelid = s.indexrelid
+    LEFT JOIN pg_class pi ON pi.oid = ii.inhparent
+    LEFT JOIN pg_inherits ti ON ti.inhrelid = s.relid
+    LEFT JOIN pg_class pt ON pt.oid = ti.inhparent
+    WHERE s.schemaname = 'b_class'
+    GROUP BY 1, 2
+"""
+
+_TABLE_DOMAINS_SQL = """
+    SELECT c.relname, pg_get_expr(d.adbin, d.adrelid)
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attname = 'data_domain'
+    JOIN pg_attrdef d ON d.adrelid = c.oid AND d.adnum = a.attnum
+    WHERE n.nspname = 'b_class'
+      AND c.relkind IN ('r', 'p')
+      AND NOT c.relispartition
+      AND c.relname LIKE 'fact\\_%'
+"""
+
+
+def legacy_index_definitions(table_name: str, data_domain: str, sub_domain: Optional[str]) -> List[Tuple[str, str]]:
+    """v4.18.0 起的统一索引集合(未开启索引策略时使用)"""
+    definitions = [
+        (f"ix_{table_name}_platform", "(platform_code)"),
+        (f"ix_{table_name}_shop", "(shop_id)"),
+        (f"ix_{table_name}_domain", "(data_domain)"),
+        (f"ix_{table_name}_granularity", "(granularity)"),
+        (f"ix_{table_name}_date", "(metric_date)"),
+        (f"ix_{table_name}_file", "(file_id)"),
+        (f"ix_{table_name}_hash", "(data_hash)"),
+        (f"ix_{table_name}_currency", "(currency_code)"),
+        (f"ix_{table_name}_gin", "USING GIN (raw_data)"),
+        # v4.18.0: 日期范围索引(所有记录)
+        (f"ix_{table_name}_period_date", "(period_start_date, period_end_date)"),
+        # v4.18.0: 时间范围索引(部分索引,仅索引有时间信息的记录)
+        (f"ix_{table_name}_period_time", "(period_start_time, period_end_time) WHERE period_start_time IS NOT NULL"),
+    ]
+    # services域的表需要sub_domain索引
+    if data_domain.lower() == 'services' and sub_domain:
+        definitions.append((f"ix_{table_name}_sub_domain", "(sub_domain)"))
+    return definitions
+
+
+def index_profile(table_name: str, data_domain: str) -> List[Tuple[str, str]]:
+    """数据域的索引画像:[(索引名, 索引列定义)]"""
+    domain = (data_domain or "").lower()
+    entries = list(_COMMON_PROFILE) + list(DOMAIN_PROFILES.get(domain, ()))
+    if domain in RAW_DATA_GIN_DOMAINS:
+        entries.append(_RAW_DATA_GIN)
+    return [(f"ix_{table_name}_{suffix}", body) for suffix, body in entries]
+
+
+@dataclass
+class IndexUsage:
+    table_name: str
+    index_name: str
+    scans: int
+    size_bytes: int
+    is_unique: bool
+
+
+@dataclass
+class IndexPlan:
+    """单表收敛计划"""
+
+    table_name: str
+    data_domain: str
+    create: List[Tuple[str, str]] = field(default_factory=list)
+    drop: List[str] = field(default_factory=list)
+    # 不在画像中但仍有扫描记录的索引(未使用 force 时保留)
+    kept_in_use: List[str] = field(default_factory=list)
+    reclaimed_bytes: int = 0
+
+    @property
+    def is_converged(self) -> bool:
+        return not self.create and not self.drop
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "table": self.table_name,
+            "data_domain": self.data_domain,
+            "create": [name for name, _ in self.create],
+            "drop": list(self.drop),
+            "kept_in_use": list(self.kept_in_use),
+            "reclaimed_bytes": self.reclaimed_bytes,
+        }
+
+
+def plan_convergence(
+    table_name: str,
+    data_domain: str,
+    existing_indexes: Dict[str, str],
+    usage: Dict[str, IndexUsage],
+    min_scans: int = 1,
+    force: bool = False,
+) -> IndexPlan:
+    """
+    计算表从现有索引收敛到画像所需的操作
+
+    只会删除本服务管理的 ix_{table_name}_* 索引;唯一索引/主键一律不动。
+    扫描次数 >= min_scans 的索引视为仍在使用,除非 force=True 否则保留。
+    """
+    plan = IndexPlan(table_name=table_name, data_domain=data_domain)
+    profile = index_profile(table_name, data_domain)
+    profile_names = {name for name, _ in profile}
+
+    plan.create = [(name, body) for name, body in profile if name not in existing_indexes]
+    for index_name in sorted(existing_indexes):
+        if index_name in profile_names or not index_name.startswith(f"ix_{table_name}_"):
+            continue
+        stats = usage.get(index_name)
+        if stats is not None and stats.is_unique:
+            continue
+        if stats is not None and stats.scans >= min_scans and not force:
+            plan.kept_in_use.append(index_name)
+            continue
+        plan.drop.append(index_name)
+        plan.reclaimed_bytes += stats.size_bytes if stats is not None else 0
+    return plan
+
+
+class BClassIndexPolicy:
+    """索引使用统计采集与表索引收敛"""
+
+    def __init__(self, db):
+        self.db = db
+        self.catalog = get_b_class_catalog()
+        self.partitions = get_b_class_partition_manager(db)
+
+    def collect_usage(self) -> Dict[str, Dict[str, IndexUsage]]:
+        """
+        读取 pg_stat_user_indexes(分区索引按父索引汇总)
+
+        Returns:
+            {表名: {索引名: IndexUsage}}
+        """
+        usage: Dict[str, Dict[str, IndexUsage]] = {}
+        for table_name, index_name, scans, size_bytes, is_unique in self.db.execute(text(_INDEX_USAGE_SQL)).fetchall():
+            usage.setdefault(table_name, {})[index_name] = IndexUsage(
+                table_name=table_name,
+                index_name=index_name,
+                scans=int(scans or 0),
+                size_bytes=int(size_bytes or 0),
+                is_unique=bool(is_unique),
+            )
+        return usage
+
+    def table_domains(self) -> Dict[str, str]:
+        """b_class 事实表 -> 数据域(读取建表时写入的 data_domain 列默认值)"""
+        domains = {}
+        for table_name, default_expr in self.db.execute(text(_TABLE_DOMAINS_SQL)).fetchall():
+            if default_expr:
+                domains[table_name] = default_expr.split("::", 1)[0].strip("'")
+        return domains
+
+    def plan(
+        self,
+        table_name: Optional[str] = None,
+        min_scans: int = 1,
+        force: bool = False,
+    ) -> List[IndexPlan]:
+        usage = self.collect_usage()
+        domains = self.table_domains()
+        if table_name is not None:
+            if table_name not in domains:
+                raise ValueError(f"表不存在或不是 b_class 事实表: {table_name}")
+            domains = {table_name: domains[table_name]}
+
+        return [
+            plan_convergence(
+                name,
+                data_domain,
+                self.catalog.get_indexes(self.db, name),
+                usage.get(name, {}),
+                min_scans=min_scans,
+                force=force,
+            )
+            for name, data_domain in sorted(domains.items())
+        ]
+
+    def converge(self, plan: IndexPlan) -> IndexPlan:
+        """
+        执行收敛计划:先建画像中缺失的索引,再删除多余索引
+
+        建索引走 BClassPartitionManager.create_index(分区表逐分区建并挂载);
+        每个删除单独提交。
+        """
+        for index_name, index_body in plan.create:
+            self.partitions.create_index(plan.table_name, index_name, index_body)
+
+        for index_name in plan.drop:
+            try:
+                self.db.execute(text(f'DROP INDEX IF EXISTS b_class."{index_name}"'))
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                logger.error(f"[BClassIndexPolicy] 删除索引失败: {index_name}", exc_info=True)
+                raise
+
+        logger.info(
+            f"[BClassIndexPolicy] 表 {plan.table_name} 已收敛到 {plan.data_domain} 画像: "
+            f"新建 {len(plan.create)} 个, 删除 {len(plan.drop)} 个, 保留使用中 {len(plan.kept_in_use)} 个"
+        )
+        return plan
+
+
+def get_b_class_index_policy(db) -> BClassIndexPolicy:
+    """获取索引策略服务实例"""
+    return BClassIndexPolicy(db)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+b_class 事实表按月分区管理(B-Class Partition Manager)
+
+开启 B_CLASS_PARTITIONING=1 后,PlatformTableManager 新建的
+b_class.fact_{platform}_{data_domain}_{granularity} 表按 metric_date 做 RANGE 分区(每月一个分区):
+
+- 入库时根据本批数据的 metric_date 自动创建缺失的月分区(分区是否存在读取目录缓存)
+- 分区父表的唯一索引必须包含分区键,因此唯一键为
+  (platform_code, COALESCE(shop_id, ''), data_domain, granularity, data_hash, metric_date)
+- 支持逐分区建索引(每个分区单独提交,锁只作用于当前分区)
+- 支持按月 detach/attach,用于整月重新入库:先 detach 旧分区,入库时自动建新分区,
+  成功后删除旧分区,失败时 attach 回去
+
+未开启时所有方法对普通表都是空操作。
+"""
+
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+from modules.core.logger import get_logger
+from backend.services.b_class_catalog_cache import get_b_class_catalog
+
+logger = get_logger(__name__)
+
+PARTITIONING_ENABLED = os.getenv("B_CLASS_PARTITIONING", "0").strip().lower() in {"1", "true", "yes"}
+
+MAX_IDENTIFIER_LENGTH = 63  # PostgreSQL标识符最大长度
+
+
+def month_start(value: Any) -> Optional[date]:
+    """返回所在月份的第一天(支持 date/datetime/ISO 字符串)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    elif not isinstance(value, date):
+        value = date.fromisoformat(str(value)[:10])
+    return value.replace(day=1)
+
+
+def next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    """分区表名:{table_name}_pYYYYMM"""
+    return f"{table_name}_p{month:%Y%m}"
+
+
+def _bounded_name(base: str, suffix: str) -> str:
+    return base[: MAX_IDENTIFIER_LENGTH - len(suffix)] + suffix
+
+
+class BClassPartitionManager:
+    """
+    b_class 分区管理
+
+    所有方法使用调用方的同步会话;DDL 执行后由目录缓存的 DDL 事件自动失效对应表。
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.catalog = get_b_class_catalog()
+
+    def is_partitioned(self, table_name: str) -> bool:
+        return self.catalog.is_partitioned(self.db, table_name)
+
+    def ensure_partitions(self, table_name: str, metric_dates: Iterable[Any], commit: bool = True) -> List[str]:
+        """
+        确保 metric_dates 覆盖的月分区都存在(入库前调用)
+
+        commit=False 时由调用方负责提交(例如在迁移事务中调用)
+
+        Returns:
+            新建的分区表名列表(普通表或分区都已存在时为空,且不发出任何查询)
+        """
+        if not self.is_partitioned(table_name):
+            return []
+
+        created = []
+        for month in sorted({m for m in (month_start(value) for value in metric_dates) if m}):
+            name = partition_name(table_name, month)
+            if self.catalog.table_exists(self.db, name):
+                continue
+            self.db.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS b_class."{name}" '
+                    f'PARTITION OF b_class."{table_name}" '
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+                )
+            )
+            created.append(name)
+
+        if created:
+            if commit:
+                self.db.commit()
+            logger.info(f"[BClassPartition] 表 {table_name} 新建月分区: {created}")
+        return created
+
+    def list_partitions(self, table_name: str) -> List[Dict[str, str]]:
+        rows = self.db.execute(
+            text(
+                """
+                SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:qualified_name)
+                ORDER BY c.relname
+                """
+            ),
+            {"qualified_name": f'b_class."{table_name}"'},
+        ).fetchall()
+        return [{"name": row[0], "bound": row[1]} for row in rows]
+
+    def create_index(self, table_name: str, index_name: str, index_body: str, unique: bool = False) -> List[str]:
+        """
+        逐分区创建索引
+
+        分区父表上先用 ON ONLY 建一个(无效的)父索引,再逐个分区建索引并 ATTACH;
+        全部分区挂上后父索引自动变为有效。每个分区单独提交,避免一次性锁住整张表。
+
+        Args:
+            index_body: 索引列定义,如 "(platform_code)" 或 "USING GIN (raw_data)"
+
+        Returns:
+            本次新建的分区索引名列表
+        """
+        unique_sql = "UNIQUE " if unique else ""
+        if not self.is_partitioned(table_name):
+            self.db.execute(
+                text(f'CREATE {unique_sql}INDEX IF NOT EXISTS "{index_name}" ON b_class."{table_name}" {index_body}')
+            )
+            self.db.commit()
+            return [index_name]
+
+        self.db.execute(
+            text(f'CREATE {unique_sql}INDEX IF NOT EXISTS "{index_name}" ON ONLY b_class."{table_name}" {index_body}')
+        )
+        self.db.commit()
+
+        covered = {
+            row[0]
+            for row in self.db.execute(
+                text(
+                    """
+                    SELECT tbl.relname
+                    FROM pg_inherits i
+                    JOIN pg_index x ON x.indexrelid = i.inhrelid
+                    JOIN pg_class tbl ON tbl.oid = x.indrelid
+                    WHERE i.inhparent = to_regclass(:qualified_index)
+                    """
+                ),
+                {"qualified_index": f'b_class."{index_name}"'},
+            ).fetchall()
+        }
+
+        created = []
+        for partition in self.list_partitions(table_name):
+            if partition["name"] in covered:
+                continue
+            child_index = _bounded_name(index_name, "_" + partition["name"].rsplit("_", 1)[-1])
+            try:
+                self.db.execute(
+                    text(
+                        f'CREATE {unique_sql}INDEX IF NOT EXISTS "{child_index}" '
+                        f'ON b_class."{partition["name"]}" {index_body}'
+                    )
+                )
+                self.db.execute(text(f'ALTER INDEX b_class."{index_name}" ATTACH PARTITION b_class."{child_index}"'))
+                self.db.commit()
+                created.append(child_index)
+            except Exception:
+                self.db.rollback()
+                logger.error(
+                    f"[BClassPartition] 分区索引创建失败: {partition['name']}.{child_index}",
+                    exc_info=True,
+                )
+                raise
+
+        logger.info(f"[BClassPartition] 索引 {index_name} 已覆盖表 {table_name} 全部分区(新建 {len(created)} 个)")
+        return created
+
+    def detach_month(self, table_name: str, month: Any) -> str:
+        """
+        分离某月分区(整月重新入库前调用)
+
+        分区会被重命名为 {partition}_detached,使下一次入库自动创建一个空的新分区。
+
+        Returns:
+            分离后的表名
+        """
+        month = month_start(month)
+        name = partition_name(table_name, month)
+        detached = _bounded_name(name, "_detached")
+        try:
+            self.db.execute(text(f'ALTER TABLE b_class."{table_name}" DETACH PARTITION b_class."{name}"'))
+            self.db.execute(text(f'ALTER TABLE b_class."{name}" RENAME TO "{detached}"'))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.catalog.invalidate(name)
+            self.catalog.invalidate(detached)
+
+        logger.info(f"[BClassPartition] 已分离分区 {name} -> {detached}")
+        return detached
+
+    def attach_month(self, table_name: str, month: Any, source_table: str) -> str:
+        """
+        把一张表挂回为某月分区(例如重新入库失败时恢复 detach_month 分离出的旧分区)
+
+        Raises:
+            ValueError: 该月已存在分区(需先 detach 或删除)
+        """
+        month = month_start(month)
+        name = partition_name(table_name, month)
+        if source_table != name and self.catalog.table_exists(self.db, name):
+            raise ValueError(f"分区 {name} 已存在,请先分离或删除后再挂载 {source_table}")
+
+        try:
+            self.db.execute(
+                text(
+                    f'ALTER TABLE b_class."{table_name}" ATTACH PARTITION b_class."{source_table}" '
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+                )
+            )
+            if source_table != name:
+                self.db.execute(text(f'ALTER TABLE b_class."{source_table}" RENAME TO "{name}"'))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.catalog.invalidate(name)
+            self.catalog.invalidate(source_table)
+
+        logger.info(f"[BClassPartition] 已挂载 {source_table} 为分区 {name}")
+        return name
+
+
+def get_b_class_partition_manager(db) -> BClassPartitionManager:
+    """获取分区管理服务实例"""
+    return BClassPartitionManager(db)
@@ -0,0 +1,429 @@
+"""
+备份引擎(Backup Engine)
+
+BackupService 原先的备份流程全部串行:单线程 pg_dump 经 gzip 管道输出,随后在进程内用
+tarfile 打包整个数据目录,最后再按 4KB 分块重读结果计算校验和;每次备份还会把 data/raw
+下的原始导出文件完整复制一遍。
+
+这里的引擎把一次备份拆成三个并行步骤:
+- 数据库:pg_dump 目录格式(--format=directory --jobs=N),各表并行导出并由 pg_dump 逐表压缩
+- 文件:数据目录(不含 data/raw)流式 tar + gzip 写出,写入的同时计算 SHA-256
+- 原始文件:data/raw 按内容寻址做增量快照,对象存放在 <备份根目录>/objects/<sha256 前两位>/<sha256>,
+  内容相同的文件跨备份只存一份;与上次快照大小和 mtime 都一致的文件直接复用摘要,不再重读
+
+每次备份目录下写一个 manifest.json,记录所有产物与原始文件的大小和 SHA-256;
+备份记录的 backup_path 指向 manifest,checksum 为 manifest 本身的 SHA-256。
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import tarfile
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from modules.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKUP_ENGINE_ENABLED = os.getenv("BACKUP_ENGINE", "1").strip().lower() not in {"0", "false", "no"}
+BACKUP_DUMP_JOBS = max(1, int(os.getenv("BACKUP_DUMP_JOBS", str(min(4, os.cpu_count() or 1)))))
+# 透传给 pg_dump --compress(如 "6"、"zstd:3");为空时使用 pg_dump 默认压缩
+BACKUP_DUMP_COMPRESS = os.getenv("BACKUP_DUMP_COMPRESS", "").strip()
+BACKUP_FILES_COMPRESSLEVEL = min(9, max(1, int(os.getenv("BACKUP_FILES_COMPRESSLEVEL", "6"))))
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = "backup-engine/1"
+CHUNK_SIZE = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    """按 1MB 分块计算文件 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class HashingWriter:
+    """写入文件的同时计算 SHA-256 与字节数(供 gzip/tarfile 作为 fileobj 使用)"""
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._digest.update(data)
+        self.size += len(data)
+        return self._fileobj.write(data)
+
+    def flush(self) -> None:
+        self._fileobj.flush()
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+@dataclass
+class BackupArtifact:
+    """备份目录内的一个产物文件(路径相对备份目录)"""
+
+    path: str
+    size: int
+    sha256: str
+
+
+@dataclass
+class RawSnapshot:
+    """data/raw 的一次内容寻址快照"""
+
+    files: List[Dict[str, Any]] = field(default_factory=list)
+    new_objects: int = 0
+    new_bytes: int = 0
+    reused_objects: int = 0
+    rehashed_files: int = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self.files)
+
+
+@dataclass
+class BackupResult:
+    backup_dir: Path
+    manifest_path: Path
+    checksum: str
+    artifacts: List[BackupArtifact]
+    raw: Optional[RawSnapshot]
+
+    @property
+    def total_size(self) -> int:
+        """逻辑大小:本次产物 + 快照引用的原始文件"""
+        return sum(artifact.size for artifact in self.artifacts) + (self.raw.total_bytes if self.raw else 0)
+
+
+class BackupEngine:
+    """并行、流式备份引擎(同步执行,调用方负责放到线程中运行)"""
+
+    def __init__(
+        self,
+        backup_root: Path,
+        data_dirs: List[str],
+        raw_dir: Optional[Path] = None,
+        dump_jobs: int = BACKUP_DUMP_JOBS,
+        dump_compress: str = BACKUP_DUMP_COMPRESS,
+        files_compresslevel: int = BACKUP_FILES_COMPRESSLEVEL,
+    ):
+        self.backup_root = Path(backup_root)
+        self.data_dirs = [Path(data_dir) for data_dir in data_dirs]
+        self.raw_dir = Path(raw_dir) if raw_dir else None
+        self.objects_dir = self.backup_root / "objects"
+        self.dump_jobs = max(1, dump_jobs)
+        self.dump_compress = dump_compress
+        self.files_compresslevel = files_compresslevel
+        # 并行快照时,"对象是否已存在"的检查与放入必须原子完成,否则相同内容的文件会被重复计为新对象
+        self._objects_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 创建
+    # ------------------------------------------------------------------
+    def run(self, name: str, database_url: Optional[str]) -> BackupResult:
+        """执行一次备份,返回写入的 manifest 信息"""
+        backup_dir = self.backup_root / name
+        backup_dir.mkdir(parents=True, exist_ok=False)
+        previous_raw = self._latest_raw_index()
+
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="backup") as pool:
+            database_future = pool.submit(self.dump_database, database_url, backup_dir) if database_url else None
+            files_future = pool.submit(self.archive_files, backup_dir / "files.tar.gz")
+            raw_future = pool.submit(self.snapshot_raw, previous_raw) if self.raw_dir else None
+
+            artifacts: List[BackupArtifact] = []
+            if database_future is not None:
+                artifacts.extend(database_future.result())
+            artifacts.append(files_future.result())
+            raw = raw_future.result() if raw_future is not None else None
+
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "name": name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "artifacts": [artifact.__dict__ for artifact in artifacts],
+            "raw": None
+            if raw is None
+            else {
+                "root": self.raw_dir.as_posix(),
+                "files": raw.files,
+                "new_objects": raw.new_objects,
+                "new_bytes": raw.new_bytes,
+                "reused_objects": raw.reused_objects,
+            },
+        }
+        payload = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+        manifest_path = backup_dir / MANIFEST_NAME
+        manifest_path.write_bytes(payload)
+
+        result = BackupResult(
+            backup_dir=backup_dir,
+            manifest_path=manifest_path,
+            checksum=hashlib.sha256(payload).hexdigest(),
+            artifacts=artifacts,
+            raw=raw,
+        )
+        if raw is not None:
+            logger.info(
+                f"[BackupEngine] {name}: raw files={len(raw.files)}, new objects={raw.new_objects} "
+                f"({raw.new_bytes} bytes), reused={raw.reused_objects}, rehashed={raw.rehashed_files}"
+            )
+        return result
+
+    def dump_database(self, database_url: str, backup_dir: Path) -> List[BackupArtifact]:
+        """pg_dump 目录格式并行导出;导出完成后并行计算各文件校验和"""
+        dump_dir = backup_dir / "database"
+        cmd = [
+            "pg_dump",
+            database_url,
+            "--format=directory",
+            f"--jobs={self.dump_jobs}",
+            f"--file={dump_dir}",
+            "--no-owner",
+            "--no-acl",
+        ]
+        if self.dump_compress:
+            cmd.append(f"--compress={self.dump_compress}")
+
+        completed = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if completed.returncode != 0:
+            raise RuntimeError(f"pg_dump failed: {completed.stderr.decode(errors='replace')}")
+
+        files = sorted(path for path in dump_dir.rglob("*") if path.is_file())
+        with ThreadPoolExecutor(max_workers=self.dump_jobs, thread_name_prefix="backup-hash") as pool:
+            digests = list(pool.map(file_sha256, files))
+        logger.info(f"[BackupEngine] Database dump completed: {dump_dir} ({len(files)} files, jobs={self.dump_jobs})")
+        return [
+            BackupArtifact(path.relative_to(backup_dir).as_posix(), path.stat().st_size, digest)
+            for path, digest in zip(files, digests)
+        ]
+
+    def archive_files(self, target: Path) -> BackupArtifact:
+        """数据目录流式打包(排除 data/raw),写入时计算校验和"""
+        excluded = self._raw_arcname()
+        with open(target, "wb") as f:
+            writer = HashingWriter(f)
+            with gzip.GzipFile(filename="", mode="wb", fileobj=writer, compresslevel=self.files_compresslevel, mtime=0) as gz:
+                with tarfile.open(fileobj=gz, mode="w|") as tar:
+                    for data_path in self.data_dirs:
+                        if not data_path.exists():
+                            continue
+                        tar.add(
+                            data_path,
+                            arcname=data_path.name,
+                            filter=lambda info: None
+                            if excluded and (info.name == excluded or info.name.startswith(excluded + "/"))
+                            else info,
+                        )
+        logger.info(f"[BackupEngine] Files archive completed: {target}")
+        return BackupArtifact(target.name, writer.size, writer.hexdigest())
+
+    def snapshot_raw(self, previous: Optional[Dict[str, Dict[str, Any]]] = None) -> RawSnapshot:
+        """data/raw 内容寻址增量快照"""
+        snapshot = RawSnapshot()
+        if self.raw_dir is None or not self.raw_dir.exists():
+            return snapshot
+
+        previous = previous or {}
+        paths = []
+        for root, dirs, files in os.walk(self.raw_dir):
+            dirs.sort()
+            paths.extend(Path(root) / name for name in sorted(files))
+
+        with ThreadPoolExecutor(max_workers=self.dump_jobs, thread_name_prefix="backup-raw") as pool:
+            entries = list(pool.map(lambda path: self._store_raw_file(path, previous), paths))
+
+        for entry, status in entries:
+            snapshot.files.append(entry)
+            if status == "new":
+                snapshot.new_objects += 1
+                snapshot.new_bytes += entry["size"]
+            else:
+                snapshot.reused_objects += 1
+                if status == "rehashed":
+                    snapshot.rehashed_files += 1
+        return snapshot
+
+    def _store_raw_file(self, path: Path, previous: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+        relative = path.relative_to(self.raw_dir).as_posix()
+        stat = path.stat()
+        known = previous.get(relative)
+        if (
+            known is not None
+            and known.get("size") == stat.st_size
+            and known.get("mtime_ns") == stat.st_mtime_ns
+            and self._object_path(known["sha256"]).exists()
+        ):
+            return {**known, "path": relative}, "unchanged"
+
+        # 复制到临时文件的同时计算摘要;对象已存在则丢弃临时文件
+        tmp_dir = self.objects_dir / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out, open(path, "rb") as src:
+                writer = HashingWriter(out)
+                for block in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    writer.write(block)
+            digest = writer.hexdigest()
+            object_path = self._object_path(digest)
+            with self._objects_lock:
+                if object_path.exists():
+                    status = "rehashed"
+                else:
+                    object_path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(tmp_name, object_path)
+                    status = "new"
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+
+        entry = {"path": relative, "sha256": digest, "size": writer.size, "mtime_ns": stat.st_mtime_ns}
+        return entry, status
+
+    # ------------------------------------------------------------------
+    # 校验与下载
+    # ------------------------------------------------------------------
+    @staticmethod
+    def is_manifest(path: Path) -> bool:
+        return Path(path).name == MANIFEST_NAME
+
+    def verify(self, manifest_path: Path, expected_checksum: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """校验 manifest 以及其中记录的所有产物和原始文件对象"""
+        manifest_path = Path(manifest_path)
+        if not manifest_path.exists():
+            return False, f"备份清单不存在: {manifest_path}"
+        payload = manifest_path.read_bytes()
+        if expected_checksum and hashlib.sha256(payload).hexdigest() != expected_checksum:
+            return False, f"备份清单校验和不匹配: {manifest_path}"
+        manifest = json.loads(payload)
+
+        files = [
+            (manifest_path.parent / artifact["path"], artifact["size"], artifact["sha256"])
+            for artifact in manifest.get("artifacts", [])
+        ]
+        objects = {entry["sha256"]: entry["size"] for entry in (manifest.get("raw") or {}).get("files", [])}
+        files.extend((self._object_path(digest), size, digest) for digest, size in objects.items())
+
+        for path, size, digest in files:
+            if not path.exists():
+                return False, f"备份文件不存在: {path}"
+            actual_size = path.stat().st_size
+            if actual_size != size:
+                return False, f"备份文件大小不匹配: {path} 期望{size}字节,实际{actual_size}字节"
+
+        with ThreadPoolExecutor(max_workers=self.dump_jobs, thread_name_prefix="backup-verify") as pool:
+            actual = list(pool.map(lambda item: file_sha256(item[0]), files))
+        for (path, _, digest), actual_digest in zip(files, actual):
+            if actual_digest != digest:
+                return False, f"备份文件校验和不匹配: {path} 期望{digest},实际{actual_digest}"
+        return True, None
+
+    def iter_archive(self, manifest_path: Path) -> Iterator[bytes]:
+        """
+        把一次备份流式输出为 tar(产物 + 按原路径还原的 data/raw 快照)
+
+        后台线程写 tar,经有界队列按块交给调用方,内存占用与文件大小无关。
+        """
+        manifest_path = Path(manifest_path)
+        manifest = json.loads(manifest_path.read_bytes())
+        members = [(manifest_path, MANIFEST_NAME)]
+        members.extend(
+            (manifest_path.parent / artifact["path"], artifact["path"]) for artifact in manifest.get("artifacts", [])
+        )
+        members.extend(
+            (self._object_path(entry["sha256"]), f"raw/{entry['path']}")
+            for entry in (manifest.get("raw") or {}).get("files", [])
+        )
+
+        chunks: "queue.Queue[Any]" = queue.Queue(maxsize=8)
+        cancelled = threading.Event()
+        done = object()
+
+        class _QueueWriter:
+            def write(self, data) -> int:
+                while not cancelled.is_set():
+                    try:
+                        chunks.put(bytes(data), timeout=1)
+                        return len(data)
+                    except queue.Full:
+                        continue
+                raise RuntimeError("archive download cancelled")
+
+        def _produce() -> None:
+            try:
+                with tarfile.open(fileobj=_QueueWriter(), mode="w|", bufsize=CHUNK_SIZE) as tar:
+                    for path, arcname in members:
+                        tar.add(str(path), arcname=arcname, recursive=False)
+                outcome: Any = done
+            except Exception as exc:
+                outcome = exc
+            while not cancelled.is_set():
+                try:
+                    chunks.put(outcome, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        producer = threading.Thread(target=_produce, name="backup-archive", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+
+    # ------------------------------------------------------------------
+    # 内部
+    # ------------------------------------------------------------------
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def _raw_arcname(self) -> Optional[str]:
+        if self.raw_dir is None:
+            return None
+        for data_path in self.data_dirs:
+            try:
+                relative = self.raw_dir.relative_to(data_path)
+            except ValueError:
+                continue
+            return f"{data_path.name}/{relative.as_posix()}".rstrip("/")
+        return None
+
+    def _latest_raw_index(self) -> Dict[str, Dict[str, Any]]:
+        """最近一次带原始文件快照的 manifest(按备份名倒序,名称含时间戳)"""
+        if not self.backup_root.exists():
+            return {}
+        for manifest_path in sorted(self.backup_root.glob(f"*/{MANIFEST_NAME}"), reverse=True):
+            try:
+                manifest = json.loads(manifest_path.read_bytes())
+            except (OSError, ValueError):
+                continue
+            raw = manifest.get("raw")
+            if raw:
+                return {entry["path"]: entry for entry in raw.get("files", [])}
+        return {}
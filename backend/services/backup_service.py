@@ -5,17 +5,17 @@
 v4.20.0: 系统管理模块API实现
 """
 
+import asyncio
 import os
 import subprocess
-import hashlib
 import tarfile
-import gzip
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from modules.core.db import BackupRecord
+from backend.services.backup_engine import BACKUP_ENGINE_ENABLED, BackupEngine, file_sha256
 from modules.core.logger import get_logger
 from backend.utils.config import get_settings
 
@@ -38,9 +38,12 @@ class BackupService:
             "/app/logs",
             "/app/config"
         ]
+        # 原始导出文件:按内容寻址增量快照,不进入文件归档
+        self.raw_dir = Path("/app/data/raw")
         
         # 确保备份目录存在
         self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self.engine = BackupEngine(self.backup_dir, self.data_dirs, raw_dir=self.raw_dir)
     
     def _get_database_url(self) -> str:
         """获取数据库连接URL(Docker网络内)"""
@@ -54,11 +57,70 @@ class BackupService:
     
     def _calculate_checksum(self, file_path: Path) -> str:
         """计算文件SHA-256校验和"""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+        return file_sha256(file_path)
+    
+    def _create_legacy_backup(self, timestamp: str) -> tuple[Path, int, str]:
+        """旧备份流程(BACKUP_ENGINE=0):pg_dump 管道 gzip + 数据目录 tar.gz"""
+        backup_files = []
+        
+        # 1. 数据库备份
+        db_backup_path = self.backup_dir / f"backup_{timestamp}_database.sql.gz"
+        try:
+            db_url = self._get_database_url()
+            # 使用pg_dump导出数据库
+            cmd = [
+                "pg_dump",
+                db_url,
+                "--no-owner",
+                "--no-acl"
+            ]
+            
+            # 执行pg_dump并压缩
+            with open(db_backup_path, "wb") as f:
+                dump_process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
+                gzip_process = subprocess.Popen(
+                    ["gzip"],
+                    stdin=dump_process.stdout,
+                    stdout=f,
+                    stderr=subprocess.PIPE
+                )
+                dump_process.stdout.close()
+                gzip_process.communicate()
+                dump_process.wait()
+                
+                if dump_process.returncode != 0:
+                    raise Exception(f"pg_dump failed: {dump_process.stderr.read().decode()}")
+            
+            backup_files.append(db_backup_path)
+            logger.info(f"数据库备份完成: {db_backup_path}")
+        except Exception as e:
+            logger.error(f"数据库备份失败: {e}", exc_info=True)
+            raise
+        
+        # 2. 文件备份
+        files_backup_path = self.backup_dir / f"backup_{timestamp}_files.tar.gz"
+        try:
+            with tarfile.open(files_backup_path, "w:gz") as tar:
+                for data_dir in self.data_dirs:
+                    data_path = Path(data_dir)
+                    if data_path.exists():
+                        tar.add(data_path, arcname=data_path.name)
+                        logger.info(f"已添加目录到备份: {data_dir}")
+            
+            backup_files.append(files_backup_path)
+            logger.info(f"文件备份完成: {files_backup_path}")
+        except Exception as e:
+            logger.error(f"文件备份失败: {e}", exc_info=True)
+            raise
+        
+        # 3. 计算总大小和校验和
+        total_size = sum(f.stat().st_size for f in backup_files)
+        checksum = self._calculate_checksum(files_backup_path)  # 使用文件备份的校验和作为主校验和
+        return files_backup_path, total_size, checksum
     
     async def create_backup(
         self,
@@ -89,68 +151,19 @@ class BackupService:
             self.db.add(backup_record)
             await self.db.flush()  # 获取ID
             
-            backup_files = []
-            
-            # 1. 数据库备份
-            db_backup_path = self.backup_dir / f"backup_{timestamp}_database.sql.gz"
-            try:
-                db_url = self._get_database_url()
-                # 使用pg_dump导出数据库
-                cmd = [
-                    "pg_dump",
-                    db_url,
-                    "--no-owner",
-                    "--no-acl"
-                ]
-                
-                # 执行pg_dump并压缩
-                with open(db_backup_path, "wb") as f:
-                    dump_process = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                    gzip_process = subprocess.Popen(
-                        ["gzip"],
-                        stdin=dump_process.stdout,
-                        stdout=f,
-                        stderr=subprocess.PIPE
-                    )
-                    dump_process.stdout.close()
-                    gzip_process.communicate()
-                    dump_process.wait()
-                    
-                    if dump_process.returncode != 0:
-                        raise Exception(f"pg_dump failed: {dump_process.stderr.read().decode()}")
-                
-                backup_files.append(db_backup_path)
-                logger.info(f"数据库备份完成: {db_backup_path}")
-            except Exception as e:
-                logger.error(f"数据库备份失败: {e}", exc_info=True)
-                raise
-            
-            # 2. 文件备份
-            files_backup_path = self.backup_dir / f"backup_{timestamp}_files.tar.gz"
-            try:
-                with tarfile.open(files_backup_path, "w:gz") as tar:
-                    for data_dir in self.data_dirs:
-                        data_path = Path(data_dir)
-                        if data_path.exists():
-                            tar.add(data_path, arcname=data_path.name)
-                            logger.info(f"已添加目录到备份: {data_dir}")
-                
-                backup_files.append(files_backup_path)
-                logger.info(f"文件备份完成: {files_backup_path}")
-            except Exception as e:
-                logger.error(f"文件备份失败: {e}", exc_info=True)
-                raise
-            
-            # 3. 计算总大小和校验和
-            total_size = sum(f.stat().st_size for f in backup_files)
-            checksum = self._calculate_checksum(files_backup_path)  # 使用文件备份的校验和作为主校验和
+            # 备份在线程中执行,不阻塞事件循环
+            if BACKUP_ENGINE_ENABLED:
+                result = await asyncio.to_thread(
+                    self.engine.run, f"backup_{timestamp}", self._get_database_url()
+                )
+                backup_path, total_size, checksum = result.manifest_path, result.total_size, result.checksum
+            else:
+                backup_path, total_size, checksum = await asyncio.to_thread(
+                    self._create_legacy_backup, timestamp
+                )
             
             # 4. 更新备份记录
-            backup_record.backup_path = str(files_backup_path)  # 主备份文件路径
+            backup_record.backup_path = str(backup_path)  # 主备份文件路径(引擎备份为 manifest)
             backup_record.backup_size = total_size
             backup_record.checksum = checksum
             backup_record.status = "completed"
@@ -243,6 +256,10 @@ class BackupService:
         """
         backup_path = Path(backup_record.backup_path)
         
+        # 引擎备份:逐个校验 manifest 中记录的产物与原始文件对象
+        if self.engine.is_manifest(backup_path):
+            return self.engine.verify(backup_path, backup_record.checksum)
+        
         if not backup_path.exists():
             return False, f"备份文件不存在: {backup_path}"
         
@@ -258,6 +275,13 @@ class BackupService:
                 return False, f"备份文件校验和不匹配: 期望{backup_record.checksum},实际{actual_checksum}"
         
         return True, None
+    
+    def is_engine_backup(self, backup_record: BackupRecord) -> bool:
+        return self.engine.is_manifest(Path(backup_record.backup_path))
+    
+    def iter_backup_archive(self, backup_record: BackupRecord):
+        """引擎备份的下载流(tar,含数据库导出、文件归档与原始文件快照)"""
+        return self.engine.iter_archive(Path(backup_record.backup_path))
 
 
 def get_backup_service(db: AsyncSession) -> BackupService:
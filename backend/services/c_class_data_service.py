@@ -17,6 +17,15 @@ from sqlalchemy import text, select, func, and_, or_
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import date, datetime, timedelta
 from modules.core.logger import get_logger
+from backend.services.c_class_metrics_engine import (
+    C_CLASS_METRICS_LOOKBACK_DAYS,
+    C_CLASS_METRICS_STORE_ENABLED,
+    MART_SOURCES,
+    metrics_store_ready,
+    period_start,
+    query_health_scores_from_store,
+    query_shop_ranking_from_store,
+)
 
 logger = get_logger(__name__)
 
@@ -63,6 +72,27 @@ class CClassDataService:
             self._cache = get_c_class_cache(redis_url=redis_url)
         return self._cache
     
+    def should_use_metrics_store(
+        self,
+        start_date: date,
+        end_date: date,
+        granularity: str,
+        account_ids: Optional[List[str]] = None
+    ) -> bool:
+        """
+        判断是否使用预计算评分表(c_class.shop_health_scores)
+        
+        预计算评分只覆盖增量刷新回看窗口内的标准粒度,且不包含账号维度;
+        评分表没有刷新记录、落后于 mart 刷新或区间内没有评分时回退到物化视图/实时计算
+        """
+        if not C_CLASS_METRICS_STORE_ENABLED or account_ids:
+            return False
+        if granularity not in MART_SOURCES:
+            return False
+        if period_start(start_date, granularity) < date.today() - timedelta(days=C_CLASS_METRICS_LOOKBACK_DAYS):
+            return False
+        return metrics_store_ready(self.db, granularity, start_date, end_date)
+    
     def should_use_materialized_view(
         self,
         start_date: date,
@@ -454,6 +484,22 @@ class CClassDataService:
                 logger.info(f"[C-Class] 从缓存获取健康度评分({start_date} 到 {end_date})")
                 return cached_result
             
+            if self.should_use_metrics_store(start_date, end_date, granularity, account_ids):
+                # 使用预计算评分(mart 刷新后增量维护)
+                logger.info(f"[C-Class] 使用预计算评分查询健康度评分({start_date} 到 {end_date},粒度:{granularity})")
+                result = query_health_scores_from_store(
+                    self.db,
+                    start_date=start_date,
+                    end_date=end_date,
+                    granularity=granularity,
+                    platform_codes=platform_codes,
+                    shop_ids=shop_ids,
+                    page=page,
+                    page_size=page_size
+                )
+                self.cache.set("health_score", result, **cache_key_params)
+                return result
+            
             # 判断是否应该使用物化视图
             use_mv = self.should_use_materialized_view(
                 start_date=start_date,
@@ -549,6 +595,24 @@ class CClassDataService:
                 logger.info(f"[C-Class] 从缓存获取店铺排名({start_date} 到 {end_date},指标:{metric})")
                 return cached_result
             
+            if self.should_use_metrics_store(start_date, end_date, granularity):
+                # 使用预计算评分表汇总排名(数据库内 RANK() + 分页)
+                logger.info(f"[C-Class] 使用预计算评分查询店铺排名({start_date} 到 {end_date},粒度:{granularity},指标:{metric})")
+                result = query_shop_ranking_from_store(
+                    self.db,
+                    start_date=start_date,
+                    end_date=end_date,
+                    granularity=granularity,
+                    platform_codes=platform_codes,
+                    shop_ids=shop_ids,
+                    metric=metric,
+                    group_by=group_by,
+                    page=page,
+                    page_size=page_size
+                )
+                self.cache.set("ranking", result, **cache_key_params)
+                return result
+            
             # 判断是否应该使用物化视图
             use_mv = self.should_use_materialized_view(
                 start_date=start_date,
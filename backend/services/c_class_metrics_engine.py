@@ -0,0 +1,701 @@
+"""
+C类指标增量引擎(店铺健康度评分与排名)
+
+CClassDataService 原先在请求时逐店铺调用 ShopHealthService 实时计算健康度(每个店铺每天多次查询),
+排名则依赖 Python 排序,只靠 CClassCache 的短 TTL 缓存兜底。
+
+这里改为在 mart 刷新完成后预计算:
+- 输入:mart.shop_{day,week,month}_kpi(GMV/订单/访客/转化率)+ fact_product_metrics(库存周转/评分),
+  仅包含 core.dim_shops 中登记的店铺
+- 每个店铺每个周期的输入计算指纹(含评分规则版本);周期内所有指纹都与已存储的一致时整周期跳过
+- GMV/转化得分是周期内的百分位排名,周期内有输入变化时整周期重新打分(内存计算),
+  但只写入得分或指纹真正变化的行,写入时 score_version +1
+- 结果存放在 c_class.shop_health_scores;API 读取时用窗口函数(RANK/COUNT OVER)排名和分页
+- metric_date 沿用 mart 的周期起始日(周一/月初);读取时按周期与查询区间是否重叠过滤,
+  与实时计算(以周末/月末标记)覆盖相同的周期
+
+每次刷新在 ops.data_freshness_log 记录 c_class.shop_health_scores.<粒度> 的完成时间;
+CClassDataService 只在该记录不落后于对应 mart 的最近一次成功刷新、且请求区间内有评分时读取评分表,
+否则(以及 C_CLASS_METRICS_STORE=0 时)回退到原有的物化视图/实时计算路由。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.services.shop_health_service import (
+    CONVERSION_SCORE_FLOOR,
+    CONVERSION_SCORE_TIERS,
+    GMV_SCORE_FLOOR,
+    GMV_SCORE_TIERS,
+    ShopHealthService,
+    score_by_rank,
+)
+from modules.core.db import DimShop, FactProductMetric, ShopHealthScore
+from modules.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+C_CLASS_METRICS_STORE_ENABLED = os.getenv("C_CLASS_METRICS_STORE", "1").strip().lower() not in {"0", "false", "no"}
+C_CLASS_METRICS_LOOKBACK_DAYS = max(1, int(os.getenv("C_CLASS_METRICS_LOOKBACK_DAYS", "62")))
+
+# 评分规则变化时递增,使所有已存储的指纹失效
+SCORING_RULES_VERSION = "1"
+
+SCORE_TABLE = ShopHealthScore.__table__.fullname
+SHOP_TABLE = DimShop.__table__.fullname
+PRODUCT_METRIC_TABLE = FactProductMetric.__table__.fullname
+
+# 粒度 -> (mart 视图, 周期列, date_trunc 单位)
+MART_SOURCES = {
+    "daily": ("mart.shop_day_kpi", "period_date", "day"),
+    "weekly": ("mart.shop_week_kpi", "period_week", "week"),
+    "monthly": ("mart.shop_month_kpi", "period_month", "month"),
+}
+TARGET_GRANULARITIES = {
+    "mart.shop_day_kpi": "daily",
+    "mart.shop_week_kpi": "weekly",
+    "mart.shop_month_kpi": "monthly",
+}
+# 评分表在 ops.data_freshness_log 中的刷新记录名(按粒度)
+STORE_FRESHNESS_TARGETS = {granularity: f"{SCORE_TABLE}.{granularity}" for granularity in MART_SOURCES}
+RANKING_METRICS = {"gmv": "gmv", "orders": "orders", "conversion_rate": "conversion_rate"}
+SCORE_FIELDS = ("health_score", "gmv_score", "conversion_score", "inventory_score", "service_score", "risk_level")
+
+
+@dataclass(frozen=True)
+class ShopPeriodInputs:
+    """单个店铺单个周期的评分输入"""
+
+    platform_code: str
+    shop_id: str
+    metric_date: date
+    gmv: float
+    order_count: int
+    visitor_count: float
+    conversion_rate: float
+    inventory_turnover: float
+    customer_satisfaction: float
+
+    @property
+    def key(self) -> Tuple[str, str, date]:
+        return self.platform_code, self.shop_id, self.metric_date
+
+    def fingerprint(self) -> str:
+        values = {
+            name: round(value, 6) if isinstance(value, float) else str(value)
+            for name, value in asdict(self).items()
+        }
+        values["rules_version"] = SCORING_RULES_VERSION
+        return hashlib.sha256(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def period_start(day: date, granularity: str) -> date:
+    """day 所在周期的起始日(与 mart 的 date_trunc 一致:周从周一开始)"""
+    if granularity == "weekly":
+        return day - timedelta(days=day.weekday())
+    if granularity == "monthly":
+        return day.replace(day=1)
+    return day
+
+
+def inventory_turnover(available_stock: float, sales_volume_30d: float) -> float:
+    """年化库存周转率 = 365 / (可用库存 / 近30天日均销量)(与 ShopHealthService 一致)"""
+    if sales_volume_30d <= 0 or available_stock <= 0:
+        return 0.0
+    turnover_days = available_stock / (sales_volume_30d / 30.0)
+    return 365.0 / turnover_days if turnover_days > 0 else 0.0
+
+
+def _rank_desc(values: List[float]) -> callable:
+    """返回 value -> 排名(比它大的个数 + 1)"""
+    negated = sorted(-value for value in values)
+    return lambda value: bisect_left(negated, -value) + 1
+
+
+def score_period(rows: List[ShopPeriodInputs]) -> Dict[Tuple[str, str, date], Dict[str, Any]]:
+    """
+    对同一周期内的店铺打分(规则与 ShopHealthService 相同,排名一次排序完成)
+    """
+    total = len(rows)
+    if total == 0:
+        return {}
+    gmv_rank = _rank_desc([row.gmv for row in rows])
+    conversion_rank = _rank_desc([row.conversion_rate for row in rows])
+
+    scores = {}
+    for row in rows:
+        metrics = asdict(row)
+        gmv_score = score_by_rank(gmv_rank(row.gmv), total, GMV_SCORE_TIERS, GMV_SCORE_FLOOR)
+        conversion_score = score_by_rank(
+            conversion_rank(row.conversion_rate), total, CONVERSION_SCORE_TIERS, CONVERSION_SCORE_FLOOR
+        )
+        inventory_score = ShopHealthService._calculate_inventory_score(metrics, [])
+        service_score = ShopHealthService._calculate_service_score(metrics, [])
+        health_score = gmv_score + conversion_score + inventory_score + service_score
+        risk_level, risk_factors = ShopHealthService._assess_risk(health_score, metrics, [])
+        scores[row.key] = {
+            "health_score": health_score,
+            "gmv_score": gmv_score,
+            "conversion_score": conversion_score,
+            "inventory_score": inventory_score,
+            "service_score": service_score,
+            "risk_level": risk_level,
+            "risk_factors": risk_factors,
+        }
+    return scores
+
+
+class CClassMetricsEngine:
+    """mart 刷新后增量重算店铺健康度评分"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def refresh(
+        self,
+        granularities: Optional[Iterable[str]] = None,
+        since: Optional[date] = None,
+        commit: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        增量刷新
+
+        Args:
+            granularities: 要刷新的粒度(默认全部)
+            since: 起始周期(默认 C_CLASS_METRICS_LOOKBACK_DAYS 天前)
+            commit: 是否提交(刷新流水线内调用时由调用方统一提交)
+
+        Returns:
+            统计信息(扫描/重算周期数、写入/未变/删除行数)
+        """
+        since = since or (datetime.now(timezone.utc).date() - timedelta(days=C_CLASS_METRICS_LOOKBACK_DAYS))
+        stats = {"periods": 0, "periods_recomputed": 0, "rows_written": 0, "rows_unchanged": 0, "rows_deleted": 0}
+
+        for granularity in granularities or MART_SOURCES:
+            inputs = await self._load_inputs(granularity, since)
+            stored = await self._load_stored(granularity, since)
+
+            periods: Dict[date, List[ShopPeriodInputs]] = defaultdict(list)
+            for row in inputs:
+                periods[row.metric_date].append(row)
+            stored_by_period: Dict[date, Dict[Tuple[str, str, date], Dict[str, Any]]] = defaultdict(dict)
+            for key, entry in stored.items():
+                stored_by_period[key[2]][key] = entry
+
+            upserts: List[Dict[str, Any]] = []
+            deletes: List[Tuple[str, str, date]] = []
+            for metric_date, rows in periods.items():
+                stats["periods"] += 1
+                fingerprints = {row.key: row.fingerprint() for row in rows}
+                existing = stored_by_period.get(metric_date, {})
+                if set(existing) == set(fingerprints) and all(
+                    existing[key]["input_hash"] == fingerprint for key, fingerprint in fingerprints.items()
+                ):
+                    stats["rows_unchanged"] += len(rows)
+                    continue
+
+                stats["periods_recomputed"] += 1
+                scores = score_period(rows)
+                for row in rows:
+                    score = scores[row.key]
+                    previous = existing.get(row.key)
+                    if (
+                        previous is not None
+                        and previous["input_hash"] == fingerprints[row.key]
+                        and all(previous[field] == score[field] for field in SCORE_FIELDS)
+                    ):
+                        stats["rows_unchanged"] += 1
+                        continue
+                    upserts.append(
+                        self._score_row(row, granularity, score, fingerprints[row.key], previous)
+                    )
+                deletes.extend(key for key in existing if key not in fingerprints)
+
+            await self._write(granularity, upserts, deletes)
+            await self._mark_refreshed(granularity)
+            stats["rows_written"] += len(upserts)
+            stats["rows_deleted"] += len(deletes)
+
+        changed = bool(stats["rows_written"] or stats["rows_deleted"])
+        if commit:
+            await self.db.commit()
+            if changed:
+                await asyncio.to_thread(_clear_read_caches)
+        elif changed:
+            # 由调用方提交:提交前读缓存仍对应库里的旧评分,提交后才清
+            _clear_read_caches_after_commit(self.db)
+        logger.info(f"[CClassMetrics] Incremental refresh since {since}: {stats}")
+        return stats
+
+    @staticmethod
+    def _score_row(
+        row: ShopPeriodInputs,
+        granularity: str,
+        score: Dict[str, Any],
+        fingerprint: str,
+        previous: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        return {
+            "platform_code": row.platform_code,
+            "shop_id": row.shop_id,
+            "metric_date": row.metric_date,
+            "granularity": granularity,
+            **{field: score[field] for field in SCORE_FIELDS},
+            "risk_factors": json.dumps(score["risk_factors"], ensure_ascii=False),
+            "gmv": row.gmv,
+            "order_count": row.order_count,
+            "conversion_rate": row.conversion_rate,
+            "inventory_turnover": row.inventory_turnover,
+            "customer_satisfaction": row.customer_satisfaction,
+            "input_hash": fingerprint,
+            "score_version": (previous["score_version"] + 1) if previous else 1,
+        }
+
+    async def _load_inputs(self, granularity: str, since: date) -> List[ShopPeriodInputs]:
+        view, period_column, unit = MART_SOURCES[granularity]
+        result = await self.db.execute(
+            text(
+                f"""
+                WITH product_metrics AS (
+                    SELECT
+                        platform_code,
+                        shop_id,
+                        date_trunc('{unit}', metric_date)::date AS period,
+                        SUM(COALESCE(available_stock, stock, 0)) AS available_stock,
+                        SUM(COALESCE(sales_volume_30d, sales_volume, 0)) AS sales_volume_30d,
+                        AVG(NULLIF(rating, 0)) AS avg_rating
+                    FROM {PRODUCT_METRIC_TABLE}
+                    WHERE metric_date >= :since
+                      AND data_domain IN ('products', 'inventory')
+                    GROUP BY 1, 2, 3
+                )
+                SELECT
+                    k.platform_code,
+                    k.shop_id,
+                    k.{period_column} AS metric_date,
+                    COALESCE(k.gmv, 0) AS gmv,
+                    COALESCE(k.order_count, 0) AS order_count,
+                    COALESCE(k.visitor_count, 0) AS visitor_count,
+                    COALESCE(k.conversion_rate, 0) AS conversion_rate,
+                    COALESCE(p.available_stock, 0) AS available_stock,
+                    COALESCE(p.sales_volume_30d, 0) AS sales_volume_30d,
+                    COALESCE(p.avg_rating, 0) AS avg_rating
+                FROM {view} k
+                JOIN {SHOP_TABLE} s
+                  ON s.platform_code = k.platform_code AND s.shop_id = k.shop_id
+                LEFT JOIN product_metrics p
+                  ON p.platform_code = k.platform_code AND p.shop_id = k.shop_id AND p.period = k.{period_column}
+                WHERE k.{period_column} >= :since
+                """
+            ),
+            {"since": since},
+        )
+        return [
+            ShopPeriodInputs(
+                platform_code=row.platform_code,
+                shop_id=row.shop_id,
+                metric_date=row.metric_date,
+                gmv=float(row.gmv or 0),
+                order_count=int(row.order_count or 0),
+                visitor_count=float(row.visitor_count or 0),
+                conversion_rate=float(row.conversion_rate or 0),
+                inventory_turnover=inventory_turnover(float(row.available_stock or 0), float(row.sales_volume_30d or 0)),
+                customer_satisfaction=float(row.avg_rating or 0),
+            )
+            for row in result.fetchall()
+        ]
+
+    async def _load_stored(self, granularity: str, since: date) -> Dict[Tuple[str, str, date], Dict[str, Any]]:
+        result = await self.db.execute(
+            text(
+                f"""
+                SELECT platform_code, shop_id, metric_date, input_hash, score_version,
+                       health_score, gmv_score, conversion_score, inventory_score, service_score, risk_level
+                FROM {SCORE_TABLE}
+                WHERE granularity = :granularity AND metric_date >= :since
+                """
+            ),
+            {"granularity": granularity, "since": since},
+        )
+        stored = {}
+        for row in result.fetchall():
+            entry = dict(row._mapping)
+            for field in SCORE_FIELDS[:-1]:
+                entry[field] = float(entry[field]) if entry[field] is not None else None
+            stored[(row.platform_code, row.shop_id, row.metric_date)] = entry
+        return stored
+
+    async def _mark_refreshed(self, granularity: str) -> None:
+        """记录该粒度评分的刷新完成时间(与评分写入同一事务提交)"""
+        await self.db.execute(
+            text(
+                """
+                INSERT INTO ops.data_freshness_log (target_name, target_type, last_started_at, last_succeeded_at, status)
+                VALUES (:target_name, 'c_class', now(), now(), 'success')
+                ON CONFLICT (target_name) DO UPDATE SET
+                    last_started_at = now(),
+                    last_succeeded_at = now(),
+                    status = 'success'
+                """
+            ),
+            {"target_name": STORE_FRESHNESS_TARGETS[granularity]},
+        )
+
+    async def _write(
+        self,
+        granularity: str,
+        upserts: List[Dict[str, Any]],
+        deletes: List[Tuple[str, str, date]],
+    ) -> None:
+        if upserts:
+            columns = list(upserts[0])
+            updates = [column for column in columns if column not in ("platform_code", "shop_id", "metric_date", "granularity")]
+            await self.db.execute(
+                text(
+                    f"""
+                    INSERT INTO {SCORE_TABLE} ({", ".join(columns)}, created_at, updated_at)
+                    VALUES ({", ".join(":" + column for column in columns)}, now(), now())
+                    ON CONFLICT (platform_code, shop_id, metric_date, granularity) DO UPDATE SET
+                        {", ".join(f"{column} = EXCLUDED.{column}" for column in updates)},
+                        updated_at = now()
+                    """
+                ),
+                upserts,
+            )
+        if deletes:
+            await self.db.execute(
+                text(
+                    f"""
+                    DELETE FROM {SCORE_TABLE}
+                    WHERE granularity = :granularity
+                      AND platform_code = :platform_code AND shop_id = :shop_id AND metric_date = :metric_date
+                    """
+                ),
+                [
+                    {"granularity": granularity, "platform_code": platform_code, "shop_id": shop_id, "metric_date": metric_date}
+                    for platform_code, shop_id, metric_date in deletes
+                ],
+            )
+
+
+def _clear_read_caches() -> None:
+    try:
+        from backend.utils.c_class_cache import get_c_class_cache
+
+        cache = get_c_class_cache(redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        cache.clear_by_type("health_score")
+        cache.clear_by_type("ranking")
+    except Exception as exc:
+        logger.warning(f"[CClassMetrics] Failed to clear C-class read caches: {exc}")
+
+
+def _clear_read_caches_after_commit(db: AsyncSession) -> None:
+    """
+    会话下一次真正提交(不含保存点释放)后清一次读缓存;先发生回滚则不清
+
+    after_commit 在事件循环线程内触发,清理交给线程池执行,不阻塞提交
+    """
+    state = {"settled": False}
+
+    def _on_commit(session) -> None:
+        # SQLAlchemy 2.x 释放保存点时也会触发 after_commit,只认最外层事务
+        if state["settled"] or session.in_nested_transaction():
+            return
+        state["settled"] = True
+        try:
+            asyncio.get_running_loop().run_in_executor(None, _clear_read_caches)
+        except RuntimeError:
+            _clear_read_caches()
+
+    def _on_rollback(session) -> None:
+        if not session.in_nested_transaction():
+            state["settled"] = True
+
+    sync_session = db.sync_session
+    event.listen(sync_session, "after_commit", _on_commit)
+    event.listen(sync_session, "after_rollback", _on_rollback)
+
+
+async def refresh_after_mart_refresh(db: AsyncSession, targets: Iterable[str], failed_targets: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    mart 刷新完成后的钩子:只刷新本次成功刷新的店铺 KPI 粒度
+
+    在保存点内执行、由调用方随刷新日志一起提交;失败只回滚保存点并记录日志,不影响刷新结果
+    """
+    if not C_CLASS_METRICS_STORE_ENABLED:
+        return None
+    failed = set(failed_targets)
+    granularities = [
+        granularity
+        for target, granularity in TARGET_GRANULARITIES.items()
+        if target in targets and target not in failed
+    ]
+    if not granularities:
+        return None
+    try:
+        async with db.begin_nested():
+            return await CClassMetricsEngine(db).refresh(granularities, commit=False)
+    except Exception as exc:
+        logger.warning(f"[CClassMetrics] Incremental refresh after mart refresh failed: {exc}", exc_info=True)
+        return None
+
+
+# ----------------------------------------------------------------------
+# 读取(CClassDataService 使用,同步会话)
+# ----------------------------------------------------------------------
+def _filters(platform_codes: Optional[List[str]], shop_ids: Optional[List[str]]) -> Tuple[str, Dict[str, Any], list]:
+    clauses, params, expanding = "", {}, []
+    if platform_codes:
+        clauses += " AND platform_code IN :platform_codes"
+        params["platform_codes"] = list(platform_codes)
+        expanding.append(bindparam("platform_codes", expanding=True))
+    if shop_ids:
+        clauses += " AND shop_id IN :shop_ids"
+        params["shop_ids"] = list(shop_ids)
+        expanding.append(bindparam("shop_ids", expanding=True))
+    return clauses, params, expanding
+
+
+def metrics_store_ready(db: Session, granularity: str, start_date: date, end_date: date) -> bool:
+    """
+    评分表能否回答该粒度/区间的查询
+
+    需要同时满足:有该粒度的刷新记录、刷新记录不早于对应 mart 最近一次成功刷新、区间内有评分行
+    """
+    view = MART_SOURCES[granularity][0]
+    try:
+        # 保存点内检查:ops 表缺失等错误不影响同一会话里后续的回退查询
+        with db.begin_nested():
+            row = db.execute(
+                text(
+                    f"""
+                    SELECT
+                        (SELECT last_succeeded_at FROM ops.data_freshness_log WHERE target_name = :store_target) AS store_refreshed_at,
+                        (SELECT last_succeeded_at FROM ops.data_freshness_log WHERE target_name = :mart_target) AS mart_refreshed_at,
+                        EXISTS (
+                            SELECT 1 FROM {SCORE_TABLE}
+                            WHERE granularity = :granularity AND metric_date >= :start_date AND metric_date <= :end_date
+                        ) AS has_rows
+                    """
+                ),
+                {
+                    "store_target": STORE_FRESHNESS_TARGETS[granularity],
+                    "mart_target": view,
+                    "granularity": granularity,
+                    "start_date": period_start(start_date, granularity),
+                    "end_date": end_date,
+                },
+            ).one()
+    except Exception as exc:
+        logger.warning(f"[CClassMetrics] Failed to check score store readiness: {exc}")
+        return False
+    if row.store_refreshed_at is None:
+        logger.debug(f"[CClassMetrics] No {granularity} score refresh recorded")
+        return False
+    if row.mart_refreshed_at is not None and row.store_refreshed_at < row.mart_refreshed_at:
+        logger.debug(f"[CClassMetrics] {granularity} scores are behind {view} refresh")
+        return False
+    return bool(row.has_rows)
+
+
+def query_health_scores_from_store(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    granularity: str,
+    platform_codes: Optional[List[str]] = None,
+    shop_ids: Optional[List[str]] = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> Dict[str, Any]:
+    """
+    分页读取预计算的健康度评分;周期内排名(health_rank)和总数由窗口函数给出
+
+    metric_date 是周期起始日,start_date 先对齐到所在周期的起始日,与区间重叠的周期都会返回
+    """
+    clauses, params, expanding = _filters(platform_codes, shop_ids)
+    statement = text(
+        f"""
+        SELECT
+            platform_code, shop_id, metric_date, granularity,
+            health_score, gmv_score, conversion_score, inventory_score, service_score,
+            gmv, order_count, conversion_rate, inventory_turnover, customer_satisfaction,
+            risk_level, score_version,
+            RANK() OVER (PARTITION BY metric_date ORDER BY health_score DESC) AS health_rank,
+            COUNT(*) OVER () AS total_count
+        FROM {SCORE_TABLE}
+        WHERE granularity = :granularity
+          AND metric_date >= :start_date
+          AND metric_date <= :end_date{clauses}
+        ORDER BY health_score DESC, metric_date DESC, platform_code, shop_id
+        LIMIT :limit OFFSET :offset
+        """
+    )
+    if expanding:
+        statement = statement.bindparams(*expanding)
+    rows = db.execute(
+        statement,
+        {
+            "granularity": granularity,
+            "start_date": period_start(start_date, granularity),
+            "end_date": end_date,
+            "limit": page_size,
+            "offset": (page - 1) * page_size,
+            **params,
+        },
+    ).fetchall()
+
+    data = [
+        {
+            "platform_code": row.platform_code,
+            "shop_id": row.shop_id,
+            "metric_date": row.metric_date,
+            "granularity": row.granularity,
+            "health_score": float(row.health_score or 0),
+            "gmv_score": float(row.gmv_score or 0),
+            "conversion_score": float(row.conversion_score or 0),
+            "inventory_score": float(row.inventory_score or 0),
+            "service_score": float(row.service_score or 0),
+            "gmv": float(row.gmv or 0),
+            "orders": int(row.order_count or 0),
+            "conversion_rate": float(row.conversion_rate or 0),
+            "inventory_turnover": float(row.inventory_turnover or 0),
+            "customer_satisfaction": float(row.customer_satisfaction or 0),
+            "risk_level": row.risk_level,
+            "rank": int(row.health_rank),
+            "score_version": int(row.score_version or 1),
+        }
+        for row in rows
+    ]
+    total = int(rows[0].total_count) if rows else _count_scores(db, granularity, start_date, end_date, platform_codes, shop_ids, page)
+    return {"data": data, "total": total, "query_type": "store"}
+
+
+def query_shop_ranking_from_store(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    granularity: str,
+    platform_codes: Optional[List[str]] = None,
+    shop_ids: Optional[List[str]] = None,
+    metric: str = "gmv",
+    group_by: str = "shop",
+    page: int = 1,
+    page_size: int = 20,
+) -> Dict[str, Any]:
+    """店铺/平台排名:与区间重叠的周期汇总后用 RANK() OVER 排名,数据库内分页"""
+    clauses, params, expanding = _filters(platform_codes, shop_ids)
+    order_column = RANKING_METRICS.get(metric, "gmv")
+    group_columns = "platform_code, shop_id" if group_by == "shop" else "platform_code"
+    shop_select = "t.shop_id, s.shop_name" if group_by == "shop" else "NULL AS shop_id, NULL AS shop_name"
+    shop_join = (
+        f"LEFT JOIN {SHOP_TABLE} s ON s.platform_code = t.platform_code AND s.shop_id = t.shop_id"
+        if group_by == "shop"
+        else ""
+    )
+    statement = text(
+        f"""
+        WITH totals AS (
+            SELECT
+                {group_columns},
+                SUM(gmv) AS gmv,
+                SUM(order_count) AS orders,
+                AVG(conversion_rate) AS conversion_rate
+            FROM {SCORE_TABLE}
+            WHERE granularity = :granularity
+              AND metric_date >= :start_date
+              AND metric_date <= :end_date{clauses}
+            GROUP BY {group_columns}
+        ),
+        ranked AS (
+            SELECT
+                totals.*,
+                RANK() OVER (ORDER BY {order_column} DESC) AS metric_rank,
+                COUNT(*) OVER () AS total_count
+            FROM totals
+        )
+        SELECT t.platform_code, {shop_select}, t.gmv, t.orders, t.conversion_rate, t.metric_rank, t.total_count
+        FROM ranked t
+        {shop_join}
+        ORDER BY t.metric_rank, t.platform_code{", t.shop_id" if group_by == "shop" else ""}
+        LIMIT :limit OFFSET :offset
+        """
+    )
+    if expanding:
+        statement = statement.bindparams(*expanding)
+    rows = db.execute(
+        statement,
+        {
+            "granularity": granularity,
+            "start_date": period_start(start_date, granularity),
+            "end_date": end_date,
+            "limit": page_size,
+            "offset": (page - 1) * page_size,
+            **params,
+        },
+    ).fetchall()
+
+    data = [
+        {
+            "rank": int(row.metric_rank),
+            "platform_code": row.platform_code,
+            "shop_id": row.shop_id,
+            "shop_name": row.shop_name,
+            "gmv": float(row.gmv or 0),
+            "orders": int(row.orders or 0),
+            "conversion_rate": float(row.conversion_rate or 0),
+        }
+        for row in rows
+    ]
+    total = int(rows[0].total_count) if rows else 0
+    return {"data": data, "total": total, "query_type": "store"}
+
+
+def _count_scores(
+    db: Session,
+    granularity: str,
+    start_date: date,
+    end_date: date,
+    platform_codes: Optional[List[str]],
+    shop_ids: Optional[List[str]],
+    page: int,
+) -> int:
+    # 只有翻页越界时需要单独计数
+    if page <= 1:
+        return 0
+    clauses, params, expanding = _filters(platform_codes, shop_ids)
+    statement = text(
+        f"""
+        SELECT COUNT(*) FROM {SCORE_TABLE}
+        WHERE granularity = :granularity
+          AND metric_date >= :start_date
+          AND metric_date <= :end_date{clauses}
+        """
+    )
+    if expanding:
+        statement = statement.bindparams(*expanding)
+    return int(
+        db.execute(
+            statement,
+            {"granularity": granularity, "start_date": period_start(start_date, granularity), "end_date": end_date, **params},
+        ).scalar()
+        or 0
+    )
+
+
+def get_c_class_metrics_engine(db: AsyncSession) -> CClassMetricsEngine:
+    """获取C类指标增量引擎"""
+    return CClassMetricsEngine(db)
@@ -58,6 +58,7 @@ class CacheService:
         "dashboard_operational_metrics": 180,
         "dashboard_clearance_ranking": 300,
         "dashboard_inventory_backlog": 300,
+        "dashboard_business_overview_batch": 180,
         "annual_summary_kpi": 180,  # 年度数据总结 KPI（add-annual-data-summary）
         # add-redis-cache-uncached-endpoints
         "performance_scores": 180,
@@ -4,6 +4,7 @@ import hashlib
 import logging
 import os
 import socket
+from functools import partial
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -27,6 +28,13 @@ from backend.services.cloud_b_class_sync_service import (
     SQLAlchemyBClassSourceReader,
     SQLAlchemyCloudWriter,
 )
+from backend.services.cloud_b_class_sync_transport import (
+    TRANSPORT_COPY,
+    TRANSPORT_UPSERT,
+    AdaptiveBatchSizer,
+    SQLAlchemyCloudCopyWriter,
+    normalize_transport,
+)
 from modules.core.db import CloudBClassSyncTask
 
 
@@ -286,6 +294,19 @@ def run_cloud_sync_startup_checks_from_env() -> dict:
     return {"status": status, "checks": checks}
 
 
+def get_cloud_sync_transport_from_env() -> str:
+    return normalize_transport(os.getenv("CLOUD_SYNC_TRANSPORT"))
+
+
+def _build_batch_sizer_factory_from_env():
+    return partial(
+        AdaptiveBatchSizer,
+        min_size=int(os.getenv("CLOUD_SYNC_MIN_BATCH_SIZE", "500")),
+        max_size=int(os.getenv("CLOUD_SYNC_MAX_BATCH_SIZE", "20000")),
+        target_seconds=float(os.getenv("CLOUD_SYNC_TARGET_BATCH_SECONDS", "2")),
+    )
+
+
 def _build_cloud_sync_service(
     *,
     local_engine,
@@ -293,11 +314,17 @@ def _build_cloud_sync_service(
     session_factory,
     dry_run: bool,
     checkpoint_scope: str,
+    transport: str = TRANSPORT_UPSERT,
+    table_concurrency: int = 1,
 ) -> CloudBClassSyncService:
     checkpoint_service = CloudBClassSyncCheckpointService(session_factory())
     mirror_manager = NoOpCloudBClassMirrorManager() if dry_run else CloudBClassMirrorManager(cloud_engine)
     source_reader = SQLAlchemyBClassSourceReader(local_engine)
-    cloud_writer = SQLAlchemyCloudWriter(cloud_engine, dry_run=dry_run)
+    pipelined = transport == TRANSPORT_COPY
+    if pipelined:
+        cloud_writer = SQLAlchemyCloudCopyWriter(cloud_engine, dry_run=dry_run)
+    else:
+        cloud_writer = SQLAlchemyCloudWriter(cloud_engine, dry_run=dry_run)
 
     def inspect_tables():
         inspector = sa_inspect(local_engine)
@@ -313,6 +340,9 @@ def _build_cloud_sync_service(
         cloud_engine=cloud_engine,
         owns_engines=False,
         checkpoint_scope=checkpoint_scope,
+        pipeline_prefetch=pipelined,
+        batch_sizer_factory=_build_batch_sizer_factory_from_env() if pipelined else None,
+        table_concurrency=table_concurrency,
     )
 
 
@@ -331,6 +361,8 @@ def build_cloud_sync_service_from_env(dry_run: bool = False) -> CloudBClassSyncS
         session_factory=SessionLocal,
         dry_run=dry_run,
         checkpoint_scope=checkpoint_scope,
+        transport=get_cloud_sync_transport_from_env(),
+        table_concurrency=int(os.getenv("CLOUD_SYNC_TABLE_CONCURRENCY", "1")),
     )
     service.owns_engines = True
     return service
@@ -345,12 +377,14 @@ class CloudSyncWorkerFactory:
         session_factory,
         dry_run: bool,
         batch_size: int = 1000,
+        transport: str = TRANSPORT_UPSERT,
     ) -> None:
         self.local_engine = local_engine
         self.cloud_engine = cloud_engine
         self.session_factory = session_factory
         self.dry_run = dry_run
         self.batch_size = batch_size
+        self.transport = normalize_transport(transport)
         self.checkpoint_scope = _build_checkpoint_scope_key(
             str(cloud_engine.url) if hasattr(cloud_engine, "url") else None,
             dry_run,
@@ -364,6 +398,7 @@ class CloudSyncWorkerFactory:
             session_factory=self.session_factory,
             dry_run=self.dry_run,
             checkpoint_scope=self.checkpoint_scope,
+            transport=self.transport,
         )
         return CloudBClassAutoSyncWorker(
             db=db,
@@ -458,6 +493,7 @@ def build_cloud_sync_worker_factory_from_env(dry_run: bool = False):
         session_factory=SessionLocal,
         dry_run=dry_run,
         batch_size=batch_size,
+        transport=get_cloud_sync_transport_from_env(),
     )
 
 
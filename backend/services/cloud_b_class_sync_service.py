@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
 import json
+import threading
+import time
 import uuid
 from collections.abc import Iterable
+from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from typing import Any
 
 from sqlalchemy import create_engine, insert, inspect as sa_inspect, select, text, update
+from sqlalchemy.exc import DBAPIError
 
-from backend.services.cloud_b_class_mirror_manager import build_canonical_columns
+from backend.services.cloud_b_class_mirror_manager import (
+    build_canonical_columns,
+    get_conflict_key_columns,
+)
 from backend.services.cloud_b_class_sync_utils import quote_ident, validate_b_class_table_name
 from backend.services.data_pipeline.refresh_queue_service import RefreshQueueService
 from modules.core.db import CloudSyncReceiveLog, RefreshQueueTask
@@ -37,11 +45,41 @@ def build_sync_payload(row: dict[str, Any]) -> dict[str, Any]:
     return payload
 
 
+@dataclass(frozen=True)
+class SourceBatchCursor:
+    """Read position for the next source batch, shaped like a checkpoint row."""
+
+    last_ingest_timestamp: Any
+    last_source_id: int | None
+
+
 class SQLAlchemyBClassSourceReader:
     """Read canonical rows from local B-class tables."""
 
     def __init__(self, engine):
         self.engine = engine
+        self._column_cache: dict[str, frozenset[str]] = {}
+        self._column_cache_lock = threading.Lock()
+
+    def get_available_columns(self, table_name: str) -> frozenset[str]:
+        """Reflect source columns once per table; batches reuse the cached set."""
+        cached = self._column_cache.get(table_name)
+        if cached is not None:
+            return cached
+        inspector = sa_inspect(self.engine)
+        columns = frozenset(
+            column["name"] for column in inspector.get_columns(table_name, schema="b_class")
+        )
+        with self._column_cache_lock:
+            self._column_cache[table_name] = columns
+        return columns
+
+    def invalidate_columns(self, table_name: str | None = None) -> None:
+        with self._column_cache_lock:
+            if table_name is None:
+                self._column_cache.clear()
+            else:
+                self._column_cache.pop(table_name, None)
 
     def _build_select_sql(
         self,
@@ -65,15 +103,29 @@ class SQLAlchemyBClassSourceReader:
             "LIMIT :batch_size"
         )
 
+    @staticmethod
+    def _is_undefined_column_error(exc: DBAPIError) -> bool:
+        if getattr(exc.orig, "pgcode", None) == "42703":
+            return True
+        message = str(exc.orig).lower()
+        return "no such column" in message or ("column" in message and "does not exist" in message)
+
     def __call__(self, table_name: str, checkpoint, batch_size: int = 1000):
         where_sql, params = CloudBClassSyncService._build_checkpoint_where_clause(checkpoint)
-        inspector = sa_inspect(self.engine)
-        available_columns = {
-            column["name"] for column in inspector.get_columns(table_name, schema="b_class")
-        }
-        sql = self._build_select_sql(table_name, where_sql, available_columns=available_columns)
         bind_params = dict(params)
         bind_params["batch_size"] = batch_size
+        try:
+            return self._read_batch(table_name, where_sql, bind_params)
+        except DBAPIError as exc:
+            if not self._is_undefined_column_error(exc):
+                raise
+        # 同步过程中源表删了列：缓存的列集已过期，重新反射后重试一次。
+        self.invalidate_columns(table_name)
+        return self._read_batch(table_name, where_sql, bind_params)
+
+    def _read_batch(self, table_name: str, where_sql: str, bind_params: dict[str, Any]) -> list[dict[str, Any]]:
+        available_columns = self.get_available_columns(table_name)
+        sql = self._build_select_sql(table_name, where_sql, available_columns=available_columns)
         with self.engine.begin() as conn:
             result = conn.execute(text(sql), bind_params)
             return [dict(row) for row in result.mappings().all()]
@@ -89,34 +141,56 @@ class SQLAlchemyCloudWriter:
         self.dry_run = dry_run
 
     @staticmethod
-    def _build_upsert_sql(table_name: str, data_domain: str) -> str:
+    def _build_conflict_clause(data_domain: str) -> str:
         columns = build_canonical_columns()
-        column_list = ", ".join(columns)
-        bind_list = ", ".join(f":{column}" for column in columns)
         update_fields = ", ".join(
             f"{column} = EXCLUDED.{column}"
             for column in columns
             if column not in {"platform_code", "shop_id", "data_domain", "granularity", "sub_domain", "data_hash"}
         )
-        if data_domain == "services":
-            conflict_clause = "(data_domain, sub_domain, granularity, data_hash)"
-        else:
-            conflict_clause = "(platform_code, shop_id, data_domain, granularity, data_hash)"
+        conflict_clause = f"({', '.join(get_conflict_key_columns(data_domain))})"
+        return f"ON CONFLICT {conflict_clause} DO UPDATE SET {update_fields}"
+
+    @staticmethod
+    def _build_upsert_sql(table_name: str, data_domain: str) -> str:
+        columns = build_canonical_columns()
+        column_list = ", ".join(columns)
+        bind_list = ", ".join(f":{column}" for column in columns)
         return (
             f'INSERT INTO {SQLAlchemyCloudWriter.TARGET_SCHEMA}."{table_name}" ({column_list}) '
             f"VALUES ({bind_list}) "
-            f"ON CONFLICT {conflict_clause} DO UPDATE SET {update_fields}"
+            f"{SQLAlchemyCloudWriter._build_conflict_clause(data_domain)}"
         )
 
+    @staticmethod
+    def _estimate_payload_bytes(prepared_rows: list[dict[str, Any]]) -> int:
+        return sum(
+            len(str(value).encode("utf-8"))
+            for record in prepared_rows
+            for value in record.values()
+            if value is not None
+        )
+
+    def _write_rows(self, conn, table_name: str, rows: list[dict[str, Any]], data_domain: str) -> int:
+        """Write one batch on ``conn`` and return the payload size in bytes."""
+        sql = self._build_upsert_sql(table_name, data_domain)
+        prepared_rows = self._prepare_rows_for_insert(rows)
+        conn.execute(text(sql), prepared_rows)
+        return self._estimate_payload_bytes(prepared_rows)
+
     def __call__(self, table_name: str, rows: list[dict[str, Any]], data_domain: str):
         if self.dry_run:
             return {"success": True, "written_rows": len(rows), "dry_run": True}
 
-        sql = self._build_upsert_sql(table_name, data_domain)
-        prepared_rows = self._prepare_rows_for_insert(rows)
+        started_at = time.perf_counter()
         with self.engine.begin() as conn:
-            conn.execute(text(sql), prepared_rows)
-        return {"success": True, "written_rows": len(rows)}
+            payload_bytes = self._write_rows(conn, table_name, rows, data_domain)
+        return {
+            "success": True,
+            "written_rows": len(rows),
+            "payload_bytes": payload_bytes,
+            "duration_seconds": time.perf_counter() - started_at,
+        }
 
     def write_rows_with_receive_log(
         self,
@@ -130,17 +204,23 @@ class SQLAlchemyCloudWriter:
         if self.dry_run:
             return {"success": True, "written_rows": len(rows), "dry_run": True}
 
-        sql = self._build_upsert_sql(table_name, data_domain)
-        prepared_rows = self._prepare_rows_for_insert(rows)
+        started_at = time.perf_counter()
         with self.engine.begin() as conn:
-            conn.execute(text(sql), prepared_rows)
+            payload_bytes = self._write_rows(conn, table_name, rows, data_domain)
+            duration_seconds = time.perf_counter() - started_at
             receive_result = receive_log_recorder.record_success_on_connection(
                 conn,
-                **receive_log_context,
+                **{
+                    **receive_log_context,
+                    "payload_bytes": payload_bytes,
+                    "duration_seconds": duration_seconds,
+                },
             )
         return {
             "success": True,
             "written_rows": len(rows),
+            "payload_bytes": payload_bytes,
+            "duration_seconds": duration_seconds,
             "receive_log": receive_result,
             "receive_id": receive_result.get("receive_id"),
         }
@@ -212,6 +292,8 @@ class CloudSyncReceiveLogRecorder:
         source_latest_ingest_timestamp: Any | None = None,
         written_rows: int = 0,
         rows: list[dict[str, Any]] | None = None,
+        payload_bytes: int | None = None,
+        duration_seconds: float | None = None,
     ) -> dict[str, Any]:
         payload = self._build_success_payload(
             source_table_name=source_table_name,
@@ -224,6 +306,8 @@ class CloudSyncReceiveLogRecorder:
             source_latest_ingest_timestamp=source_latest_ingest_timestamp,
             written_rows=written_rows,
             rows=rows,
+            payload_bytes=payload_bytes,
+            duration_seconds=duration_seconds,
         )
         with self.engine.begin() as conn:
             conn.execute(insert(CloudSyncReceiveLog.__table__).values(**payload))
@@ -243,6 +327,8 @@ class CloudSyncReceiveLogRecorder:
         source_latest_ingest_timestamp: Any | None = None,
         written_rows: int = 0,
         rows: list[dict[str, Any]] | None = None,
+        payload_bytes: int | None = None,
+        duration_seconds: float | None = None,
     ) -> dict[str, Any]:
         payload = self._build_success_payload(
             source_table_name=source_table_name,
@@ -255,6 +341,8 @@ class CloudSyncReceiveLogRecorder:
             source_latest_ingest_timestamp=source_latest_ingest_timestamp,
             written_rows=written_rows,
             rows=rows,
+            payload_bytes=payload_bytes,
+            duration_seconds=duration_seconds,
         )
         conn.execute(insert(CloudSyncReceiveLog.__table__).values(**payload))
         return {"status": "completed", "receive_id": payload["receive_id"], "written_rows": written_rows}
@@ -272,6 +360,8 @@ class CloudSyncReceiveLogRecorder:
         source_latest_ingest_timestamp: Any | None = None,
         written_rows: int = 0,
         rows: list[dict[str, Any]] | None = None,
+        payload_bytes: int | None = None,
+        duration_seconds: float | None = None,
     ) -> dict[str, Any]:
         rows = list(rows or [])
         business_date_min, business_date_max = self._business_date_range(rows)
@@ -290,7 +380,26 @@ class CloudSyncReceiveLogRecorder:
             "source_latest_ingest_timestamp": source_latest_ingest_timestamp,
             "written_rows": written_rows,
             "status": "completed",
+            **self._build_throughput_fields(written_rows, payload_bytes, duration_seconds),
+        }
+
+    @staticmethod
+    def _build_throughput_fields(
+        written_rows: int,
+        payload_bytes: int | None,
+        duration_seconds: float | None,
+    ) -> dict[str, Any]:
+        if duration_seconds is None:
+            return {}
+        duration_seconds = max(float(duration_seconds), 1e-6)
+        fields: dict[str, Any] = {
+            "duration_ms": int(round(duration_seconds * 1000)),
+            "rows_per_second": round(written_rows / duration_seconds, 2),
         }
+        if payload_bytes is not None:
+            fields["payload_bytes"] = int(payload_bytes)
+            fields["bytes_per_second"] = round(payload_bytes / duration_seconds, 2)
+        return fields
 
 
 class CloudRefreshQueueEnqueuer:
@@ -386,6 +495,273 @@ class CloudRefreshQueueEnqueuer:
             }
 
 
+class _TableSyncJob:
+    """One table's checkpointed batch loop, advanced one batch per ``step``.
+
+    ``sync_table`` drives a single job to completion; the concurrent
+    ``sync_all_tables`` mode interleaves steps of several jobs round-robin.
+    """
+
+    def __init__(self, service: "CloudBClassSyncService", table_name: str, batch_size: int, offload_io: bool):
+        self.service = service
+        self.table_name = table_name
+        self.batch_size = batch_size
+        # Offloaded reads/writes run on worker threads so other coroutines keep going.
+        self.offload_io = offload_io
+        self.started = False
+        self.checkpoint = None
+        self.data_domain: str | None = None
+        self.batch_sizer = None
+        self.requested_size = batch_size
+        self.pending_read = None
+        self.total_written_rows = 0
+        self.total_payload_bytes = 0
+        self.total_write_seconds = 0.0
+        self.dry_run_seen = False
+        self.latest_ingest_timestamp = None
+
+    def start(self) -> None:
+        service = self.service
+        validate_b_class_table_name(self.table_name)
+        self.checkpoint = service.checkpoint_service.create_or_get_checkpoint(
+            self.table_name,
+            table_schema=service.checkpoint_scope,
+        )
+        self.data_domain = service._infer_data_domain(self.table_name)
+        service.mirror_manager.ensure_cloud_mirror_table(self.table_name, self.data_domain)
+        # 每张表开始同步时重新反射源列，两次同步之间新增的列不会被缓存成 NULL。
+        invalidate_columns = getattr(service.source_batch_reader, "invalidate_columns", None)
+        if invalidate_columns is not None:
+            invalidate_columns(self.table_name)
+        if service.batch_sizer_factory is not None:
+            self.batch_sizer = service.batch_sizer_factory(self.batch_size)
+        self.requested_size = self._next_batch_size()
+        self.started = True
+
+    def _next_batch_size(self) -> int:
+        return self.batch_sizer.current if self.batch_sizer is not None else self.batch_size
+
+    def _checkpoint_cursor(self) -> SourceBatchCursor:
+        # Snapshot in the event-loop thread; ORM checkpoints must not lazy-load from workers.
+        return SourceBatchCursor(
+            last_ingest_timestamp=self.checkpoint.last_ingest_timestamp,
+            last_source_id=self.checkpoint.last_source_id,
+        )
+
+    async def _read(self, cursor: SourceBatchCursor, batch_size: int) -> list[dict[str, Any]]:
+        reader = self.service.source_batch_reader
+        kwargs = {"table_name": self.table_name, "checkpoint": cursor, "batch_size": batch_size}
+        if self.offload_io:
+            rows = await asyncio.to_thread(reader, **kwargs)
+        else:
+            rows = reader(**kwargs)
+        return list(await self.service._maybe_await(rows))
+
+    async def _write(self, writer, **kwargs) -> dict[str, Any]:
+        if self.offload_io:
+            result = await asyncio.to_thread(writer, **kwargs)
+        else:
+            result = writer(**kwargs)
+        return await self.service._maybe_await(result)
+
+    async def discard_pending_read(self) -> None:
+        pending_read, self.pending_read = self.pending_read, None
+        if pending_read is None:
+            return
+        pending_read.cancel()
+        try:
+            await pending_read
+        except BaseException:  # noqa: BLE001
+            pass
+
+    def _projection_result(self) -> dict[str, Any]:
+        service = self.service
+        if self.total_written_rows <= 0 or self.dry_run_seen:
+            return {"projection_status": "not_required"}
+        if service.projection_enqueuer is None:
+            return {"projection_status": "not_required"}
+        try:
+            enqueue_result = service.projection_enqueuer.enqueue_after_sync(
+                source_table_name=self.table_name,
+                data_domain=self.data_domain,
+                written_rows=self.total_written_rows,
+                checkpoint_scope=service.checkpoint_scope,
+                source_latest_ingest_timestamp=self.latest_ingest_timestamp,
+            )
+        except Exception as exc:  # noqa: BLE001
+            return {
+                "projection_status": "failed",
+                "projection_error": str(exc),
+                "error_code": "projection_runtime_failure",
+            }
+
+        status = enqueue_result.get("status", "not_required")
+        payload = {
+            "projection_status": status,
+            "refresh_queue_job_id": enqueue_result.get("job_id"),
+            "refresh_targets": enqueue_result.get("targets", []),
+        }
+        if status == "not_required":
+            payload["projection_status"] = "not_required"
+        return payload
+
+    def _throughput(self) -> dict[str, Any]:
+        if self.total_write_seconds <= 0:
+            return {}
+        return {
+            "payload_bytes": self.total_payload_bytes,
+            "write_seconds": round(self.total_write_seconds, 3),
+            "rows_per_second": round(self.total_written_rows / self.total_write_seconds, 2),
+            "bytes_per_second": round(self.total_payload_bytes / self.total_write_seconds, 2),
+        }
+
+    async def _completed_result(self) -> dict[str, Any]:
+        await self.discard_pending_read()
+        result = {
+            "status": "completed",
+            "table_name": self.table_name,
+            "written_rows": self.total_written_rows,
+            **self._throughput(),
+            **self._projection_result(),
+        }
+        if self.batch_sizer is not None:
+            result["final_batch_size"] = self.batch_sizer.current
+        return result
+
+    async def step(self) -> dict[str, Any] | None:
+        """Sync one batch. Returns the final table result, or None when more batches remain."""
+        service = self.service
+        table_name = self.table_name
+        data_domain = self.data_domain
+        if self.pending_read is not None:
+            pending_read, self.pending_read = self.pending_read, None
+            rows = await pending_read
+        else:
+            rows = await self._read(self._checkpoint_cursor(), self.requested_size)
+        current_size = self.requested_size
+        payload_rows = [build_sync_payload(row) for row in rows]
+
+        if not rows:
+            return await self._completed_result()
+
+        if service.pipeline_prefetch and len(rows) >= current_size:
+            # The next read only depends on the last source row, not on the
+            # committed checkpoint, so it can overlap with this batch's write.
+            next_cursor = SourceBatchCursor(
+                last_ingest_timestamp=rows[-1]["ingest_timestamp"],
+                last_source_id=rows[-1]["id"],
+            )
+            self.requested_size = self._next_batch_size()
+            self.pending_read = asyncio.ensure_future(self._read(next_cursor, self.requested_size))
+
+        receive_id = f"receive-{uuid.uuid4().hex}"
+        source_file_id = CloudSyncReceiveLogRecorder._first_non_empty(rows, "file_id")
+        for payload_row in payload_rows:
+            raw_payload = payload_row.get("raw_data")
+            if not isinstance(raw_payload, dict):
+                raw_payload = {}
+            raw_payload["_cloud_sync_receive_id"] = receive_id
+            if source_file_id is not None:
+                raw_payload.setdefault("_cloud_sync_source_file_id", source_file_id)
+            payload_row["raw_data"] = raw_payload
+
+        receive_log_context = {
+            "source_table_name": table_name,
+            "receive_id": receive_id,
+            "source_file_id": source_file_id,
+            "data_domain": data_domain,
+            "granularity": (payload_rows[0] or {}).get("granularity") if payload_rows else None,
+            "platform_code": (payload_rows[0] or {}).get("platform_code") if payload_rows else None,
+            "checkpoint_scope": service.checkpoint_scope,
+            "source_latest_ingest_timestamp": rows[-1].get("ingest_timestamp") if rows else None,
+            "written_rows": len(rows),
+            "rows": rows,
+        }
+        write_started_at = time.perf_counter()
+        if (
+            service.receive_log_recorder is not None
+            and hasattr(service.remote_writer, "write_rows_with_receive_log")
+        ):
+            write_result = await self._write(
+                service.remote_writer.write_rows_with_receive_log,
+                table_name=table_name,
+                rows=payload_rows,
+                data_domain=data_domain,
+                receive_log_recorder=service.receive_log_recorder,
+                receive_log_context=receive_log_context,
+            )
+        else:
+            write_result = await self._write(
+                service.remote_writer,
+                table_name=table_name,
+                rows=payload_rows,
+                data_domain=data_domain,
+            )
+        write_seconds = time.perf_counter() - write_started_at
+
+        write_succeeded = bool(write_result.get("success"))
+        if not write_succeeded:
+            await self.discard_pending_read()
+            return {
+                "status": "failed",
+                "table_name": table_name,
+                "written_rows": self.total_written_rows,
+                "error": write_result.get("error") or write_result.get("detail") or "sync_failed",
+                "error_code": write_result.get("error_code") or "sync_failed",
+            }
+
+        self.total_written_rows += int(write_result.get("written_rows", len(rows)))
+        payload_bytes = write_result.get("payload_bytes")
+        self.total_payload_bytes += int(payload_bytes or 0)
+        self.total_write_seconds += write_seconds
+        if self.batch_sizer is not None:
+            self.batch_sizer.observe(rows=len(rows), seconds=write_seconds, full_batch=len(rows) >= current_size)
+        if (
+            service.receive_log_recorder is not None
+            and not bool(write_result.get("dry_run"))
+            and not write_result.get("receive_log")
+        ):
+            await service._maybe_await(
+                service.receive_log_recorder.record_success(
+                    **receive_log_context,
+                    payload_bytes=payload_bytes,
+                    duration_seconds=write_result.get("duration_seconds", write_seconds),
+                )
+            )
+        self.dry_run_seen = self.dry_run_seen or bool(write_result.get("dry_run"))
+        if service._should_advance_checkpoint(write_succeeded, dry_run=bool(write_result.get("dry_run"))):
+            last_row = rows[-1]
+            self.latest_ingest_timestamp = last_row["ingest_timestamp"]
+            service.checkpoint_service.advance_checkpoint(
+                table_name=table_name,
+                ingest_timestamp=last_row["ingest_timestamp"],
+                source_id=last_row["id"],
+                status="completed",
+                table_schema=service.checkpoint_scope,
+            )
+        else:
+            return await self._completed_result()
+
+        if len(rows) < current_size:
+            return await self._completed_result()
+        if self.pending_read is None:
+            self.requested_size = self._next_batch_size()
+        return None
+
+    async def fail(self, exc: Exception) -> dict[str, Any]:
+        await self.discard_pending_read()
+        self.service.checkpoint_service.mark_failure(
+            self.table_name,
+            str(exc),
+            table_schema=self.service.checkpoint_scope,
+        )
+        return {
+            "status": "failed",
+            "table_name": self.table_name,
+            "error": str(exc),
+        }
+
+
 class CloudBClassSyncService:
     """Checkpointed local-to-cloud B-class sync orchestration."""
 
@@ -404,6 +780,9 @@ class CloudBClassSyncService:
         checkpoint_scope: str = "b_class",
         projection_enqueuer=None,
         receive_log_recorder=None,
+        pipeline_prefetch: bool = False,
+        batch_sizer_factory=None,
+        table_concurrency: int = 1,
     ) -> None:
         self.checkpoint_service = checkpoint_service
         self.mirror_manager = mirror_manager
@@ -418,6 +797,10 @@ class CloudBClassSyncService:
         self.checkpoint_scope = checkpoint_scope
         self.projection_enqueuer = projection_enqueuer
         self.receive_log_recorder = receive_log_recorder
+        # Pipelined mode reads batch N+1 on a worker thread while batch N is written.
+        self.pipeline_prefetch = pipeline_prefetch
+        self.batch_sizer_factory = batch_sizer_factory
+        self.table_concurrency = max(1, int(table_concurrency or 1))
         if self.projection_enqueuer is None and cloud_engine is not None:
             self.projection_enqueuer = CloudRefreshQueueEnqueuer(cloud_engine)
         if self.receive_log_recorder is None and cloud_engine is not None:
@@ -466,7 +849,73 @@ class CloudBClassSyncService:
             return await value
         return value
 
-    async def sync_all_tables(self, batch_size: int = 1000) -> dict[str, Any]:
+    async def _sync_tables_sequentially(self, tables: list[str], batch_size: int) -> list[dict[str, Any]]:
+        results = []
+        for table_name in tables:
+            if self.sync_table_handler is not None:
+                result = await self._maybe_await(
+                    self.sync_table_handler(table_name, batch_size=batch_size)
+                )
+            else:
+                result = await self.sync_table(table_name, batch_size=batch_size)
+            results.append(result)
+        return results
+
+    async def _sync_tables_round_robin(
+        self,
+        tables: list[str],
+        batch_size: int,
+        max_concurrency: int,
+    ) -> list[dict[str, Any]]:
+        """Sync tables with a bounded worker pool, one batch per turn.
+
+        A job that still has rows goes to the back of the queue after each batch,
+        so small tables finish early instead of waiting behind a large backfill.
+        """
+        if self.sync_table_handler is not None:
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def run_handler(table_name: str) -> dict[str, Any]:
+                async with semaphore:
+                    return await self._maybe_await(
+                        self.sync_table_handler(table_name, batch_size=batch_size)
+                    )
+
+            return list(await asyncio.gather(*(run_handler(table_name) for table_name in tables)))
+
+        results: dict[str, dict[str, Any]] = {}
+        queue: asyncio.Queue = asyncio.Queue()
+        for table_name in tables:
+            queue.put_nowait(_TableSyncJob(self, table_name, batch_size, offload_io=True))
+        worker_count = min(max_concurrency, len(tables))
+        remaining = len(tables)
+
+        async def worker() -> None:
+            nonlocal remaining
+            while True:
+                job = await queue.get()
+                if job is None:
+                    return
+                try:
+                    if not job.started:
+                        job.start()
+                    result = await job.step()
+                except Exception as exc:
+                    result = await job.fail(exc)
+                if result is None:
+                    queue.put_nowait(job)
+                    continue
+                results[job.table_name] = result
+                remaining -= 1
+                if remaining == 0:
+                    for _ in range(worker_count):
+                        queue.put_nowait(None)
+
+        if worker_count:
+            await asyncio.gather(*(worker() for _ in range(worker_count)))
+        return [results[table_name] for table_name in tables]
+
+    async def sync_all_tables(self, batch_size: int = 1000, max_concurrency: int | None = None) -> dict[str, Any]:
         if self.table_inspector is None:
             return {
                 "status": "completed",
@@ -482,21 +931,13 @@ class CloudBClassSyncService:
         if self.run_recorder is not None:
             run_id = self.run_recorder.create_run(total_tables=len(tables))
 
-        results = []
-        succeeded = 0
-        failed = 0
-        for table_name in tables:
-            if self.sync_table_handler is not None:
-                result = await self._maybe_await(
-                    self.sync_table_handler(table_name, batch_size=batch_size)
-                )
-            else:
-                result = await self.sync_table(table_name, batch_size=batch_size)
-            results.append(result)
-            if result["status"] == "completed":
-                succeeded += 1
-            else:
-                failed += 1
+        concurrency = max(1, int(max_concurrency or self.table_concurrency))
+        if concurrency > 1:
+            results = await self._sync_tables_round_robin(tables, batch_size, concurrency)
+        else:
+            results = await self._sync_tables_sequentially(tables, batch_size)
+        succeeded = sum(1 for result in results if result["status"] == "completed")
+        failed = len(results) - succeeded
 
         summary = {
             "status": "completed" if failed == 0 else "partial_success",
@@ -525,168 +966,15 @@ class CloudBClassSyncService:
         return self._filter_b_class_tables(inspected)
 
     async def sync_table(self, table_name: str, batch_size: int = 1000) -> dict[str, Any]:
+        job = _TableSyncJob(self, table_name, batch_size, offload_io=self.pipeline_prefetch)
         try:
-            validate_b_class_table_name(table_name)
-            checkpoint = self.checkpoint_service.create_or_get_checkpoint(
-                table_name,
-                table_schema=self.checkpoint_scope,
-            )
-            data_domain = self._infer_data_domain(table_name)
-            self.mirror_manager.ensure_cloud_mirror_table(table_name, data_domain)
-            total_written_rows = 0
-            dry_run_seen = False
-            latest_ingest_timestamp = None
-
-            def _projection_result() -> dict[str, Any]:
-                if total_written_rows <= 0 or dry_run_seen:
-                    return {"projection_status": "not_required"}
-                if self.projection_enqueuer is None:
-                    return {"projection_status": "not_required"}
-                try:
-                    enqueue_result = self.projection_enqueuer.enqueue_after_sync(
-                        source_table_name=table_name,
-                        data_domain=data_domain,
-                        written_rows=total_written_rows,
-                        checkpoint_scope=self.checkpoint_scope,
-                        source_latest_ingest_timestamp=latest_ingest_timestamp,
-                    )
-                except Exception as exc:  # noqa: BLE001
-                    return {
-                        "projection_status": "failed",
-                        "projection_error": str(exc),
-                        "error_code": "projection_runtime_failure",
-                    }
-
-                status = enqueue_result.get("status", "not_required")
-                payload = {
-                    "projection_status": status,
-                    "refresh_queue_job_id": enqueue_result.get("job_id"),
-                    "refresh_targets": enqueue_result.get("targets", []),
-                }
-                if status == "not_required":
-                    payload["projection_status"] = "not_required"
-                return payload
-
+            job.start()
             while True:
-                rows = await self._maybe_await(
-                    self.source_batch_reader(
-                        table_name=table_name,
-                        checkpoint=checkpoint,
-                        batch_size=batch_size,
-                    )
-                )
-                rows = list(rows)
-                payload_rows = [build_sync_payload(row) for row in rows]
-
-                if not rows:
-                    return {
-                        "status": "completed",
-                        "table_name": table_name,
-                        "written_rows": total_written_rows,
-                        **_projection_result(),
-                    }
-
-                receive_id = f"receive-{uuid.uuid4().hex}"
-                source_file_id = CloudSyncReceiveLogRecorder._first_non_empty(rows, "file_id")
-                for payload_row in payload_rows:
-                    raw_payload = payload_row.get("raw_data")
-                    if not isinstance(raw_payload, dict):
-                        raw_payload = {}
-                    raw_payload["_cloud_sync_receive_id"] = receive_id
-                    if source_file_id is not None:
-                        raw_payload.setdefault("_cloud_sync_source_file_id", source_file_id)
-                    payload_row["raw_data"] = raw_payload
-
-                receive_log_context = {
-                    "source_table_name": table_name,
-                    "receive_id": receive_id,
-                    "source_file_id": source_file_id,
-                    "data_domain": data_domain,
-                    "granularity": (payload_rows[0] or {}).get("granularity") if payload_rows else None,
-                    "platform_code": (payload_rows[0] or {}).get("platform_code") if payload_rows else None,
-                    "checkpoint_scope": self.checkpoint_scope,
-                    "source_latest_ingest_timestamp": rows[-1].get("ingest_timestamp") if rows else None,
-                    "written_rows": len(rows),
-                    "rows": rows,
-                }
-                if (
-                    self.receive_log_recorder is not None
-                    and hasattr(self.remote_writer, "write_rows_with_receive_log")
-                ):
-                    write_result = await self._maybe_await(
-                        self.remote_writer.write_rows_with_receive_log(
-                            table_name=table_name,
-                            rows=payload_rows,
-                            data_domain=data_domain,
-                            receive_log_recorder=self.receive_log_recorder,
-                            receive_log_context=receive_log_context,
-                        )
-                    )
-                else:
-                    write_result = await self._maybe_await(
-                        self.remote_writer(
-                            table_name=table_name,
-                            rows=payload_rows,
-                            data_domain=data_domain,
-                        )
-                    )
-
-                write_succeeded = bool(write_result.get("success"))
-                if not write_succeeded:
-                    return {
-                        "status": "failed",
-                        "table_name": table_name,
-                        "written_rows": total_written_rows,
-                        "error": write_result.get("error") or write_result.get("detail") or "sync_failed",
-                        "error_code": write_result.get("error_code") or "sync_failed",
-                    }
-
-                total_written_rows += int(write_result.get("written_rows", len(rows)))
-                if (
-                    self.receive_log_recorder is not None
-                    and not bool(write_result.get("dry_run"))
-                    and not write_result.get("receive_log")
-                ):
-                    await self._maybe_await(
-                        self.receive_log_recorder.record_success(**receive_log_context)
-                    )
-                dry_run_seen = dry_run_seen or bool(write_result.get("dry_run"))
-                if self._should_advance_checkpoint(write_succeeded, dry_run=bool(write_result.get("dry_run"))):
-                    last_row = rows[-1]
-                    latest_ingest_timestamp = last_row["ingest_timestamp"]
-                    self.checkpoint_service.advance_checkpoint(
-                        table_name=table_name,
-                        ingest_timestamp=last_row["ingest_timestamp"],
-                        source_id=last_row["id"],
-                        status="completed",
-                        table_schema=self.checkpoint_scope,
-                    )
-                else:
-                    return {
-                        "status": "completed",
-                        "table_name": table_name,
-                        "written_rows": total_written_rows,
-                        **_projection_result(),
-                    }
-
-                if len(rows) < batch_size:
-                    return {
-                        "status": "completed",
-                        "table_name": table_name,
-                        "written_rows": total_written_rows,
-                        **_projection_result(),
-                    }
+                result = await job.step()
+                if result is not None:
+                    return result
         except Exception as exc:
-            self.checkpoint_service.mark_failure(
-                table_name,
-                str(exc),
-                table_schema=self.checkpoint_scope,
-            )
-            return {
-                "status": "failed",
-                "table_name": table_name,
-                "error": str(exc),
-            }
+            return await job.fail(exc)
 
     def close(self) -> None:
         db = getattr(self.checkpoint_service, "db", None)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+import uuid
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import text
+
+from backend.services.cloud_b_class_mirror_manager import (
+    build_canonical_columns,
+    get_conflict_key_columns,
+)
+from backend.services.cloud_b_class_sync_service import SQLAlchemyCloudWriter
+from backend.services.cloud_b_class_sync_utils import quote_ident, validate_b_class_table_name
+
+
+TRANSPORT_UPSERT = "upsert"
+TRANSPORT_COPY = "copy"
+SUPPORTED_TRANSPORTS = (TRANSPORT_UPSERT, TRANSPORT_COPY)
+
+STAGE_SEQUENCE_COLUMN = "_stage_seq"
+
+
+def normalize_transport(value: str | None) -> str:
+    transport = str(value or TRANSPORT_UPSERT).strip().lower()
+    if transport not in SUPPORTED_TRANSPORTS:
+        raise ValueError(f"Unsupported cloud sync transport: {value}")
+    return transport
+
+
+def encode_copy_value(value: Any) -> str:
+    """Encode one value for PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        rendered = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, (datetime, date)):
+        rendered = value.isoformat()
+    else:
+        rendered = str(value)
+    return (
+        rendered.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _ByteCounter:
+    def __init__(self) -> None:
+        self.total = 0
+
+    def track(self, lines: Iterator[str]) -> Iterator[str]:
+        for line in lines:
+            self.total += len(line.encode("utf-8"))
+            yield line
+
+
+def iter_copy_lines(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Yield COPY text lines for canonical rows plus a staging sequence number."""
+    columns = build_canonical_columns()
+    for sequence, row in enumerate(rows):
+        values = [encode_copy_value(row.get(column)) for column in columns]
+        values.append(str(sequence))
+        yield "\t".join(values) + "\n"
+
+
+class CopyLineStream:
+    """File-like adapter so psycopg2 ``copy_expert`` pulls lines lazily."""
+
+    def __init__(self, lines: Iterator[str]) -> None:
+        self._lines = lines
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size is None or size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        if size is None or size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size: int = -1) -> str:
+        if self._buffer:
+            chunk, self._buffer = self._buffer, ""
+            return chunk
+        return next(self._lines, "")
+
+
+class SQLAlchemyCloudCopyWriter(SQLAlchemyCloudWriter):
+    """Stream canonical rows through COPY into a staging table, then merge once."""
+
+    @staticmethod
+    def _build_stage_table_sql(table_name: str, stage_name: str) -> str:
+        validate_b_class_table_name(table_name)
+        column_list = ", ".join(build_canonical_columns())
+        return (
+            f"CREATE TEMP TABLE {quote_ident(stage_name)} ON COMMIT DROP AS "
+            f"SELECT {column_list}, 0::BIGINT AS {STAGE_SEQUENCE_COLUMN} "
+            f'FROM {SQLAlchemyCloudWriter.TARGET_SCHEMA}."{table_name}" WITH NO DATA'
+        )
+
+    @staticmethod
+    def _build_copy_sql(stage_name: str) -> str:
+        column_list = ", ".join((*build_canonical_columns(), STAGE_SEQUENCE_COLUMN))
+        return f"COPY {quote_ident(stage_name)} ({column_list}) FROM STDIN"
+
+    @staticmethod
+    def _build_merge_sql(table_name: str, stage_name: str, data_domain: str) -> str:
+        column_list = ", ".join(build_canonical_columns())
+        conflict_columns = ", ".join(get_conflict_key_columns(data_domain))
+        # ON CONFLICT cannot touch the same target row twice in one statement, so
+        # keep only the last staged copy of each conflict key.
+        return (
+            f'INSERT INTO {SQLAlchemyCloudWriter.TARGET_SCHEMA}."{table_name}" ({column_list}) '
+            f"SELECT DISTINCT ON ({conflict_columns}) {column_list} "
+            f"FROM {quote_ident(stage_name)} "
+            f"ORDER BY {conflict_columns}, {STAGE_SEQUENCE_COLUMN} DESC "
+            f"{SQLAlchemyCloudWriter._build_conflict_clause(data_domain)}"
+        )
+
+    @staticmethod
+    def _copy_rows(cursor, copy_sql: str, rows: Iterable[dict[str, Any]]) -> int:
+        counter = _ByteCounter()
+        lines = counter.track(iter_copy_lines(rows))
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(copy_sql, CopyLineStream(lines))
+            return counter.total
+        if hasattr(cursor, "copy"):
+            with cursor.copy(copy_sql) as copy:
+                for line in lines:
+                    copy.write(line)
+            return counter.total
+        raise RuntimeError("COPY transport requires a psycopg or psycopg2 connection")
+
+    def _write_rows(self, conn, table_name: str, rows: list[dict[str, Any]], data_domain: str) -> int:
+        stage_name = f"_cloud_sync_stage_{uuid.uuid4().hex[:12]}"
+        conn.execute(text(self._build_stage_table_sql(table_name, stage_name)))
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            payload_bytes = self._copy_rows(cursor, self._build_copy_sql(stage_name), rows)
+        finally:
+            cursor.close()
+        conn.execute(text(self._build_merge_sql(table_name, stage_name, data_domain)))
+        return payload_bytes
+
+
+class AdaptiveBatchSizer:
+    """Grow or shrink the sync batch so each cloud write lands near a target latency."""
+
+    def __init__(
+        self,
+        initial_size: int,
+        *,
+        min_size: int = 100,
+        max_size: int = 20000,
+        target_seconds: float = 2.0,
+    ) -> None:
+        self.min_size = max(1, int(min_size))
+        self.max_size = max(self.min_size, int(max_size))
+        self.target_seconds = max(0.01, float(target_seconds))
+        self.current = min(max(int(initial_size), self.min_size), self.max_size)
+
+    def observe(self, *, rows: int, seconds: float, full_batch: bool = True) -> int:
+        if rows <= 0:
+            return self.current
+        seconds = max(float(seconds), 1e-6)
+        desired = int(rows / seconds * self.target_seconds)
+        if not full_batch:
+            # A short tail batch says nothing about how far we could grow.
+            desired = min(desired, self.current)
+        # Move at most one doubling/halving step per batch to damp WAN jitter.
+        desired = min(max(desired, self.current // 2), self.current * 2)
+        self.current = min(max(desired, self.min_size), self.max_size)
+        return self.current
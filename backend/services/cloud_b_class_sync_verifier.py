@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import text
+
+from backend.services.cloud_b_class_sync_service import (
+    CloudBClassSyncService,
+    SourceBatchCursor,
+    SQLAlchemyBClassSourceReader,
+    build_sync_payload,
+)
+from backend.services.cloud_b_class_sync_utils import quote_ident, validate_b_class_table_name
+
+
+# Merkle levels, coarse to fine. Each level refines the previous one by one key.
+BUCKET_KEYS: tuple[str, ...] = ("platform_code", "shop_id", "metric_date")
+
+BUCKET_KEY_SQL: dict[str, str] = {
+    "platform_code": "COALESCE(platform_code, '')",
+    "shop_id": "COALESCE(shop_id, '')",
+    "metric_date": "COALESCE(CAST(metric_date AS TEXT), '')",
+}
+
+# Order-independent bucket digest: sum of 60-bit prefixes of md5(data_hash).
+# SUM(bigint) widens to numeric in PostgreSQL, so large buckets cannot overflow.
+BUCKET_HASH_SQL = "COALESCE(SUM(('x' || substr(md5(data_hash), 1, 15))::bit(60)::bigint), 0)"
+
+BucketKey = tuple[str, ...]
+BucketDigest = tuple[int, str]
+
+
+class SQLAlchemyBucketHashReader:
+    """Compute bucket digests for one side of the sync inside its own database."""
+
+    def __init__(self, engine, schema_name: str = "b_class", upper_bound: SourceBatchCursor | None = None):
+        self.engine = engine
+        self.schema_name = schema_name
+        # Local side only: ignore rows past the sync checkpoint, they are not expected remotely yet.
+        self.upper_bound = upper_bound
+
+    def _build_bucket_hash_sql(self, table_name: str, level: int, prefix: BucketKey) -> tuple[str, dict[str, Any]]:
+        validate_b_class_table_name(table_name)
+        group_keys = BUCKET_KEYS[: level + 1]
+        select_keys = ", ".join(f"{BUCKET_KEY_SQL[key]} AS {key}" for key in group_keys)
+        conditions = []
+        params: dict[str, Any] = {}
+        for index, value in enumerate(prefix):
+            conditions.append(f"{BUCKET_KEY_SQL[BUCKET_KEYS[index]]} = :prefix_{index}")
+            params[f"prefix_{index}"] = value
+        if self.upper_bound is not None and self.upper_bound.last_ingest_timestamp is not None:
+            conditions.append(
+                "(ingest_timestamp < :upper_ingest_timestamp "
+                "OR (ingest_timestamp = :upper_ingest_timestamp AND id <= :upper_source_id))"
+            )
+            params["upper_ingest_timestamp"] = self.upper_bound.last_ingest_timestamp
+            params["upper_source_id"] = self.upper_bound.last_source_id or 0
+        where_clause = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        group_by = ", ".join(BUCKET_KEY_SQL[key] for key in group_keys)
+        sql = (
+            f"SELECT {select_keys}, COUNT(*) AS row_count, {BUCKET_HASH_SQL} AS hash_sum "
+            f"FROM {quote_ident(self.schema_name)}.{quote_ident(table_name)} "
+            f"{where_clause}"
+            f"GROUP BY {group_by}"
+        )
+        return sql, params
+
+    def fetch_bucket_hashes(self, table_name: str, level: int, prefix: BucketKey) -> dict[BucketKey, BucketDigest]:
+        sql, params = self._build_bucket_hash_sql(table_name, level, prefix)
+        group_keys = BUCKET_KEYS[: level + 1]
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(sql), params).mappings().all()
+        return {
+            tuple(str(row[key]) for key in group_keys): (int(row["row_count"]), str(row["hash_sum"]))
+            for row in rows
+        }
+
+
+class CloudBClassMerkleVerifier:
+    """Compare local and cloud B-class tables top-down by bucket digests.
+
+    Only digests of buckets whose parent differs are requested, so an in-sync
+    table costs one digest per platform and a divergent one only descends into
+    the shops and dates that actually differ.
+    """
+
+    def __init__(self, local_reader, cloud_reader) -> None:
+        self.local_reader = local_reader
+        self.cloud_reader = cloud_reader
+
+    def verify_table(self, table_name: str) -> dict[str, Any]:
+        validate_b_class_table_name(table_name)
+        hash_requests = 0
+        buckets_compared = 0
+        prefixes: list[BucketKey] = [()]
+        diverged: list[dict[str, Any]] = []
+
+        for level in range(len(BUCKET_KEYS)):
+            next_prefixes: list[BucketKey] = []
+            for prefix in prefixes:
+                local_hashes = self.local_reader.fetch_bucket_hashes(table_name, level, prefix)
+                cloud_hashes = self.cloud_reader.fetch_bucket_hashes(table_name, level, prefix)
+                hash_requests += 2
+                for key in sorted(set(local_hashes) | set(cloud_hashes)):
+                    buckets_compared += 1
+                    local_digest = local_hashes.get(key)
+                    cloud_digest = cloud_hashes.get(key)
+                    if local_digest == cloud_digest:
+                        continue
+                    if level + 1 < len(BUCKET_KEYS):
+                        next_prefixes.append(key)
+                        continue
+                    diverged.append(
+                        {
+                            **dict(zip(BUCKET_KEYS, key)),
+                            "local_rows": local_digest[0] if local_digest else 0,
+                            "cloud_rows": cloud_digest[0] if cloud_digest else 0,
+                        }
+                    )
+            prefixes = next_prefixes
+            if not prefixes:
+                break
+
+        return {
+            "table_name": table_name,
+            "status": "in_sync" if not diverged else "diverged",
+            "diverged_buckets": diverged,
+            "hash_requests": hash_requests,
+            "buckets_compared": buckets_compared,
+        }
+
+
+class CloudBClassBucketRepairer:
+    """Re-sync individual divergent buckets from the local table to the cloud mirror."""
+
+    def __init__(self, local_engine, cloud_engine, remote_writer, batch_size: int = 1000) -> None:
+        self.local_engine = local_engine
+        self.cloud_engine = cloud_engine
+        self.remote_writer = remote_writer
+        self.batch_size = batch_size
+        self.source_reader = SQLAlchemyBClassSourceReader(local_engine)
+
+    @staticmethod
+    def _bucket_where(bucket: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+        conditions = []
+        params: dict[str, Any] = {}
+        for key in BUCKET_KEYS:
+            conditions.append(f"{BUCKET_KEY_SQL[key]} = :bucket_{key}")
+            params[f"bucket_{key}"] = str(bucket.get(key) or "")
+        return " AND ".join(conditions), params
+
+    def _read_bucket_rows(self, table_name: str, bucket: dict[str, Any]) -> list[dict[str, Any]]:
+        bucket_where, bucket_params = self._bucket_where(bucket)
+        available_columns = self.source_reader.get_available_columns(table_name)
+        cursor: SourceBatchCursor | None = None
+        rows: list[dict[str, Any]] = []
+        while True:
+            where_sql, params = CloudBClassSyncService._build_checkpoint_where_clause(cursor)
+            combined_where = f"{bucket_where} AND {where_sql}" if where_sql else bucket_where
+            sql = self.source_reader._build_select_sql(table_name, combined_where, available_columns=available_columns)
+            with self.local_engine.connect() as conn:
+                batch = [
+                    dict(row)
+                    for row in conn.execute(
+                        text(sql),
+                        {**bucket_params, **params, "batch_size": self.batch_size},
+                    ).mappings().all()
+                ]
+            rows.extend(batch)
+            if len(batch) < self.batch_size:
+                return rows
+            cursor = SourceBatchCursor(
+                last_ingest_timestamp=batch[-1]["ingest_timestamp"],
+                last_source_id=batch[-1]["id"],
+            )
+
+    def _delete_extraneous_rows(
+        self,
+        table_name: str,
+        bucket: dict[str, Any],
+        keep_hashes: Sequence[str],
+    ) -> int:
+        bucket_where, params = self._bucket_where(bucket)
+        sql = f"DELETE FROM b_class.{quote_ident(table_name)} WHERE {bucket_where}"
+        if keep_hashes:
+            sql += " AND NOT (data_hash = ANY(:keep_hashes))"
+            params["keep_hashes"] = list(keep_hashes)
+        with self.cloud_engine.begin() as conn:
+            return int(conn.execute(text(sql), params).rowcount or 0)
+
+    def repair_bucket(
+        self,
+        table_name: str,
+        bucket: dict[str, Any],
+        *,
+        delete_extraneous: bool = False,
+    ) -> dict[str, Any]:
+        data_domain = CloudBClassSyncService._infer_data_domain(table_name)
+        rows = self._read_bucket_rows(table_name, bucket)
+        written_rows = 0
+        for start in range(0, len(rows), self.batch_size):
+            payload_rows = [build_sync_payload(row) for row in rows[start:start + self.batch_size]]
+            result = self.remote_writer(table_name=table_name, rows=payload_rows, data_domain=data_domain)
+            if not result.get("success"):
+                return {
+                    "status": "failed",
+                    "bucket": bucket,
+                    "written_rows": written_rows,
+                    "error": result.get("error") or "sync_failed",
+                }
+            written_rows += int(result.get("written_rows", len(payload_rows)))
+        deleted_rows = 0
+        if delete_extraneous:
+            deleted_rows = self._delete_extraneous_rows(
+                table_name,
+                bucket,
+                [row["data_hash"] for row in rows if row.get("data_hash")],
+            )
+        return {
+            "status": "completed",
+            "bucket": bucket,
+            "written_rows": written_rows,
+            "deleted_rows": deleted_rows,
+        }
@@ -804,6 +804,8 @@ class CloudSyncAdminQueryService:
         return CloudSyncReceiveLogState(
             last_receive_at=_iso(getattr(receive_row, "created_at", None)),
             last_written_rows=getattr(receive_row, "written_rows", None),
+            last_rows_per_second=getattr(receive_row, "rows_per_second", None),
+            last_bytes_per_second=getattr(receive_row, "bytes_per_second", None),
             latest_business_date=str(getattr(receive_row, "business_date_max", None) or "") or None,
             status=getattr(receive_row, "status", None),
         )
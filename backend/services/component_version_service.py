@@ -14,7 +14,7 @@ from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_, or_
 
-from modules.core.db import ComponentVersion
+from modules.core.db import ComponentSelectorStat, ComponentVersion
 from modules.core.logger import get_logger
 from backend.services.active_collection_components import (
     is_active_component_name,
@@ -454,3 +454,82 @@ class ComponentVersionService:
             }
             for v in versions
         ]
+    
+    def record_selector_wins(
+        self,
+        platform: str,
+        component_name: str,
+        version: str,
+        wins: Dict[str, Dict[str, int]],
+    ) -> None:
+        """
+        累加步骤选择器胜出次数(与 record_usage 并列的使用统计)
+        
+        Args:
+            platform: 平台代码
+            component_name: 组件名称
+            version: 版本号(无版本时为空串)
+            wins: {step_key: {selector_key: 本次运行胜出次数}}
+        """
+        if not wins:
+            return
+        
+        existing = {
+            (row.step_key, row.selector_key): row
+            for row in self.db.execute(
+                select(ComponentSelectorStat).where(
+                    and_(
+                        ComponentSelectorStat.platform == platform,
+                        ComponentSelectorStat.component_name == component_name,
+                        ComponentSelectorStat.version == version,
+                        ComponentSelectorStat.step_key.in_(list(wins)),
+                    )
+                )
+            ).scalars().all()
+        }
+        
+        now = datetime.now(timezone.utc)
+        for step_key, selector_wins in wins.items():
+            for selector_key, count in selector_wins.items():
+                row = existing.get((step_key, selector_key))
+                if row is None:
+                    row = ComponentSelectorStat(
+                        platform=platform,
+                        component_name=component_name,
+                        version=version,
+                        step_key=step_key,
+                        selector_key=selector_key,
+                        win_count=0,
+                    )
+                    self.db.add(row)
+                row.win_count = (row.win_count or 0) + int(count)
+                row.last_won_at = now
+        
+        self.db.commit()
+    
+    def get_selector_win_counts(
+        self,
+        platform: str,
+        component_name: str,
+        version: str,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        获取组件各步骤选择器的历史胜出次数
+        
+        Returns:
+            {step_key: {selector_key: win_count}}
+        """
+        rows = self.db.execute(
+            select(ComponentSelectorStat).where(
+                and_(
+                    ComponentSelectorStat.platform == platform,
+                    ComponentSelectorStat.component_name == component_name,
+                    ComponentSelectorStat.version == version,
+                )
+            )
+        ).scalars().all()
+        
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row.step_key, {})[row.selector_key] = int(row.win_count or 0)
+        return counts
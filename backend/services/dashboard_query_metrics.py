@@ -0,0 +1,188 @@
+"""In-process latency histograms for dashboard endpoints, SQL modules and reducers.
+
+Everything is kept in plain dictionaries guarded by one lock and rendered in
+Prometheus text format by ``/metrics``; labels are bounded by route templates,
+SQL source relations and service method names.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterable, Sequence
+
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_COUNT_BUCKETS: tuple[float, ...] = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+_SQL_SOURCE_PATTERN = re.compile(r"\bFROM\s+([A-Za-z_][\w]*\.[A-Za-z_][\w]*)", re.IGNORECASE)
+
+LabelSet = tuple[tuple[str, str], ...]
+
+
+def sql_module_label(query: str) -> str:
+    """Label a dashboard SQL statement by the first schema-qualified relation it reads."""
+    match = _SQL_SOURCE_PATTERN.search(query or "")
+    return match.group(1).lower() if match else "unknown"
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _render_labels(labels: LabelSet, extra: Iterable[tuple[str, str]] = ()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    rendered = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs)
+    return "{" + rendered + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return f"{bound:g}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def render(self, name: str, labels: LabelSet) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_render_labels(labels, [('le', _format_bound(bound))])} {cumulative}")
+        lines.append(f"{name}_bucket{_render_labels(labels, [('le', '+Inf')])} {self.count}")
+        lines.append(f"{name}_sum{_render_labels(labels)} {self.total}")
+        lines.append(f"{name}_count{_render_labels(labels)} {self.count}")
+        return lines
+
+
+class DashboardQueryMetrics:
+    """Collect dashboard latency, row-count and cache-outcome samples for Prometheus."""
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = LATENCY_BUCKETS,
+        row_buckets: Sequence[float] = ROW_COUNT_BUCKETS,
+    ) -> None:
+        self.latency_buckets = tuple(latency_buckets)
+        self.row_buckets = tuple(row_buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._request_latency: dict[LabelSet, _Histogram] = {}
+            self._query_latency: dict[LabelSet, _Histogram] = {}
+            self._query_rows: dict[LabelSet, _Histogram] = {}
+            self._query_errors: dict[LabelSet, int] = {}
+            self._module_latency: dict[LabelSet, _Histogram] = {}
+            self._cache_lookups: dict[LabelSet, int] = {}
+
+    def _observe(self, series: dict[LabelSet, _Histogram], labels: LabelSet, value: float, buckets) -> None:
+        with self._lock:
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = _Histogram(buckets)
+                series[labels] = histogram
+            histogram.observe(value)
+
+    def _increment(self, series: dict[LabelSet, int], labels: LabelSet) -> None:
+        with self._lock:
+            series[labels] = series.get(labels, 0) + 1
+
+    def observe_request(self, endpoint: str, method: str, status_code: int, seconds: float) -> None:
+        labels = (("endpoint", endpoint), ("method", method), ("status", f"{int(status_code) // 100}xx"))
+        self._observe(self._request_latency, labels, max(seconds, 0.0), self.latency_buckets)
+
+    def observe_query(self, module: str, seconds: float, rows: int, *, failed: bool = False) -> None:
+        labels = (("module", module),)
+        self._observe(self._query_latency, labels, max(seconds, 0.0), self.latency_buckets)
+        if failed:
+            self._increment(self._query_errors, labels)
+            return
+        self._observe(self._query_rows, labels, max(rows, 0), self.row_buckets)
+
+    def observe_module(self, module: str, total_seconds: float, db_seconds: float) -> None:
+        """Split one service call into database time and Python reduce time."""
+        db_seconds = min(max(db_seconds, 0.0), max(total_seconds, 0.0))
+        for phase, value in (("db", db_seconds), ("reduce", max(total_seconds - db_seconds, 0.0))):
+            self._observe(
+                self._module_latency,
+                (("module", module), ("phase", phase)),
+                value,
+                self.latency_buckets,
+            )
+
+    def observe_cache(self, cache_type: str, status: str) -> None:
+        self._increment(self._cache_lookups, (("cache_type", cache_type), ("status", str(status).lower())))
+
+    def render_prometheus(self) -> list[str]:
+        with self._lock:
+            histograms = [
+                (
+                    "xihong_dashboard_request_duration_seconds",
+                    "Dashboard API request latency by route template.",
+                    dict(self._request_latency),
+                ),
+                (
+                    "xihong_dashboard_query_duration_seconds",
+                    "Dashboard SQL latency by source relation.",
+                    dict(self._query_latency),
+                ),
+                (
+                    "xihong_dashboard_query_rows",
+                    "Rows returned per dashboard SQL statement by source relation.",
+                    dict(self._query_rows),
+                ),
+                (
+                    "xihong_dashboard_module_duration_seconds",
+                    "Dashboard service module time split into db and reduce phases.",
+                    dict(self._module_latency),
+                ),
+            ]
+            counters = [
+                (
+                    "xihong_dashboard_query_errors_total",
+                    "Failed dashboard SQL statements by source relation.",
+                    dict(self._query_errors),
+                ),
+                (
+                    "xihong_dashboard_cache_lookups_total",
+                    "Dashboard cache outcomes (hit/miss/bypass) by cache type.",
+                    dict(self._cache_lookups),
+                ),
+            ]
+            lines: list[str] = []
+            for name, help_text, series in histograms:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels in sorted(series):
+                    lines.extend(series[labels].render(name, labels))
+            for name, help_text, series in counters:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for labels in sorted(series):
+                    lines.append(f"{name}{_render_labels(labels)} {series[labels]}")
+            return lines
+
+
+_metrics: DashboardQueryMetrics | None = None
+
+
+def get_dashboard_query_metrics() -> DashboardQueryMetrics:
+    global _metrics
+    if _metrics is None:
+        _metrics = DashboardQueryMetrics()
+    return _metrics
@@ -19,9 +19,10 @@ from backend.models.database import (
     CatalogFile,
 )
 from modules.core.db import BridgeProductKeys  # [*] v4.12.0新增:用于关联product_id
-from modules.core.logger import get_logger  # [*] v4.6.1新增:导入logger
+from modules.core.logger import get_logger, get_sampled_logger  # [*] v4.6.1新增:导入logger
 
 logger = get_logger(__name__)
+row_logger = get_sampled_logger(__name__)
 
 
 # ========================= Attributes治理策略 =========================
@@ -825,7 +826,7 @@ def upsert_orders_v2(db: Session, rows: List[Dict[str, Any]], file_record: Optio
                     core["shipping_fee"] = 0.0
                 if core.get("tax_amount") is None:
                     core["tax_amount"] = 0.0
-                logger.debug(f"[UpsertOrders] 已取消订单处理: order_id={core.get('order_id')}, 使用默认值填充缺失字段")
+                row_logger.debug("[UpsertOrders] 已取消订单处理: order_id=%s, 使用默认值填充缺失字段", core.get("order_id"))
         
         # [*] v4.12.1修复:确保file_id字段被设置(用于数据血缘追踪)
         if not core.get("file_id") and file_record:
@@ -849,7 +850,7 @@ def upsert_orders_v2(db: Session, rows: List[Dict[str, Any]], file_record: Optio
             
             if aligned_account_id:
                 core["aligned_account_id"] = aligned_account_id
-                logger.debug(f"[UpsertOrders] 自动对齐账号: '{account}' -> '{aligned_account_id}'")
+                row_logger.debug("[UpsertOrders] 自动对齐账号: '%s' -> '%s'", account, aligned_account_id)
 
         # [TODO] v4.19.0: 订单数据导入需要改为导入到 b_class.fact_{platform}_orders_{granularity}
         # 当前使用 FactOrder 表(已废弃),需要实现新的导入逻辑
@@ -21,14 +21,17 @@ v4.13.0 DSS架构重构:
 - 数据入库(RawDataImporter写入JSONB格式)
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, date
 import re
 import os
 import asyncio
+import threading
 
 from modules.core.db import CatalogFile
 from modules.core.logger import get_logger
@@ -56,6 +59,7 @@ from backend.services.currency_extractor import (
     get_currency_extractor,
 )  # [*] v4.15.0新增
 from backend.services.orders_ingestion_normalizer import (
+    OrdersRowPreparer,
     extend_orders_deduplication_fields,
     merge_hash_identity_values,
     prepare_orders_rows_for_b_class,
@@ -79,6 +83,12 @@ from backend.services.orders_ingestion_normalizer import (
 
 logger = get_logger(__name__)
 
+# 分块入库:每块行数(<=0 表示整文件一块),控制单文件入库的峰值内存
+# 事务边界:数据行由 RawDataImporter 按块(块内再按批)各自提交;文件状态只在全部块成功后提交一次。
+# 中途某块失败时,之前的块已入库但文件不会标记为 ingested,返回 partial=True 及已提交的行数/统计;
+# 重试整个文件是幂等的(data_hash 与分块无关,入库为 UPSERT / ON CONFLICT DO NOTHING)
+INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "5000") or 0)
+
 
 ORDERS_EXPLICIT_FIELD_MAP = {
     "利润": "profit",
@@ -199,6 +209,125 @@ def normalize_row_fields_for_domain(
     return dict(row)
 
 
+@dataclass(frozen=True)
+class RowNormalizationPlan:
+    """按表头编译一次的行归一化计划
+
+    同一文件的所有行表头相同,字段名归一化和货币代码识别只需在表头上做一次;
+    行级只剩按计划重建键。当前原始数据契约保留源列名(renames为空),行直接透传。
+    """
+
+    domain: str
+    columns: Tuple[str, ...]
+    renames: Dict[str, str]  # normalize_row_fields_for_domain 对源列名的改名(仅非恒等项)
+    field_names: Dict[str, str]  # 源列名 -> 归一化列名(移除货币代码)
+    column_currencies: Dict[str, str]  # 含货币代码的源列名 -> 货币代码
+    currency_code: Optional[str]  # 行级货币代码(第一个含货币代码的列)
+
+    @property
+    def normalized_columns(self) -> List[str]:
+        return [self.field_names[column] for column in self.columns]
+
+
+_ROW_NORMALIZATION_PLAN_CACHE_SIZE = 256
+_row_normalization_plans: "OrderedDict[tuple, RowNormalizationPlan]" = OrderedDict()
+_row_normalization_plans_lock = threading.Lock()
+
+
+def _compile_row_normalization_plan(
+    domain: str,
+    columns: Tuple[str, ...],
+    currency_extractor=None,
+) -> RowNormalizationPlan:
+    extractor = currency_extractor or get_currency_extractor()
+    probe = normalize_row_fields_for_domain(
+        domain=domain,
+        row={column: column for column in columns},
+        currency_extractor=extractor,
+    )
+    renames = {source: target for target, source in probe.items() if target != source}
+    field_names: Dict[str, str] = {}
+    column_currencies: Dict[str, str] = {}
+    for column in columns:
+        field_names[column] = extractor.normalize_field_name(str(column))
+        currency_code = extractor.extract_currency_code(str(column))
+        if currency_code:
+            column_currencies[column] = currency_code
+
+    currency_code = next(iter(column_currencies.values()), None)
+    if len(set(column_currencies.values())) > 1:
+        logger.warning(
+            f"[Ingest] 表头包含多个不同的货币代码: {sorted(set(column_currencies.values()))},"
+            f"行级货币代码使用第一个: {currency_code}"
+        )
+    return RowNormalizationPlan(
+        domain=domain,
+        columns=columns,
+        renames=renames,
+        field_names=field_names,
+        column_currencies=column_currencies,
+        currency_code=currency_code,
+    )
+
+
+def get_row_normalization_plan(
+    domain: str,
+    columns: List[str],
+    *,
+    template_id: Optional[int] = None,
+    template_version: Optional[int] = None,
+    currency_extractor=None,
+) -> RowNormalizationPlan:
+    """获取表头对应的归一化计划(按 数据域+模板版本+表头 缓存)"""
+    columns = tuple(columns)
+    cache_key = ((domain or "").lower(), template_id, template_version, columns)
+    with _row_normalization_plans_lock:
+        plan = _row_normalization_plans.get(cache_key)
+        if plan is not None:
+            _row_normalization_plans.move_to_end(cache_key)
+            return plan
+
+    plan = _compile_row_normalization_plan(domain, columns, currency_extractor)
+    with _row_normalization_plans_lock:
+        _row_normalization_plans[cache_key] = plan
+        while len(_row_normalization_plans) > _ROW_NORMALIZATION_PLAN_CACHE_SIZE:
+            _row_normalization_plans.popitem(last=False)
+    return plan
+
+
+def apply_row_normalization_plan(
+    domain: str,
+    rows: List[Dict[str, Any]],
+    *,
+    template_id: Optional[int] = None,
+    template_version: Optional[int] = None,
+    currency_extractor=None,
+) -> Tuple[List[Dict[str, Any]], List[Optional[str]]]:
+    """按表头计划归一化行,返回(行, 每行货币代码)
+
+    结果与逐行调用 normalize_row_fields_for_domain / extract_currency_from_row
+    一致;表头变化的行(罕见)会切换到对应表头的计划。
+    """
+    normalized_rows: List[Dict[str, Any]] = []
+    currency_codes: List[Optional[str]] = []
+    plan: Optional[RowNormalizationPlan] = None
+    for row in rows:
+        columns = tuple(row)
+        if plan is None or columns != plan.columns:
+            plan = get_row_normalization_plan(
+                domain,
+                list(columns),
+                template_id=template_id,
+                template_version=template_version,
+                currency_extractor=currency_extractor,
+            )
+        if plan.renames:
+            row = {plan.renames.get(key, key): value for key, value in row.items()}
+        normalized_rows.append(row)
+        currency_codes.append(plan.currency_code)
+    return normalized_rows, currency_codes
+
+
 def _build_hash_identity_values(
     raw_importer: Any,
     rows: List[Dict[str, Any]],
@@ -387,6 +516,44 @@ class DataIngestionService:
             return str(normalized.path)
         return str(safe_path)
 
+    @staticmethod
+    def _resolve_chunk_rows(chunk_rows: Optional[int], total_rows: int) -> int:
+        size = INGEST_CHUNK_ROWS if chunk_rows is None else chunk_rows
+        if not size or size <= 0:
+            return max(total_rows, 1)
+        return int(size)
+
+    async def _report_chunk_progress(
+        self,
+        task_id: Optional[str],
+        *,
+        processed_rows: int,
+        total_rows: int,
+        chunk_index: int,
+        chunk_count: int,
+    ) -> Optional[str]:
+        """上报分块入库进度;失败时返回None,后续分块不再上报(进度不影响入库)"""
+        if not task_id:
+            return None
+        from backend.services.sync_progress_tracker import SyncProgressTracker
+
+        try:
+            await SyncProgressTracker(self.db).queue_update(
+                task_id,
+                {
+                    "total_rows": total_rows,
+                    "processed_rows": processed_rows,
+                    "row_progress": round(processed_rows * 100.0 / total_rows, 2),
+                    "message": f"入库分块{chunk_index}/{chunk_count}: {processed_rows}/{total_rows}行",
+                },
+            )
+            return task_id
+        except Exception as progress_error:
+            logger.warning(
+                f"[Ingest] 分块进度上报失败,后续分块不再上报: task_id={task_id}, error={progress_error}"
+            )
+            return None
+
     async def ingest_data(
         self,
         file_id: int,
@@ -406,6 +573,8 @@ class DataIngestionService:
         sub_domain: Optional[str] = None,  # [*] v4.14.0新增:子类型
         template_id: Optional[int] = None,
         field_parse_rules: Optional[List[Dict[str, Any]]] = None,
+        chunk_rows: Optional[int] = None,
+        template_version: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         数据入库主方法
@@ -418,6 +587,10 @@ class DataIngestionService:
             header_row: 表头行(0-based)
             task_id: 同步任务ID
             extract_images: 是否提取图片
+            chunk_rows: 分块行数(默认INGEST_CHUNK_ROWS);每块依次完成
+                元数据补充 -> 归一化 -> data_hash -> UPSERT入库,不再整文件展开为字典列表;
+                每块单独提交,中途失败时的行为见 INGEST_CHUNK_ROWS 处说明
+            template_version: 模板版本(与template_id一起作为表头归一化计划的缓存键)
 
         Returns:
             入库结果字典
@@ -524,12 +697,12 @@ class DataIngestionService:
             df = df.dropna(how="all")
             df = df.fillna("")
 
-            # 转换为字典列表
-            all_rows = df.to_dict("records")
-            logger.info(f"[Ingest] 读取完整文件成功: {len(all_rows)}行数据")
+            # 分块入库:不再整文件转换为字典列表,按块从DataFrame切片转换
+            total_rows = len(df)
+            logger.info(f"[Ingest] 读取完整文件成功: {total_rows}行数据")
 
             # [*] v4.15.0新增:提前检测空文件(有表头但无数据行)
-            if len(all_rows) == 0:
+            if total_rows == 0:
                 # 情况:有表头但无数据行
                 logger.warning(
                     f"[Ingest] [v4.15.0] 检测到空文件(有表头但无数据行): "
@@ -571,9 +744,8 @@ class DataIngestionService:
 
             # [*] DSS架构:跳过字段映射,直接使用原始数据
             # DSS架构原则:数据同步只做数据采集和存储,字段映射在 PostgreSQL semantic/api 层完成
-            enhanced_rows = all_rows  # 直接使用原始数据,保留所有原始列名
             logger.info(
-                f"[Ingest] [DSS] 跳过字段映射,直接使用原始数据: {len(enhanced_rows)}行,{len(original_header_columns)}个字段"
+                f"[Ingest] [DSS] 跳过字段映射,直接使用原始数据: {total_rows}行,{len(original_header_columns)}个字段"
             )
 
             # [*] 向后兼容:如果提供了mappings,记录日志但不使用(DSS架构不需要字段映射)
@@ -583,7 +755,7 @@ class DataIngestionService:
                 )
 
             # [*] v4.18.1优化:文件级别检查platform_code和shop_id(减少日志输出)
-            # 从file_record获取一次,然后批量应用到所有行
+            # 从file_record获取一次,然后在每个分块中批量应用到所有行
             if file_record:
                 # 文件级别确定platform_code
                 file_platform_code = file_record.platform_code or platform or "unknown"
@@ -605,26 +777,11 @@ class DataIngestionService:
                         f"[Ingest] [v4.18.1] 文件级别shop_id为空,设为'none'(将使用数据库账号主数据进行关联)"
                     )
 
-                # 批量应用到所有行(静默处理,不逐行输出日志)
-                for row in enhanced_rows:
-                    if not row.get("platform_code"):
-                        row["platform_code"] = file_platform_code
-                    if not row.get("shop_id"):
-                        row["shop_id"] = file_shop_id
-                    if file_main_account_id and not row.get("main_account_id"):
-                        row["main_account_id"] = file_main_account_id
-                    if file_shop_account_id and not row.get("shop_account_id"):
-                        row["shop_account_id"] = file_shop_account_id
-                    if file_store_name and not row.get("store_name"):
-                        row["store_name"] = file_store_name
-                    if file_platform_shop_id and not row.get("platform_shop_id"):
-                        row["platform_shop_id"] = file_platform_shop_id
 
             # [*] DSS架构:跳过数据标准化,保留原始数据
             # DSS架构原则:数据同步只做数据采集和存储,数据标准化在 PostgreSQL semantic/api 层完成
             # 如果需要数据类型转换,应在 PostgreSQL semantic/api 层通过标准化逻辑处理
             logger.info(f"[Ingest] [DSS] 跳过数据标准化,保留原始数据格式")
-            # enhanced_rows 保持不变,直接使用原始数据
 
             # [*] DSS架构:移除特殊处理,保留原始数据
             # DSS架构原则:不修改原始数据,所有数据处理在 PostgreSQL semantic/api 层完成
@@ -635,23 +792,20 @@ class DataIngestionService:
             # DSS架构原则:数据同步只做去重和入库,不做业务逻辑验证
             # 业务逻辑验证应在 PostgreSQL semantic/api 层完成
             logger.info(
-                f"[Ingest] [DSS] 跳过数据验证,所有{len(enhanced_rows)}行数据将直接进入去重和入库流程"
+                f"[Ingest] [DSS] 跳过数据验证,所有{total_rows}行数据将直接进入去重和入库流程"
             )
             validation_result = {
                 "errors": [],
                 "warnings": [],
-                "ok_rows": len(enhanced_rows),
-                "total": len(enhanced_rows),
+                "ok_rows": total_rows,
+                "total": total_rows,
             }
             quarantined_count = 0  # DSS架构下不隔离数据
 
-            # [*] DSS架构:使用所有数据(不筛选)
-            valid_rows = enhanced_rows  # 直接使用所有数据,不做验证筛选
-
             # 11. 数据入库(使用RawDataImporter写入JSONB格式)[*] v4.6.0 DSS架构
             # [*] v4.12.2增强:添加数据丢失追踪日志
             logger.info(
-                f"[Ingest] [DSS] 数据入库开始: file_id={file_id}, 总行数={len(valid_rows)}(DSS架构:跳过验证,所有数据入库)"
+                f"[Ingest] [DSS] 数据入库开始: file_id={file_id}, 总行数={total_rows}(DSS架构:跳过验证,所有数据入库)"
             )
 
             staged = 0
@@ -659,11 +813,16 @@ class DataIngestionService:
             amount_imported = 0
             raw_import_error = None
 
+            # 只有调用方传入的任务ID才上报分块进度(single_file_*为占位ID,任务中心无记录)
+            progress_task_id = task_id
             if not task_id:
                 task_id = f"single_file_{file_id}"
 
-            if valid_rows:
+            if total_rows:
                 # [*] v4.6.0 DSS架构:使用RawDataImporter写入JSONB格式(保留原始中文表头)
+                # 已提交块的累计结果(中途失败时如实返回,见 INGEST_CHUNK_ROWS 处说明)
+                committed_stats = {"inserted": 0, "updated": 0, "skipped": 0}
+                committed_rows = 0
                 try:
                     # 获取RawDataImporter和DeduplicationService实例
                     raw_importer = get_raw_data_importer(self.db)
@@ -701,11 +860,10 @@ class DataIngestionService:
                         final_deduplication_fields,
                         field_parse_rules,
                     )
-                    orders_identity_values = []
+                    orders_preparer = None
                     if domain.lower() == "orders":
-                        valid_rows, orders_identity_values = prepare_orders_rows_for_b_class(
-                            valid_rows
-                        )
+                        # 订单行号跨分块连续编号,与整文件一次处理的data_hash一致
+                        orders_preparer = OrdersRowPreparer()
                         final_deduplication_fields = extend_orders_deduplication_fields(
                             domain,
                             final_deduplication_fields,
@@ -714,18 +872,14 @@ class DataIngestionService:
                     if final_deduplication_fields:
                         logger.info(
                             f"[Ingest] [v4.14.0] 使用核心字段计算data_hash: {final_deduplication_fields} "
-                            f"(数据行数={len(valid_rows)})"
+                            f"(数据行数={total_rows})"
                         )
                     else:
                         logger.warning(
                             f"[Ingest] [v4.14.0] [WARN] 未配置核心字段,使用所有业务字段计算data_hash "
-                            f"(数据行数={len(valid_rows)})"
+                            f"(数据行数={total_rows})"
                         )
 
-                    # 计算data_hash(批量计算,支持核心字段)
-                    logger.info(
-                        f"[Ingest] [DSS] 开始计算data_hash: {len(valid_rows)}行"
-                    )
                     hash_scope_values = {
                         "platform_code": (
                             file_platform_code
@@ -737,66 +891,15 @@ class DataIngestionService:
                         "granularity": granularity,
                         "sub_domain": sub_domain,
                     }
-                    hash_identity_values = _build_hash_identity_values(
-                        raw_importer,
-                        valid_rows,
-                        field_parse_rules,
-                    )
-                    hash_identity_values = merge_hash_identity_values(
-                        hash_identity_values,
-                        orders_identity_values,
-                    )
-                    data_hashes = dedup_service.batch_calculate_data_hash(
-                        valid_rows,
-                        deduplication_fields=final_deduplication_fields,
-                        header_bindings=getattr(raw_importer, "header_bindings", None),
-                        scope_values=hash_scope_values,
-                        identity_values=hash_identity_values,
-                    )
-                    logger.info(
-                        f"[Ingest] [DSS] data_hash计算完成: {len(data_hashes)}个哈希"
-                    )
 
                     # 准备header_columns(原始表头字段列表)
                     # [*] v4.6.0 DSS架构:使用原始表头字段列表(保留中文表头)
                     # [*] v4.16.0修复:始终使用文件原始列名(包含货币代码)用于追溯和货币代码提取
-                    # 注意:original_header_columns在函数作用域中定义,可以直接访问
                     header_columns_for_storage = original_header_columns  # 用于保存到数据库(原始列名,包含货币代码)
-                    if not header_columns_for_storage and valid_rows:
-                        # 如果无法获取原始表头,从第一行数据获取键(作为兜底)
-                        header_columns_for_storage = list(valid_rows[0].keys())
-                        logger.warning(
-                            f"[Ingest] [DSS] 无法获取原始表头,使用数据键作为header_columns"
-                        )
 
                     # [*] v4.15.0新增:货币代码提取和字段名归一化
                     currency_extractor = get_currency_extractor()
-                    normalized_rows = []
-                    currency_codes = []
-
-                    for row in valid_rows:
-                        # 归一化字段名(移除货币代码部分)
-                        normalized_row = normalize_row_fields_for_domain(
-                            domain=domain,
-                            row=row,
-                            currency_extractor=currency_extractor,
-                        )
-                        normalized_rows.append(normalized_row)
-
-                        # [*] v4.16.0修复:提取货币代码时使用文件原始列名(row.keys()),而不是归一化的header_columns
-                        # 原因:归一化的header_columns已经移除了货币代码,无法提取
-                        # 使用 row.keys() 获取文件原始的字段名(包含货币代码)
-                        currency_code = currency_extractor.extract_currency_from_row(
-                            row,
-                            header_columns=None,  # [*] 修复:传入None,让方法使用row.keys()(原始字段名)
-                        )
-                        currency_codes.append(currency_code)
 
-                    logger.info(
-                        f"[Ingest] [v4.15.0] 货币代码提取完成: "
-                        f"提取到{sum(1 for c in currency_codes if c)}个货币代码,"
-                        f"字段名归一化完成: {len(normalized_rows)}行"
-                    )
                     logger.info(
                         "[Ingest] raw import date context: file_id=%s, date_from=%s, date_to=%s, field_parse_rules=%s",
                         file_id,
@@ -835,9 +938,6 @@ class DataIngestionService:
                     table_name_suffix = f"{domain}_{granularity}"
                     if sub_domain_value:
                         table_name_suffix = f"{domain}_{sub_domain_value}_{granularity}"
-                    logger.info(
-                        f"[Ingest] [DSS] 开始批量插入到fact_raw_data_{table_name_suffix}表"
-                    )
 
                     # [*] v4.16.0修复:准备归一化的header_columns用于动态列管理
                     # 动态列应该使用归一化的列名(不包含货币代码),避免创建重复的列
@@ -860,83 +960,170 @@ class DataIngestionService:
                             f"platform_param={platform})"
                         )
 
-                    # [*] v4.19.0更新:统一使用异步操作
-                    import_result = await raw_importer.async_batch_insert_raw_data(
-                        rows=normalized_rows,  # [*] v4.15.0更新:使用归一化后的数据(字段名不含货币代码)
-                        data_hashes=data_hashes,
-                        data_domain=domain,
-                        granularity=granularity,
-                        platform_code=platform_code_for_table,  # [*] v4.17.0修复:使用正确的platform_code
-                        shop_id=(
-                            getattr(file_record, "shop_id", None)
-                            if file_record
-                            else None
-                        ),
-                        file_id=file_id,
-                        header_columns=normalized_header_columns,  # [*] v4.16.0修复:使用归一化的header_columns用于动态列管理(避免创建重复列)
-                        currency_codes=currency_codes,  # [*] v4.15.0新增:货币代码列表
-                        sub_domain=sub_domain_value,  # [*] v4.16.0新增:子类型(services域必须提供)
-                        original_header_columns=header_columns_for_storage,  # [*] v4.16.0新增:原始header_columns(包含货币代码,用于保存到数据库)
-                        template_id=template_id,
-                        file_date_from=(
-                            getattr(file_record, "date_from", None)
-                            if file_record
-                            else None
-                        ),
-                        file_date_to=(
-                            getattr(file_record, "date_to", None)
-                            if file_record
-                            else None
-                        ),
-                        field_parse_rules=field_parse_rules,
-                        header_bindings=header_bindings or [],
+                    chunk_size = self._resolve_chunk_rows(chunk_rows, total_rows)
+                    chunk_count = (total_rows + chunk_size - 1) // chunk_size
+                    logger.info(
+                        f"[Ingest] [DSS] 开始分块插入到fact_raw_data_{table_name_suffix}表: "
+                        f"{total_rows}行, 每块{chunk_size}行, 共{chunk_count}块"
                     )
 
-                    # [*] v4.15.0修改:处理新的返回值格式(字典)
-                    if isinstance(import_result, dict):
-                        imported = import_result.get("inserted", 0) + import_result.get(
-                            "updated", 0
+                    import_result = {"inserted": 0, "updated": 0, "skipped": 0}
+                    currency_code_count = 0
+                    for chunk_index, chunk_start in enumerate(
+                        range(0, total_rows, chunk_size), start=1
+                    ):
+                        # 每块独立完成 元数据补充 -> 归一化 -> data_hash -> UPSERT,块结束后即释放
+                        chunk = df.iloc[chunk_start : chunk_start + chunk_size].to_dict(
+                            "records"
                         )
-                        updated = import_result.get("updated", 0)
-                        skipped = import_result.get("skipped", 0)
-
-                        if updated > 0:
-                            logger.info(
-                                f"[Ingest] [DSS] [v4.15.0] UPSERT策略完成: "
-                                f"新插入={import_result.get('inserted', 0)}行, "
-                                f"更新={updated}行, "
-                                f"总计={imported}行(表=fact_raw_data_{domain}_{granularity})"
+                        # 文件级元数据批量应用到本块所有行(静默处理,不逐行输出日志)
+                        for row in chunk:
+                            if not row.get("platform_code"):
+                                row["platform_code"] = file_platform_code
+                            if not row.get("shop_id"):
+                                row["shop_id"] = file_shop_id
+                            if file_main_account_id and not row.get("main_account_id"):
+                                row["main_account_id"] = file_main_account_id
+                            if file_shop_account_id and not row.get("shop_account_id"):
+                                row["shop_account_id"] = file_shop_account_id
+                            if file_store_name and not row.get("store_name"):
+                                row["store_name"] = file_store_name
+                            if file_platform_shop_id and not row.get("platform_shop_id"):
+                                row["platform_shop_id"] = file_platform_shop_id
+
+                        orders_identity_values = []
+                        if orders_preparer is not None:
+                            chunk, orders_identity_values = prepare_orders_rows_for_b_class(
+                                chunk,
+                                preparer=orders_preparer,
                             )
+
+                        # 计算data_hash(批量计算,支持核心字段)
+                        hash_identity_values = _build_hash_identity_values(
+                            raw_importer,
+                            chunk,
+                            field_parse_rules,
+                        )
+                        hash_identity_values = merge_hash_identity_values(
+                            hash_identity_values,
+                            orders_identity_values,
+                        )
+                        data_hashes = dedup_service.batch_calculate_data_hash(
+                            chunk,
+                            deduplication_fields=final_deduplication_fields,
+                            header_bindings=getattr(raw_importer, "header_bindings", None),
+                            scope_values=hash_scope_values,
+                            identity_values=hash_identity_values,
+                        )
+
+                        # 按表头编译的归一化计划:字段名/货币代码只在表头上识别一次
+                        # [*] v4.16.0修复:货币代码使用文件原始列名(row.keys())识别,而不是归一化的header_columns
+                        normalized_rows, currency_codes = apply_row_normalization_plan(
+                            domain,
+                            chunk,
+                            template_id=template_id,
+                            template_version=template_version,
+                            currency_extractor=currency_extractor,
+                        )
+                        currency_code_count += sum(1 for c in currency_codes if c)
+
+                        # [*] v4.19.0更新:统一使用异步操作
+                        chunk_result = await raw_importer.async_batch_insert_raw_data(
+                            rows=normalized_rows,  # [*] v4.15.0更新:使用归一化后的数据(字段名不含货币代码)
+                            data_hashes=data_hashes,
+                            data_domain=domain,
+                            granularity=granularity,
+                            platform_code=platform_code_for_table,  # [*] v4.17.0修复:使用正确的platform_code
+                            shop_id=(
+                                getattr(file_record, "shop_id", None)
+                                if file_record
+                                else None
+                            ),
+                            file_id=file_id,
+                            header_columns=normalized_header_columns,  # [*] v4.16.0修复:使用归一化的header_columns用于动态列管理(避免创建重复列)
+                            currency_codes=currency_codes,  # [*] v4.15.0新增:货币代码列表
+                            sub_domain=sub_domain_value,  # [*] v4.16.0新增:子类型(services域必须提供)
+                            original_header_columns=header_columns_for_storage,  # [*] v4.16.0新增:原始header_columns(包含货币代码,用于保存到数据库)
+                            template_id=template_id,
+                            file_date_from=(
+                                getattr(file_record, "date_from", None)
+                                if file_record
+                                else None
+                            ),
+                            file_date_to=(
+                                getattr(file_record, "date_to", None)
+                                if file_record
+                                else None
+                            ),
+                            field_parse_rules=field_parse_rules,
+                            header_bindings=header_bindings or [],
+                        )
+                        if isinstance(chunk_result, dict):
+                            for key in import_result:
+                                import_result[key] += chunk_result.get(key, 0)
                         else:
+                            # 兼容旧格式(整数)
+                            import_result["inserted"] += int(chunk_result or 0)
+
+                        processed_rows = min(chunk_start + chunk_size, total_rows)
+                        committed_stats = dict(import_result)
+                        committed_rows = processed_rows
+                        if chunk_count > 1:
                             logger.info(
-                                f"[Ingest] [DSS] 批量插入完成: "
-                                f"插入={import_result.get('inserted', 0)}行, "
-                                f"跳过={skipped}行, "
-                                f"总计={imported}行(表=fact_raw_data_{domain}_{granularity})"
+                                f"[Ingest] [DSS] 分块{chunk_index}/{chunk_count}入库完成: "
+                                f"{processed_rows}/{total_rows}行"
                             )
+                            progress_task_id = await self._report_chunk_progress(
+                                progress_task_id,
+                                processed_rows=processed_rows,
+                                total_rows=total_rows,
+                                chunk_index=chunk_index,
+                                chunk_count=chunk_count,
+                            )
+                        del chunk, normalized_rows, currency_codes, data_hashes
+
+                    logger.info(
+                        f"[Ingest] [v4.15.0] 货币代码提取完成: "
+                        f"提取到{currency_code_count}个货币代码,"
+                        f"字段名归一化完成: {total_rows}行"
+                    )
+
+                    # [*] v4.15.0修改:处理新的返回值格式(字典)
+                    imported = import_result.get("inserted", 0) + import_result.get(
+                        "updated", 0
+                    )
+                    updated = import_result.get("updated", 0)
+                    skipped = import_result.get("skipped", 0)
+
+                    if updated > 0:
+                        logger.info(
+                            f"[Ingest] [DSS] [v4.15.0] UPSERT策略完成: "
+                            f"新插入={import_result.get('inserted', 0)}行, "
+                            f"更新={updated}行, "
+                            f"总计={imported}行(表=fact_raw_data_{domain}_{granularity})"
+                        )
                     else:
-                        # 兼容旧格式(整数)
-                        imported = import_result
-                        updated = 0
-                        skipped = 0
                         logger.info(
-                            f"[Ingest] [DSS] 批量插入完成: {imported}行成功(表=fact_raw_data_{domain}_{granularity})"
+                            f"[Ingest] [DSS] 批量插入完成: "
+                            f"插入={import_result.get('inserted', 0)}行, "
+                            f"跳过={skipped}行, "
+                            f"总计={imported}行(表=fact_raw_data_{domain}_{granularity})"
                         )
 
                     # [*] 添加行数验证:验证导入行数与源文件行数匹配
-                    if len(valid_rows) > 0:
-                        loss_rate = (len(valid_rows) - imported) / len(valid_rows)
+                    if total_rows > 0:
+                        loss_rate = (total_rows - imported) / total_rows
                         if loss_rate > 0.05:  # 超过5%的数据丢失
                             logger.warning(
                                 f"[Ingest] [WARN] 警告:检测到显著数据丢失！"
-                                f"源文件行数={len(valid_rows)}, "
+                                f"源文件行数={total_rows}, "
                                 f"导入行数={imported}, "
                                 f"丢失率={loss_rate:.2%} "
                                 f"(可能原因:核心字段配置不正确导致所有行产生相同的hash)"
                             )
-                        elif imported == 1 and len(valid_rows) > 1:
+                        elif imported == 1 and total_rows > 1:
                             logger.error(
-                                f"[Ingest] [FAIL] 严重错误:只导入了1行,但源文件有{len(valid_rows)}行！"
+                                f"[Ingest] [FAIL] 严重错误:只导入了1行,但源文件有{total_rows}行！"
                                 f"这可能是因为所有行的data_hash都相同,导致去重失败。"
                                 f"请检查核心字段配置是否正确。"
                             )
@@ -1002,6 +1189,12 @@ class DataIngestionService:
                         None  # [*] v4.16.0修复:确保import_result被定义,避免后续访问错误
                     )
 
+                    if committed_rows:
+                        logger.warning(
+                            f"[Ingest] [DSS] 文件{file_id}部分入库: 前{committed_rows}/{total_rows}行已提交,"
+                            f"文件未标记为ingested,重试时按data_hash幂等覆盖"
+                        )
+
                     return {
                         "success": False,
                         "message": _format_sync_stage_error(
@@ -1012,11 +1205,9 @@ class DataIngestionService:
                         "amount_imported": 0,
                         "quarantined": 0,
                         "skipped": False,
-                        "import_stats": {
-                            "inserted": 0,
-                            "updated": 0,
-                            "skipped": 0,
-                        },
+                        "partial": committed_rows > 0,
+                        "committed_rows": committed_rows,
+                        "import_stats": committed_stats,
                         "image_extraction_started": False,
                         "normalization_report": normalization_report,
                     }
@@ -1139,7 +1330,7 @@ class DataIngestionService:
             # 注意:空文件应该在上面的提前检测中已经处理,这里是兜底检测
             if imported == 0 and staged == 0:
                 # 检查是否是空文件(兜底检测,正常情况下不应该到达这里)
-                if not valid_rows or len(valid_rows) == 0:
+                if not total_rows:
                     # 空文件:标记为已处理(避免重复处理)
                     logger.warning(
                         f"[Ingest] [v4.15.0] 兜底检测:发现空文件(应该在提前检测中处理): "
@@ -1179,12 +1370,12 @@ class DataIngestionService:
                         if updated_count > 0:
                             # UPSERT策略:有更新,显示更新消息
                             logger.info(
-                                f"[Ingest] [v4.16.0] UPSERT策略:所有{len(valid_rows)}行数据都已存在,"
+                                f"[Ingest] [v4.16.0] UPSERT策略:所有{total_rows}行数据都已存在,"
                                 f"已更新{updated_count}行(新插入{inserted_count}行)"
                             )
                             return {
                                 "success": True,
-                                "message": f"数据同步完成:所有{len(valid_rows)}行数据都已存在,已更新{updated_count}行",
+                                "message": f"数据同步完成:所有{total_rows}行数据都已存在,已更新{updated_count}行",
                                 "staged": updated_count + inserted_count,
                                 "imported": updated_count + inserted_count,
                                 "amount_imported": 0,
@@ -1201,12 +1392,12 @@ class DataIngestionService:
                         else:
                             # 异常情况:有数据但updated和inserted都是0
                             logger.warning(
-                                f"[Ingest] [v4.16.0] [WARN] 异常情况:有{len(valid_rows)}行数据,"
+                                f"[Ingest] [v4.16.0] [WARN] 异常情况:有{total_rows}行数据,"
                                 f"但imported=0, updated={updated_count}, inserted={inserted_count}"
                             )
                             return {
                                 "success": True,
-                                "message": f"数据同步完成:所有{len(valid_rows)}行数据都已存在,已更新0行(异常情况)",
+                                "message": f"数据同步完成:所有{total_rows}行数据都已存在,已更新0行(异常情况)",
                                 "staged": 0,
                                 "imported": 0,
                                 "amount_imported": 0,
@@ -1239,19 +1430,19 @@ class DataIngestionService:
                             # UPSERT策略:假设所有数据都被更新了
                             logger.info(
                                 f"[Ingest] [v4.16.0] UPSERT策略(旧格式兼容):"
-                                f"所有{len(valid_rows)}行数据都已存在,假设已更新"
+                                f"所有{total_rows}行数据都已存在,假设已更新"
                             )
                             return {
                                 "success": True,
-                                "message": f"数据同步完成:所有{len(valid_rows)}行数据都已存在,已更新{len(valid_rows)}行",
-                                "staged": len(valid_rows),
-                                "imported": len(valid_rows),
+                                "message": f"数据同步完成:所有{total_rows}行数据都已存在,已更新{total_rows}行",
+                                "staged": total_rows,
+                                "imported": total_rows,
                                 "amount_imported": 0,
                                 "quarantined": 0,
                                 "skipped": False,  # [*] v4.16.0修复:UPSERT策略下不应该标记为跳过
                                 "import_stats": {
                                     "inserted": 0,
-                                    "updated": len(valid_rows),
+                                    "updated": total_rows,
                                     "skipped": 0,
                                 },
                                 "image_extraction_started": False,
@@ -1261,11 +1452,11 @@ class DataIngestionService:
                             # INSERT策略:跳过重复数据(旧逻辑,保留兼容性)
                             logger.info(
                                 f"[Ingest] [OK] 所有数据都已存在(重复数据),已跳过: "
-                                f"准备入库{len(valid_rows)}行,实际入库0行(全部重复,这是正常情况)"
+                                f"准备入库{total_rows}行,实际入库0行(全部重复,这是正常情况)"
                             )
                             return {
                                 "success": True,
-                                "message": f"数据同步完成:所有{len(valid_rows)}行数据都已存在,已跳过重复数据",
+                                "message": f"数据同步完成:所有{total_rows}行数据都已存在,已跳过重复数据",
                                 "staged": 0,
                                 "imported": 0,
                                 "amount_imported": 0,
@@ -1274,7 +1465,7 @@ class DataIngestionService:
                                 "import_stats": {
                                     "inserted": 0,
                                     "updated": 0,
-                                    "skipped": len(valid_rows),
+                                    "skipped": total_rows,
                                 },
                                 "image_extraction_started": False,
                                 "normalization_report": normalization_report,
@@ -1282,7 +1473,7 @@ class DataIngestionService:
                     else:
                         # [*] v4.16.0修复:import_result不存在的情况(异常发生在batch_insert_raw_data之前)
                         logger.error(
-                            f"[Ingest] [v4.16.0] [WARN] 严重错误:有{len(valid_rows)}行数据,"
+                            f"[Ingest] [v4.16.0] [WARN] 严重错误:有{total_rows}行数据,"
                             f"但import_result未定义(可能异常发生在batch_insert_raw_data之前)"
                         )
                         return {
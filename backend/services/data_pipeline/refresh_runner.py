@@ -13,6 +13,7 @@ from backend.services.data_pipeline.refresh_registry import (
     topologically_sort_targets,
 )
 from backend.services.data_pipeline.sql_loader import load_sql_text, split_sql_statements
+from backend.services.c_class_metrics_engine import refresh_after_mart_refresh
 from modules.core.logger import get_logger
 
 
@@ -511,6 +512,7 @@ async def execute_refresh_plan(
             await _update_run_log(db, run_id, "partial_failed")
         else:
             await _update_run_log(db, run_id, "success")
+        await refresh_after_mart_refresh(db, ordered_targets, failed_targets)
         return {
             "run_id": run_id,
             "status": "partial_failed" if failed_targets else "success",
@@ -549,6 +551,7 @@ async def execute_refresh_plan(
                     except Exception:
                         failed_targets.add(remaining_target)
             await _update_run_log(db, run_id, "partial_failed", error_message=str(exc))
+            await refresh_after_mart_refresh(db, ordered_targets, failed_targets)
             return {
                 "run_id": run_id,
                 "status": "partial_failed",
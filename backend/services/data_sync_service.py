@@ -1091,6 +1091,7 @@ class DataSyncService:
                     ),
                     sub_domain=sub_domain_value,  # [*] v4.16.0修复:优先从catalog_file获取
                     template_id=getattr(template, "id", None),
+                    template_version=getattr(template, "version", None),
                     field_parse_rules=resolved_field_parse_rules,
                 )
 
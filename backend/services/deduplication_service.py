@@ -25,7 +25,7 @@ import json
 import pandas as pd
 
 from modules.core.db import CatalogFile
-from modules.core.logger import get_logger
+from modules.core.logger import get_logger, get_sampled_logger
 from backend.services.semantic_field_registry import (
     get_semantic_requirements,
     is_canonical_semantic_key,
@@ -33,6 +33,8 @@ from backend.services.semantic_field_registry import (
     resolve_semantic_value,
 )
 logger = get_logger(__name__)
+# 逐行 debug 日志采样,热循环中未命中采样时不做格式化
+row_logger = get_sampled_logger(__name__)
 
 
 class DeduplicationService:
@@ -181,8 +183,10 @@ class DeduplicationService:
                     missing_fields.append(field)
                     if semantic_key and get_semantic_requirements(semantic_key).get("required"):
                         missing_required_fields.append(field)
-                    logger.debug(
-                        f"[Dedup] 核心字段 {field} 在数据行中未找到,跳过(可用字段: {list(row.keys())[:5]}...)"
+                    row_logger.debug(
+                        "[Dedup] 核心字段 %s 在数据行中未找到,跳过(可用字段: %s...)",
+                        field,
+                        list(row)[:5],
                     )
             
             # 如果所有核心字段都缺失,记录严重警告
@@ -227,8 +231,9 @@ class DeduplicationService:
         
         if self._hash_log_count <= 3:
             logger.debug(
-                f"[Dedup] 计算data_hash: 使用字段={list(business_data.keys())}, "
-                f"hash前8位={data_hash[:8]}..."
+                "[Dedup] 计算data_hash: 使用字段=%s, hash前8位=%s...",
+                list(business_data.keys()),
+                data_hash[:8],
             )
         
         return data_hash
@@ -463,13 +468,13 @@ class DeduplicationService:
             # 1. 文件内去重
             if data_hash in seen_in_file:
                 duplicate_count += 1
-                logger.debug(f"[Dedup] 文件内重复: 行{i+1}, hash={data_hash[:16]}...")
+                row_logger.debug("[Dedup] 文件内重复: 行%s, hash=%.16s...", i + 1, data_hash)
                 continue
             
             # 2. 跨文件去重
             if data_hash in existing_hashes:
                 duplicate_count += 1
-                logger.debug(f"[Dedup] 跨文件重复: 行{i+1}, hash={data_hash[:16]}...")
+                row_logger.debug("[Dedup] 跨文件重复: 行%s, hash=%.16s...", i + 1, data_hash)
                 continue
             
             # 新数据
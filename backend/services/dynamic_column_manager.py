@@ -23,6 +23,7 @@ from sqlalchemy.exc import ProgrammingError
 import asyncio  # [*] v4.18.2新增:用于run_in_executor
 
 from modules.core.logger import get_logger
+from backend.services.b_class_catalog_cache import get_b_class_catalog
 
 logger = get_logger(__name__)
 
@@ -141,6 +142,11 @@ class DynamicColumnManager:
             现有列名集合
         """
         try:
+            # b_class 动态表优先读取目录缓存(稳态下不查询数据库)
+            cached_columns = get_b_class_catalog().get_columns(self.db, table_name)
+            if cached_columns is not None:
+                return set(cached_columns)
+
             # 使用SQLAlchemy的inspect功能查询表结构
             inspector = inspect(self.db.bind)
             columns = inspector.get_columns(table_name)
@@ -259,6 +265,7 @@ class DynamicColumnManager:
             
         except Exception as e:
             self.db.rollback()
+            get_b_class_catalog().invalidate(table_name)
             logger.error(
                 f"[DynamicColumn] 确保列存在失败 (表={table_name}): {e}",
                 exc_info=True
@@ -18,6 +18,8 @@ from types import SimpleNamespace
 from typing import Any, Dict, Optional
 
 from sqlalchemy import and_, or_, select, text, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from modules.core.db import (
@@ -34,7 +36,10 @@ from modules.core.db import (
     ShopAccount,
 )
 from modules.core.logger import get_logger
-from backend.services.postgresql_shop_metrics_service import load_shop_monthly_metrics
+from backend.services.postgresql_shop_metrics_service import (
+    load_shop_monthly_metrics,
+    load_shop_monthly_metrics_for_months,
+)
 from backend.services.payroll_period_lock_service import PayrollPeriodLockService
 
 logger = get_logger(__name__)
@@ -149,19 +154,22 @@ class HRIncomeCalculationService:
         ratio = min(achieved_value / target_value, 1.0)
         return max(ratio * max_score, 0.0)
 
-    async def _load_shop_metrics(self, year_month: str) -> Dict[str, Dict[str, float]]:
-        metrics_by_shop = await load_shop_monthly_metrics(self.db, year_month)
+    @classmethod
+    def _normalize_shop_metrics(cls, metrics_by_shop: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
         return {
             key: {
-                "monthly_sales": self._to_float(value.get("monthly_sales"), 0.0),
-                "monthly_profit": self._to_float(value.get("monthly_profit"), 0.0),
-                "achievement_rate": self._normalize_achievement_rate(
+                "monthly_sales": cls._to_float(value.get("monthly_sales"), 0.0),
+                "monthly_profit": cls._to_float(value.get("monthly_profit"), 0.0),
+                "achievement_rate": cls._normalize_achievement_rate(
                     value.get("achievement_rate")
                 ),
             }
             for key, value in metrics_by_shop.items()
         }
 
+    async def _load_shop_metrics(self, year_month: str) -> Dict[str, Dict[str, float]]:
+        return self._normalize_shop_metrics(await load_shop_monthly_metrics(self.db, year_month))
+
     async def _load_profit_basis_by_shop(
         self,
         year_month: str,
@@ -231,84 +239,106 @@ class HRIncomeCalculationService:
 
         performance_by_shop: Dict[str, Dict[str, float]] = {}
         for row in rows:
-            details = getattr(row, "score_details", None) or {}
-            total_score = getattr(row, "total_score", None)
-            if total_score is None:
-                continue
-            if not self._is_formal_store_performance(details):
-                continue
-            sales_target = self._to_float(
-                self._score_details_field(details, "sales", "target"),
-                0.0,
-            )
-            performance_by_shop[self._shop_key(row.platform_code, row.shop_id)] = {
-                "total_score": self._to_float(total_score, 0.0),
-                "performance_coefficient": self._to_float(
-                    getattr(row, "performance_coefficient", None),
-                    1.0,
-                ),
-                "sales_target": sales_target,
-            }
+            entry = self._store_performance_entry(row)
+            if entry is not None:
+                performance_by_shop[self._shop_key(row.platform_code, row.shop_id)] = entry
         return performance_by_shop
 
-    async def _load_attendance_adjustment_by_employee(
-        self,
-        year_month: str,
-        assignments: list[Any],
-    ) -> Dict[str, float]:
-        employee_codes = sorted(
+    @classmethod
+    def _store_performance_entry(cls, row: Any) -> Optional[Dict[str, float]]:
+        details = getattr(row, "score_details", None) or {}
+        total_score = getattr(row, "total_score", None)
+        if total_score is None:
+            return None
+        if not cls._is_formal_store_performance(details):
+            return None
+        return {
+            "total_score": cls._to_float(total_score, 0.0),
+            "performance_coefficient": cls._to_float(
+                getattr(row, "performance_coefficient", None),
+                1.0,
+            ),
+            "sales_target": cls._to_float(
+                cls._score_details_field(details, "sales", "target"),
+                0.0,
+            ),
+        }
+
+    @staticmethod
+    def _employee_codes(assignments: list[Any]) -> list[str]:
+        return sorted(
             {
                 (row.employee_code or "").strip()
                 for row in assignments
                 if (row.employee_code or "").strip()
             }
         )
-        if not employee_codes:
-            return {}
 
+    @staticmethod
+    def _month_bounds(year_month: str):
         period_start = datetime.strptime(f"{year_month}-01", "%Y-%m-%d").date()
         if period_start.month == 12:
             next_month = period_start.replace(year=period_start.year + 1, month=1, day=1)
         else:
             next_month = period_start.replace(month=period_start.month + 1, day=1)
+        return period_start, next_month
 
+    @staticmethod
+    def _attendance_row_fields(row: Any) -> tuple[str, str, Any]:
+        if isinstance(row, dict):
+            employee_code = row.get("employee_code", "")
+            raw_status = row.get("status", "")
+            attendance_date = row.get("attendance_date")
+        else:
+            employee_code = getattr(row, "employee_code", None) or ""
+            raw_status = getattr(row, "status", None) or ""
+            attendance_date = getattr(row, "attendance_date", None)
+        return employee_code.strip(), str(raw_status).strip().lower(), attendance_date
+
+    async def _query_attendance_rows(
+        self,
+        employee_codes: list[str],
+        period_start,
+        period_end,
+    ) -> list[Any]:
         try:
             # A failed ORM probe must not roll back pending shop-performance rows
             # held by the outer monthly settlement transaction.
             nested_transaction = self.db.begin_nested()
-            if inspect.isawaitable(nested_transaction):
-                # AsyncSession.begin_nested() is synchronous.  This branch keeps
-                # lightweight session doubles usable without changing production
-                # transaction semantics.
+            if not hasattr(nested_transaction, "__aenter__") and inspect.isawaitable(nested_transaction):
+                # AsyncSession.begin_nested() is synchronous and returns an async
+                # context manager (which is itself awaitable).  This branch keeps
+                # lightweight session doubles whose begin_nested() is a coroutine
+                # usable without changing production transaction semantics.
                 nested_transaction.close()
-                rows = (
+                return (
                     await self.db.execute(
                         select(AttendanceRecord).where(
                             AttendanceRecord.employee_code.in_(employee_codes),
                             AttendanceRecord.attendance_date >= period_start,
-                            AttendanceRecord.attendance_date < next_month,
+                            AttendanceRecord.attendance_date < period_end,
                         )
                     )
                 ).scalars().all()
-            else:
-                async with nested_transaction:
-                    rows = (
-                        await self.db.execute(
-                            select(AttendanceRecord).where(
-                                AttendanceRecord.employee_code.in_(employee_codes),
-                                AttendanceRecord.attendance_date >= period_start,
-                                AttendanceRecord.attendance_date < next_month,
-                            )
+            async with nested_transaction:
+                return (
+                    await self.db.execute(
+                        select(AttendanceRecord).where(
+                            AttendanceRecord.employee_code.in_(employee_codes),
+                            AttendanceRecord.attendance_date >= period_start,
+                            AttendanceRecord.attendance_date < period_end,
                         )
-                    ).scalars().all()
+                    )
+                ).scalars().all()
         except Exception:
-            rows = (
+            return (
                 await self.db.execute(
                     text(
                         """
                         select
                           "员工编号" as employee_code,
-                          "状态" as status
+                          "状态" as status,
+                          "考勤日期" as attendance_date
                         from a_class.attendance_records
                         where "员工编号" = any(:employee_codes)
                           and "考勤日期" >= :period_start
@@ -318,26 +348,28 @@ class HRIncomeCalculationService:
                     {
                         "employee_codes": employee_codes,
                         "period_start": period_start,
-                        "next_month": next_month,
+                        "next_month": period_end,
                     },
                 )
             ).mappings().all()
 
+    async def _load_attendance_adjustment_by_employee(
+        self,
+        year_month: str,
+        assignments: list[Any],
+    ) -> Dict[str, float]:
+        employee_codes = self._employee_codes(assignments)
+        if not employee_codes:
+            return {}
+
+        period_start, next_month = self._month_bounds(year_month)
+        rows = await self._query_attendance_rows(employee_codes, period_start, next_month)
+
         adjustment_by_employee: Dict[str, float] = {}
         for row in rows:
-            employee_code = (
-                row.get("employee_code", "")
-                if isinstance(row, dict)
-                else (getattr(row, "employee_code", None) or "")
-            ).strip()
+            employee_code, status, _ = self._attendance_row_fields(row)
             if not employee_code:
                 continue
-            raw_status = (
-                row.get("status", "")
-                if isinstance(row, dict)
-                else (getattr(row, "status", None) or "")
-            )
-            status = str(raw_status).strip().lower()
             delta = self.ATTENDANCE_PENALTY_BY_STATUS.get(status, 0.0)
             adjustment_by_employee[employee_code] = adjustment_by_employee.get(employee_code, 0.0) + delta
         return adjustment_by_employee
@@ -347,13 +379,7 @@ class HRIncomeCalculationService:
         year_month: str,
         assignments: list[Any],
     ) -> Dict[str, float]:
-        employee_codes = sorted(
-            {
-                (row.employee_code or "").strip()
-                for row in assignments
-                if (row.employee_code or "").strip()
-            }
-        )
+        employee_codes = self._employee_codes(assignments)
         if not employee_codes:
             return {}
 
@@ -381,13 +407,7 @@ class HRIncomeCalculationService:
         year_month: str,
         assignments: list[Any],
     ) -> Dict[str, float]:
-        employee_codes = sorted(
-            {
-                (row.employee_code or "").strip()
-                for row in assignments
-                if (row.employee_code or "").strip()
-            }
-        )
+        employee_codes = self._employee_codes(assignments)
         if not employee_codes:
             return {}
 
@@ -412,23 +432,8 @@ class HRIncomeCalculationService:
             for employee_code, score in score_by_employee.items()
         }
 
-    async def _load_default_commission_ratio_by_employee(
-        self,
-        year_month: str,
-        assignments: list[Any],
-    ) -> Dict[str, float]:
-        employee_codes = sorted(
-            {
-                (row.employee_code or "").strip()
-                for row in assignments
-                if (row.employee_code or "").strip()
-            }
-        )
-        if not employee_codes:
-            return {}
-
-        effective_cutoff = self._year_month_last_day(year_month)
-        rows = (
+    async def _query_salary_structure_rows(self, employee_codes: list[str]) -> list[Any]:
+        return (
             await self.db.execute(
                 select(SalaryStructure)
                 .where(
@@ -443,18 +448,21 @@ class HRIncomeCalculationService:
             )
         ).scalars().all()
 
+    @classmethod
+    def _commission_ratio_from_salary_rows(cls, rows: list[Any], year_month: str) -> Dict[str, float]:
+        effective_cutoff = cls._year_month_last_day(year_month)
         ratio_by_employee: Dict[str, float] = {}
         fallback_by_employee: Dict[str, float] = {}
         for row in rows:
             employee_code = (getattr(row, "employee_code", None) or "").strip()
             if not employee_code:
                 continue
-            ratio = self._to_float(getattr(row, "commission_ratio", None), 0.0)
+            ratio = cls._to_float(getattr(row, "commission_ratio", None), 0.0)
             if employee_code not in fallback_by_employee:
                 fallback_by_employee[employee_code] = ratio
             if employee_code in ratio_by_employee:
                 continue
-            effective_date = self._coerce_date(getattr(row, "effective_date", None))
+            effective_date = cls._coerce_date(getattr(row, "effective_date", None))
             if effective_date is not None and effective_date <= effective_cutoff:
                 ratio_by_employee[employee_code] = ratio
 
@@ -462,44 +470,21 @@ class HRIncomeCalculationService:
             ratio_by_employee.setdefault(employee_code, ratio)
         return ratio_by_employee
 
-    async def calculate_month(self, year_month: str, commit: bool = True) -> Dict[str, Any]:
-        try:
-            datetime.strptime(year_month, "%Y-%m")
-        except ValueError as exc:
-            raise ValueError("year_month format must be YYYY-MM") from exc
+    async def _load_default_commission_ratio_by_employee(
+        self,
+        year_month: str,
+        assignments: list[Any],
+    ) -> Dict[str, float]:
+        employee_codes = self._employee_codes(assignments)
+        if not employee_codes:
+            return {}
 
-        await PayrollPeriodLockService(self.db).assert_month_mutable(
-            year_month=year_month,
-        )
+        rows = await self._query_salary_structure_rows(employee_codes)
+        return self._commission_ratio_from_salary_rows(rows, year_month)
 
-        assignment_rows = (
-            await self.db.execute(
-                select(EmployeeShopAssignment)
-                .join(
-                    ShopAccount,
-                    and_(
-                        func.lower(ShopAccount.platform) == func.lower(EmployeeShopAssignment.platform_code),
-                        ShopAccount.enabled == True,
-                        ShopAccount.business_role == "operating_store",
-                        or_(
-                            ShopAccount.platform_shop_id == EmployeeShopAssignment.shop_id,
-                            ShopAccount.shop_account_id == EmployeeShopAssignment.shop_id,
-                        ),
-                    ),
-                )
-                .where(EmployeeShopAssignment.status == "active")
-                .where(EmployeeShopAssignment.year_month == year_month)
-            )
-        ).scalars().all()
-        if not assignment_rows:
-            return {
-                "year_month": year_month,
-                "employee_count": 0,
-                "commission_upserts": 0,
-                "performance_upserts": 0,
-                "source": "employee_shop_assignments + shop_commission_config + profit_basis_amount",
-            }
-        assignments = [
+    @staticmethod
+    def _snapshot_assignments(rows: list[Any]) -> list[Any]:
+        return [
             SimpleNamespace(
                 employee_code=getattr(row, "employee_code", None),
                 platform_code=getattr(row, "platform_code", None),
@@ -508,49 +493,50 @@ class HRIncomeCalculationService:
                 status=getattr(row, "status", None),
                 year_month=getattr(row, "year_month", None),
             )
-            for row in assignment_rows
+            for row in rows
         ]
 
-        cfg_rows = (
-            await self.db.execute(
-                select(ShopCommissionConfig).where(
-                    ShopCommissionConfig.year_month == year_month
-                )
-            )
-        ).scalars().all()
-        allocatable_by_shop = {
-            self._shop_key(row.platform_code, row.shop_id): self._to_float(
-                row.allocatable_profit_rate, 1.0
+    @staticmethod
+    def _operating_assignments_query():
+        return (
+            select(EmployeeShopAssignment)
+            .join(
+                ShopAccount,
+                and_(
+                    func.lower(ShopAccount.platform) == func.lower(EmployeeShopAssignment.platform_code),
+                    ShopAccount.enabled == True,
+                    ShopAccount.business_role == "operating_store",
+                    or_(
+                        ShopAccount.platform_shop_id == EmployeeShopAssignment.shop_id,
+                        ShopAccount.shop_account_id == EmployeeShopAssignment.shop_id,
+                    ),
+                ),
             )
-            for row in cfg_rows
-        }
-
-        metrics_by_shop = await self._load_shop_metrics(year_month)
-        profit_basis_by_shop = await self._load_profit_basis_by_shop(
-            year_month, assignments
-        )
-        performance_by_shop = await self._load_store_performance_by_shop(
-            year_month, assignments
-        )
-        attendance_adjustment_by_employee = await self._load_attendance_adjustment_by_employee(
-            year_month, assignments
-        )
-        manual_adjustment_by_employee = await self._load_manual_adjustment_by_employee(
-            year_month, assignments
-        )
-        input_score_by_employee = await self._load_employee_performance_input_score_by_employee(
-            year_month, assignments
-        )
-        default_commission_ratio_by_employee = await self._load_default_commission_ratio_by_employee(
-            year_month, assignments
+            .where(EmployeeShopAssignment.status == "active")
         )
 
+    def _compute_month_income(
+        self,
+        assignments: list[Any],
+        *,
+        allocatable_by_shop: Dict[str, float],
+        metrics_by_shop: Dict[str, Dict[str, float]],
+        profit_basis_by_shop: Dict[str, Dict[str, float]],
+        performance_by_shop: Dict[str, Dict[str, float]],
+        attendance_adjustment_by_employee: Dict[str, float],
+        manual_adjustment_by_employee: Dict[str, float],
+        input_score_by_employee: Dict[str, float],
+        default_commission_ratio_by_employee: Dict[str, float],
+    ) -> Dict[str, Any]:
+        """Pure per-month calculation shared by calculate_month and calculate_months."""
+        assignments_by_employee: Dict[str, list[Any]] = {}
         commission_agg: Dict[str, Dict[str, float]] = {}
         performance_agg: Dict[str, Dict[str, float]] = {}
         for row in assignments:
             employee_code = (row.employee_code or "").strip()
             if not employee_code:
                 continue
+            assignments_by_employee.setdefault(employee_code, []).append(row)
 
             shop_key = self._shop_key(row.platform_code, row.shop_id)
             metric = metrics_by_shop.get(shop_key, {})
@@ -614,10 +600,8 @@ class HRIncomeCalculationService:
             comm_rec["weighted_rate_num"] += achievement_rate * sales_share
             comm_rec["weighted_rate_den"] += sales_share
 
-        commission_upserts = 0
-        performance_upserts = 0
+        commissions: Dict[str, Dict[str, float]] = {}
         commission_allocations: list[dict[str, Any]] = []
-
         for employee_code, rec in commission_agg.items():
             sales_amount = rec["sales_amount"]
             raw_commission_amount = rec["commission_amount"]
@@ -625,11 +609,11 @@ class HRIncomeCalculationService:
                 commission_rate = raw_commission_amount / sales_amount
             else:
                 commission_rate = 0.0
+
+            commissioned_rows = []
             coefficient_num = 0.0
             coefficient_den = 0.0
-            for row in assignments:
-                if (row.employee_code or "").strip() != employee_code:
-                    continue
+            for row in assignments_by_employee[employee_code]:
                 ratio = self._to_float(row.commission_ratio, 0.0)
                 if ratio <= 0:
                     ratio = self._to_float(
@@ -639,6 +623,7 @@ class HRIncomeCalculationService:
                 if ratio <= 0:
                     continue
                 shop_key = self._shop_key(row.platform_code, row.shop_id)
+                commissioned_rows.append((row, shop_key, ratio))
                 metric = metrics_by_shop.get(shop_key, {})
                 monthly_sales = self._to_float(metric.get("monthly_sales"), 0.0)
                 sales_share = monthly_sales * ratio
@@ -653,18 +638,7 @@ class HRIncomeCalculationService:
             if sales_amount > 0:
                 commission_rate = commission_amount / sales_amount
 
-            for row in assignments:
-                if (row.employee_code or "").strip() != employee_code:
-                    continue
-                ratio = self._to_float(row.commission_ratio, 0.0)
-                if ratio <= 0:
-                    ratio = self._to_float(
-                        default_commission_ratio_by_employee.get(employee_code),
-                        0.0,
-                    )
-                if ratio <= 0:
-                    continue
-                shop_key = self._shop_key(row.platform_code, row.shop_id)
+            for row, shop_key, ratio in commissioned_rows:
                 profit_basis_amount = self._to_float(
                     profit_basis_by_shop.get(shop_key, {}).get("profit_basis_amount"),
                     0.0,
@@ -684,33 +658,13 @@ class HRIncomeCalculationService:
                         * inherited_coefficient,
                     }
                 )
+            commissions[employee_code] = {
+                "sales_amount": sales_amount,
+                "commission_amount": commission_amount,
+                "commission_rate": commission_rate,
+            }
 
-            comm = (
-                await self.db.execute(
-                    select(EmployeeCommission).where(
-                        EmployeeCommission.employee_code == employee_code,
-                        EmployeeCommission.year_month == year_month,
-                    )
-                )
-            ).scalar_one_or_none()
-            if comm:
-                comm.sales_amount = sales_amount
-                comm.commission_amount = commission_amount
-                comm.commission_rate = commission_rate
-                comm.calculated_at = datetime.now(timezone.utc)
-            else:
-                self.db.add(
-                    EmployeeCommission(
-                        employee_code=employee_code,
-                        year_month=year_month,
-                        sales_amount=sales_amount,
-                        commission_amount=commission_amount,
-                        commission_rate=commission_rate,
-                        calculated_at=datetime.now(timezone.utc),
-                    )
-                )
-            commission_upserts += 1
-
+        performances: Dict[str, Dict[str, float]] = {}
         for employee_code, rec in performance_agg.items():
             sales_amount = rec["sales_amount"]
             if rec["weighted_rate_den"] > 0:
@@ -733,8 +687,106 @@ class HRIncomeCalculationService:
                 manual_adjustment_by_employee.get(employee_code),
                 0.0,
             )
-            performance_score = min(max(performance_score, 0.0), 100.0)
+            performances[employee_code] = {
+                "actual_sales": sales_amount,
+                "achievement_rate": achievement_rate,
+                "performance_score": min(max(performance_score, 0.0), 100.0),
+            }
+
+        return {
+            "commissions": commissions,
+            "performances": performances,
+            "commission_allocations": commission_allocations,
+        }
 
+    async def calculate_month(self, year_month: str, commit: bool = True) -> Dict[str, Any]:
+        try:
+            datetime.strptime(year_month, "%Y-%m")
+        except ValueError as exc:
+            raise ValueError("year_month format must be YYYY-MM") from exc
+
+        await PayrollPeriodLockService(self.db).assert_month_mutable(
+            year_month=year_month,
+        )
+
+        assignment_rows = (
+            await self.db.execute(
+                self._operating_assignments_query()
+                .where(EmployeeShopAssignment.year_month == year_month)
+            )
+        ).scalars().all()
+        if not assignment_rows:
+            return {
+                "year_month": year_month,
+                "employee_count": 0,
+                "commission_upserts": 0,
+                "performance_upserts": 0,
+                "source": "employee_shop_assignments + shop_commission_config + profit_basis_amount",
+            }
+        assignments = self._snapshot_assignments(assignment_rows)
+
+        cfg_rows = (
+            await self.db.execute(
+                select(ShopCommissionConfig).where(
+                    ShopCommissionConfig.year_month == year_month
+                )
+            )
+        ).scalars().all()
+        allocatable_by_shop = {
+            self._shop_key(row.platform_code, row.shop_id): self._to_float(
+                row.allocatable_profit_rate, 1.0
+            )
+            for row in cfg_rows
+        }
+
+        computed = self._compute_month_income(
+            assignments,
+            allocatable_by_shop=allocatable_by_shop,
+            metrics_by_shop=await self._load_shop_metrics(year_month),
+            profit_basis_by_shop=await self._load_profit_basis_by_shop(year_month, assignments),
+            performance_by_shop=await self._load_store_performance_by_shop(year_month, assignments),
+            attendance_adjustment_by_employee=await self._load_attendance_adjustment_by_employee(
+                year_month, assignments
+            ),
+            manual_adjustment_by_employee=await self._load_manual_adjustment_by_employee(
+                year_month, assignments
+            ),
+            input_score_by_employee=await self._load_employee_performance_input_score_by_employee(
+                year_month, assignments
+            ),
+            default_commission_ratio_by_employee=await self._load_default_commission_ratio_by_employee(
+                year_month, assignments
+            ),
+        )
+
+        commission_upserts = 0
+        performance_upserts = 0
+        for employee_code, values in computed["commissions"].items():
+            comm = (
+                await self.db.execute(
+                    select(EmployeeCommission).where(
+                        EmployeeCommission.employee_code == employee_code,
+                        EmployeeCommission.year_month == year_month,
+                    )
+                )
+            ).scalar_one_or_none()
+            if comm:
+                comm.sales_amount = values["sales_amount"]
+                comm.commission_amount = values["commission_amount"]
+                comm.commission_rate = values["commission_rate"]
+                comm.calculated_at = datetime.now(timezone.utc)
+            else:
+                self.db.add(
+                    EmployeeCommission(
+                        employee_code=employee_code,
+                        year_month=year_month,
+                        calculated_at=datetime.now(timezone.utc),
+                        **values,
+                    )
+                )
+            commission_upserts += 1
+
+        for employee_code, values in computed["performances"].items():
             perf = (
                 await self.db.execute(
                     select(EmployeePerformance).where(
@@ -744,19 +796,17 @@ class HRIncomeCalculationService:
                 )
             ).scalar_one_or_none()
             if perf:
-                perf.actual_sales = sales_amount
-                perf.achievement_rate = achievement_rate
-                perf.performance_score = performance_score
+                perf.actual_sales = values["actual_sales"]
+                perf.achievement_rate = values["achievement_rate"]
+                perf.performance_score = values["performance_score"]
                 perf.calculated_at = datetime.now(timezone.utc)
             else:
                 self.db.add(
                     EmployeePerformance(
                         employee_code=employee_code,
                         year_month=year_month,
-                        actual_sales=sales_amount,
-                        achievement_rate=achievement_rate,
-                        performance_score=performance_score,
                         calculated_at=datetime.now(timezone.utc),
+                        **values,
                     )
                 )
             performance_upserts += 1
@@ -765,9 +815,280 @@ class HRIncomeCalculationService:
             await self.db.commit()
         return {
             "year_month": year_month,
-            "employee_count": len(performance_agg),
+            "employee_count": len(computed["performances"]),
             "commission_upserts": commission_upserts,
             "performance_upserts": performance_upserts,
-            "commission_allocations": commission_allocations,
+            "commission_allocations": computed["commission_allocations"],
+            "source": "employee_shop_assignments + employee_performance_inputs + performance_scores + shop_profit_basis",
+        }
+
+    # ------------------------------------------------------------------
+    # Batch mode: several months in one pass per source
+    # ------------------------------------------------------------------
+
+    async def _load_store_performance_for_months(
+        self,
+        year_months: list[str],
+        assignments: list[Any],
+    ) -> Dict[str, Dict[str, Dict[str, float]]]:
+        platform_codes = sorted({(row.platform_code or "").lower() for row in assignments})
+        shop_ids = sorted({row.shop_id for row in assignments})
+        rows = (
+            await self.db.execute(
+                select(PerformanceScore).where(
+                    PerformanceScore.period.in_(year_months),
+                    PerformanceScore.platform_code.in_(platform_codes),
+                    PerformanceScore.shop_id.in_(shop_ids),
+                )
+            )
+        ).scalars().all()
+
+        performance_by_month: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for row in rows:
+            entry = self._store_performance_entry(row)
+            if entry is not None:
+                performance_by_month.setdefault(row.period, {})[
+                    self._shop_key(row.platform_code, row.shop_id)
+                ] = entry
+        return performance_by_month
+
+    async def _load_attendance_adjustment_for_months(
+        self,
+        year_months: list[str],
+        employee_codes: list[str],
+    ) -> Dict[str, Dict[str, float]]:
+        period_start, _ = self._month_bounds(year_months[0])
+        _, period_end = self._month_bounds(year_months[-1])
+        rows = await self._query_attendance_rows(employee_codes, period_start, period_end)
+
+        adjustment_by_month: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            employee_code, status, attendance_date = self._attendance_row_fields(row)
+            attendance_date = self._coerce_date(attendance_date)
+            if not employee_code or attendance_date is None:
+                continue
+            month_adjustments = adjustment_by_month.setdefault(attendance_date.strftime("%Y-%m"), {})
+            month_adjustments[employee_code] = month_adjustments.get(employee_code, 0.0) + (
+                self.ATTENDANCE_PENALTY_BY_STATUS.get(status, 0.0)
+            )
+        return adjustment_by_month
+
+    async def _load_manual_adjustment_for_months(
+        self,
+        year_months: list[str],
+        employee_codes: list[str],
+    ) -> Dict[str, Dict[str, float]]:
+        rows = (
+            await self.db.execute(
+                select(EmployeePerformanceAdjustment).where(
+                    EmployeePerformanceAdjustment.year_month.in_(year_months),
+                    EmployeePerformanceAdjustment.status == "active",
+                    EmployeePerformanceAdjustment.employee_code.in_(employee_codes),
+                )
+            )
+        ).scalars().all()
+
+        adjustment_by_month: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            employee_code = (getattr(row, "employee_code", None) or "").strip()
+            if not employee_code:
+                continue
+            month_adjustments = adjustment_by_month.setdefault(row.year_month, {})
+            month_adjustments[employee_code] = month_adjustments.get(employee_code, 0.0) + self._to_float(
+                getattr(row, "score_delta", None), 0.0
+            )
+        return adjustment_by_month
+
+    async def _load_input_score_for_months(
+        self,
+        year_months: list[str],
+        employee_codes: list[str],
+    ) -> Dict[str, Dict[str, float]]:
+        rows = (
+            await self.db.execute(
+                select(EmployeePerformanceInput).where(
+                    EmployeePerformanceInput.year_month.in_(year_months),
+                    EmployeePerformanceInput.status == "active",
+                    EmployeePerformanceInput.employee_code.in_(employee_codes),
+                )
+            )
+        ).scalars().all()
+
+        score_by_month: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            employee_code = (getattr(row, "employee_code", None) or "").strip()
+            if not employee_code:
+                continue
+            month_scores = score_by_month.setdefault(row.year_month, {})
+            month_scores[employee_code] = month_scores.get(employee_code, 0.0) + self._calculate_input_metric_score(row)
+        return {
+            year_month: {
+                employee_code: min(max(score, 0.0), 100.0)
+                for employee_code, score in month_scores.items()
+            }
+            for year_month, month_scores in score_by_month.items()
+        }
+
+    @staticmethod
+    def _empty_month_result(year_month: str) -> Dict[str, Any]:
+        return {
+            "year_month": year_month,
+            "employee_count": 0,
+            "commission_upserts": 0,
+            "performance_upserts": 0,
+            "commission_allocations": [],
+        }
+
+    async def _bulk_upsert_income(
+        self,
+        commission_rows: list[dict[str, Any]],
+        performance_rows: list[dict[str, Any]],
+    ) -> None:
+        bind = getattr(self.db, "bind", None)
+        insert = sqlite_insert if bind is not None and bind.dialect.name == "sqlite" else pg_insert
+        for model, rows in ((EmployeeCommission, commission_rows), (EmployeePerformance, performance_rows)):
+            if not rows:
+                continue
+            stmt = insert(model)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["employee_code", "year_month"],
+                    set_={
+                        column: getattr(stmt.excluded, column)
+                        for column in rows[0]
+                        if column not in ("employee_code", "year_month")
+                    },
+                ),
+                rows,
+            )
+
+    async def calculate_months(self, year_months: list[str], commit: bool = True) -> Dict[str, Any]:
+        """
+        Batch form of calculate_month for year-end recalculations and backfills.
+
+        Every source is loaded once for all months, results are computed per
+        (employee, month) with the same rules as calculate_month, and each
+        result table is written with a single bulk upsert.
+        """
+        for year_month in year_months:
+            try:
+                datetime.strptime(year_month, "%Y-%m")
+            except ValueError as exc:
+                raise ValueError("year_month format must be YYYY-MM") from exc
+        year_months = sorted(set(year_months))
+        if not year_months:
+            return {"year_months": [], "months": [], "commission_upserts": 0, "performance_upserts": 0}
+
+        await PayrollPeriodLockService(self.db).assert_months_mutable(
+            year_months=year_months,
+        )
+
+        assignment_rows = (
+            await self.db.execute(
+                self._operating_assignments_query()
+                .where(EmployeeShopAssignment.year_month.in_(year_months))
+            )
+        ).scalars().all()
+        assignments = self._snapshot_assignments(assignment_rows)
+        assignments_by_month: Dict[str, list[Any]] = {}
+        for row in assignments:
+            assignments_by_month.setdefault(row.year_month, []).append(row)
+
+        months: list[dict[str, Any]] = []
+        commission_rows: list[dict[str, Any]] = []
+        performance_rows: list[dict[str, Any]] = []
+        if not assignments:
+            return {
+                "year_months": year_months,
+                "months": [self._empty_month_result(year_month) for year_month in year_months],
+                "commission_upserts": 0,
+                "performance_upserts": 0,
+                "source": "employee_shop_assignments + shop_commission_config + profit_basis_amount",
+            }
+
+        employee_codes = self._employee_codes(assignments)
+        allocatable_by_month: Dict[str, Dict[str, float]] = {}
+        for row in (
+            await self.db.execute(
+                select(ShopCommissionConfig).where(
+                    ShopCommissionConfig.year_month.in_(year_months)
+                )
+            )
+        ).scalars().all():
+            allocatable_by_month.setdefault(row.year_month, {})[
+                self._shop_key(row.platform_code, row.shop_id)
+            ] = self._to_float(row.allocatable_profit_rate, 1.0)
+
+        profit_basis_by_month: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for row in (
+            await self.db.execute(
+                select(ShopProfitBasis).where(
+                    ShopProfitBasis.period_month.in_(year_months),
+                    ShopProfitBasis.basis_version == "A_ONLY_V1",
+                )
+            )
+        ).scalars().all():
+            if not bool(getattr(row, "is_locked", False)):
+                continue
+            profit_basis_by_month.setdefault(row.period_month, {})[
+                self._shop_key(row.platform_code, row.shop_id)
+            ] = {"profit_basis_amount": self._to_float(getattr(row, "profit_basis_amount", 0.0), 0.0)}
+
+        metrics_by_month = await load_shop_monthly_metrics_for_months(self.db, year_months)
+        performance_by_month = await self._load_store_performance_for_months(year_months, assignments)
+        attendance_by_month = await self._load_attendance_adjustment_for_months(year_months, employee_codes)
+        manual_by_month = await self._load_manual_adjustment_for_months(year_months, employee_codes)
+        input_score_by_month = await self._load_input_score_for_months(year_months, employee_codes)
+        salary_rows = await self._query_salary_structure_rows(employee_codes)
+        calculated_at = datetime.now(timezone.utc)
+
+        for year_month in year_months:
+            month_assignments = assignments_by_month.get(year_month, [])
+            if not month_assignments:
+                months.append(self._empty_month_result(year_month))
+                continue
+            computed = self._compute_month_income(
+                month_assignments,
+                allocatable_by_shop=allocatable_by_month.get(year_month, {}),
+                metrics_by_shop=self._normalize_shop_metrics(metrics_by_month.get(year_month, {})),
+                profit_basis_by_shop=profit_basis_by_month.get(year_month, {}),
+                performance_by_shop=performance_by_month.get(year_month, {}),
+                attendance_adjustment_by_employee=attendance_by_month.get(year_month, {}),
+                manual_adjustment_by_employee=manual_by_month.get(year_month, {}),
+                input_score_by_employee=input_score_by_month.get(year_month, {}),
+                default_commission_ratio_by_employee=self._commission_ratio_from_salary_rows(
+                    salary_rows, year_month
+                ),
+            )
+            commission_rows.extend(
+                {"employee_code": employee_code, "year_month": year_month, **values, "calculated_at": calculated_at}
+                for employee_code, values in computed["commissions"].items()
+            )
+            performance_rows.extend(
+                {"employee_code": employee_code, "year_month": year_month, **values, "calculated_at": calculated_at}
+                for employee_code, values in computed["performances"].items()
+            )
+            months.append(
+                {
+                    "year_month": year_month,
+                    "employee_count": len(computed["performances"]),
+                    "commission_upserts": len(computed["commissions"]),
+                    "performance_upserts": len(computed["performances"]),
+                    "commission_allocations": computed["commission_allocations"],
+                }
+            )
+
+        await self._bulk_upsert_income(commission_rows, performance_rows)
+        if commit:
+            await self.db.commit()
+        logger.info(
+            f"[HRIncome] Batch recalculated {len(year_months)} months: "
+            f"commissions={len(commission_rows)} performances={len(performance_rows)}"
+        )
+        return {
+            "year_months": year_months,
+            "months": months,
+            "commission_upserts": len(commission_rows),
+            "performance_upserts": len(performance_rows),
             "source": "employee_shop_assignments + employee_performance_inputs + performance_scores + shop_profit_basis",
         }
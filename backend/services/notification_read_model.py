@@ -0,0 +1,148 @@
+"""
+通知读模型(Notification Read Model)
+
+通知列表/分组/详情接口原先逐条查询关联用户名(N+1),分组接口还要为每个类型再查一次最新通知。
+这里把关联用户(发起人)用 LEFT JOIN 一次带出,分组统计与每组最新通知用一条窗口函数查询完成。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Integer, and_, case, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from modules.core.db import DimUser, Notification
+
+NotificationRow = Tuple[Notification, Optional[str]]
+
+
+@dataclass
+class NotificationGroupRow:
+    """单个通知类型的统计与最新通知"""
+
+    notification_type: str
+    total_count: int
+    unread_count: int
+    latest: Notification
+    latest_related_username: Optional[str]
+
+
+# 优先级排序:high > medium > low
+PRIORITY_ORDER = case(
+    (Notification.priority == "high", 1),
+    (Notification.priority == "medium", 2),
+    (Notification.priority == "low", 3),
+    else_=2,
+)
+
+
+class NotificationReadModel:
+    """按接收者读取通知,关联用户名随通知一起返回"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _with_related_username():
+        related_user = aliased(DimUser)
+        return (
+            select(Notification, related_user.username.label("related_username"))
+            .outerjoin(related_user, related_user.user_id == Notification.related_user_id)
+        )
+
+    async def list_page(
+        self,
+        recipient_id: int,
+        *,
+        is_read: Optional[bool] = None,
+        notification_type: Optional[str] = None,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[NotificationRow], int]:
+        """
+        分页读取通知(高优先级置顶,其次按时间倒序)
+
+        Returns:
+            ([(通知, 关联用户名)], 过滤后的总数)
+        """
+        conditions = [Notification.recipient_id == recipient_id]
+        if is_read is not None:
+            conditions.append(Notification.is_read == is_read)
+        if notification_type:
+            conditions.append(Notification.notification_type == notification_type)
+        if priority:
+            conditions.append(Notification.priority == priority)
+
+        total = (
+            await self.db.execute(select(func.count()).select_from(Notification).where(*conditions))
+        ).scalar() or 0
+
+        query = (
+            self._with_related_username()
+            .where(*conditions)
+            .order_by(PRIORITY_ORDER, Notification.created_at.desc(), Notification.notification_id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return [(row[0], row[1]) for row in result.all()], total
+
+    async def get(self, recipient_id: int, notification_id: int) -> Optional[NotificationRow]:
+        query = self._with_related_username().where(
+            and_(
+                Notification.notification_id == notification_id,
+                Notification.recipient_id == recipient_id,
+            )
+        )
+        row = (await self.db.execute(query)).first()
+        return (row[0], row[1]) if row is not None else None
+
+    async def grouped(self, recipient_id: int) -> List[NotificationGroupRow]:
+        """
+        按通知类型分组:每组总数、未读数与最新一条通知
+
+        一条查询完成:窗口函数在类型分区内计数并给通知按时间编号,只保留编号为 1 的行。
+        """
+        related_user = aliased(DimUser)
+        partition = Notification.notification_type
+        ranked = (
+            select(
+                Notification.notification_id.label("notification_id"),
+                func.count().over(partition_by=partition).label("total_count"),
+                func.sum(cast(~Notification.is_read, Integer)).over(partition_by=partition).label("unread_count"),
+                func.row_number()
+                .over(
+                    partition_by=partition,
+                    order_by=(Notification.created_at.desc(), Notification.notification_id.desc()),
+                )
+                .label("rn"),
+            )
+            .where(Notification.recipient_id == recipient_id)
+            .subquery()
+        )
+        query = (
+            select(Notification, related_user.username, ranked.c.total_count, ranked.c.unread_count)
+            .join(ranked, ranked.c.notification_id == Notification.notification_id)
+            .outerjoin(related_user, related_user.user_id == Notification.related_user_id)
+            .where(ranked.c.rn == 1)
+        )
+        result = await self.db.execute(query)
+        return [
+            NotificationGroupRow(
+                notification_type=notification.notification_type,
+                total_count=int(total_count or 0),
+                unread_count=int(unread_count or 0),
+                latest=notification,
+                latest_related_username=related_username,
+            )
+            for notification, related_username, total_count, unread_count in result.all()
+        ]
+
+
+def get_notification_read_model(db: AsyncSession) -> NotificationReadModel:
+    """获取通知读模型"""
+    return NotificationReadModel(db)
@@ -5,7 +5,7 @@
 from __future__ import annotations
 
 import json
-from collections import Counter, defaultdict
+from collections import defaultdict
 from typing import Any
 
 
@@ -103,48 +103,64 @@ def _first_present(row: dict[str, Any], fields: tuple[str, ...]) -> str | None:
     return None
 
 
-def prepare_orders_rows_for_b_class(
-    rows: list[dict[str, Any]],
-) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
-    """Prepare orders rows for B-class storage without changing metric grain.
+class OrdersRowPreparer:
+    """Stateful order-line numbering for rows that arrive in chunks.
 
-    The first source row for an order keeps order-level amounts. Additional
-    rows for the same order get a line index for hashing and keep order-level
-    amount fields blank so mart SUMs remain order-level.
+    Line counters and the last seen order id carry over between ``prepare``
+    calls, so an order split across two chunks gets the same identity values
+    as in a single whole-file pass.
     """
-    if not rows:
-        return [], []
 
-    order_ids: list[str] = []
-    last_order_id: str | None = None
-    for index, row in enumerate(rows):
-        order_id = _first_present(row, ORDER_ID_FIELDS)
-        if order_id:
-            last_order_id = order_id
-        order_ids.append(last_order_id or f"__missing_order_id__:{index}")
-
-    order_counts = Counter(order_ids)
-    line_counters: dict[str, int] = defaultdict(int)
-    prepared_rows: list[dict[str, Any]] = []
-    identity_values: list[dict[str, Any]] = []
-
-    for row, order_id in zip(rows, order_ids):
-        row_copy = dict(row)
-        row_identity: dict[str, Any] = {}
-
-        if order_counts[order_id] > 1:
-            line_counters[order_id] += 1
-            source_line_index = line_counters[order_id]
+    def __init__(self) -> None:
+        self._last_order_id: str | None = None
+        self._row_offset = 0
+        self._line_counters: dict[str, int] = defaultdict(int)
+
+    def prepare(
+        self,
+        rows: list[dict[str, Any]],
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        prepared_rows: list[dict[str, Any]] = []
+        identity_values: list[dict[str, Any]] = []
+
+        for row in rows:
+            order_id = _first_present(row, ORDER_ID_FIELDS)
+            if order_id:
+                self._last_order_id = order_id
+            order_key = self._last_order_id or f"__missing_order_id__:{self._row_offset}"
+            self._row_offset += 1
+
+            row_copy = dict(row)
+            row_identity: dict[str, Any] = {}
+
+            self._line_counters[order_key] += 1
+            source_line_index = self._line_counters[order_key]
             if source_line_index > 1:
                 row_identity[SOURCE_LINE_INDEX_FIELD] = source_line_index
                 for field in ORDER_LEVEL_AMOUNT_FIELDS:
                     if field in row_copy:
                         row_copy[field] = ""
 
-        prepared_rows.append(row_copy)
-        identity_values.append(row_identity)
+            prepared_rows.append(row_copy)
+            identity_values.append(row_identity)
+
+        return prepared_rows, identity_values
+
 
-    return prepared_rows, identity_values
+def prepare_orders_rows_for_b_class(
+    rows: list[dict[str, Any]],
+    preparer: OrdersRowPreparer | None = None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Prepare orders rows for B-class storage without changing metric grain.
+
+    The first source row for an order keeps order-level amounts. Additional
+    rows for the same order get a line index for hashing and keep order-level
+    amount fields blank so mart SUMs remain order-level. Pass the same
+    ``preparer`` for every chunk of one file to keep line numbering continuous.
+    """
+    if not rows:
+        return [], []
+    return (preparer or OrdersRowPreparer()).prepare(rows)
 
 
 def extend_orders_deduplication_fields(
@@ -55,6 +55,27 @@ class PayrollPeriodLockService:
                 f"{year_month} 工资单已确认，不能重新计算绩效或提成；请在下一工资月份补录。"
             )
 
+    async def assert_months_mutable(self, *, year_months: list[str]) -> None:
+        """Batch form of assert_month_mutable: one query for all requested months."""
+        if not year_months:
+            return
+        locked_months = sorted(
+            set(
+                (
+                    await self.db.execute(
+                        select(PayrollRecord.year_month).where(
+                            PayrollRecord.year_month.in_(year_months),
+                            PayrollRecord.status.in_(self.LOCKED_STATUSES),
+                        )
+                    )
+                ).scalars().all()
+            )
+        )
+        if locked_months:
+            raise PayrollPeriodLockedError(
+                f"{', '.join(locked_months)} 工资单已确认，不能重新计算绩效或提成；请在下一工资月份补录。"
+            )
+
     async def assert_salary_effective_date_mutable(
         self,
         *,
@@ -15,17 +15,29 @@ v4.17.0新增:
 - 集成动态列管理(根据模板字段添加列)
 """
 
-from typing import Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession  # [*] v4.18.2新增:异步支持
-from sqlalchemy import text, inspect
+from sqlalchemy import text
 from sqlalchemy.exc import ProgrammingError
 import asyncio  # [*] v4.18.2新增:用于run_in_executor
 
 from modules.core.logger import get_logger
+from backend.services.b_class_catalog_cache import get_b_class_catalog
+from backend.services.b_class_index_policy import INDEX_POLICY_ENABLED, index_profile, legacy_index_definitions
+from backend.services.b_class_partition_manager import PARTITIONING_ENABLED, get_b_class_partition_manager
 from backend.services.dynamic_column_manager import get_dynamic_column_manager, SYSTEM_FIELDS
 
 logger = get_logger(__name__)
 
+# 唯一索引列(使用COALESCE处理NULL值);分区表的唯一索引必须额外包含分区键 metric_date
+UNIQUE_HASH_INDEX_COLUMNS = "platform_code, COALESCE(shop_id, ''), data_domain, granularity, data_hash"
+
+
+def unique_hash_index_columns(partitioned: bool) -> str:
+    if partitioned:
+        return f"{UNIQUE_HASH_INDEX_COLUMNS}, metric_date"
+    return UNIQUE_HASH_INDEX_COLUMNS
+
 
 class PlatformTableManager:
     """
@@ -50,6 +62,8 @@ class PlatformTableManager:
         """
         self.db = db
         self.dynamic_column_manager = get_dynamic_column_manager(db)
+        self.catalog = get_b_class_catalog()
+        self.partitions = get_b_class_partition_manager(db)
         # [*] v4.19.0更新:异步模式下不在构造函数中执行DDL,由调用者显式调用
     
     def _ensure_b_class_schema(self):
@@ -189,10 +203,9 @@ class PlatformTableManager:
             return []
     
     def _table_exists(self, table_name: str) -> bool:
-        """检查表是否存在(在b_class schema中)"""
+        """检查表是否存在(在b_class schema中,读取目录缓存)"""
         try:
-            inspector = inspect(self.db.bind)
-            return table_name in inspector.get_table_names(schema='b_class')
+            return self.catalog.table_exists(self.db, table_name)
         except Exception as e:
             logger.error(f"[PlatformTableManager] 检查表存在性失败: {e}", exc_info=True)
             return False
@@ -209,14 +222,7 @@ class PlatformTableManager:
         """
         try:
             # 检查列是否存在
-            check_column_sql = text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_schema = 'b_class' 
-                AND table_name = :table_name
-                AND column_name IN ('period_start_date', 'period_end_date', 'period_start_time', 'period_end_time')
-            """)
-            existing_columns = {row[0] for row in self.db.execute(check_column_sql, {'table_name': table_name}).fetchall()}
+            existing_columns = self.catalog.get_columns(self.db, table_name) or frozenset()
             
             # 需要添加的列
             columns_to_add = []
@@ -271,33 +277,22 @@ class PlatformTableManager:
             
         except Exception as e:
             self.db.rollback()
+            self.catalog.invalidate(table_name)
             logger.error(f"[PlatformTableManager] [v4.18.1] 补齐period列失败: {e}", exc_info=True)
 
     def _ensure_unique_hash_index_contract(self, table_name: str, data_domain: str) -> None:
         """
         修复历史 services 表唯一索引缺少平台/店铺维度的问题。
         """
+        if data_domain.lower() != "services":
+            return
         try:
             index_name = f"uq_{table_name}_hash"
-            row = self.db.execute(
-                text(
-                    """
-                    SELECT indexdef
-                    FROM pg_indexes
-                    WHERE schemaname = 'b_class'
-                      AND indexname = :index_name
-                    """
-                ),
-                {"index_name": index_name},
-            ).fetchone()
-            if not row:
+            index_def = self.catalog.get_index_definition(self.db, table_name, index_name)
+            if index_def is None:
                 return
 
-            index_def = str(row[0] or "")
-            expected_fragment = "platform_code, COALESCE(shop_id, ''), data_domain, granularity, data_hash"
-            if data_domain.lower() != "services":
-                return
-            if expected_fragment in index_def:
+            if UNIQUE_HASH_INDEX_COLUMNS in index_def:
                 return
 
             logger.warning(
@@ -308,35 +303,57 @@ class PlatformTableManager:
                 text(
                     f'''
                     CREATE UNIQUE INDEX IF NOT EXISTS "{index_name}"
-                    ON b_class."{table_name}" (platform_code, COALESCE(shop_id, ''), data_domain, granularity, data_hash)
+                    ON b_class."{table_name}" ({unique_hash_index_columns(self.partitions.is_partitioned(table_name))})
                     '''
                 )
             )
             self.db.commit()
         except Exception as e:
             self.db.rollback()
+            self.catalog.invalidate(table_name)
             logger.error(
                 f"[PlatformTableManager] 修复唯一索引契约失败 (表={table_name}): {e}",
                 exc_info=True,
             )
     
+    def _base_index_definitions(
+        self,
+        table_name: str,
+        data_domain: str,
+        sub_domain: Optional[str]
+    ) -> List[Tuple[str, str]]:
+        """
+        基础索引定义列表:(索引名, 索引列定义)
+
+        开启 B_CLASS_INDEX_POLICY 时使用按数据域定义的入库友好索引画像,否则沿用统一索引集合。
+        """
+        if INDEX_POLICY_ENABLED:
+            return index_profile(table_name, data_domain)
+        return legacy_index_definitions(table_name, data_domain, sub_domain)
+    
     def _create_base_table(
         self,
         table_name: str,
         platform: str,
         data_domain: str,
         sub_domain: Optional[str],
-        granularity: str
+        granularity: str,
+        partitioned: Optional[bool] = None
     ):
         """
         创建基础表结构(系统字段)
         
+        partitioned 为 None 时取 B_CLASS_PARTITIONING;分区表按 metric_date 每月一个分区,
+        主键为 (id, metric_date),分区在入库时由 BClassPartitionManager 自动创建。
+        
         表结构:
         - 系统字段:id, platform_code, shop_id, data_domain, granularity, sub_domain,
                     metric_date, file_id, template_id, raw_data, header_columns,
                     data_hash, ingest_timestamp, currency_code
         - 动态列:根据模板字段动态添加(通过sync_table_columns方法)
         """
+        if partitioned is None:
+            partitioned = PARTITIONING_ENABLED
         try:
             # 构建CREATE TABLE SQL
             # [*] 注意:services域的表需要sub_domain字段,其他域sub_domain可为NULL
@@ -348,11 +365,16 @@ class PlatformTableManager:
                 # 其他域sub_domain可为NULL
                 sub_domain_column = "sub_domain VARCHAR(64),"
             
+            # 分区表的主键必须包含分区键
+            id_column = "id BIGSERIAL," if partitioned else "id BIGSERIAL PRIMARY KEY,"
+            partition_key_constraint = ", PRIMARY KEY (id, metric_date)" if partitioned else ""
+            partition_clause = " PARTITION BY RANGE (metric_date)" if partitioned else ""
+            
             # v4.18.0: 添加period_start_date, period_end_date, period_start_time, period_end_time字段
             # 用于支持日期范围数据(如周度/月度数据)和精确时间查询
             create_table_sql = text(f"""
                 CREATE TABLE IF NOT EXISTS b_class."{table_name}" (
-                    id BIGSERIAL PRIMARY KEY,
+                    {id_column}
                     platform_code VARCHAR(32) NOT NULL,
                     shop_id VARCHAR(256),
                     data_domain VARCHAR(64) NOT NULL DEFAULT '{data_domain}',
@@ -369,8 +391,8 @@ class PlatformTableManager:
                     header_columns JSONB,
                     data_hash VARCHAR(64) NOT NULL,
                     ingest_timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
-                    currency_code VARCHAR(3)
-                )
+                    currency_code VARCHAR(3){partition_key_constraint}
+                ){partition_clause}
             """)
             
             self.db.execute(create_table_sql)
@@ -379,34 +401,17 @@ class PlatformTableManager:
             # [WARN] PostgreSQL的UNIQUE约束不支持表达式,需要使用唯一索引
             unique_index_sql = text(f"""
                 CREATE UNIQUE INDEX IF NOT EXISTS "uq_{table_name}_hash" 
-                ON b_class."{table_name}" (platform_code, COALESCE(shop_id, ''), data_domain, granularity, data_hash)
+                ON b_class."{table_name}" ({unique_hash_index_columns(partitioned)})
             """)
             
             self.db.execute(unique_index_sql)
             
-            # 创建其他索引(在b_class schema中)
+            # 创建其他索引(在b_class schema中;分区表上建在父表,自动传播到各分区)
             indexes_sql = [
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_platform" ON b_class."{table_name}" (platform_code)'),
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_shop" ON b_class."{table_name}" (shop_id)'),
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_domain" ON b_class."{table_name}" (data_domain)'),
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_granularity" ON b_class."{table_name}" (granularity)'),
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_date" ON b_class."{table_name}" (metric_date)'),
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_file" ON b_class."{table_name}" (file_id)'),
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_hash" ON b_class."{table_name}" (data_hash)'),
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_currency" ON b_class."{table_name}" (currency_code)'),
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_gin" ON b_class."{table_name}" USING GIN (raw_data)'),
-                # v4.18.0: 日期范围索引(所有记录)
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_period_date" ON b_class."{table_name}" (period_start_date, period_end_date)'),
-                # v4.18.0: 时间范围索引(部分索引,仅索引有时间信息的记录)
-                text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_period_time" ON b_class."{table_name}" (period_start_time, period_end_time) WHERE period_start_time IS NOT NULL'),
+                text(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON b_class."{table_name}" {index_body}')
+                for index_name, index_body in self._base_index_definitions(table_name, data_domain, sub_domain)
             ]
             
-            # services域的表需要sub_domain索引
-            if data_domain.lower() == 'services' and sub_domain:
-                indexes_sql.append(
-                    text(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_sub_domain" ON b_class."{table_name}" (sub_domain)')
-                )
-            
             for index_sql in indexes_sql:
                 try:
                     self.db.execute(index_sql)
@@ -437,12 +442,147 @@ class PlatformTableManager:
             
         except Exception as e:
             self.db.rollback()
+            self.catalog.invalidate(table_name)
             logger.error(
                 f"[PlatformTableManager] 创建表失败 (表={table_name}): {e}",
                 exc_info=True
             )
             raise
 
+    def migrate_to_partitioned(
+        self,
+        table_name: str,
+        data_domain: str,
+        sub_domain: Optional[str] = None,
+        drop_legacy: bool = False
+    ) -> Dict[str, Any]:
+        """
+        把已有的普通表迁移为按 metric_date 月分区的表(表名不变)
+
+        步骤(单个事务):
+        1. 原表及其索引重命名为 *_legacy
+        2. 以 LIKE 原表(含动态列、默认值、id 序列)创建同名分区父表,补齐外键
+        3. 按原表中出现的月份建分区并整表复制数据
+        4. 重建依赖该表的普通视图(CREATE OR REPLACE,重新绑定到新表)
+        索引在数据复制完成后逐分区创建(每个分区单独提交)。
+
+        物化视图无法就地重新绑定,仍引用 *_legacy 表;此时不会删除 legacy 表,
+        需重新执行 dashboard bootstrap 后再手动删除。
+
+        Returns:
+            迁移结果(分区数、复制行数、重建的视图、仍引用 legacy 的物化视图)
+        """
+        if self.partitions.is_partitioned(table_name):
+            return {"table": table_name, "status": "already_partitioned"}
+        if not self._table_exists(table_name):
+            raise ValueError(f"表不存在: b_class.{table_name}")
+
+        legacy_name = table_name[:56] + "_legacy"
+        qualified = f'b_class."{table_name}"'
+        try:
+            dependents = self.db.execute(
+                text(
+                    """
+                    SELECT DISTINCT n.nspname, v.relname, v.relkind, pg_get_viewdef(v.oid)
+                    FROM pg_depend d
+                    JOIN pg_rewrite r ON r.oid = d.objid
+                    JOIN pg_class v ON v.oid = r.ev_class
+                    JOIN pg_namespace n ON n.oid = v.relnamespace
+                    WHERE d.refobjid = to_regclass(:qualified_name)
+                      AND v.oid <> d.refobjid
+                    """
+                ),
+                {"qualified_name": qualified},
+            ).fetchall()
+            index_names = [
+                row[0]
+                for row in self.db.execute(
+                    text("SELECT indexname FROM pg_indexes WHERE schemaname = 'b_class' AND tablename = :table_name"),
+                    {"table_name": table_name},
+                ).fetchall()
+            ]
+            sequence_name = self.db.execute(
+                text("SELECT pg_get_serial_sequence(:qualified_name, 'id')"),
+                {"qualified_name": qualified},
+            ).scalar()
+            months = [
+                row[0]
+                for row in self.db.execute(
+                    text(f"SELECT DISTINCT date_trunc('month', metric_date)::date FROM {qualified} ORDER BY 1")
+                ).fetchall()
+            ]
+
+            # 1. 原表及索引让出名称(主键约束随索引一起重命名)
+            self.db.execute(text(f'ALTER TABLE {qualified} RENAME TO "{legacy_name}"'))
+            for index_name in index_names:
+                self.db.execute(text(f'ALTER INDEX b_class."{index_name}" RENAME TO "{index_name[:56]}_legacy"'))
+
+            # 2. 同名分区父表
+            self.db.execute(
+                text(
+                    f'CREATE TABLE {qualified} (LIKE b_class."{legacy_name}" INCLUDING DEFAULTS, '
+                    f"PRIMARY KEY (id, metric_date)) PARTITION BY RANGE (metric_date)"
+                )
+            )
+            self.db.execute(
+                text(f"ALTER TABLE {qualified} ADD FOREIGN KEY (file_id) REFERENCES catalog_files(id) ON DELETE SET NULL")
+            )
+            self.db.execute(
+                text(
+                    f"ALTER TABLE {qualified} ADD FOREIGN KEY (template_id) "
+                    f"REFERENCES field_mapping_templates(id) ON DELETE SET NULL"
+                )
+            )
+            if sequence_name:
+                # id 序列归属新表,删除 legacy 表时不会连带删除
+                self.db.execute(text(f"ALTER SEQUENCE {sequence_name} OWNED BY {qualified}.id"))
+
+            # 3. 分区 + 数据
+            self.partitions.ensure_partitions(table_name, months, commit=False)
+            copied = self.db.execute(text(f'INSERT INTO {qualified} SELECT * FROM b_class."{legacy_name}"')).rowcount
+
+            # 4. 普通视图重新绑定到新表
+            rebound_views, legacy_matviews = [], []
+            for schema, view_name, relkind, definition in dependents:
+                if relkind == "v":
+                    self.db.execute(text(f'CREATE OR REPLACE VIEW "{schema}"."{view_name}" AS {definition}'))
+                    rebound_views.append(f"{schema}.{view_name}")
+                else:
+                    legacy_matviews.append(f"{schema}.{view_name}")
+
+            if drop_legacy and not legacy_matviews:
+                self.db.execute(text(f'DROP TABLE b_class."{legacy_name}"'))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            self.catalog.invalidate()
+            logger.error(f"[PlatformTableManager] 分区迁移失败 (表={table_name}): {e}", exc_info=True)
+            raise
+
+        # 索引在数据就位后逐分区创建
+        self.partitions.create_index(
+            table_name, f"uq_{table_name}_hash", f"({unique_hash_index_columns(True)})", unique=True
+        )
+        for index_name, index_body in self._base_index_definitions(table_name, data_domain, sub_domain):
+            self.partitions.create_index(table_name, index_name, index_body)
+
+        if legacy_matviews:
+            logger.warning(
+                f"[PlatformTableManager] 表 {table_name} 已迁移为分区表,以下物化视图仍引用 {legacy_name},"
+                f"请重新执行 dashboard bootstrap 后再删除旧表: {legacy_matviews}"
+            )
+        result = {
+            "table": table_name,
+            "status": "migrated",
+            "partitions": len(months),
+            "rows_copied": copied,
+            "rebound_views": rebound_views,
+            "legacy_table": None if drop_legacy and not legacy_matviews else legacy_name,
+            "legacy_materialized_views": legacy_matviews,
+        }
+        logger.info(f"[PlatformTableManager] 分区迁移完成: {result}")
+        return result
+
 
 def get_platform_table_manager(db: AsyncSession) -> PlatformTableManager:
     """
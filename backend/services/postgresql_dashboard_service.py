@@ -1,5 +1,12 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import functools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from datetime import date as date_cls
 from datetime import datetime, timedelta, timezone
 from typing import Any
@@ -8,6 +15,7 @@ from sqlalchemy import text
 from sqlalchemy.exc import ProgrammingError
 
 from backend.models.database import AsyncSessionLocal
+from backend.services.dashboard_query_metrics import get_dashboard_query_metrics, sql_module_label
 from backend.services.labor_cost_policy_service import LaborCostPolicyService
 
 
@@ -905,10 +913,100 @@ def _previous_store_analysis_anchor(granularity: str, target_date: str) -> str:
     raise ValueError("granularity must be one of daily/weekly/monthly/quarterly/yearly")
 
 
+BUSINESS_OVERVIEW_BATCH_MODULES = (
+    "kpi",
+    "comparison",
+    "shop_racing",
+    "traffic_ranking",
+    "inventory_backlog",
+    "operational_metrics",
+)
+
+
+@dataclass
+class _SharedFetchScope:
+    """One session plus a row memo shared by every module of a batch request."""
+
+    session: Any
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    rows: dict[tuple[str, tuple[tuple[str, str], ...]], list[dict[str, Any]]] = field(default_factory=dict)
+    query_count: int = 0
+    shared_hits: int = 0
+
+
+_shared_fetch_scope: ContextVar[_SharedFetchScope | None] = ContextVar(
+    "postgresql_dashboard_shared_fetch_scope",
+    default=None,
+)
+
+
+@dataclass
+class _ModuleTiming:
+    db_seconds: float = 0.0
+
+
+_module_timing: ContextVar[_ModuleTiming | None] = ContextVar(
+    "postgresql_dashboard_module_timing",
+    default=None,
+)
+
+
+def _instrumented_module(module: str):
+    """Record a service call's total time split into session time and Python reduce time."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _module_timing.get() is not None:
+                return await func(*args, **kwargs)
+            timing = _ModuleTiming()
+            token = _module_timing.set(timing)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _module_timing.reset(token)
+                get_dashboard_query_metrics().observe_module(
+                    module,
+                    time.perf_counter() - started,
+                    timing.db_seconds,
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def _fetch_memo_key(query: str, params: dict[str, Any]) -> tuple[str, tuple[tuple[str, str], ...]]:
+    return query, tuple(sorted((str(name), repr(value)) for name, value in params.items()))
+
+
+def normalize_business_overview_module_requests(modules: list[Any]) -> list[tuple[str, str, dict[str, Any]]]:
+    """Return ``(key, module, options)`` triples; plain strings name a module with defaults."""
+    if not modules:
+        raise ValueError("at least one module is required")
+    normalized: list[tuple[str, str, dict[str, Any]]] = []
+    seen_keys: set[str] = set()
+    for item in modules:
+        if isinstance(item, str):
+            module, key, options = item, item, {}
+        elif isinstance(item, dict):
+            module = str(item.get("module") or "")
+            key = str(item.get("key") or module)
+            options = dict(item.get("options") or {})
+        else:
+            raise ValueError(f"invalid module request: {item!r}")
+        if module not in BUSINESS_OVERVIEW_BATCH_MODULES:
+            raise ValueError(f"unsupported business overview module: {module}")
+        if key in seen_keys:
+            raise ValueError(f"duplicate module key: {key}")
+        seen_keys.add(key)
+        normalized.append((key, module, options))
+    return normalized
+
+
 class PostgresqlDashboardService:
     def __init__(self) -> None:
-        import asyncio
-
         self._column_cache: dict[tuple[str, str], set[str]] = {}
         self._column_cache_lock = asyncio.Lock()
 
@@ -940,10 +1038,77 @@ class PostgresqlDashboardService:
             self._column_cache[cache_key] = columns
             return columns
 
-    async def _fetch_rows(self, query: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+    @asynccontextmanager
+    async def shared_fetch_scope(self) -> AsyncIterator[_SharedFetchScope]:
+        """Route every fetch of the current task through one session and memoize identical reads."""
+        active = _shared_fetch_scope.get()
+        if active is not None:
+            yield active
+            return
         async with AsyncSessionLocal() as session:
+            scope = _SharedFetchScope(session=session)
+            token = _shared_fetch_scope.set(scope)
+            try:
+                yield scope
+            finally:
+                _shared_fetch_scope.reset(token)
+
+    @asynccontextmanager
+    async def _open_session(self, *, shared: bool = True) -> AsyncIterator[Any]:
+        scope = _shared_fetch_scope.get() if shared else None
+        started = time.perf_counter()
+        try:
+            if scope is None:
+                async with AsyncSessionLocal() as session:
+                    yield session
+                return
+            # AsyncSession is not safe for concurrent use; serialize modules on the shared one.
+            async with scope.lock:
+                scope.query_count += 1
+                yield scope.session
+        finally:
+            timing = _module_timing.get()
+            if timing is not None:
+                timing.db_seconds += time.perf_counter() - started
+
+    async def _execute_rows(
+        self,
+        session: Any,
+        query: str,
+        params: dict[str, Any],
+        *,
+        rollback_on_error: bool = False,
+    ) -> list[dict[str, Any]]:
+        module = sql_module_label(query)
+        started = time.perf_counter()
+        try:
             result = await session.execute(text(query), params)
-            return [dict(row) for row in result.mappings().all()]
+            rows = [dict(row) for row in result.mappings().all()]
+        except Exception:
+            get_dashboard_query_metrics().observe_query(module, time.perf_counter() - started, 0, failed=True)
+            if rollback_on_error:
+                await session.rollback()
+            raise
+        get_dashboard_query_metrics().observe_query(module, time.perf_counter() - started, len(rows))
+        return rows
+
+    async def _fetch_rows(self, query: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+        scope = _shared_fetch_scope.get()
+        if scope is None:
+            async with self._open_session() as session:
+                return await self._execute_rows(session, query, params)
+
+        memo_key = _fetch_memo_key(query, params)
+        cached = scope.rows.get(memo_key)
+        if cached is None:
+            async with self._open_session() as session:
+                # Keep the shared transaction usable for the remaining modules.
+                cached = await self._execute_rows(session, query, params, rollback_on_error=True)
+            scope.rows[memo_key] = cached
+        else:
+            scope.shared_hits += 1
+        # Reducers annotate rows in place, so every module gets its own copies.
+        return [dict(row) for row in cached]
 
     async def _fetch_rows_with_statement_timeout(
         self,
@@ -952,13 +1117,13 @@ class PostgresqlDashboardService:
         *,
         timeout_ms: int,
     ) -> list[dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
+        # SET LOCAL would outlive this statement on a shared session, so always use a private one.
+        async with self._open_session(shared=False) as session:
             await session.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
-            result = await session.execute(text(query), params)
-            return [dict(row) for row in result.mappings().all()]
+            return await self._execute_rows(session, query, params)
 
     async def _load_active_employee_count(self, _period_key: date_cls) -> int:
-        async with AsyncSessionLocal() as session:
+        async with self._open_session() as session:
             try:
                 result = await session.execute(
                     text(
@@ -1092,7 +1257,7 @@ class PostgresqlDashboardService:
         platform: str | None = None,
         shop_id: str | None = None,
     ) -> dict[str, float]:
-        async with AsyncSessionLocal() as session:
+        async with self._open_session() as session:
             if granularity == "monthly":
                 if platform or shop_id:
                     try:
@@ -1314,7 +1479,7 @@ class PostgresqlDashboardService:
     ) -> float | None:
         """Use the same persisted expense and projected-labor sources as expense management."""
         year_month = period_month.strftime("%Y-%m")
-        async with AsyncSessionLocal() as session:
+        async with self._open_session() as session:
             effective_month = await LaborCostPolicyService(session).get_effective_month()
             use_projected_labor = bool(
                 effective_month is not None and year_month >= effective_month
@@ -1581,6 +1746,7 @@ class PostgresqlDashboardService:
             "latest_metric_date": row.get("latest_metric_date"),
         }
 
+    @_instrumented_module("business_overview_data_freshness")
     async def get_business_overview_data_freshness(
         self,
         platform: str | None = None,
@@ -1652,6 +1818,7 @@ class PostgresqlDashboardService:
             "warnings": warnings,
         }
 
+    @_instrumented_module("business_overview_kpi")
     async def get_business_overview_kpi(
         self,
         month: str | None = None,
@@ -1684,6 +1851,7 @@ class PostgresqlDashboardService:
         previous_reduced = await self._reduce_business_overview_kpi_snapshot(previous_rows, previous_period_key)
         return self._attach_business_overview_kpi_changes(reduced, previous_reduced)
 
+    @_instrumented_module("business_overview_comparison")
     async def get_business_overview_comparison(
         self,
         granularity: str,
@@ -1775,6 +1943,7 @@ class PostgresqlDashboardService:
         )
         return reduced
 
+    @_instrumented_module("business_overview_inventory_backlog")
     async def get_business_overview_inventory_backlog(
         self,
         min_days: int = 30,
@@ -1801,6 +1970,7 @@ class PostgresqlDashboardService:
             ),
         }
 
+    @_instrumented_module("clearance_ranking")
     async def get_clearance_ranking(
         self,
         min_days: int = 30,
@@ -1859,6 +2029,7 @@ class PostgresqlDashboardService:
             ranked.append(normalized)
         return ranked
 
+    @_instrumented_module("business_overview_shop_racing")
     async def get_business_overview_shop_racing(
         self,
         granularity: str,
@@ -2041,6 +2212,7 @@ class PostgresqlDashboardService:
             )
         return rank_shop_racing_rows(normalized_rows)
 
+    @_instrumented_module("business_overview_traffic_ranking")
     async def get_business_overview_traffic_ranking(
         self,
         granularity: str,
@@ -2714,6 +2886,7 @@ class PostgresqlDashboardService:
             "items": items,
         }
 
+    @_instrumented_module("business_overview_operational_metrics")
     async def get_business_overview_operational_metrics(
         self,
         month: str,
@@ -2855,6 +3028,105 @@ class PostgresqlDashboardService:
         total["meta"] = meta
         return total
 
+    async def _resolve_business_overview_module(
+        self,
+        module: str,
+        options: dict[str, Any],
+        *,
+        granularity: str,
+        target_date: str,
+        platform: str | None,
+        shop_id: str | None,
+    ) -> Any:
+        if module == "kpi":
+            return await self.get_business_overview_kpi(
+                month=target_date,
+                platform=platform,
+                granularity=granularity,
+                target_date=target_date,
+                shop_id=shop_id,
+            )
+        if module == "comparison":
+            return await self.get_business_overview_comparison(
+                granularity=granularity,
+                target_date=target_date,
+                platform=platform,
+            )
+        if module == "shop_racing":
+            return await self.get_business_overview_shop_racing(
+                granularity=granularity,
+                target_date=target_date,
+                group_by=str(options.get("group_by") or "shop"),
+                platform=platform,
+            )
+        if module == "traffic_ranking":
+            return await self.get_business_overview_traffic_ranking(
+                granularity=granularity,
+                target_date=target_date,
+                dimension=str(options.get("dimension") or "visitor"),
+                platform=platform,
+            )
+        if module == "inventory_backlog":
+            return await self.get_business_overview_inventory_backlog(
+                min_days=int(options.get("min_days") or 30),
+                limit=int(options.get("limit") or 20),
+                granularity=granularity,
+                target_date=target_date,
+            )
+        if module == "operational_metrics":
+            period = _normalize_period_start(target_date)
+            return await self.get_business_overview_operational_metrics(
+                month=date_cls(period.year, period.month, 1).isoformat(),
+                platform=platform,
+                shop_id=shop_id,
+            )
+        raise ValueError(f"unsupported business overview module: {module}")
+
+    async def get_business_overview_batch(
+        self,
+        modules: list[Any],
+        granularity: str,
+        target_date: str,
+        platform: str | None = None,
+        shop_id: str | None = None,
+    ) -> dict[str, Any]:
+        """Resolve several business-overview modules for one period in a single session.
+
+        Modules run one after another on the shared session; identical source
+        reads (same SQL and parameters) are executed once and handed to every
+        module that needs them. A failing module is reported under ``errors``
+        without discarding the others.
+        """
+        requests = normalize_business_overview_module_requests(modules)
+        effective_granularity = str(granularity or "monthly").strip().lower()
+        _normalize_period_start(target_date)
+
+        results: dict[str, Any] = {}
+        errors: dict[str, str] = {}
+        async with self.shared_fetch_scope() as scope:
+            for key, module, options in requests:
+                try:
+                    results[key] = await self._resolve_business_overview_module(
+                        module,
+                        options,
+                        granularity=effective_granularity,
+                        target_date=target_date,
+                        platform=platform,
+                        shop_id=shop_id,
+                    )
+                except ValueError:
+                    raise
+                except Exception as exc:
+                    errors[key] = str(exc)
+            query_count = scope.query_count
+            shared_hits = scope.shared_hits
+
+        return {
+            "modules": results,
+            "errors": errors,
+            "query_stats": {"queries": query_count, "shared_hits": shared_hits},
+        }
+
     async def get_b_cost_analysis_overview(
         self,
         period_month: str,
@@ -90,6 +90,40 @@ async def load_shop_monthly_metrics(
     return metrics_by_shop
 
 
+async def load_shop_monthly_metrics_for_months(
+    db: AsyncSession,
+    year_months: list[str],
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Load monthly shop metrics for several months in one query, keyed by year_month."""
+    period_keys = sorted({_normalize_period_start(year_month) for year_month in year_months})
+    metrics_by_month: dict[str, dict[str, dict[str, float]]] = {
+        period_key.strftime("%Y-%m"): {} for period_key in period_keys
+    }
+    if not period_keys:
+        return metrics_by_month
+    result = await _execute_shop_racing_query_with_recovery(
+        db,
+        """
+            SELECT period_key, platform_code, shop_id, gmv, profit, achievement_rate
+            FROM api.business_overview_shop_racing_module
+            WHERE granularity = 'monthly'
+              AND period_key = ANY(:period_keys)
+        """,
+        {"period_keys": period_keys},
+    )
+
+    for row in result.mappings().all():
+        period_key = row.get("period_key")
+        year_month = period_key.strftime("%Y-%m") if hasattr(period_key, "strftime") else str(period_key)[:7]
+        key = _shop_key(row.get("platform_code"), row.get("shop_id"))
+        metrics_by_month.setdefault(year_month, {})[key] = {
+            "monthly_sales": _to_float(row.get("gmv")),
+            "monthly_profit": _to_float(row.get("profit")),
+            "achievement_rate": _to_float(row.get("achievement_rate")),
+        }
+    return metrics_by_month
+
+
 async def load_shop_monthly_target_achievement(
     db: AsyncSession,
     year_month: str,
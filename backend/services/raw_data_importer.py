@@ -30,6 +30,7 @@ from backend.services.executor_manager import (
     get_executor_manager,
 )  # v4.19.0新增:使用统一执行器管理器
 
+from backend.services.b_class_catalog_cache import get_b_class_catalog
 from backend.services.dynamic_column_manager import get_dynamic_column_manager
 from backend.services.deduplication_fields_config import (  # [*] v4.15.0新增
     get_deduplication_strategy,
@@ -69,6 +70,7 @@ class RawDataImporter:
         """
         self.db = db
         self.table_manager = get_platform_table_manager(db)
+        self.catalog = get_b_class_catalog()
 
     def get_target_table_name(
         self,
@@ -813,6 +815,13 @@ class RawDataImporter:
                     )
                     # 动态列管理失败不影响数据入库(继续使用raw_data JSONB)
 
+            # 分区表(B_CLASS_PARTITIONING):按本批metric_date自动创建缺失的月分区
+            # 分区已存在时只读目录缓存,不发出查询
+            metric_dates = [record["metric_date"] for record in insert_data]
+            is_partitioned = self.table_manager.partitions.is_partitioned(table_name)
+            if is_partitioned:
+                self.table_manager.partitions.ensure_partitions(table_name, metric_dates)
+
             # [*] v4.14.0修复:不要在这里填充动态列
             # 原因:SQLAlchemy ORM模型不包含动态列,会导致"Unconsumed column names"错误
             # 解决方案:先使用ORM插入系统字段,然后使用原始SQL更新动态列
@@ -844,11 +853,10 @@ class RawDataImporter:
                 new_index_name = f"uq_{table_name}_hash"
                 is_expression_index_for_query = False
                 try:
-                    check_index_def_sql = text(
-                        f"SELECT indexdef FROM pg_indexes "
-                        f"WHERE indexname = '{new_index_name}' AND schemaname = 'b_class'"
+                    index_def = (
+                        self.catalog.get_index_definition(self.db, table_name, new_index_name)
+                        or ""
                     )
-                    index_def = self.db.execute(check_index_def_sql).scalar() or ""
                     if index_def:
                         # 检查索引定义中是否包含COALESCE或其他表达式
                         is_expression_index_for_query = (
@@ -892,6 +900,14 @@ class RawDataImporter:
                     where_clause += " AND sub_domain = :sub_domain"
                     where_params["sub_domain"] = sub_domain
 
+                # 分区表:限定在本批的metric_date范围内,只扫描涉及的月分区
+                # (分区表的唯一键包含metric_date,范围外的行不可能冲突)
+                batch_dates = [value for value in metric_dates if value is not None]
+                if is_partitioned and batch_dates:
+                    where_clause += " AND metric_date BETWEEN :min_metric_date AND :max_metric_date"
+                    where_params["min_metric_date"] = min(batch_dates)
+                    where_params["max_metric_date"] = max(batch_dates)
+
                 # [*] v4.17.1优化:使用LIMIT优化查询(如果只需要检查是否存在,不需要全部数据)
                 # 但为了准确统计INSERT/UPDATE,我们需要查询所有匹配的data_hash
                 select_columns = (
@@ -928,19 +944,13 @@ class RawDataImporter:
             index_exists = False
             is_expression_index = False
             try:
-                check_index_sql = text(
-                    f"SELECT COUNT(*) FROM pg_indexes "
-                    f"WHERE indexname = '{new_index_name}'"
+                index_def = self.catalog.get_index_definition(
+                    self.db, table_name, new_index_name
                 )
-                index_exists = self.db.execute(check_index_sql).scalar() > 0
+                index_exists = index_def is not None
 
                 # [*] v4.14.0修复:如果索引存在,检查是否是表达式索引
                 if index_exists:
-                    check_index_def_sql = text(
-                        f"SELECT indexdef FROM pg_indexes "
-                        f"WHERE indexname = '{new_index_name}'"
-                    )
-                    index_def = self.db.execute(check_index_def_sql).scalar() or ""
                     # 检查索引定义中是否包含COALESCE或其他表达式
                     is_expression_index = (
                         "COALESCE" in index_def.upper() or "(" in index_def
@@ -1004,18 +1014,12 @@ class RawDataImporter:
             index_exists = False
             is_expression_index = False
             try:
-                check_index_sql = text(
-                    f"SELECT COUNT(*) FROM pg_indexes "
-                    f"WHERE indexname = '{new_index_name}'"
+                index_def = self.catalog.get_index_definition(
+                    self.db, table_name, new_index_name
                 )
-                index_exists = self.db.execute(check_index_sql).scalar() > 0
+                index_exists = index_def is not None
 
                 if index_exists:
-                    check_index_def_sql = text(
-                        f"SELECT indexdef FROM pg_indexes "
-                        f"WHERE indexname = '{new_index_name}'"
-                    )
-                    index_def = self.db.execute(check_index_def_sql).scalar() or ""
                     is_expression_index = (
                         "COALESCE" in index_def.upper() or "(" in index_def
                     )
@@ -1096,6 +1100,9 @@ class RawDataImporter:
                     conflict_clause = (
                         "(platform_code, shop_id, data_domain, granularity, data_hash)"
                     )
+                # 分区表的唯一索引必须包含分区键metric_date
+                if is_partitioned:
+                    conflict_clause = conflict_clause[:-1] + ", metric_date)"
 
                 if is_upsert:
                     # UPSERT策略:ON CONFLICT ... DO UPDATE
@@ -1597,6 +1604,8 @@ class RawDataImporter:
 
         except Exception as e:
             self.db.rollback()
+            # 失败可能源于其他进程的DDL导致目录缓存过期,下次入库重新加载
+            self.catalog.invalidate()
             logger.error(f"[RawDataImporter] 批量插入失败: {e}", exc_info=True)
             raise
 
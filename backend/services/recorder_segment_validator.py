@@ -5,7 +5,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from playwright.async_api import async_playwright, expect
 from sqlalchemy import select
 
 from backend.services.component_test_service import ComponentTestService
@@ -309,6 +308,8 @@ class RecorderSegmentValidator:
         steps: List[Dict[str, Any]],
         download_file_path: Optional[str],
     ) -> Optional[str]:
+        from playwright.async_api import expect
+
         if resolved_signal == "export_complete":
             gate = evaluate_export_complete(file_path=download_file_path)
             if gate.status is GateStatus.READY:
@@ -383,6 +384,8 @@ class RecorderSegmentValidator:
             signal=resolved_signal,
         )
 
+        from playwright.async_api import async_playwright
+
         try:
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=False)
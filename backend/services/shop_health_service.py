@@ -36,6 +36,21 @@ from modules.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 排名得分档位:(百分位上限, 得分);超出所有档位时取保底得分
+GMV_SCORE_TIERS = ((10, 30.0), (30, 25.0), (50, 20.0), (70, 15.0))
+GMV_SCORE_FLOOR = 10.0
+CONVERSION_SCORE_TIERS = ((10, 25.0), (30, 20.0), (50, 15.0), (70, 10.0))
+CONVERSION_SCORE_FLOOR = 5.0
+
+
+def score_by_rank(rank: int, total: int, tiers, floor: float) -> float:
+    """按排名百分位取得分(排名越靠前得分越高)"""
+    percentile = (rank / total) * 100
+    for upper, score in tiers:
+        if percentile <= upper:
+            return score
+    return floor
+
 
 class ShopHealthService:
     """店铺健康度评分服务"""
@@ -340,18 +355,7 @@ class ShopHealthService:
         
         # 计算得分:排名越靠前得分越高
         # 前10%:30分,前30%:25分,前50%:20分,前70%:15分,其他:10分
-        percentile = (rank / total_shops) * 100
-        
-        if percentile <= 10:
-            return 30.0
-        elif percentile <= 30:
-            return 25.0
-        elif percentile <= 50:
-            return 20.0
-        elif percentile <= 70:
-            return 15.0
-        else:
-            return 10.0
+        return score_by_rank(rank, total_shops, GMV_SCORE_TIERS, GMV_SCORE_FLOOR)
     
     def _calculate_conversion_score(
         self,
@@ -375,21 +379,10 @@ class ShopHealthService:
                 break
         
         # 计算得分:排名越靠前得分越高
-        percentile = (rank / total_shops) * 100
-        
-        if percentile <= 10:
-            return 25.0
-        elif percentile <= 30:
-            return 20.0
-        elif percentile <= 50:
-            return 15.0
-        elif percentile <= 70:
-            return 10.0
-        else:
-            return 5.0
+        return score_by_rank(rank, total_shops, CONVERSION_SCORE_TIERS, CONVERSION_SCORE_FLOOR)
     
+    @staticmethod
     def _calculate_inventory_score(
-        self,
         shop_metrics: Dict[str, Any],
         all_shops_metrics: List[Dict[str, Any]]
     ) -> float:
@@ -409,8 +402,8 @@ class ShopHealthService:
         else:
             return 5.0
     
+    @staticmethod
     def _calculate_service_score(
-        self,
         shop_metrics: Dict[str, Any],
         all_shops_metrics: List[Dict[str, Any]]
     ) -> float:
@@ -430,8 +423,8 @@ class ShopHealthService:
         else:
             return 4.0
     
+    @staticmethod
     def _assess_risk(
-        self,
         health_score: float,
         shop_metrics: Dict[str, Any],
         all_shops_metrics: List[Dict[str, Any]]
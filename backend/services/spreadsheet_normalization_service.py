@@ -9,7 +9,6 @@ import subprocess
 import tempfile
 from typing import Optional
 
-import openpyxl
 import pandas as pd
 
 from modules.core.logger import get_logger
@@ -243,6 +242,8 @@ class SpreadsheetNormalizationService:
         return converted_path
 
     def _strip_workbook_to_values_only(self, source_xlsx: Path, output_path: Path) -> None:
+        import openpyxl
+
         workbook = openpyxl.load_workbook(source_xlsx, data_only=True, read_only=False)
         try:
             stripped = openpyxl.Workbook()
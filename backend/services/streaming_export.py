@@ -0,0 +1,651 @@
+"""
+流式导出引擎(Streaming Export Engine)
+
+导出接口原先的做法是 `.scalars().all()` 取出全部 ORM 对象,拼成 DataFrame 或 openpyxl
+工作簿,在 BytesIO 里写完整个文件后才开始返回响应;大文件导出时内存峰值与结果集成正比,
+首字节要等到整个工作簿生成完毕,经常超时。
+
+这里的引擎按块处理:
+- 读取:服务端游标流式查询(stream + yield_per),每次只持有 EXPORT_CHUNK_SIZE 行
+- 写入:XLSX 由流式 zip 写出(工作表 XML 逐行追加、inlineStr 单元格,不需要共享字符串表),
+  CSV 逐块编码(带 BOM,Excel 直接打开不乱码);每块写完立即把已生成的字节发给客户端
+- 超过 EXPORT_BACKGROUND_ROW_THRESHOLD 行的导出转为任务中心后台任务(task_family="export"),
+  文件写到 EXPORT_DIR,完成后通过 GET /api/task-center/tasks/{task_id}/artifact 下载
+
+流式响应在生成器内使用独立会话读取,不依赖请求作用域的数据库会话。
+后台导出在当前进程内执行,服务重启时未完成的导出任务由 fail_orphaned_export_jobs 标记为失败。
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import csv
+import io
+import math
+import os
+import re
+import time
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timezone
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+from urllib.parse import quote
+from uuid import uuid4
+from xml.sax.saxutils import escape
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.database import AsyncSessionLocal
+from backend.services.task_center_service import TaskCenterService
+from backend.utils.api_response import success_response
+from modules.core.logger import get_logger
+from modules.core.db import TaskCenterTask
+from modules.core.path_manager import get_data_dir
+
+logger = get_logger(__name__)
+
+EXPORT_CHUNK_SIZE = max(1, int(os.getenv("EXPORT_CHUNK_SIZE", "2000")))
+EXPORT_BACKGROUND_ROW_THRESHOLD = max(0, int(os.getenv("EXPORT_BACKGROUND_ROW_THRESHOLD", "50000")))
+EXPORT_RETENTION_HOURS = max(1, int(os.getenv("EXPORT_RETENTION_HOURS", "72")))
+EXPORT_PROGRESS_INTERVAL_SECONDS = 1.0
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MEDIA_TYPE = "text/csv"
+XLSX_MAX_ROWS = 1048576
+XLSX_MAX_CELL_CHARS = 32767
+EXPORT_TASK_FAMILY = "export"
+EXPORT_UNFINISHED_STATUSES = ("queued", "running")
+
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_RUNNING_EXPORT_JOBS: set = set()
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    "</Relationships>"
+)
+# 样式 0 为默认单元格,样式 1 为表头(加粗、居中)
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1">'
+    '<alignment horizontal="center"/></xf></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+@dataclass
+class ExportSpec:
+    """
+    一次导出的定义
+
+    row_mapper 把查询结果的一行(scalars=True 时为 ORM 对象)映射为单元格值列表;
+    结果为空且提供了 empty_headers/empty_row 时,输出这组占位表头与提示行。
+    statement 为 None 表示没有可查询的数据(直接输出空结果)。
+    """
+
+    statement: Any
+    headers: Sequence[str]
+    row_mapper: Callable[[Any], Sequence[Any]]
+    filename: str
+    format: str = "xlsx"
+    sheet_name: str = "Sheet1"
+    empty_headers: Optional[Sequence[str]] = None
+    empty_row: Optional[Sequence[Any]] = None
+    scalars: bool = True
+
+    @property
+    def extension(self) -> str:
+        return "csv" if self.format == "csv" else "xlsx"
+
+    @property
+    def media_type(self) -> str:
+        return CSV_MEDIA_TYPE if self.format == "csv" else XLSX_MEDIA_TYPE
+
+    @property
+    def download_name(self) -> str:
+        return f"{self.filename}.{self.extension}"
+
+
+@dataclass
+class ExportArtifact:
+    """后台导出生成的文件"""
+
+    path: Path
+    filename: str
+    media_type: str
+    size_bytes: int
+    row_count: int
+
+    def to_details(self) -> Dict[str, Any]:
+        return {
+            "file": self.path.name,
+            "filename": self.filename,
+            "media_type": self.media_type,
+            "size_bytes": self.size_bytes,
+            "row_count": self.row_count,
+        }
+
+
+def export_dir() -> Path:
+    """后台导出文件目录(EXPORT_DIR,默认 <data>/exports)"""
+    configured = os.getenv("EXPORT_DIR", "").strip()
+    return Path(configured) if configured else get_data_dir() / "exports"
+
+
+class _ByteSink(io.RawIOBase):
+    """不可 seek 的字节缓冲:zipfile 会改用数据描述符,写出的字节可以随时取走"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@lru_cache(maxsize=None)
+def _column_letter(index: int) -> str:
+    """0-based 列序号 -> Excel 列名(0 -> A, 26 -> AA)"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _plain_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    return value
+
+
+class _TabularStreamWriter(abc.ABC):
+    """表头延迟写入:第一批数据到达时写表头,结果为空时改写占位表头与提示行"""
+
+    def __init__(self, headers: Sequence[str], placeholder: Optional[tuple] = None):
+        self.headers = list(headers)
+        self.placeholder = placeholder
+        self.row_count = 0
+        self._header_written = False
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> None:
+        if not rows:
+            return
+        if not self._header_written:
+            self._write_header(self.headers)
+        self._write_data(rows)
+        self.row_count += len(rows)
+
+    def close(self) -> None:
+        if not self._header_written:
+            if self.placeholder is not None:
+                headers, row = self.placeholder
+                self._write_header(list(headers))
+                self._write_data([list(row)])
+            else:
+                self._write_header(self.headers)
+        self._finish()
+
+    def _write_header(self, headers: List[str]) -> None:
+        self._header_written = True
+        self._write_data([headers], header=True)
+
+    @abc.abstractmethod
+    def _write_data(self, rows: Sequence[Sequence[Any]], header: bool = False) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _finish(self) -> None:
+        ...
+
+
+class XlsxStreamWriter(_TabularStreamWriter):
+    """常量内存的单工作表 XLSX 写出器(工作表 XML 逐块压缩写入 zip)"""
+
+    def __init__(self, fileobj, headers: Sequence[str], *, sheet_name: str = "Sheet1", placeholder=None):
+        super().__init__(headers, placeholder)
+        self._zip = zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES_XML)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS_XML)
+        self._zip.writestr("xl/workbook.xml", self._workbook_xml(sheet_name))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS_XML)
+        self._zip.writestr("xl/styles.xml", _STYLES_XML)
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._sheet.write(_SHEET_HEAD.encode("utf-8"))
+        self._next_row = 1
+
+    @staticmethod
+    def _workbook_xml(sheet_name: str) -> str:
+        name = _ILLEGAL_XML_CHARS.sub("", re.sub(r"[\[\]:*?/\\]", "_", sheet_name or "Sheet1"))[:31] or "Sheet1"
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+            "</workbook>"
+        )
+
+    @staticmethod
+    def _cell(ref: str, value: Any, style: str) -> str:
+        if isinstance(value, bool):
+            return f'<c r="{ref}"{style} t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, (int, float, Decimal)):
+            # NaN/inf 没有合法的单元格表示,与 pandas 导出一致留空
+            return f'<c r="{ref}"{style}><v>{value}</v></c>' if math.isfinite(value) else ""
+        text = _ILLEGAL_XML_CHARS.sub("", str(_plain_value(value)))[:XLSX_MAX_CELL_CHARS]
+        return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+    def _write_data(self, rows: Sequence[Sequence[Any]], header: bool = False) -> None:
+        if self._next_row + len(rows) - 1 > XLSX_MAX_ROWS:
+            raise ValueError(f"导出行数超过 Excel 单表上限 {XLSX_MAX_ROWS},请改用 CSV 格式导出")
+        style = ' s="1"' if header else ""
+        parts = []
+        for row in rows:
+            number = self._next_row
+            self._next_row += 1
+            cells = "".join(
+                self._cell(f"{_column_letter(column)}{number}", value, style)
+                for column, value in enumerate(row)
+                if value is not None
+            )
+            parts.append(f'<row r="{number}">{cells}</row>')
+        self._sheet.write("".join(parts).encode("utf-8"))
+
+    def _finish(self) -> None:
+        self._sheet.write(_SHEET_TAIL.encode("utf-8"))
+        self._sheet.close()
+        self._zip.close()
+
+
+class CsvStreamWriter(_TabularStreamWriter):
+    """逐块编码的 CSV 写出器(UTF-8 BOM,便于 Excel 识别中文)"""
+
+    def __init__(self, fileobj, headers: Sequence[str], *, placeholder=None, **_):
+        super().__init__(headers, placeholder)
+        self._fileobj = fileobj
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer)
+        self._fileobj.write("\ufeff".encode("utf-8"))
+
+    def _write_data(self, rows: Sequence[Sequence[Any]], header: bool = False) -> None:
+        self._csv.writerows(["" if value is None else _plain_value(value) for value in row] for row in rows)
+        self._fileobj.write(self._buffer.getvalue().encode("utf-8"))
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def _finish(self) -> None:
+        self._fileobj.flush()
+
+
+def _open_writer(spec: ExportSpec, fileobj) -> _TabularStreamWriter:
+    placeholder = (spec.empty_headers, spec.empty_row) if spec.empty_headers is not None else None
+    writer_cls = CsvStreamWriter if spec.format == "csv" else XlsxStreamWriter
+    return writer_cls(fileobj, spec.headers, sheet_name=spec.sheet_name, placeholder=placeholder)
+
+
+async def iter_export_rows(
+    session: AsyncSession,
+    spec: ExportSpec,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[List[Sequence[Any]]]:
+    """服务端游标分块读取,逐块产出映射后的行;row_mapper 返回 None 的行被跳过"""
+    if spec.statement is None:
+        return
+    options = {"yield_per": chunk_size}
+    if spec.scalars:
+        result = await session.stream_scalars(spec.statement, execution_options=options)
+    else:
+        result = await session.stream(spec.statement, execution_options=options)
+    async for partition in result.partitions():
+        rows = [mapped for mapped in map(spec.row_mapper, partition) if mapped is not None]
+        if rows:
+            yield rows
+
+
+async def count_export_rows(db: AsyncSession, statement: Any) -> int:
+    """导出前统计行数(决定走流式响应还是后台任务)"""
+    if statement is None:
+        return 0
+    subquery = statement.order_by(None).subquery()
+    return int((await db.execute(select(func.count()).select_from(subquery))).scalar() or 0)
+
+
+async def stream_export_chunks(
+    spec: ExportSpec,
+    *,
+    session_factory=None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """边查询边写出,产出已生成的文件字节"""
+    factory = session_factory or AsyncSessionLocal
+    sink = _ByteSink()
+    writer = _open_writer(spec, sink)
+    async with factory() as session:
+        async for rows in iter_export_rows(session, spec, chunk_size):
+            writer.write_rows(rows)
+            data = sink.drain()
+            if data:
+                yield data
+    writer.close()
+    yield sink.drain()
+
+
+def _content_disposition(filename: str) -> str:
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
+
+
+def stream_export_response(spec: ExportSpec, *, session_factory=None) -> StreamingResponse:
+    """流式下载响应:首块数据写出即开始传输"""
+
+    async def _body():
+        try:
+            async for chunk in stream_export_chunks(spec, session_factory=session_factory):
+                yield chunk
+        except Exception as exc:
+            # 响应头已发出,只能中断传输;客户端会收到不完整的文件
+            logger.error(f"[StreamingExport] 流式导出中断: file={spec.download_name}, error={exc}", exc_info=True)
+            raise
+
+    return StreamingResponse(
+        _body(),
+        media_type=spec.media_type,
+        headers={
+            "Content-Disposition": _content_disposition(spec.download_name),
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+async def write_export_file(
+    spec: ExportSpec,
+    path: Path,
+    *,
+    session_factory=None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> ExportArtifact:
+    """把导出写入文件(先写 .part,完成后原子替换)"""
+    factory = session_factory or AsyncSessionLocal
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".part")
+    try:
+        with open(partial, "wb") as fileobj:
+            writer = _open_writer(spec, fileobj)
+            async with factory() as session:
+                async for rows in iter_export_rows(session, spec, chunk_size):
+                    writer.write_rows(rows)
+                    if progress is not None:
+                        await progress(writer.row_count)
+            writer.close()
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return ExportArtifact(
+        path=path,
+        filename=spec.download_name,
+        media_type=spec.media_type,
+        size_bytes=path.stat().st_size,
+        row_count=writer.row_count,
+    )
+
+
+def artifact_download_url(task_id: str) -> str:
+    return f"/api/task-center/tasks/{task_id}/artifact"
+
+
+def purge_expired_exports(now: Optional[float] = None) -> int:
+    """删除超过 EXPORT_RETENTION_HOURS 的后台导出文件"""
+    directory = export_dir()
+    if not directory.is_dir():
+        return 0
+    cutoff = (now or time.time()) - EXPORT_RETENTION_HOURS * 3600
+    removed = 0
+    for path in directory.iterdir():
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError as exc:
+            logger.warning(f"[StreamingExport] 清理过期导出文件失败: {path}, error={exc}")
+    return removed
+
+
+async def start_export_job(
+    db: AsyncSession,
+    spec: ExportSpec,
+    *,
+    task_type: str,
+    total_rows: int = 0,
+    details: Optional[Dict[str, Any]] = None,
+    requested_by: Optional[int] = None,
+    admin_only: bool = False,
+    session_factory=None,
+) -> Dict[str, Any]:
+    """
+    登记任务中心任务并在后台生成导出文件,立即返回任务信息
+
+    requested_by/admin_only 记录在任务详情中,下载导出文件时据此鉴权(见 can_download_export)。
+    """
+    purge_expired_exports()
+    task_id = f"export-{uuid4().hex}"
+    await TaskCenterService(db).create_task(
+        task_id=task_id,
+        task_family=EXPORT_TASK_FAMILY,
+        task_type=task_type,
+        status="queued",
+        trigger_source="manual",
+        total_rows=total_rows,
+        details_json={
+            "export": {
+                "format": spec.extension,
+                "filename": spec.download_name,
+                **(details or {}),
+                "requested_by": requested_by,
+                "admin_only": admin_only,
+            }
+        },
+    )
+    job = asyncio.create_task(_run_export_job(task_id, spec, total_rows, session_factory))
+    _RUNNING_EXPORT_JOBS.add(job)
+    job.add_done_callback(_RUNNING_EXPORT_JOBS.discard)
+    logger.info(f"[StreamingExport] 已创建后台导出任务: task_id={task_id}, rows={total_rows}, file={spec.download_name}")
+    return {
+        "task_id": task_id,
+        "status": "queued",
+        "total_rows": total_rows,
+        "download_url": artifact_download_url(task_id),
+    }
+
+
+async def _run_export_job(task_id: str, spec: ExportSpec, total_rows: int, session_factory=None) -> None:
+    factory = session_factory or AsyncSessionLocal
+    async with factory() as task_db:
+        service = TaskCenterService(task_db)
+        last_report = 0.0
+
+        async def _progress(row_count: int) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if now - last_report < EXPORT_PROGRESS_INTERVAL_SECONDS:
+                return
+            last_report = now
+            percent = min(99.0, row_count * 100.0 / total_rows) if total_rows else 0.0
+            await service.update_task(task_id, processed_rows=row_count, progress_percent=round(percent, 2))
+
+        try:
+            await service.update_task(task_id, status="running", started_at=datetime.now(timezone.utc))
+            artifact = await write_export_file(
+                spec,
+                export_dir() / f"{task_id}.{spec.extension}",
+                session_factory=factory,
+                progress=_progress,
+            )
+            await service.update_task(
+                task_id,
+                status="completed",
+                total_rows=artifact.row_count,
+                processed_rows=artifact.row_count,
+                progress_percent=100.0,
+                finished_at=datetime.now(timezone.utc),
+                details_json={"artifact": artifact.to_details()},
+            )
+            logger.info(f"[StreamingExport] 后台导出完成: task_id={task_id}, rows={artifact.row_count}")
+        except Exception as exc:
+            logger.error(f"[StreamingExport] 后台导出失败: task_id={task_id}, error={exc}", exc_info=True)
+            try:
+                await task_db.rollback()
+                await service.update_task(
+                    task_id,
+                    status="failed",
+                    error_summary=str(exc)[:2000],
+                    finished_at=datetime.now(timezone.utc),
+                )
+            except Exception as update_error:
+                logger.error(f"[StreamingExport] 更新导出任务状态失败: task_id={task_id}, error={update_error}")
+
+
+async def fail_orphaned_export_jobs(
+    db: AsyncSession, *, error_message: str = "service restarted before export completed"
+) -> int:
+    """
+    启动时把上次进程遗留的 queued/running 导出任务标记为失败
+
+    后台导出是进程内的 asyncio 任务,进程退出后不会再推进;必须在接收请求前调用,
+    否则会把本进程新建的导出误标为失败。
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(TaskCenterTask)
+        .where(
+            TaskCenterTask.task_family == EXPORT_TASK_FAMILY,
+            TaskCenterTask.status.in_(EXPORT_UNFINISHED_STATUSES),
+        )
+        .values(status="failed", error_summary=error_message, finished_at=now, updated_at=now)
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+def can_download_export(task: Dict[str, Any], *, user_id: Optional[int], is_admin: bool) -> bool:
+    """管理员可下载任意导出;其他用户只能下载自己发起、且不限管理员的导出"""
+    if is_admin:
+        return True
+    export = (task.get("details_json") or {}).get("export") or {}
+    if export.get("admin_only") or export.get("requested_by") is None or user_id is None:
+        return False
+    return int(export["requested_by"]) == int(user_id)
+
+
+def resolve_export_artifact(task: Dict[str, Any]) -> Optional[ExportArtifact]:
+    """已完成导出任务的文件;任务未完成、不是导出任务或文件已被清理时返回 None"""
+    if task.get("task_family") != EXPORT_TASK_FAMILY or task.get("status") != "completed":
+        return None
+    artifact = (task.get("details_json") or {}).get("artifact") or {}
+    name = Path(str(artifact.get("file") or "")).name
+    if not name:
+        return None
+    path = export_dir() / name
+    if not path.is_file():
+        return None
+    return ExportArtifact(
+        path=path,
+        filename=artifact.get("filename") or name,
+        media_type=artifact.get("media_type") or "application/octet-stream",
+        size_bytes=int(artifact.get("size_bytes") or path.stat().st_size),
+        row_count=int(artifact.get("row_count") or 0),
+    )
+
+
+async def export_response(
+    db: AsyncSession,
+    spec: ExportSpec,
+    *,
+    task_type: str,
+    total_rows: Optional[int] = None,
+    details: Optional[Dict[str, Any]] = None,
+    requested_by: Optional[int] = None,
+    admin_only: bool = False,
+    session_factory=None,
+):
+    """
+    导出入口:行数不超过阈值时直接流式下载,否则转为后台任务并返回 202 + 任务信息
+
+    requested_by 为发起导出的用户 ID;admin_only=True 的导出文件只允许管理员下载。
+    """
+    if total_rows is None:
+        total_rows = await count_export_rows(db, spec.statement)
+    if total_rows > EXPORT_BACKGROUND_ROW_THRESHOLD:
+        job = await start_export_job(
+            db,
+            spec,
+            task_type=task_type,
+            total_rows=total_rows,
+            details=details,
+            requested_by=requested_by,
+            admin_only=admin_only,
+            session_factory=session_factory,
+        )
+        return success_response(
+            data=job,
+            message="导出数据量较大,已转为后台任务,完成后可在任务中心下载",
+            status_code=202,
+        )
+    return stream_export_response(spec, session_factory=session_factory)
@@ -20,6 +20,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.celery_app import celery_app
 from backend.services.task_center_service import TaskCenterService
+from backend.services.task_telemetry_writer import (
+    TASK_TELEMETRY_BUFFERED,
+    PendingTaskTelemetry,
+    task_telemetry,
+)
 from backend.utils.data_formatter import format_datetime
 from modules.core.db import CatalogFile
 from modules.core.logger import get_logger
@@ -86,6 +91,7 @@ class SyncProgressTracker:
 
     async def update_task(self, task_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         try:
+            await self._flush_buffered(task_id)
             current = await self.task_center.get_task(task_id)
             if not current:
                 raise ValueError(f"Task {task_id} not found")
@@ -98,6 +104,31 @@ class SyncProgressTracker:
             await self.db.rollback()
             raise
 
+    async def queue_update(self, task_id: str, updates: Dict[str, Any]) -> None:
+        """
+        缓冲进度更新(热路径使用)
+
+        同一任务的多次更新合并为最新值,由 task_telemetry 定时或在任务完成前写入。
+        """
+        if not TASK_TELEMETRY_BUFFERED:
+            await self.update_task(task_id, updates)
+            return
+        task_telemetry.queue_update(task_id, updates)
+
+    async def queue_error(self, task_id: str, error: str) -> None:
+        """缓冲错误信息(热路径使用),语义同 add_error"""
+        if not TASK_TELEMETRY_BUFFERED:
+            await self.add_error(task_id, error)
+            return
+        task_telemetry.queue_error(task_id, error)
+
+    async def queue_warning(self, task_id: str, warning: str) -> None:
+        """缓冲警告信息(热路径使用),语义同 add_warning"""
+        if not TASK_TELEMETRY_BUFFERED:
+            await self.add_warning(task_id, warning)
+            return
+        task_telemetry.queue_warning(task_id, warning)
+
     async def set_runner(
         self,
         task_id: str,
@@ -179,6 +210,7 @@ class SyncProgressTracker:
         error: Optional[str] = None,
     ) -> Dict[str, Any]:
         try:
+            await self._flush_buffered(task_id)
             current = await self.task_center.get_task(task_id)
             if not current:
                 raise ValueError(f"Task {task_id} not found")
@@ -215,6 +247,7 @@ class SyncProgressTracker:
 
     async def add_error(self, task_id: str, error: str) -> None:
         try:
+            await self._flush_buffered(task_id)
             current = await self.task_center.get_task(task_id)
             if not current:
                 return
@@ -241,6 +274,7 @@ class SyncProgressTracker:
 
     async def add_warning(self, task_id: str, warning: str) -> None:
         try:
+            await self._flush_buffered(task_id)
             current = await self.task_center.get_task(task_id)
             if not current:
                 return
@@ -285,6 +319,7 @@ class SyncProgressTracker:
 
     async def delete_task(self, task_id: str) -> bool:
         try:
+            task_telemetry.discard(task_id)
             deleted = await self.task_center.delete_task(task_id)
             if deleted:
                 logger.info("[SyncProgress] Deleted task %s", task_id)
@@ -324,6 +359,7 @@ class SyncProgressTracker:
         file_last_status: str,
         file_error_message: str,
     ) -> Dict[str, Any]:
+        await self._flush_buffered(task_id)
         current = await self.task_center.get_task(task_id)
         if not current:
             raise ValueError(f"Task {task_id} not found")
@@ -397,13 +433,37 @@ class SyncProgressTracker:
             await self.db.commit()
         return recovered_count
 
+    @staticmethod
+    async def _flush_buffered(task_id: str) -> None:
+        """直接写入前先写入该任务的缓冲,避免较旧的缓冲稍后覆盖本次写入"""
+        if task_telemetry.pending(task_id) is not None:
+            await task_telemetry.flush(task_id)
+
+    @classmethod
+    def pending_to_task_center(
+        cls,
+        current: Dict[str, Any],
+        pending: PendingTaskTelemetry,
+    ) -> Dict[str, Any]:
+        """把缓冲的进度更新/错误/警告转换为 task center 字段(flush 与读取叠加共用)"""
+        payload = cls._legacy_updates_to_task_center(current, pending.updates)
+        details = payload["details_json"]
+        if pending.errors:
+            details["errors"] = details.get("errors", []) + pending.errors
+            details["message"] = pending.errors[-1]["message"]
+            payload["error_summary"] = pending.errors[-1]["message"]
+        if pending.warnings:
+            details["warnings"] = details.get("warnings", []) + pending.warnings
+        return payload
+
+    @classmethod
     def _legacy_updates_to_task_center(
-        self,
+        cls,
         current: Dict[str, Any],
         updates: Dict[str, Any],
     ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {}
-        details = self._details_from_task_center(current)
+        details = cls._details_from_task_center(current)
 
         field_map = {
             "task_type": "task_type",
@@ -421,7 +481,7 @@ class SyncProgressTracker:
                 payload[task_center_key] = updates[legacy_key]
 
         if "status" in updates:
-            payload["status"] = self._legacy_status_to_task_center(updates["status"])
+            payload["status"] = cls._legacy_status_to_task_center(updates["status"])
 
         if "message" in updates:
             details["message"] = updates["message"]
@@ -455,6 +515,10 @@ class SyncProgressTracker:
         return payload
 
     def _task_to_dict(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        pending = task_telemetry.pending(task.get("task_id"))
+        if pending is not None and pending.has_task_changes:
+            # 叠加尚未写入数据库的进度,读取方看到的是实时状态
+            task = {**task, **self.pending_to_task_center(task, pending)}
         details = self._details_from_task_center(task)
         task_details = details.get("task_details", {})
         errors = details.get("errors", [])
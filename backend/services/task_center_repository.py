@@ -21,8 +21,12 @@ class TaskCenterRepository:
         return task
 
     async def get_task_by_task_id(self, task_id: str) -> TaskCenterTask | None:
+        # 任务行会被多个会话/进程写入(含 task_telemetry 的缓冲 flush),
+        # 会话的 expire_on_commit=False,这里总是以数据库中的值刷新已加载的对象
         result = await self.db.execute(
-            select(TaskCenterTask).where(TaskCenterTask.task_id == task_id)
+            select(TaskCenterTask)
+            .where(TaskCenterTask.task_id == task_id)
+            .execution_options(populate_existing=True)
         )
         return result.scalar_one_or_none()
 
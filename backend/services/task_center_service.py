@@ -6,6 +6,7 @@ from typing import Any
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.services.task_center_repository import TaskCenterRepository
+from backend.services.task_telemetry_writer import task_telemetry
 
 
 class TaskCenterService:
@@ -75,6 +76,24 @@ class TaskCenterService:
         )
         return self._log_to_dict(log)
 
+    def queue_log(
+        self,
+        task_id: str,
+        *,
+        level: str,
+        event_type: str,
+        message: str,
+        details_json: dict[str, Any] | None = None,
+    ) -> None:
+        """Buffer a log row; rows are inserted in batches by the task telemetry writer."""
+        task_telemetry.queue_log(
+            task_id,
+            level=level,
+            event_type=event_type,
+            message=message,
+            details_json=details_json,
+        )
+
     async def add_link(
         self,
         task_id: str,
@@ -114,6 +133,8 @@ class TaskCenterService:
         return [self._task_to_dict(row) for row in rows]
 
     async def list_logs(self, task_id: str, *, limit: int = 200) -> list[dict[str, Any]]:
+        if task_telemetry.pending(task_id) is not None:
+            await task_telemetry.flush(task_id)
         task = await self.repository.get_task_by_task_id(task_id)
         if task is None:
             raise ValueError(f"Task {task_id} not found")
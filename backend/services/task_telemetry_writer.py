@@ -0,0 +1,233 @@
+"""
+任务遥测缓冲写入(Task Telemetry Writer)
+
+批量同步(process_batch_sync_background)、分块入库进度等热路径原先每次进度更新都要
+"查一次任务 + 写一次 + 提交一次",一个 500 文件的批次会产生上千个小事务与入库本身争抢连接。
+
+这里把进度写入改为进程内缓冲:
+- 进度更新按任务合并,只保留最新值(task_details 按键合并)
+- 错误/警告/任务日志追加到缓冲,flush 时一次写入
+- 后台按 TASK_TELEMETRY_FLUSH_INTERVAL_SECONDS 定时 flush(一个事务写入所有任务);
+  任务完成/出错等终态写入前由 SyncProgressTracker 先 flush 该任务
+- 读取方(SyncProgressTracker.get_task / list_tasks)在数据库状态上叠加尚未 flush 的缓冲,
+  同进程内的进度查询是实时的
+
+进度更新使用 SyncProgressTracker 的 legacy 更新格式(processed_files/current_file/...)。
+TASK_TELEMETRY_BUFFERED=0 时 SyncProgressTracker 的 queue_* 方法退化为直接写入。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from modules.core.db import TaskCenterLog, TaskCenterTask
+from modules.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+TASK_TELEMETRY_BUFFERED = os.getenv("TASK_TELEMETRY_BUFFERED", "1").strip().lower() not in {"0", "false", "no"}
+TASK_TELEMETRY_FLUSH_INTERVAL_SECONDS = max(0.1, float(os.getenv("TASK_TELEMETRY_FLUSH_INTERVAL_SECONDS", "1.0")))
+
+
+@dataclass
+class PendingTaskTelemetry:
+    """单个任务尚未写入数据库的遥测"""
+
+    updates: Dict[str, Any] = field(default_factory=dict)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    warnings: List[Dict[str, Any]] = field(default_factory=list)
+    logs: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def has_task_changes(self) -> bool:
+        return bool(self.updates or self.errors or self.warnings)
+
+    def merge_updates(self, updates: Dict[str, Any]) -> None:
+        for key, value in updates.items():
+            current = self.updates.get(key)
+            if key == "task_details" and isinstance(current, dict) and isinstance(value, dict):
+                self.updates[key] = {**current, **value}
+            else:
+                self.updates[key] = value
+
+    def absorb(self, newer: "PendingTaskTelemetry") -> None:
+        """把更新的缓冲合并到当前(较旧的)缓冲之上(flush 失败回填时使用)"""
+        self.merge_updates(newer.updates)
+        self.errors.extend(newer.errors)
+        self.warnings.extend(newer.warnings)
+        self.logs.extend(newer.logs)
+
+
+class TaskTelemetryWriter:
+    """进程级任务遥测缓冲;queue_* 方法是同步的,可在任意协程中调用"""
+
+    def __init__(self, session_factory=None, flush_interval: float = TASK_TELEMETRY_FLUSH_INTERVAL_SECONDS):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, PendingTaskTelemetry] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_lock_loop = None
+        self.flushes = 0
+
+    # ------------------------------------------------------------------
+    # 写入缓冲
+    # ------------------------------------------------------------------
+    def queue_update(self, task_id: str, updates: Dict[str, Any]) -> None:
+        self._entry(task_id).merge_updates(updates)
+        self._ensure_flusher()
+
+    def queue_error(self, task_id: str, message: str) -> None:
+        self._entry(task_id).errors.append({"time": datetime.now(timezone.utc).isoformat(), "message": message})
+        self._ensure_flusher()
+
+    def queue_warning(self, task_id: str, message: str) -> None:
+        self._entry(task_id).warnings.append({"time": datetime.now(timezone.utc).isoformat(), "message": message})
+        self._ensure_flusher()
+
+    def queue_log(
+        self,
+        task_id: str,
+        *,
+        level: str,
+        event_type: str,
+        message: str,
+        details_json: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self._entry(task_id).logs.append(
+            {
+                "level": level,
+                "event_type": event_type,
+                "message": message,
+                "details_json": details_json,
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+        self._ensure_flusher()
+
+    def pending(self, task_id: str) -> Optional[PendingTaskTelemetry]:
+        """尚未 flush 的缓冲(读取方用于叠加实时状态)"""
+        return self._pending.get(task_id)
+
+    def discard(self, task_id: str) -> None:
+        self._pending.pop(task_id, None)
+
+    # ------------------------------------------------------------------
+    # flush
+    # ------------------------------------------------------------------
+    async def flush(self, task_id: Optional[str] = None) -> int:
+        """
+        把缓冲写入数据库(所有任务在一个事务内)
+
+        Returns:
+            写入的任务数
+        """
+        async with self._lock():
+            if task_id is None:
+                drained, self._pending = self._pending, {}
+            else:
+                entry = self._pending.pop(task_id, None)
+                drained = {task_id: entry} if entry is not None else {}
+            if not drained:
+                return 0
+
+            try:
+                written = await self._write(drained)
+            except Exception:
+                # 写入失败:放回缓冲(期间新到的遥测叠加在其上),下次 flush 重试
+                for pending_task_id, entry in drained.items():
+                    newer = self._pending.get(pending_task_id)
+                    if newer is not None:
+                        entry.absorb(newer)
+                    self._pending[pending_task_id] = entry
+                raise
+            self.flushes += 1
+            return written
+
+    async def _write(self, drained: Dict[str, PendingTaskTelemetry]) -> int:
+        # 延迟导入:SyncProgressTracker 依赖本模块
+        from backend.services.sync_progress_tracker import SyncProgressTracker
+        from backend.services.task_center_service import TaskCenterService
+
+        session_factory = self._session_factory
+        if session_factory is None:
+            from backend.models.database import AsyncSessionLocal
+
+            session_factory = AsyncSessionLocal
+
+        async with session_factory() as session:
+            result = await session.execute(
+                select(TaskCenterTask)
+                .where(TaskCenterTask.task_id.in_(list(drained)))
+                .execution_options(populate_existing=True)
+            )
+            tasks = {task.task_id: task for task in result.scalars().all()}
+            service = TaskCenterService(session)
+            now = datetime.now(timezone.utc)
+
+            for task_id, entry in drained.items():
+                task = tasks.get(task_id)
+                if task is None:
+                    logger.debug("[TaskTelemetry] Task %s not found, dropping buffered telemetry", task_id)
+                    continue
+                if entry.has_task_changes:
+                    payload = SyncProgressTracker.pending_to_task_center(service._task_to_dict(task), entry)
+                    payload["details_json"] = {**(task.details_json or {}), **payload["details_json"]}
+                    for key, value in payload.items():
+                        if hasattr(task, key):
+                            setattr(task, key, value)
+                    task.updated_at = now
+                for log in entry.logs:
+                    session.add(TaskCenterLog(task_pk=task.id, **log))
+
+            await session.commit()
+            return len(tasks)
+
+    # ------------------------------------------------------------------
+    # 内部
+    # ------------------------------------------------------------------
+    def _entry(self, task_id: str) -> PendingTaskTelemetry:
+        entry = self._pending.get(task_id)
+        if entry is None:
+            entry = self._pending[task_id] = PendingTaskTelemetry()
+        return entry
+
+    def _lock(self) -> asyncio.Lock:
+        # Celery 任务每次 asyncio.run 都是新事件循环,锁需要按循环重建
+        loop = asyncio.get_running_loop()
+        if self._flush_lock is None or self._flush_lock_loop is not loop:
+            self._flush_lock = asyncio.Lock()
+            self._flush_lock_loop = loop
+        return self._flush_lock
+
+    def _ensure_flusher(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._flusher is not None and not self._flusher.done() and self._flusher.get_loop() is loop:
+            return
+        self._flusher = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        """定时 flush;缓冲为空时退出,下次入队再启动"""
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as exc:
+                logger.warning("[TaskTelemetry] Periodic flush failed, will retry: %s", exc, exc_info=True)
+
+
+task_telemetry = TaskTelemetryWriter()
+
+
+def get_task_telemetry_writer() -> TaskTelemetryWriter:
+    """获取进程级任务遥测缓冲"""
+    return task_telemetry
@@ -6,6 +6,7 @@
 import asyncio
 import os
 import sys
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List
@@ -34,6 +35,10 @@ AUTO_INGEST_STALE_TIMEOUT_MINUTES = max(
 AUTO_INGEST_HEARTBEAT_INTERVAL_SECONDS = max(
     5, int(os.getenv("AUTO_INGEST_HEARTBEAT_INTERVAL_SECONDS", "30"))
 )
+# 逐文件进度写入的最小间隔;间隔内完成的文件只更新内存中的最新进度,由下一次写入或心跳一并写入
+AUTO_INGEST_PROGRESS_FLUSH_SECONDS = max(
+    0.0, float(os.getenv("AUTO_INGEST_PROGRESS_FLUSH_SECONDS", "5"))
+)
 AUTO_INGEST_STALE_WARNING_MINUTES = max(
     1, int(os.getenv("AUTO_INGEST_STALE_WARNING_MINUTES", "15"))
 )
@@ -1354,6 +1359,22 @@ def auto_ingest_pending_files(max_files: int | None = None):
                         except Exception:
                             pass
 
+            # 已写入数据库的进度(progress_results 的长度)与最近一次写入时间
+            progress_state = {"written": 0, "written_at": time.monotonic(), "current_item": None}
+
+            def write_progress() -> None:
+                _update_auto_ingest_task_progress(
+                    db,
+                    task_record_id,
+                    len(ids),
+                    progress_results,
+                    max_files,
+                    max_concurrent,
+                    current_item=progress_state["current_item"],
+                )
+                progress_state["written"] = len(progress_results)
+                progress_state["written_at"] = time.monotonic()
+
             async def heartbeat_loop(stop_event: asyncio.Event):
                 heartbeat_interval = _int_env(
                     "AUTO_INGEST_HEARTBEAT_INTERVAL_SECONDS",
@@ -1363,7 +1384,11 @@ def auto_ingest_pending_files(max_files: int | None = None):
                     try:
                         await asyncio.wait_for(stop_event.wait(), timeout=heartbeat_interval)
                     except asyncio.TimeoutError:
-                        _heartbeat_auto_ingest_task(db, task_record_id)
+                        if progress_state["written"] < len(progress_results):
+                            # 进度写入本身会刷新 heartbeat_at
+                            write_progress()
+                        else:
+                            _heartbeat_auto_ingest_task(db, task_record_id)
              
             async def process_indexed(index: int, file_id: int):
                 return index, await process_single(file_id)
@@ -1389,19 +1414,13 @@ def auto_ingest_pending_files(max_files: int | None = None):
                         processed_item = result
                     processed_results.append(processed_item)
                     progress_results.append(processed_item)
-                    _update_auto_ingest_task_progress(
-                        db,
-                        task_record_id,
-                        len(ids),
-                        progress_results,
-                        max_files,
-                        max_concurrent,
-                        current_item=str(
-                            processed_item.get("file_name")
-                            or processed_item.get("file_id")
-                            or ""
-                        ),
+                    progress_state["current_item"] = str(
+                        processed_item.get("file_name")
+                        or processed_item.get("file_id")
+                        or ""
                     )
+                    if time.monotonic() - progress_state["written_at"] >= AUTO_INGEST_PROGRESS_FLUSH_SECONDS:
+                        write_progress()
             finally:
                 stop_event.set()
                 await heartbeat_task
@@ -10,6 +10,8 @@ from starlette.requests import Request
 
 from backend.domains.business.routers.dashboard_api_postgresql import (
     _require_dashboard_assets_ready,
+    BusinessOverviewBatchRequest,
+    get_business_overview_batch_postgresql,
     get_business_overview_bootstrap_postgresql,
     get_business_overview_comparison_postgresql,
     get_business_overview_inventory_backlog_postgresql,
@@ -575,6 +577,213 @@ async def test_postgresql_business_overview_bootstrap_miss_reuses_module_caches(
     }.issubset(singleflight_types)
 
 
+
+@pytest.mark.asyncio
+async def test_postgresql_business_overview_batch_caches_whole_module_set(monkeypatch):
+    cache_calls = []
+    service_calls = []
+
+    class _CacheServiceStub:
+        async def get(self, cache_type, **kwargs):
+            cache_calls.append(("get", cache_type, dict(kwargs)))
+            return None
+
+        async def get_or_set_singleflight(self, cache_type, producer, **kwargs):
+            cache_calls.append(("get_or_set_singleflight", cache_type, dict(kwargs)))
+            return await producer()
+
+    class _ServiceStub:
+        async def get_business_overview_batch(self, **kwargs):
+            service_calls.append(kwargs)
+            return {
+                "modules": {"kpi": {"gmv": 100}, "shop_racing": []},
+                "errors": {},
+                "query_stats": {"queries": 3, "shared_hits": 1},
+            }
+
+    monkeypatch.setattr(
+        "backend.domains.business.routers.dashboard_api_postgresql.get_postgresql_dashboard_service",
+        lambda: _ServiceStub(),
+    )
+
+    response = await get_business_overview_batch_postgresql(
+        request=_make_cached_request("/api/dashboard/business-overview/batch", _CacheServiceStub()),
+        body=BusinessOverviewBatchRequest(
+            granularity="Monthly",
+            period_key="2026-03-01",
+            platform_code="shopee",
+            modules=["kpi", "shop_racing"],
+        ),
+    )
+
+    body = json.loads(response.body.decode("utf-8"))
+    assert response.headers["X-Cache"] == "MISS"
+    assert body["data"]["modules"]["kpi"]["gmv"] == 100
+    assert body["meta"]["granularity"] == "monthly"
+    assert len(service_calls) == 1
+    assert service_calls[0]["granularity"] == "monthly"
+    assert [cache_type for _method, cache_type, _kwargs in cache_calls] == [
+        "dashboard_business_overview_batch",
+        "dashboard_business_overview_batch",
+    ]
+    assert '"module": "shop_racing"' in cache_calls[0][2]["modules"]
+
+
+@pytest.mark.asyncio
+async def test_postgresql_business_overview_batch_traffic_ranking_carries_identity_health(monkeypatch):
+    identity_calls = []
+
+    class _CacheServiceStub:
+        async def get(self, cache_type, **kwargs):
+            return None
+
+        async def get_or_set_singleflight(self, cache_type, producer, **kwargs):
+            return await producer()
+
+    class _ServiceStub:
+        async def get_business_overview_batch(self, **kwargs):
+            return {
+                "modules": {"kpi": {"gmv": 100}, "traffic_ranking": []},
+                "errors": {},
+                "query_stats": {"queries": 2, "shared_hits": 0},
+            }
+
+        async def get_business_overview_identity_health(self, granularity, target_date, platform):
+            identity_calls.append((granularity, target_date, platform))
+            return {"unresolved_shops": 2}
+
+    monkeypatch.setattr(
+        "backend.domains.business.routers.dashboard_api_postgresql.get_postgresql_dashboard_service",
+        lambda: _ServiceStub(),
+    )
+
+    response = await get_business_overview_batch_postgresql(
+        request=_make_cached_request("/api/dashboard/business-overview/batch", _CacheServiceStub()),
+        body=BusinessOverviewBatchRequest(
+            granularity="monthly",
+            period_key="2026-03-01",
+            platform_code="shopee",
+            modules=["kpi", "traffic_ranking"],
+        ),
+    )
+
+    body = json.loads(response.body.decode("utf-8"))
+    module_meta = body["data"]["module_meta"]
+    assert list(module_meta) == ["kpi", "traffic_ranking"]
+    assert module_meta["traffic_ranking"]["identity_health"] == {"unresolved_shops": 2}
+    assert module_meta["traffic_ranking"]["is_empty_period"] is True
+    assert identity_calls == [("monthly", "2026-03-01", "shopee")]
+
+
+class _BusinessOverviewParityServiceStub:
+    """单独路由与 batch 共用的服务桩:batch 的模块结果直接取自对应的单模块方法"""
+
+    async def get_business_overview_kpi(self, **kwargs):
+        return {"gmv": 0, "order_count": 0, "visitor_count": 0, "profit": 0, "conversion_rate": None,
+                "avg_order_value": None, "attach_rate": None}
+
+    async def get_business_overview_comparison(self, **kwargs):
+        return {"metrics": {"gmv": {"today": 10, "yesterday": 5, "average": 7, "change": 1.0}}}
+
+    async def get_business_overview_shop_racing(self, **kwargs):
+        return []
+
+    async def get_business_overview_traffic_ranking(self, **kwargs):
+        return [{"name": "shop-a", "visitor_count": 3}]
+
+    async def get_business_overview_operational_metrics(self, **kwargs):
+        return {"monthly_target": 100, "monthly_total_achieved": 40, "meta": {"warnings": ["target_partial"]}}
+
+    async def get_business_overview_data_freshness(self, platform, shop_id):
+        return {"is_stale": True, "warnings": ["orders_stale"]}
+
+    async def get_business_overview_identity_health(self, granularity, target_date, platform):
+        return {"unresolved_shops": 1}
+
+    async def get_business_overview_batch(self, modules, granularity, target_date, platform, shop_id):
+        producers = {
+            "kpi": self.get_business_overview_kpi,
+            "comparison": self.get_business_overview_comparison,
+            "shop_racing": self.get_business_overview_shop_racing,
+            "traffic_ranking": self.get_business_overview_traffic_ranking,
+            "operational_metrics": self.get_business_overview_operational_metrics,
+        }
+        return {
+            "modules": {module: await producers[module]() for module in modules},
+            "errors": {},
+            "query_stats": {"queries": len(modules), "shared_hits": 0},
+        }
+
+
+def _comparable_meta(meta):
+    return {key: value for key, value in meta.items() if key not in {"generated_at", "cache"}}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("module", "route", "route_kwargs"),
+    [
+        ("kpi", get_business_overview_kpi_postgresql, {}),
+        ("comparison", get_business_overview_comparison_postgresql, {}),
+        ("shop_racing", get_business_overview_shop_racing_postgresql, {"group_by": "shop"}),
+        ("traffic_ranking", get_business_overview_traffic_ranking_postgresql, {"dimension": "visitor"}),
+        ("operational_metrics", get_business_overview_operational_metrics_postgresql, {}),
+    ],
+)
+async def test_postgresql_business_overview_batch_module_matches_single_route(monkeypatch, module, route, route_kwargs):
+    monkeypatch.setattr(
+        "backend.domains.business.routers.dashboard_api_postgresql.get_postgresql_dashboard_service",
+        lambda: _BusinessOverviewParityServiceStub(),
+    )
+    scope = {"granularity": "monthly", "period_key": "2026-03-15", "platform_code": "shopee", "shop_id": "s1"}
+
+    single = json.loads(
+        (await route(request=_make_request(f"/api/dashboard/business-overview/{module}"), **scope, **route_kwargs)).body
+    )
+    batch = json.loads(
+        (
+            await get_business_overview_batch_postgresql(
+                request=_make_request("/api/dashboard/business-overview/batch"),
+                body=BusinessOverviewBatchRequest(**scope, modules=[module]),
+            )
+        ).body
+    )
+
+    assert batch["data"]["modules"][module] == single["data"]
+    assert _comparable_meta(batch["data"]["module_meta"][module]) == _comparable_meta(single["meta"])
+
+
+@pytest.mark.asyncio
+async def test_postgresql_business_overview_batch_rejects_operational_metrics_non_monthly(monkeypatch):
+    monkeypatch.setattr(
+        "backend.domains.business.routers.dashboard_api_postgresql.get_postgresql_dashboard_service",
+        lambda: _BusinessOverviewParityServiceStub(),
+    )
+
+    single = await get_business_overview_operational_metrics_postgresql(
+        request=_make_request("/api/dashboard/business-overview/operational-metrics"),
+        granularity="daily",
+        period_key="2026-03-15",
+        platform_code=None,
+        shop_id=None,
+    )
+    batch = await get_business_overview_batch_postgresql(
+        request=_make_request("/api/dashboard/business-overview/batch"),
+        body=BusinessOverviewBatchRequest(granularity="daily", period_key="2026-03-15", modules=["kpi", "operational_metrics"]),
+    )
+
+    assert single.status_code == batch.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_postgresql_business_overview_batch_rejects_unknown_module():
+    response = await get_business_overview_batch_postgresql(
+        request=_make_request("/api/dashboard/business-overview/batch"),
+        body=BusinessOverviewBatchRequest(period_key="2026-03-01", modules=["annual_summary"]),
+    )
+
+    assert response.status_code == 400
+
 def test_postgresql_shop_racing_route_returns_service_payload(monkeypatch):
     class _ServiceStub:
         async def get_business_overview_shop_racing(self, granularity, target_date, group_by, platform):
@@ -3665,3 +3665,81 @@ async def test_postgresql_dashboard_service_reads_real_inventory_chain(monkeypat
         assert clearance[0]["estimated_turnover_days"] >= 30
 
         await engine.dispose()
+
+
+class _BatchResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return [dict(row) for row in self._rows]
+
+
+class _BatchSession:
+    def __init__(self, opened):
+        self.statements = []
+        opened.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        self.statements.append(sql)
+        if "business_overview_shop_racing_monthly_module" in sql:
+            return _BatchResult(
+                [
+                    {"period_key": date(2026, 4, 1), "platform_code": "shopee", "shop_id": "s1", "gmv": 100},
+                    {"period_key": date(2026, 3, 1), "platform_code": "shopee", "shop_id": "s1", "gmv": 80},
+                ]
+            )
+        if "business_overview_traffic_ranking_module" in sql:
+            raise RuntimeError("traffic module unavailable")
+        return _BatchResult([])
+
+    async def rollback(self):
+        self.statements.append("ROLLBACK")
+
+
+@pytest.mark.asyncio
+async def test_business_overview_batch_resolves_modules_in_one_session(monkeypatch):
+    service = PostgresqlDashboardService()
+    opened = []
+    monkeypatch.setattr(dashboard_service_module, "AsyncSessionLocal", lambda: _BatchSession(opened))
+
+    result = await service.get_business_overview_batch(
+        modules=[
+            "shop_racing",
+            {"module": "shop_racing", "key": "platform_racing", "options": {"group_by": "platform"}},
+            "traffic_ranking",
+        ],
+        granularity="monthly",
+        target_date="2026-04-01",
+    )
+
+    assert len(opened) == 1
+    session = opened[0]
+    racing_reads = [sql for sql in session.statements if "shop_racing_monthly_module" in sql]
+    assert len(racing_reads) == 1
+    assert result["query_stats"] == {"queries": 2, "shared_hits": 1}
+    assert result["modules"]["shop_racing"][0]["gmv"] == 100
+    assert result["modules"]["platform_racing"][0]["gmv"] == 100
+    assert "traffic_ranking" not in result["modules"]
+    assert "traffic module unavailable" in result["errors"]["traffic_ranking"]
+    assert session.statements[-1] == "ROLLBACK"
+
+
+@pytest.mark.asyncio
+async def test_business_overview_batch_rejects_unknown_or_duplicate_modules():
+    service = PostgresqlDashboardService()
+
+    with pytest.raises(ValueError, match="unsupported"):
+        await service.get_business_overview_batch(modules=["clearance"], granularity="monthly", target_date="2026-04-01")
+    with pytest.raises(ValueError, match="duplicate"):
+        await service.get_business_overview_batch(modules=["kpi", "kpi"], granularity="monthly", target_date="2026-04-01")
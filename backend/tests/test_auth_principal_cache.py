@@ -0,0 +1,175 @@
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from backend.dependencies.auth import get_current_db_user, get_current_user
+from backend.services import auth_principal_cache as cache_module
+from backend.services.auth_principal_cache import (
+    AuthenticatedPrincipal,
+    PrincipalCache,
+    PrincipalInvalidationBus,
+)
+from modules.core.db import DimRole, DimUser, UserSession
+
+
+def _user(user_id=7):
+    return SimpleNamespace(
+        user_id=user_id,
+        username="operator",
+        email="op@example.com",
+        full_name="Operator",
+        status="active",
+        is_active=True,
+        is_superuser=False,
+        created_at=None,
+        last_login=None,
+        roles=[SimpleNamespace(role_id=3, role_code="operator", role_name="运营人员", permissions='["orders.view"]')],
+    )
+
+
+def _session(session_id="sid-1", user_id=7, expires_in=timedelta(hours=1)):
+    return SimpleNamespace(
+        session_id=session_id,
+        user_id=user_id,
+        is_active=True,
+        expires_at=datetime.now(timezone.utc) + expires_in,
+    )
+
+
+def _scalar_result(value):
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = value
+    return result
+
+
+@pytest.fixture
+def local_cache(monkeypatch):
+    monkeypatch.setattr(cache_module, "PRINCIPAL_CACHE_LOCAL_ONLY", True)
+    monkeypatch.setattr(cache_module, "PRINCIPAL_CACHE_ENABLED", True)
+    cache_module.principal_cache.invalidate(everything=True)
+    yield cache_module.principal_cache
+    cache_module.principal_cache.invalidate(everything=True)
+
+
+@pytest.mark.asyncio
+async def test_cached_principal_skips_database_on_repeat_requests(monkeypatch, local_cache):
+    request = SimpleNamespace(cookies={"access_token": "access-token"})
+    monkeypatch.setattr(
+        "backend.dependencies.auth.auth_service.verify_token",
+        lambda token: {"user_id": 7, "sid": "sid-1"},
+    )
+    db = AsyncMock()
+    db.execute.side_effect = [_scalar_result(_user()), _scalar_result(_session())]
+
+    first = await get_current_user(request=request, credentials=None, db=db)
+    assert db.execute.await_count == 2
+
+    db.execute.side_effect = AssertionError("cache hit must not query the database")
+    second = await get_current_user(request=request, credentials=None, db=db)
+
+    assert isinstance(second, AuthenticatedPrincipal)
+    assert (second.user_id, second.username, second.session_id) == (first.user_id, "operator", "sid-1")
+    assert [role.role_code for role in second.roles] == ["operator"]
+    assert second.roles[0].permissions == '["orders.view"]'
+    assert local_cache.hits == 1
+
+
+def test_entries_expire_with_ttl_and_session_expiry(monkeypatch):
+    cache = PrincipalCache(ttl_seconds=30)
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    cache.put(AuthenticatedPrincipal.from_records(_user(), _session()), cache.generation)
+    cache.put(
+        AuthenticatedPrincipal.from_records(_user(8), _session("sid-2", 8, timedelta(seconds=-1))),
+        cache.generation,
+    )
+
+    assert cache.get(7, "sid-1") is not None
+    assert cache.get(8, "sid-2") is None
+    now[0] += 31
+    assert cache.get(7, "sid-1") is None
+    assert len(cache) == 0
+
+
+def test_put_is_dropped_when_invalidation_races_the_database_read():
+    cache = PrincipalCache()
+    generation = cache.generation
+    cache.invalidate(user_ids=[7])
+
+    assert cache.put(AuthenticatedPrincipal.from_records(_user(), _session()), generation) is False
+    assert cache.get(7, "sid-1") is None
+
+
+def _persistent(session, obj):
+    make_transient_to_detached(obj)
+    session.add(obj)
+    return obj
+
+
+def test_committed_auth_changes_invalidate_affected_principals(monkeypatch, local_cache):
+    published = []
+    monkeypatch.setattr(
+        cache_module.invalidation_bus,
+        "publish",
+        lambda **kwargs: published.append(kwargs),
+    )
+    for user_id, session_id in ((7, "sid-1"), (8, "sid-2"), (9, "sid-3")):
+        local_cache.put(
+            AuthenticatedPrincipal.from_records(_user(user_id), _session(session_id, user_id)),
+            local_cache.generation,
+        )
+
+    session = Session()
+    user = _persistent(session, DimUser(user_id=7, username="operator", status="active"))
+    user_session = _persistent(session, UserSession(session_id="sid-2", user_id=8))
+    user.status = "suspended"
+    user_session.is_active = False
+
+    cache_module._collect_flushed_auth_changes(session, None, None)
+    cache_module._publish_committed_auth_changes(session)
+
+    assert local_cache.get(7, "sid-1") is None
+    assert local_cache.get(8, "sid-2") is None
+    assert local_cache.get(9, "sid-3") is not None
+    assert published == [{"user_ids": {7}, "session_ids": {"sid-2"}, "everything": False}]
+
+    role = _persistent(session, DimRole(role_id=3, role_code="operator", role_name="运营人员"))
+    role.permissions = "[]"
+    cache_module._collect_flushed_auth_changes(session, None, None)
+    cache_module._discard_rolled_back_auth_changes(session)
+    cache_module._publish_committed_auth_changes(session)
+    assert local_cache.get(9, "sid-3") is not None
+
+    cache_module._collect_flushed_auth_changes(session, None, None)
+    cache_module._publish_committed_auth_changes(session)
+    assert len(local_cache) == 0
+
+
+def test_bus_applies_remote_invalidations_and_ignores_its_own():
+    cache = PrincipalCache()
+    bus = PrincipalInvalidationBus(cache)
+    cache.put(AuthenticatedPrincipal.from_records(_user(), _session()), cache.generation)
+
+    bus.apply(json.dumps({"origin": bus.origin, "user_ids": [7], "session_ids": [], "all": False}))
+    assert cache.get(7, "sid-1") is not None
+
+    bus.apply(json.dumps({"origin": "other-worker", "user_ids": [], "session_ids": ["sid-1"], "all": False}))
+    assert cache.get(7, "sid-1") is None
+
+
+@pytest.mark.asyncio
+async def test_writable_user_dependency_reloads_orm_user_for_cached_principal():
+    principal = AuthenticatedPrincipal.from_records(_user(), _session())
+    orm_user = SimpleNamespace(user_id=7, is_active=True)
+    db = AsyncMock()
+    db.execute.return_value = _scalar_result(orm_user)
+
+    assert await get_current_db_user(current_user=principal, db=db) is orm_user
+
+    plain_user = _user()
+    assert await get_current_db_user(current_user=plain_user, db=AsyncMock()) is plain_user
@@ -0,0 +1,109 @@
+from backend.services import b_class_catalog_cache as catalog_module
+from backend.services.b_class_catalog_cache import BClassCatalogCache
+from backend.services.platform_table_manager import PlatformTableManager
+
+SERVICES_INDEX_DEF = (
+    'CREATE UNIQUE INDEX "uq_fact_shopee_services_agent_daily_hash" ON b_class.fact_shopee_services_agent_daily '
+    "USING btree (platform_code, COALESCE(shop_id, ''), data_domain, granularity, data_hash)"
+)
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _CatalogDb:
+    def __init__(self, tables):
+        self.tables = tables
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        only = (params or {}).get("table_name")
+        selected = {name: spec for name, spec in self.tables.items() if only in (None, name)}
+        if "pg_attribute" in sql:
+            return _Result(
+                [
+                    (name, column, "p" if spec.get("partitioned") else "r")
+                    for name, spec in selected.items()
+                    for column in spec["columns"]
+                ]
+            )
+        if "pg_indexes" in sql:
+            return _Result(
+                [(name, index, definition) for name, spec in selected.items() for index, definition in spec["indexes"].items()]
+            )
+        return _Result([])
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def catalog_queries(self):
+        return [sql for sql in self.statements if "pg_attribute" in sql or "pg_indexes" in sql]
+
+
+def _services_table():
+    return {
+        "fact_shopee_services_agent_daily": {
+            "columns": ["id", "platform_code", "data_hash", "period_start_date", "period_end_date", "period_start_time", "period_end_time"],
+            "indexes": {"uq_fact_shopee_services_agent_daily_hash": SERVICES_INDEX_DEF},
+        }
+    }
+
+
+def test_steady_state_ensure_table_exists_issues_no_catalog_queries(monkeypatch):
+    catalog = BClassCatalogCache(ttl_seconds=300)
+    monkeypatch.setattr(catalog_module, "_catalog_cache", catalog)
+    db = _CatalogDb(_services_table())
+
+    manager = PlatformTableManager(db)
+    for _ in range(3):
+        table_name = manager.ensure_table_exists("shopee", "services", "agent", "daily")
+
+    assert table_name == "fact_shopee_services_agent_daily"
+    assert len(db.catalog_queries()) == 2
+    assert manager.dynamic_column_manager.get_existing_columns(table_name) >= {"period_start_date", "data_hash"}
+    assert len(db.statements) == 2
+
+
+def test_ddl_invalidates_only_the_affected_table():
+    catalog = BClassCatalogCache(ttl_seconds=300)
+    tables = _services_table()
+    tables["fact_tiktok_orders_daily"] = {"columns": ["id"], "indexes": {}}
+    db = _CatalogDb(tables)
+
+    assert catalog.get_columns(db, "fact_tiktok_orders_daily") == frozenset({"id"})
+    tables["fact_tiktok_orders_daily"]["columns"].append("销售额")
+    catalog.on_ddl('ALTER TABLE "fact_tiktok_orders_daily" ADD COLUMN IF NOT EXISTS "销售额" TEXT')
+    catalog.on_ddl("SELECT 1 FROM b_class.fact_tiktok_orders_daily")
+
+    assert "销售额" in catalog.get_columns(db, "fact_tiktok_orders_daily")
+    assert db.statements[-1].rstrip().endswith("AND tablename = :table_name")
+    assert catalog.get_index_definition(db, "fact_shopee_services_agent_daily", "uq_fact_shopee_services_agent_daily_hash") == SERVICES_INDEX_DEF
+    assert len(db.catalog_queries()) == 4
+
+
+def test_unattributed_b_class_ddl_and_ttl_force_full_reload(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(catalog_module.time, "monotonic", lambda: now[0])
+    catalog = BClassCatalogCache(ttl_seconds=60)
+    db = _CatalogDb(_services_table())
+
+    assert catalog.table_exists(db, "fact_shopee_services_agent_daily")
+    catalog.on_ddl('DROP INDEX IF EXISTS b_class."uq_fact_shopee_services_agent_daily_hash"')
+    assert catalog.table_exists(db, "fact_shopee_services_agent_daily")
+    assert len(db.catalog_queries()) == 4
+
+    now[0] += 61
+    db.tables = {}
+    assert not catalog.table_exists(db, "fact_shopee_services_agent_daily")
+    assert len(db.catalog_queries()) == 6
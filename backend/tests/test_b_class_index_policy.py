@@ -0,0 +1,141 @@
+import importlib.util
+from pathlib import Path
+
+from backend.services import b_class_catalog_cache as catalog_module
+from backend.services import b_class_index_policy as policy_module
+from backend.services import platform_table_manager as manager_module
+from backend.services.b_class_catalog_cache import BClassCatalogCache
+from backend.services.b_class_index_policy import (
+    BClassIndexPolicy,
+    IndexUsage,
+    index_profile,
+    legacy_index_definitions,
+    plan_convergence,
+)
+
+TABLE = "fact_shopee_orders_daily"
+
+
+def _usage(index_name, scans=0, size_bytes=8192, is_unique=False):
+    return IndexUsage(TABLE, index_name, scans, size_bytes, is_unique)
+
+
+def _legacy_indexes():
+    indexes = {name: f"CREATE INDEX {name} ON b_class.{TABLE} {body}" for name, body in legacy_index_definitions(TABLE, "orders", None)}
+    indexes[f"uq_{TABLE}_hash"] = "CREATE UNIQUE INDEX ..."
+    indexes[f"{TABLE}_pkey"] = "CREATE UNIQUE INDEX ..."
+    return indexes
+
+
+def test_profile_drops_constant_and_redundant_columns(monkeypatch):
+    monkeypatch.setattr(policy_module, "RAW_DATA_GIN_DOMAINS", frozenset({"products"}))
+
+    orders = dict(index_profile(TABLE, "orders"))
+    assert orders[f"ix_{TABLE}_shop_date"] == "(shop_id, metric_date)"
+    assert orders[f"ix_{TABLE}_ingest_brin"] == "USING BRIN (ingest_timestamp)"
+    assert not {f"ix_{TABLE}_{suffix}" for suffix in ("platform", "domain", "granularity", "hash", "currency", "gin")} & set(orders)
+    assert not any("GIN" in body for body in orders.values())
+
+    products = dict(index_profile("fact_shopee_products_daily", "products"))
+    assert products["ix_fact_shopee_products_daily_raw_data_path"] == "USING GIN (raw_data jsonb_path_ops)"
+
+
+def test_plan_keeps_scanned_and_unique_indexes_unless_forced():
+    usage = {
+        f"ix_{TABLE}_date": _usage(f"ix_{TABLE}_date", scans=42),
+        f"ix_{TABLE}_gin": _usage(f"ix_{TABLE}_gin", size_bytes=1 << 20),
+        f"uq_{TABLE}_hash": _usage(f"uq_{TABLE}_hash", is_unique=True),
+    }
+
+    plan = plan_convergence(TABLE, "orders", _legacy_indexes(), usage)
+
+    assert [name for name, _ in plan.create] == [f"ix_{TABLE}_shop_date", f"ix_{TABLE}_ingest_brin"]
+    assert plan.kept_in_use == [f"ix_{TABLE}_date"]
+    assert f"ix_{TABLE}_gin" in plan.drop and f"ix_{TABLE}_platform" in plan.drop
+    assert f"ix_{TABLE}_file" not in plan.drop
+    assert not {f"uq_{TABLE}_hash", f"{TABLE}_pkey"} & set(plan.drop)
+    assert plan.reclaimed_bytes == 1 << 20
+
+    forced = plan_convergence(TABLE, "orders", _legacy_indexes(), usage, force=True)
+    assert f"ix_{TABLE}_date" in forced.drop and not forced.kept_in_use
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _PolicyDb:
+    def __init__(self, indexes, usage_rows):
+        self.indexes = indexes
+        self.usage_rows = usage_rows
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        if "pg_stat_user_indexes" in sql:
+            return _Result(self.usage_rows)
+        if "pg_attrdef" in sql:
+            return _Result([(TABLE, "'orders'::character varying")])
+        if "pg_attribute" in sql:
+            return _Result([(TABLE, "id", "r")])
+        if "pg_indexes" in sql:
+            return _Result([(TABLE, name, definition) for name, definition in self.indexes.items()])
+        return _Result([])
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def ddl(self):
+        return [sql for sql in self.statements if sql.startswith(("CREATE", "DROP"))]
+
+
+def test_converge_creates_profile_indexes_before_dropping(monkeypatch):
+    monkeypatch.setattr(catalog_module, "_catalog_cache", BClassCatalogCache(ttl_seconds=300))
+    db = _PolicyDb(_legacy_indexes(), [(TABLE, f"ix_{TABLE}_date", 42, 8192, False)])
+    policy = BClassIndexPolicy(db)
+
+    (plan,) = policy.plan()
+    assert plan.data_domain == "orders"
+    policy.converge(plan)
+
+    ddl = db.ddl()
+    assert ddl[:2] == [
+        f'CREATE INDEX IF NOT EXISTS "ix_{TABLE}_shop_date" ON b_class."{TABLE}" (shop_id, metric_date)',
+        f'CREATE INDEX IF NOT EXISTS "ix_{TABLE}_ingest_brin" ON b_class."{TABLE}" USING BRIN (ingest_timestamp)',
+    ]
+    assert f'DROP INDEX IF EXISTS b_class."ix_{TABLE}_platform"' in ddl[2:]
+    assert f'DROP INDEX IF EXISTS b_class."ix_{TABLE}_date"' not in ddl
+
+
+def test_new_tables_use_profile_when_policy_enabled(monkeypatch):
+    monkeypatch.setattr(manager_module, "INDEX_POLICY_ENABLED", True)
+    manager = manager_module.PlatformTableManager(_PolicyDb({}, []))
+
+    assert manager._base_index_definitions(TABLE, "orders", None) == index_profile(TABLE, "orders")
+
+
+def test_converge_script_dry_run_does_not_change_indexes(monkeypatch, capsys):
+    spec = importlib.util.spec_from_file_location(
+        "converge_b_class_indexes", Path("scripts/converge_b_class_indexes.py")
+    )
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+    monkeypatch.setattr(catalog_module, "_catalog_cache", BClassCatalogCache(ttl_seconds=300))
+    db = _PolicyDb(_legacy_indexes(), [])
+
+    assert script.main(["--dry-run"], session_factory=lambda: db) == 0
+
+    assert db.ddl() == []
+    assert "pending=1" in capsys.readouterr().out
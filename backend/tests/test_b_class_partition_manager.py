@@ -0,0 +1,142 @@
+from datetime import date
+
+import pytest
+
+from backend.services import b_class_catalog_cache as catalog_module
+from backend.services.b_class_catalog_cache import BClassCatalogCache
+from backend.services.b_class_partition_manager import BClassPartitionManager, partition_name
+from backend.services.platform_table_manager import PlatformTableManager
+
+TABLE = "fact_shopee_orders_daily"
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _PartitionDb:
+    def __init__(self, tables, partitions=(), covered=()):
+        self.tables = tables
+        self.partitions = list(partitions)
+        self.covered = list(covered)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        only = (params or {}).get("table_name")
+        if "pg_attribute" in sql:
+            return _Result(
+                [
+                    (name, "id", "p" if spec.get("partitioned") else "r")
+                    for name, spec in self.tables.items()
+                    if only in (None, name)
+                ]
+            )
+        if "pg_index x" in sql:
+            return _Result([(name,) for name in self.covered])
+        if "pg_inherits" in sql:
+            return _Result([(name, "") for name in self.partitions])
+        return _Result([])
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def ddl(self):
+        return [sql for sql in self.statements if sql.startswith(("CREATE", "ALTER"))]
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    cache = BClassCatalogCache(ttl_seconds=300)
+    monkeypatch.setattr(catalog_module, "_catalog_cache", cache)
+    return cache
+
+
+def test_ensure_partitions_creates_only_missing_months(catalog):
+    db = _PartitionDb({TABLE: {"partitioned": True}, f"{TABLE}_p202601": {}})
+    manager = BClassPartitionManager(db)
+
+    created = manager.ensure_partitions(TABLE, [date(2026, 1, 5), "2026-02-28", date(2026, 2, 1), None])
+
+    assert created == [f"{TABLE}_p202602"]
+    assert db.ddl() == [
+        f'CREATE TABLE IF NOT EXISTS b_class."{TABLE}_p202602" PARTITION OF b_class."{TABLE}" '
+        "FOR VALUES FROM ('2026-02-01') TO ('2026-03-01')"
+    ]
+    assert db.commits == 1
+
+    # 分区已存在(目录缓存命中)时不再发出任何查询
+    catalog.invalidate()
+    db.tables[f"{TABLE}_p202602"] = {}
+    manager.ensure_partitions(TABLE, [date(2026, 1, 1)])
+    statements = len(db.statements)
+    assert manager.ensure_partitions(TABLE, [date(2026, 2, 3), date(2026, 1, 9)]) == []
+    assert len(db.statements) == statements
+
+
+def test_ensure_partitions_is_a_no_op_for_plain_tables(catalog):
+    db = _PartitionDb({TABLE: {}})
+
+    assert BClassPartitionManager(db).ensure_partitions(TABLE, [date(2026, 1, 1)]) == []
+    assert db.ddl() == []
+
+
+def test_create_index_builds_and_attaches_each_uncovered_partition(catalog):
+    partitions = [partition_name(TABLE, date(2026, month, 1)) for month in (1, 2, 3)]
+    db = _PartitionDb({TABLE: {"partitioned": True}}, partitions=partitions, covered=[partitions[0]])
+
+    created = BClassPartitionManager(db).create_index(TABLE, f"ix_{TABLE}_file", "(file_id)")
+
+    assert created == [f"ix_{TABLE}_file_p202602", f"ix_{TABLE}_file_p202603"]
+    assert db.ddl() == [
+        f'CREATE INDEX IF NOT EXISTS "ix_{TABLE}_file" ON ONLY b_class."{TABLE}" (file_id)',
+        f'CREATE INDEX IF NOT EXISTS "ix_{TABLE}_file_p202602" ON b_class."{TABLE}_p202602" (file_id)',
+        f'ALTER INDEX b_class."ix_{TABLE}_file" ATTACH PARTITION b_class."ix_{TABLE}_file_p202602"',
+        f'CREATE INDEX IF NOT EXISTS "ix_{TABLE}_file_p202603" ON b_class."{TABLE}_p202603" (file_id)',
+        f'ALTER INDEX b_class."ix_{TABLE}_file" ATTACH PARTITION b_class."ix_{TABLE}_file_p202603"',
+    ]
+    assert db.commits == 3
+
+
+def test_detach_and_reattach_month(catalog):
+    db = _PartitionDb({TABLE: {"partitioned": True}, f"{TABLE}_p202603": {}})
+    manager = BClassPartitionManager(db)
+
+    with pytest.raises(ValueError):
+        manager.attach_month(TABLE, "2026-03-15", f"{TABLE}_p202603_detached")
+
+    detached = manager.detach_month(TABLE, date(2026, 3, 20))
+    assert detached == f"{TABLE}_p202603_detached"
+    del db.tables[f"{TABLE}_p202603"]
+
+    assert manager.attach_month(TABLE, date(2026, 3, 1), detached) == f"{TABLE}_p202603"
+    assert db.ddl() == [
+        f'ALTER TABLE b_class."{TABLE}" DETACH PARTITION b_class."{TABLE}_p202603"',
+        f'ALTER TABLE b_class."{TABLE}_p202603" RENAME TO "{detached}"',
+        f'ALTER TABLE b_class."{TABLE}" ATTACH PARTITION b_class."{detached}" '
+        "FOR VALUES FROM ('2026-03-01') TO ('2026-04-01')",
+        f'ALTER TABLE b_class."{detached}" RENAME TO "{TABLE}_p202603"',
+    ]
+
+
+def test_partitioned_base_table_keys_include_metric_date(catalog):
+    db = _PartitionDb({})
+
+    PlatformTableManager(db)._create_base_table(TABLE, "shopee", "orders", None, "daily", partitioned=True)
+
+    create_table, unique_index = db.ddl()[:2]
+    assert "PRIMARY KEY (id, metric_date)" in create_table
+    assert create_table.endswith("PARTITION BY RANGE (metric_date)")
+    assert unique_index.endswith(
+        "(platform_code, COALESCE(shop_id, ''), data_domain, granularity, data_hash, metric_date)"
+    )
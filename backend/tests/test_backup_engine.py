@@ -0,0 +1,102 @@
+import hashlib
+import io
+import subprocess
+import tarfile
+import threading
+from pathlib import Path
+
+from backend.services import backup_engine as engine_module
+from backend.services.backup_engine import BackupEngine
+
+
+def _engine(tmp_path):
+    data_dir = tmp_path / "data"
+    config_dir = tmp_path / "config"
+    (data_dir / "raw" / "shopee").mkdir(parents=True)
+    (data_dir / "catalog").mkdir()
+    config_dir.mkdir()
+    (data_dir / "raw" / "shopee" / "orders_0101.xlsx").write_bytes(b"orders-a" * 1000)
+    (data_dir / "raw" / "shopee" / "orders_copy.xlsx").write_bytes(b"orders-a" * 1000)
+    (data_dir / "catalog" / "stores.json").write_text("{}", encoding="utf-8")
+    (config_dir / "settings.yaml").write_text("debug: false\n", encoding="utf-8")
+    return BackupEngine(
+        tmp_path / "backups",
+        [str(data_dir), str(config_dir)],
+        raw_dir=data_dir / "raw",
+        dump_jobs=2,
+    )
+
+
+def _fake_pg_dump(calls):
+    def run(cmd, stdout=None, stderr=None):
+        calls.append(cmd)
+        dump_dir = Path(next(arg.split("=", 1)[1] for arg in cmd if arg.startswith("--file=")))
+        dump_dir.mkdir(parents=True)
+        (dump_dir / "toc.dat").write_bytes(b"toc")
+        (dump_dir / "3012.dat.gz").write_bytes(b"table-data")
+        return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+    return run
+
+
+def test_backup_runs_parallel_dump_and_dedupes_raw_exports(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(engine_module.subprocess, "run", _fake_pg_dump(calls))
+    engine = _engine(tmp_path)
+
+    first = engine.run("backup_20261019_010000", "postgresql://u:p@postgres:5432/erp")
+
+    (cmd,) = calls
+    assert "--format=directory" in cmd and "--jobs=2" in cmd
+    artifacts = {artifact.path: artifact for artifact in first.artifacts}
+    assert set(artifacts) == {"database/3012.dat.gz", "database/toc.dat", "files.tar.gz"}
+    archive = first.backup_dir / "files.tar.gz"
+    assert artifacts["files.tar.gz"].sha256 == hashlib.sha256(archive.read_bytes()).hexdigest()
+    with tarfile.open(archive) as tar:
+        names = set(tar.getnames())
+    assert "data/catalog/stores.json" in names and "config/settings.yaml" in names
+    assert not any(name.startswith("data/raw") for name in names)
+    assert (first.raw.new_objects, first.raw.reused_objects) == (1, 1)
+
+    raw_dir = tmp_path / "data" / "raw" / "shopee"
+    (raw_dir / "orders_0102.xlsx").write_bytes(b"orders-b" * 1000)
+    second = engine.run("backup_20261019_020000", None)
+
+    assert (second.raw.new_objects, second.raw.reused_objects, second.raw.rehashed_files) == (1, 2, 0)
+    assert len(list((tmp_path / "backups" / "objects").glob("*/*"))) == 2
+    assert engine.verify(second.manifest_path, second.checksum) == (True, None)
+
+
+def test_verify_detects_tampered_raw_object_and_archive_restores_raw_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine_module.subprocess, "run", _fake_pg_dump([]))
+    engine = _engine(tmp_path)
+    result = engine.run("backup_20261019_010000", "postgresql://u:p@postgres:5432/erp")
+
+    with tarfile.open(fileobj=io.BytesIO(b"".join(engine.iter_archive(result.manifest_path)))) as tar:
+        names = set(tar.getnames())
+        restored = tar.extractfile("raw/shopee/orders_copy.xlsx").read()
+    assert {"manifest.json", "files.tar.gz", "database/toc.dat", "raw/shopee/orders_0101.xlsx"} <= names
+    assert restored == b"orders-a" * 1000
+
+    (digest_path,) = (tmp_path / "backups" / "objects").glob("*/*")
+    digest_path.write_bytes(b"x" * digest_path.stat().st_size)
+    ok, error = engine.verify(result.manifest_path, result.checksum)
+    assert not ok and "校验和不匹配" in error
+
+
+def test_parallel_raw_snapshot_counts_identical_content_once(tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    # 两个内容相同的文件同时算完摘要,再同时争抢放入对象
+    barrier = threading.Barrier(2, timeout=5)
+    original_hexdigest = engine_module.HashingWriter.hexdigest
+
+    def _hexdigest(writer):
+        barrier.wait()
+        return original_hexdigest(writer)
+
+    monkeypatch.setattr(engine_module.HashingWriter, "hexdigest", _hexdigest)
+
+    snapshot = engine.snapshot_raw()
+
+    assert (snapshot.new_objects, snapshot.new_bytes) == (1, 8000)
+    assert (snapshot.reused_objects, snapshot.rehashed_files) == (1, 1)
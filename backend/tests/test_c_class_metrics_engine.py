@@ -0,0 +1,287 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.services import c_class_metrics_engine as engine_module
+from backend.services.c_class_metrics_engine import CClassMetricsEngine, ShopPeriodInputs, score_period
+from backend.services.shop_health_service import ShopHealthService
+
+
+class _Row:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+        self._mapping = values
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeScoreDb:
+    """按 SQL 文本分派的假异步会话:mart 输入来自 inputs,评分表存放在 stored"""
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.stored = {}
+        self.writes = []
+        self.refresh_marks = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "ops.data_freshness_log" in sql:
+            self.refresh_marks.append(params["target_name"])
+            return _Result([])
+        if "FROM mart." in sql:
+            return _Result([_Row(**row) for row in self.inputs])
+        if sql.lstrip().startswith("SELECT"):
+            return _Result(
+                [_Row(**row) for row in self.stored.values() if row["granularity"] == params["granularity"]]
+            )
+        if "INSERT INTO" in sql:
+            self.writes.extend(params)
+            for row in params:
+                self.stored[(row["platform_code"], row["shop_id"], row["metric_date"], row["granularity"])] = dict(row)
+            return _Result([])
+        if "DELETE FROM" in sql:
+            for row in params:
+                self.stored.pop((row["platform_code"], row["shop_id"], row["metric_date"], row["granularity"]), None)
+            return _Result([])
+        raise AssertionError(sql)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _mart_row(shop_id, gmv, conversion_rate, metric_date=date(2026, 10, 1)):
+    return {
+        "platform_code": "shopee",
+        "shop_id": shop_id,
+        "metric_date": metric_date,
+        "gmv": gmv,
+        "order_count": 10,
+        "visitor_count": 500,
+        "conversion_rate": conversion_rate,
+        "available_stock": 300,
+        "sales_volume_30d": 450,
+        "avg_rating": 4.6,
+    }
+
+
+def test_score_period_matches_shop_health_service_ranking_with_ties():
+    rows = [
+        ShopPeriodInputs("shopee", shop_id, date(2026, 10, 1), gmv, 1, 100, conversion, 10.0, 4.2)
+        for shop_id, gmv, conversion in (("a", 500, 4.0), ("b", 500, 2.5), ("c", 300, 1.0), ("d", 100, 3.0))
+    ]
+    scores = score_period(rows)
+
+    service = ShopHealthService.__new__(ShopHealthService)
+    metrics = [{"gmv": row.gmv, "conversion_rate": row.conversion_rate} for row in rows]
+    for row in rows:
+        expected_gmv = service._calculate_gmv_score({"gmv": row.gmv}, metrics)
+        expected_conversion = service._calculate_conversion_score({"conversion_rate": row.conversion_rate}, metrics)
+        assert scores[row.key]["gmv_score"] == expected_gmv
+        assert scores[row.key]["conversion_score"] == expected_conversion
+    assert scores[("shopee", "a", date(2026, 10, 1))]["gmv_score"] == scores[("shopee", "b", date(2026, 10, 1))]["gmv_score"]
+    assert scores[("shopee", "c", date(2026, 10, 1))]["risk_level"] in {"medium", "high"}
+
+
+@pytest.mark.asyncio
+async def test_refresh_skips_unchanged_periods_and_writes_only_changed_rows(monkeypatch):
+    monkeypatch.setattr(engine_module, "_clear_read_caches", lambda: None)
+    db = FakeScoreDb([_mart_row("a", 900, 5.0), _mart_row("b", 500, 3.0), _mart_row("c", 100, 1.0)])
+    engine = CClassMetricsEngine(db)
+
+    first = await engine.refresh(["daily"], since=date(2026, 9, 1))
+    assert first["rows_written"] == 3
+    assert {row["score_version"] for row in db.stored.values()} == {1}
+
+    db.writes.clear()
+    second = await engine.refresh(["daily"], since=date(2026, 9, 1))
+    assert (second["periods_recomputed"], second["rows_written"], second["rows_unchanged"]) == (0, 0, 3)
+    assert db.writes == []
+
+    db.inputs[2] = _mart_row("c", 120, 1.0)
+    third = await engine.refresh(["daily"], since=date(2026, 9, 1))
+    assert third["periods_recomputed"] == 1
+    assert [row["shop_id"] for row in db.writes] == ["c"]
+    assert db.stored[("shopee", "c", date(2026, 10, 1), "daily")]["score_version"] == 2
+    assert db.stored[("shopee", "a", date(2026, 10, 1), "daily")]["score_version"] == 1
+
+    db.inputs.pop(1)
+    fourth = await engine.refresh(["daily"], since=date(2026, 9, 1))
+    assert fourth["rows_deleted"] == 1
+    assert ("shopee", "b", date(2026, 10, 1), "daily") not in db.stored
+    assert db.commits == 4
+    assert db.refresh_marks == ["c_class.shop_health_scores.daily"] * 4
+
+
+@pytest.mark.asyncio
+async def test_refresh_hook_only_runs_for_successful_shop_kpi_targets(monkeypatch):
+    calls = []
+
+    class _Engine:
+        def __init__(self, db):
+            pass
+
+        async def refresh(self, granularities, commit=True):
+            calls.append((granularities, commit))
+            if "weekly" in granularities:
+                raise RuntimeError("mart unavailable")
+            return {"rows_written": 1}
+
+    class _Db:
+        @asynccontextmanager
+        async def begin_nested(self):
+            yield
+
+    monkeypatch.setattr(engine_module, "CClassMetricsEngine", _Engine)
+    monkeypatch.setattr(engine_module, "C_CLASS_METRICS_STORE_ENABLED", True)
+
+    assert await engine_module.refresh_after_mart_refresh(_Db(), ["mart.inventory_snapshot"]) is None
+    result = await engine_module.refresh_after_mart_refresh(
+        _Db(), ["mart.shop_day_kpi", "mart.shop_month_kpi"], ["mart.shop_month_kpi"]
+    )
+    assert result == {"rows_written": 1}
+    assert await engine_module.refresh_after_mart_refresh(_Db(), ["mart.shop_week_kpi"]) is None
+    assert calls == [(["daily"], False), (["weekly"], False)]
+
+
+@pytest.mark.asyncio
+async def test_caller_committed_refresh_clears_read_caches_only_after_commit(monkeypatch):
+    cleared = []
+    monkeypatch.setattr(engine_module, "_clear_read_caches", lambda: cleared.append(1))
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    async def _wait_cleared(count):
+        for _ in range(100):
+            if len(cleared) >= count:
+                break
+            await asyncio.sleep(0.01)
+        return len(cleared)
+
+    try:
+        async with AsyncSession(engine) as session:
+            await session.execute(text("SELECT 1"))
+            engine_module._clear_read_caches_after_commit(session)
+            async with session.begin_nested():
+                await session.execute(text("SELECT 1"))
+            assert cleared == []
+            await session.rollback()
+            await session.execute(text("SELECT 1"))
+            await session.commit()
+            await asyncio.sleep(0.05)
+            assert cleared == []
+
+            await session.execute(text("SELECT 1"))
+            engine_module._clear_read_caches_after_commit(session)
+            await session.commit()
+            assert await _wait_cleared(1) == 1
+            await session.execute(text("SELECT 1"))
+            await session.commit()
+            await asyncio.sleep(0.05)
+            assert len(cleared) == 1
+    finally:
+        await engine.dispose()
+
+
+def _create_score_store(conn):
+    conn.execute(text("ATTACH DATABASE ':memory:' AS c_class"))
+    conn.execute(text("ATTACH DATABASE ':memory:' AS ops"))
+    conn.execute(
+        text(
+            """
+            CREATE TABLE c_class.shop_health_scores (
+                platform_code TEXT, shop_id TEXT, metric_date DATE, granularity TEXT,
+                health_score REAL, gmv_score REAL, conversion_score REAL, inventory_score REAL, service_score REAL,
+                gmv REAL, order_count INTEGER, conversion_rate REAL, inventory_turnover REAL,
+                customer_satisfaction REAL, risk_level TEXT, score_version INTEGER
+            )
+            """
+        )
+    )
+    conn.execute(text("CREATE TABLE ops.data_freshness_log (target_name TEXT PRIMARY KEY, last_succeeded_at TIMESTAMP)"))
+
+
+def test_store_readers_return_periods_overlapping_the_requested_range():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    sync_engine = create_engine("sqlite://")
+    with sync_engine.connect() as conn:
+        _create_score_store(conn)
+        # 周/月评分以周期起始日(周一/月初)标记
+        for shop_id, metric_date, granularity in (
+            ("a", date(2026, 10, 5), "weekly"),
+            ("b", date(2026, 9, 28), "weekly"),
+            ("c", date(2026, 10, 1), "monthly"),
+        ):
+            conn.execute(
+                text(
+                    "INSERT INTO c_class.shop_health_scores VALUES "
+                    "('shopee', :shop_id, :metric_date, :granularity, 80, 30, 20, 20, 10, 100, 5, 2.5, 3, 4.5, 'low', 1)"
+                ),
+                {"shop_id": shop_id, "metric_date": metric_date, "granularity": granularity},
+            )
+        db = Session(bind=conn)
+
+        weekly = engine_module.query_health_scores_from_store(db, date(2026, 10, 7), date(2026, 10, 11), "weekly")
+        monthly = engine_module.query_health_scores_from_store(db, date(2026, 10, 15), date(2026, 10, 31), "monthly")
+        ranking = engine_module.query_shop_ranking_from_store(
+            db, date(2026, 10, 7), date(2026, 10, 11), "weekly", group_by="platform"
+        )
+
+    assert [row["shop_id"] for row in weekly["data"]] == ["a"]
+    assert [row["shop_id"] for row in monthly["data"]] == ["c"]
+    assert ranking["data"][0]["gmv"] == 100
+
+
+def test_data_service_falls_back_when_store_is_empty_or_behind_mart(monkeypatch):
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from backend.services import c_class_data_service as data_service_module
+
+    monkeypatch.setattr(data_service_module, "C_CLASS_METRICS_STORE_ENABLED", True)
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())
+    sync_engine = create_engine("sqlite://")
+    with sync_engine.connect() as conn:
+        _create_score_store(conn)
+        service = data_service_module.CClassDataService(Session(bind=conn))
+
+        def use_store():
+            return service.should_use_metrics_store(today, today, "weekly")
+
+
+        # 没有刷新记录
+        assert use_store() is False
+        conn.execute(
+            text("INSERT INTO ops.data_freshness_log VALUES ('c_class.shop_health_scores.weekly', :at)"),
+            {"at": datetime(2026, 10, 19, 8, 0)},
+        )
+        # 有刷新记录但区间内没有评分
+        assert use_store() is False
+        conn.execute(
+            text("INSERT INTO c_class.shop_health_scores (platform_code, shop_id, metric_date, granularity) "
+                 "VALUES ('shopee', 'a', :metric_date, 'weekly')"),
+            {"metric_date": week_start},
+        )
+        assert use_store() is True
+        assert service.should_use_metrics_store(today, today, "daily") is False
+        # mart 之后又刷新过,评分表没跟上
+        conn.execute(
+            text("INSERT INTO ops.data_freshness_log VALUES ('mart.shop_week_kpi', :at)"),
+            {"at": datetime(2026, 10, 19, 9, 0)},
+        )
+        assert use_store() is False
@@ -202,3 +202,32 @@ def test_cloud_writer_rolls_back_fact_rows_when_receive_log_write_fails():
     with engine.begin() as conn:
         count = conn.execute(text("SELECT COUNT(*) FROM b_class.fact_shopee_orders_monthly")).scalar_one()
     assert count == 0
+
+
+def test_receive_log_recorder_stores_batch_throughput():
+    engine = create_engine(
+        "sqlite://",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ATTACH DATABASE ':memory:' AS ops")
+    CloudSyncReceiveLog = getattr(core_db, "CloudSyncReceiveLog")
+    CloudSyncReceiveLog.__table__.create(bind=engine, checkfirst=True)
+
+    recorder = cloud_b_class_sync_service.CloudSyncReceiveLogRecorder(engine)
+    recorder.record_success(
+        source_table_name="fact_shopee_orders_daily",
+        written_rows=500,
+        payload_bytes=1_000_000,
+        duration_seconds=2.0,
+    )
+
+    with engine.begin() as conn:
+        row = conn.execute(select(CloudSyncReceiveLog.__table__)).mappings().one()
+
+    assert row["duration_ms"] == 2000
+    assert row["payload_bytes"] == 1_000_000
+    assert row["rows_per_second"] == 250
+    assert row["bytes_per_second"] == 500_000
@@ -0,0 +1,283 @@
+import json
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from modules.apps.collection_center import api_replay
+from modules.apps.collection_center import executor_v2 as executor_module
+from modules.apps.collection_center.executor_v2 import CollectionExecutorV2
+
+CN_TZ = timezone(timedelta(hours=8))
+XLSX_BODY = b"PK\x03\x04" + b"\x00" * 32
+
+
+def _epoch(day: str, hour: int = 0, minute: int = 0, second: int = 0) -> int:
+    return int(datetime.fromisoformat(day).replace(hour=hour, minute=minute, second=second, tzinfo=CN_TZ).timestamp())
+
+
+def _write_har(tmp_path: Path, request: dict = None) -> Path:
+    start = _epoch("2026-09-01")
+    end = _epoch("2026-09-07", 23, 59, 59)
+    entries = [
+        {
+            "request": {"method": "GET", "url": "https://seller.shopee.cn/api/v3/home", "headers": []},
+            "response": {"status": 200, "headers": [], "content": {"mimeType": "application/json"}},
+        },
+        {
+            "request": request or {
+                "method": "POST",
+                "url": f"https://seller.shopee.cn/api/mydata/export?SPC_CDS=abcd-1234-efgh&start_time={start}&end_time={end}",
+                "headers": [
+                    {"name": "Cookie", "value": "SPC_CDS=abcd-1234-efgh"},
+                    {"name": "x-csrftoken", "value": "csrf-token-value"},
+                    {"name": "Accept", "value": "*/*"},
+                    {"name": "sec-fetch-mode", "value": "cors"},
+                ],
+                "cookies": [
+                    {"name": "SPC_CDS", "value": "abcd-1234-efgh"},
+                    {"name": "csrftoken", "value": "csrf-token-value"},
+                ],
+                "postData": {
+                    "mimeType": "application/json",
+                    "text": json.dumps(
+                        {
+                            "filter": {"date_from": "2026-09-01", "date_to": "2026-09-07", "shop_id": 1001, "period": "day"},
+                            "metrics": ["gmv"],
+                        }
+                    ),
+                },
+            },
+            "response": {
+                "status": 200,
+                "headers": [{"name": "Content-Disposition", "value": 'attachment; filename="orders.xlsx"'}],
+                "content": {"mimeType": "application/octet-stream"},
+            },
+        },
+    ]
+    har_path = tmp_path / "capture.har"
+    har_path.write_text(json.dumps({"log": {"entries": entries}}), encoding="utf-8")
+    return har_path
+
+
+class _FakeResponse:
+    def __init__(self, status, content_type, body):
+        self.status = status
+        self.headers = {"content-type": content_type}
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+    async def dispose(self):
+        return None
+
+
+class _FakeContext:
+    def __init__(self, response):
+        self.calls = []
+        self.request = SimpleNamespace(fetch=self._fetch)
+        self._response = response
+
+    async def _fetch(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self._response
+
+    async def cookies(self, url=None):
+        return [{"name": "SPC_CDS", "value": "fresh-cds"}, {"name": "csrftoken", "value": "fresh-csrf"}]
+
+
+def _learn(tmp_path: Path, **overrides) -> api_replay.ExportRequestTemplate:
+    options = {"platform": "shopee", "data_domain": "orders", "account_id": "acc-a", "shop_id": "1001", "granularity": "daily"}
+    options.update(overrides)
+    return api_replay.learn_export_template(_write_har(tmp_path), **options)
+
+
+def test_learn_template_from_har_detects_dates_and_session_values(tmp_path):
+    template = _learn(tmp_path, platform="Shopee")
+
+    assert template.method == "POST"
+    assert template.url == "https://seller.shopee.cn/api/mydata/export"
+    assert template.file_kind == "xlsx"
+    assert "cookie" not in template.headers and "sec-fetch-mode" not in template.headers
+    assert template.cookie_fields == {"query:SPC_CDS": "SPC_CDS", "header:x-csrftoken": "csrftoken"}
+    roles = {(field.location, "/".join(field.path)): (field.kind, field.role) for field in template.date_fields}
+    assert roles == {
+        ("query", "start_time"): ("epoch_s", "start"),
+        ("query", "end_time"): ("epoch_s", "end"),
+        ("json", "filter/date_from"): ("%Y-%m-%d", "start"),
+        ("json", "filter/date_to"): ("%Y-%m-%d", "end"),
+    }
+    assert template.scope_fields == [
+        api_replay.ScopeField(location="json", path=["filter", "shop_id"], role="shop", captured_value=1001),
+        api_replay.ScopeField(location="json", path=["filter", "period"], role="granularity", captured_value="day"),
+    ]
+    assert (template.account_id, template.shop_id, template.granularity) == ("acc-a", "1001", "daily")
+
+
+def test_render_request_shifts_dates_and_uses_current_cookies(tmp_path):
+    template = _learn(tmp_path)
+
+    request = api_replay.render_export_request(
+        template,
+        "2026-10-01",
+        "2026-10-31",
+        cookies={"SPC_CDS": "fresh-cds", "csrftoken": "fresh-csrf"},
+        shop_id="2002",
+        granularity="daily",
+    )
+
+    assert request["params"]["start_time"] == str(_epoch("2026-10-01"))
+    assert request["params"]["end_time"] == str(_epoch("2026-10-31", 23, 59, 59))
+    assert request["params"]["SPC_CDS"] == "fresh-cds"
+    assert request["headers"]["x-csrftoken"] == "fresh-csrf"
+    assert json.loads(request["data"]) == {
+        "filter": {"date_from": "2026-10-01", "date_to": "2026-10-31", "shop_id": 2002, "period": "day"},
+        "metrics": ["gmv"],
+    }
+
+
+def test_render_refuses_when_shop_or_granularity_cannot_be_confirmed(tmp_path):
+    template = _learn(tmp_path)
+    render = api_replay.render_export_request
+
+    with pytest.raises(api_replay.ReplayScopeError):
+        render(template, "2026-10-01", "2026-10-31", shop_id="2002", granularity="monthly")
+    with pytest.raises(api_replay.ReplayScopeError):
+        render(template, "2026-10-01", "2026-10-31", shop_id=None, granularity="daily")
+    # 未识别出店铺字段时,只允许录制时的同一店铺
+    no_shop_field = replace(template, scope_fields=[f for f in template.scope_fields if f.role != "shop"])
+    with pytest.raises(api_replay.ReplayScopeError):
+        render(no_shop_field, "2026-10-01", "2026-10-31", shop_id="2002", granularity="daily")
+    assert render(no_shop_field, "2026-10-01", "2026-10-31", shop_id="1001", granularity="daily")
+    # 录制店铺 ID 残留在未识别的字段里
+    leaking = replace(template, json_body={**template.json_body, "owner": "1001"})
+    with pytest.raises(api_replay.ReplayScopeError, match="shop id"):
+        render(leaking, "2026-10-01", "2026-10-31", shop_id="2002", granularity="daily")
+
+
+def test_learn_and_render_dates_in_url_path_and_form_body(tmp_path):
+    har_path = _write_har(
+        tmp_path,
+        {
+            "method": "POST",
+            "url": "https://seller.shopee.cn/api/report/2026-09-01/2026-09-07/export",
+            "headers": [],
+            "postData": {
+                "mimeType": "application/x-www-form-urlencoded",
+                "text": "shop_id=1001&begin_date=2026%2F09%2F01&end_date=2026%2F09%2F07&lang=zh",
+            },
+        },
+    )
+    template = api_replay.learn_export_template(
+        har_path, platform="shopee", data_domain="orders", shop_id="1001", granularity="daily"
+    )
+
+    roles = {(field.location, "/".join(field.path)): field.role for field in template.date_fields}
+    assert roles == {
+        ("path", "3"): "start",
+        ("path", "4"): "end",
+        ("form", "begin_date"): "start",
+        ("form", "end_date"): "end",
+    }
+    request = api_replay.render_export_request(template, "2026-10-01", "2026-10-31", shop_id="2002", granularity="daily")
+    assert request["url"] == "https://seller.shopee.cn/api/report/2026-10-01/2026-10-31/export"
+    assert request["data"] == "shop_id=2002&begin_date=2026%2F10%2F01&end_date=2026%2F10%2F31&lang=zh"
+    assert request["headers"]["content-type"] == "application/x-www-form-urlencoded"
+
+
+def test_learn_and_render_refuse_when_date_range_is_not_covered(tmp_path):
+    no_dates = _write_har(
+        tmp_path,
+        {"method": "POST", "url": "https://seller.shopee.cn/api/export", "headers": [], "postData": {"text": "{}"}},
+    )
+    with pytest.raises(api_replay.ReplayScopeError, match="no date range"):
+        api_replay.learn_export_template(no_dates, platform="shopee", data_domain="orders", shop_id="1001")
+
+    template = _learn(tmp_path)
+    render = api_replay.render_export_request
+    with pytest.raises(api_replay.ReplayScopeError, match="no date field"):
+        render(replace(template, date_fields=[]), "2026-10-01", "2026-10-31", shop_id="1001", granularity="daily")
+    start_only = replace(template, date_fields=[f for f in template.date_fields if f.role == "start"])
+    with pytest.raises(api_replay.ReplayScopeError, match="no end date"):
+        render(start_only, "2026-10-01", "2026-10-31", shop_id="1001", granularity="daily")
+    # 未识别的字段里残留录制时的日期
+    leaking = replace(template, json_body={**template.json_body, "label": "2026-09-07"})
+    with pytest.raises(api_replay.ReplayScopeError, match="captured date"):
+        render(leaking, "2026-10-01", "2026-10-31", shop_id="1001", granularity="daily")
+    # 目标范围与录制日期重叠时,同值不算残留
+    assert render(leaking, "2026-09-07", "2026-09-30", shop_id="1001", granularity="daily")
+
+
+def test_template_round_trips_through_store_by_exact_scope(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_replay, "get_data_dir", lambda: tmp_path)
+    template = _learn(tmp_path, data_domain="services", sub_domain="agent")
+
+    api_replay.save_export_template(template)
+
+    load = api_replay.load_export_template
+    assert load("shopee", "services", "agent", account_id="acc-a", granularity="day") == template
+    assert load("shopee", "services", "ai_assistant", account_id="acc-a", granularity="daily") is None
+    assert load("shopee", "services", account_id="acc-a", granularity="daily") is None
+    assert load("shopee", "services", "agent", account_id="acc-b", granularity="daily") is None
+    assert load("shopee", "services", "agent", account_id="acc-a", granularity="weekly") is None
+
+
+@pytest.mark.asyncio
+async def test_replay_export_saves_valid_file_and_rejects_json(tmp_path):
+    template = _learn(tmp_path)
+    scope = {"shop_id": "1001", "granularity": "daily"}
+
+    ok_context = _FakeContext(_FakeResponse(200, "application/octet-stream", XLSX_BODY))
+    saved = await api_replay.replay_export(
+        ok_context, template, date_from="2026-10-01", date_to="2026-10-31", download_dir=tmp_path / "dl", **scope
+    )
+    url, kwargs = ok_context.calls[0]
+    assert url == template.url and kwargs["method"] == "POST"
+    assert Path(saved).read_bytes() == XLSX_BODY
+
+    error_context = _FakeContext(_FakeResponse(200, "application/json", b'{"code": 401}'))
+    assert (
+        await api_replay.replay_export(
+            error_context, template, date_from="2026-10-01", date_to="2026-10-31", download_dir=tmp_path / "dl", **scope
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_executor_uses_replay_and_falls_back_when_response_invalid(tmp_path, monkeypatch):
+    template = _learn(tmp_path)
+    lookups = []
+
+    def _load(platform, domain, sub_domain=None, *, account_id=None, granularity=None):
+        lookups.append((platform, domain, sub_domain, account_id, granularity))
+        return template
+
+    monkeypatch.setattr(executor_module, "load_export_template", _load)
+    executor = CollectionExecutorV2.__new__(CollectionExecutorV2)
+    component = {
+        "platform": "shopee",
+        "name": "orders_export",
+        "_params": {
+            "account": {"shop_account_id": "acc-a", "shop_id": "2002"},
+            "params": {"data_domain": "orders", "date_from": "2026-10-01", "date_to": "2026-10-31", "granularity": "daily"},
+        },
+    }
+
+    ok_page = SimpleNamespace(context=_FakeContext(_FakeResponse(200, "application/octet-stream", XLSX_BODY)))
+    assert await executor._try_api_replay_export(ok_page, component, tmp_path / "dl")
+    assert lookups[0] == ("shopee", "orders", None, "acc-a", "daily")
+    assert json.loads(ok_page.context.calls[0][1]["data"])["filter"]["shop_id"] == 2002
+
+    # 粒度与模板不一致:不发请求,回退到 UI 导出
+    weekly = {**component, "_params": {**component["_params"], "params": {**component["_params"]["params"], "granularity": "weekly"}}}
+    weekly_page = SimpleNamespace(context=_FakeContext(_FakeResponse(200, "application/octet-stream", XLSX_BODY)))
+    assert await executor._try_api_replay_export(weekly_page, weekly, tmp_path / "dl") is None
+    assert weekly_page.context.calls == []
+
+    bad_page = SimpleNamespace(context=_FakeContext(_FakeResponse(403, "text/html", b"<html>")))
+    assert await executor._try_api_replay_export(bad_page, component, tmp_path / "dl") is None
+    assert await executor._try_api_replay_export(ok_page, {**component, "api_replay": False}, tmp_path / "dl") is None
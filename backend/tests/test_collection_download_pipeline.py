@@ -0,0 +1,155 @@
+import asyncio
+import errno
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+import modules.apps.collection_center.download_pipeline as pipeline_module
+import modules.services.catalog_scanner as catalog_scanner_module
+from modules.apps.collection_center import executor_v2 as executor_module
+from modules.apps.collection_center.download_pipeline import DownloadCapture, land_file
+from modules.apps.collection_center.executor_v2 import CollectionExecutorV2
+from modules.core.db import CatalogFile
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(_type, _compiler, **_kwargs):
+    return "JSON"
+
+
+class _FakeDownload:
+    def __init__(self, suggested_filename: str, payload: bytes):
+        self.suggested_filename = suggested_filename
+        self.payload = payload
+
+    async def save_as(self, path: str):
+        Path(path).write_bytes(self.payload)
+
+
+class _FakePage:
+    def __init__(self):
+        self.listeners = {}
+
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+
+    def emit(self, event, payload):
+        for handler in list(self.listeners.get(event, [])):
+            handler(payload)
+
+
+@pytest.mark.parametrize("cross_device", [False, True])
+def test_land_file_hashes_match_catalog_hash_in_one_pass(tmp_path, monkeypatch, cross_device):
+    source = tmp_path / "downloads" / "export.xlsx"
+    source.parent.mkdir()
+    payload = b"x" * (3 * 1024 + 17)
+    source.write_bytes(payload)
+    target = tmp_path / "raw" / "2026" / "shopee_orders_daily.xlsx"
+    target.parent.mkdir(parents=True)
+
+    if cross_device:
+        real_replace = pipeline_module.os.replace
+
+        def _replace(src, dst):
+            if Path(src) == source:
+                raise OSError(errno.EXDEV, "cross-device link")
+            return real_replace(src, dst)
+
+        monkeypatch.setattr(pipeline_module.os, "replace", _replace)
+
+    landed = land_file(source, target, identities=[("shop-1", "shopee"), ("shop-1", "shopee")], chunk_size=1024)
+
+    assert not source.exists()
+    assert target.read_bytes() == payload
+    assert not target.with_name(target.name + ".part").exists()
+    assert landed.size == len(payload)
+    assert landed.catalog_hashes == {
+        "shop-1|shopee": catalog_scanner_module._compute_sha256(target, shop_id="shop-1", platform_code="shopee")
+    }
+    assert landed.content_sha256 == catalog_scanner_module._compute_sha256(target)
+
+
+@pytest.mark.asyncio
+async def test_download_capture_queues_events_fired_before_the_wait(tmp_path):
+    page = _FakePage()
+
+    async with DownloadCapture(page, tmp_path, watch_directory=False) as capture:
+        page.emit("download", _FakeDownload("orders.xlsx", b"orders"))
+        saved = await capture.next_download(1, save_as="renamed.xlsx")
+        missing = await capture.wait_for_file(timeout=0.05)
+
+    assert saved == str(tmp_path / "renamed.xlsx")
+    assert (tmp_path / "renamed.xlsx").read_bytes() == b"orders"
+    assert missing is None
+    assert page.listeners["download"] == []
+
+
+@pytest.mark.asyncio
+async def test_download_capture_watches_directory_and_ignores_existing_files(tmp_path):
+    (tmp_path / "old.xlsx").write_bytes(b"old")
+
+    async with DownloadCapture(_FakePage(), tmp_path) as capture:
+        await asyncio.sleep(0.2)
+        (tmp_path / "report.csv.crdownload").write_bytes(b"partial")
+        (tmp_path / "report.csv").write_bytes(b"a,b\n1,2\n")
+        found = await capture.wait_for_file(timeout=10)
+
+    assert found == str(tmp_path / "report.csv")
+
+
+@pytest.mark.asyncio
+async def test_process_files_registration_reuses_landing_hash(tmp_path, monkeypatch):
+    import backend.services.platform_table_manager as platform_table_manager_module
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}", future=True)
+    CatalogFile.__table__.create(engine)
+    monkeypatch.setattr(catalog_scanner_module, "_get_engine", lambda: engine)
+    monkeypatch.setattr(
+        platform_table_manager_module,
+        "get_platform_table_manager",
+        lambda _session: type(
+            "_NoopTableManager",
+            (),
+            {"ensure_table_exists": staticmethod(lambda **_kwargs: "fact_tiktok_orders_daily")},
+        )(),
+    )
+    raw_dir = tmp_path / "data" / "raw"
+    monkeypatch.setattr(executor_module, "get_data_raw_dir", lambda: raw_dir, raising=False)
+
+    download_file = tmp_path / "downloads" / "orders.xlsx"
+    download_file.parent.mkdir()
+    download_file.write_bytes(b"orders-content")
+
+    compute_sha256 = catalog_scanner_module._compute_sha256
+
+    def _no_reread(*_args, **_kwargs):
+        raise AssertionError("register_single_file should reuse the landing hash")
+
+    monkeypatch.setattr(catalog_scanner_module, "_compute_sha256", _no_reread)
+
+    executor = CollectionExecutorV2.__new__(CollectionExecutorV2)
+    executor._infer_data_domain_from_path = lambda file_path, data_domains, idx: data_domains[idx]
+    executor._infer_sub_domain_from_path = lambda file_path, data_domain=None: ""
+
+    processed = await CollectionExecutorV2._process_files(
+        executor,
+        [str(download_file)],
+        platform="tiktok",
+        data_domains=["orders"],
+        granularity="daily",
+        account={"shop_id": "shop-9", "label": "demo"},
+    )
+
+    assert len(processed) == 1
+    with Session(engine) as session:
+        record = session.execute(select(CatalogFile)).scalar_one()
+    assert record.file_hash == compute_sha256(
+        Path(processed[0]), shop_id=record.shop_id, platform_code=record.platform_code
+    )
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import modules.apps.collection_center.executor_v2 as executor_module
+from backend.services.component_version_service import ComponentVersionService
+from modules.apps.collection_center.executor_v2 import CollectionExecutorV2
+from modules.core.db import ComponentSelectorStat
+
+
+class _FakeLocator:
+    def __init__(self, page, selector: str):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state: str, timeout: int):
+        self.page.waits.append((self.selector, state))
+        delay = self.page.visible_after.get(self.selector)
+        if delay is None:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(f"{self.selector} not {state}")
+        await asyncio.sleep(delay)
+
+
+class _FakePage:
+    def __init__(self, visible_after):
+        self.visible_after = visible_after
+        self.waits = []
+
+    def locator(self, selector: str):
+        return _FakeLocator(self, selector)
+
+    def get_by_text(self, value: str):
+        return _FakeLocator(self, f"text={value}")
+
+
+COMPONENT = {"name": "login", "platform": "shopee", "_version_number": "1.2.0"}
+
+
+def _step(**extra):
+    return {
+        "action": "click",
+        "selectors": [
+            {"type": "css", "value": "#stale-submit", "priority": 1},
+            {"type": "text", "value": "Log in", "priority": 2},
+            {"type": "css", "value": "button.login", "priority": 3},
+        ],
+        **extra,
+    }
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    monkeypatch.setattr(executor_module, "_load_selector_win_counts_sync", lambda **_: {})
+    return CollectionExecutorV2()
+
+
+@pytest.mark.asyncio
+async def test_race_returns_first_attached_selector_without_waiting_for_stale_ones(executor):
+    page = _FakePage({"text=Log in": 0.05, "button.login": 0.01})
+
+    started = asyncio.get_running_loop().time()
+    locator = await executor._get_locator_with_fallback(page, _step(), 2000, COMPONENT)
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert locator.selector == "button.login"
+    assert elapsed < 1.0
+    assert {selector for selector, _ in page.waits} == {"#stale-submit", "text=Log in", "button.login"}
+    stats_key = ("shopee", "shopee/login", "1.2.0")
+    step_key = CollectionExecutorV2._selector_step_key(_step())
+    assert executor._selector_wins_pending[stats_key] == {step_key: {"css=button.login": 1}}
+
+
+@pytest.mark.asyncio
+async def test_race_prefers_candidate_order_when_several_attach_together(executor):
+    page = _FakePage({"#stale-submit": 0, "button.login": 0})
+
+    locator = await executor._get_locator_with_fallback(page, _step(), 2000, COMPONENT)
+
+    assert locator.selector == "#stale-submit"
+
+
+@pytest.mark.asyncio
+async def test_sequential_mode_keeps_priority_order(executor):
+    page = _FakePage({"text=Log in": 0, "button.login": 0})
+
+    locator = await executor._get_locator_with_fallback(page, _step(selector_race=False), 2000, COMPONENT)
+
+    assert locator.selector == "text=Log in"
+    assert [selector for selector, _ in page.waits] == ["#stale-submit", "text=Log in"]
+
+
+@pytest.mark.asyncio
+async def test_all_candidates_failing_falls_back_to_legacy_selector(executor):
+    page = _FakePage({})
+
+    locator = await executor._get_locator_with_fallback(page, _step(selector="#legacy"), 50, COMPONENT)
+
+    assert locator.selector == "#legacy"
+    assert executor._selector_wins_pending == {}
+
+
+@pytest.mark.asyncio
+async def test_race_probes_attached_with_short_timeout_before_legacy_fallback(executor):
+    page = _FakePage({})
+
+    started = asyncio.get_running_loop().time()
+    locator = await executor._get_locator_with_fallback(page, _step(selector="#legacy"), 30000, COMPONENT)
+    elapsed = asyncio.get_running_loop().time() - started
+
+    # 与逐个尝试一致:每个候选只探测 attached 1 秒,不会等满步骤超时
+    assert locator.selector == "#legacy"
+    assert elapsed < executor_module.SELECTOR_PROBE_TIMEOUT_MS / 1000 + 0.5
+    assert {state for _, state in page.waits} == {"attached"}
+
+
+@pytest.mark.asyncio
+async def test_history_reorders_candidates_and_wins_are_flushed(executor, monkeypatch):
+    step = _step(selector_race=False)
+    step_key = CollectionExecutorV2._selector_step_key(step)
+    monkeypatch.setattr(
+        executor_module,
+        "_load_selector_win_counts_sync",
+        lambda **_: {step_key: {"css=button.login": 9, "text=Log in": 1}},
+    )
+    recorded = []
+    monkeypatch.setattr(executor_module, "_record_selector_wins_sync", lambda **kwargs: recorded.append(kwargs))
+    page = _FakePage({"#stale-submit": 0, "text=Log in": 0, "button.login": 0})
+
+    await executor._load_selector_history(COMPONENT)
+    locator = await executor._get_locator_with_fallback(page, step, 2000, COMPONENT)
+    await executor._flush_selector_wins(COMPONENT)
+
+    assert locator.selector == "button.login"
+    assert page.waits == [("button.login", "attached")]
+    assert recorded == [
+        {
+            "platform": "shopee",
+            "component_name": "shopee/login",
+            "version": "1.2.0",
+            "wins": {step_key: {"css=button.login": 1}},
+        }
+    ]
+
+
+def test_component_version_service_accumulates_selector_wins():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("ATTACH DATABASE ':memory:' AS core"))
+    ComponentSelectorStat.__table__.create(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        service = ComponentVersionService(session)
+        service.record_selector_wins("shopee", "shopee/login", "1.2.0", {"submit": {"css=button.login": 2}})
+        service.record_selector_wins(
+            "shopee", "shopee/login", "1.2.0", {"submit": {"css=button.login": 1, "text=Log in": 1}}
+        )
+        service.record_selector_wins("shopee", "shopee/login", "1.3.0", {"submit": {"text=Log in": 5}})
+
+        assert service.get_selector_win_counts("shopee", "shopee/login", "1.2.0") == {
+            "submit": {"css=button.login": 3, "text=Log in": 1}
+        }
+    finally:
+        session.close()
+        engine.dispose()
@@ -161,6 +161,7 @@ async def test_recreate_runtime_page_with_saved_session_preserves_fingerprint_vi
         platform="miaoshou",
         account={"account_id": "acc-1", "login_url": "https://erp.91miaoshou.com"},
         account_id="acc-1",
+        headless=True,
     )
 
     assert captured["viewport"] == {"width": 2880, "height": 1800}
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+from modules.apps.collection_center.executor_v2 import CollectionExecutorV2
+from modules.apps.collection_center.network_policy import (
+    apply_network_policy,
+    get_network_policy,
+    get_network_stats,
+)
+
+
+class _FakeRoute:
+    def __init__(self):
+        self.outcome = None
+
+    async def fallback(self):
+        self.outcome = "fallback"
+
+    async def abort(self, error_code=None):
+        self.outcome = f"abort:{error_code}"
+
+
+class _FakeContext:
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def request(self, url, resource_type):
+        route = _FakeRoute()
+        _pattern, handler = self.routes[-1]
+        await handler(route, SimpleNamespace(url=url, resource_type=resource_type))
+        return route.outcome
+
+
+def test_policy_blocks_heavy_resources_and_trackers_but_keeps_verification():
+    policy = get_network_policy("TikTok")
+
+    assert policy.classify("https://seller.tiktokshopglobalselling.com/api/export", "fetch") is None
+    assert policy.classify("https://seller.tiktokshopglobalselling.com/logo.png", "image") == "image"
+    assert policy.classify("https://cdn.example.com/font.woff2", "font") == "font"
+    assert policy.classify("https://www.google-analytics.com/collect", "xhr") == "tracking"
+    assert policy.classify("https://analytics.tiktok.com/api/v2/pixel", "script") == "tracking"
+    assert policy.classify("https://verify-sg.example.com/captcha/slide.jpg", "image") is None
+    assert policy.classify("data:image/png;base64,AAAA", "image") is None
+    assert get_network_policy("shopee").classify("https://analytics.tiktok.com/x", "script") is None
+
+
+def test_platform_allowed_hosts_keep_login_and_captcha_cdns():
+    assert get_network_policy("tiktok").classify("https://p16-security-va.ibyteimg.com/img/puzzle.png", "image") is None
+    assert get_network_policy("miaoshou").classify("https://at.alicdn.com/t/font_nc.woff", "font") is None
+    assert get_network_policy("shopee").classify("https://deo.shopeemobile.com/shopee/login/bg.png", "image") is None
+    assert get_network_policy("shopee").classify("https://at.alicdn.com/t/font_nc.woff", "font") == "font"
+
+
+@pytest.mark.asyncio
+async def test_apply_network_policy_routes_requests_and_counts_savings():
+    context = _FakeContext()
+
+    stats = await apply_network_policy(context, "shopee", headless=True)
+    outcomes = [
+        await context.request("https://seller.shopee.cn/portal/home", "document"),
+        await context.request("https://seller.shopee.cn/banner.jpg", "image"),
+        await context.request("https://connect.facebook.net/sdk.js", "script"),
+    ]
+
+    assert outcomes == ["fallback", "abort:blockedbyclient", "abort:blockedbyclient"]
+    assert get_network_stats(context) is stats
+    summary = stats.summary()
+    assert (summary["allowed_requests"], summary["blocked_requests"]) == (1, 2)
+    assert summary["blocked_by_reason"] == {"image": 1, "tracking": 1}
+    assert summary["estimated_bytes_saved"] > 0
+    assert await apply_network_policy(context, "shopee", headless=True) is None
+    assert len(context.routes) == 1
+
+
+@pytest.mark.asyncio
+async def test_headed_contexts_are_not_routed():
+    context = _FakeContext()
+
+    assert await apply_network_policy(context, "shopee", headless=False) is None
+    assert context.routes == []
+
+
+@pytest.mark.asyncio
+async def test_stop_browser_diagnostics_reports_network_savings():
+    context = _FakeContext()
+    await apply_network_policy(context, "miaoshou", headless=True)
+    await context.request("https://erp.91miaoshou.com/static/bg.mp4", "media")
+    emitted = []
+
+    async def _emit(task_id, message, *, details=None):
+        emitted.append((task_id, message, details))
+
+    executor = CollectionExecutorV2.__new__(CollectionExecutorV2)
+    executor._emit_browser_diagnostic = _emit
+
+    await executor._stop_browser_diagnostics(task_id="t-1", play_context=context, diagnostics=None, scope="main")
+
+    assert len(emitted) == 1
+    task_id, _message, details = emitted[0]
+    assert task_id == "t-1"
+    assert details["diagnostic_event"] == "network_policy_summary"
+    assert details["blocked_by_reason"] == {"media": 1}
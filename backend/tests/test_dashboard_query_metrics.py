@@ -0,0 +1,119 @@
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+import backend.services.postgresql_dashboard_service as dashboard_service_module
+from backend.middleware.performance_logging import PerformanceLoggingMiddleware
+from backend.services.dashboard_query_metrics import (
+    DashboardQueryMetrics,
+    get_dashboard_query_metrics,
+    sql_module_label,
+)
+from backend.services.postgresql_dashboard_service import PostgresqlDashboardService
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_dashboard_query_metrics().reset()
+    yield
+    get_dashboard_query_metrics().reset()
+
+
+def test_sql_module_label_uses_first_schema_qualified_source():
+    assert sql_module_label("SELECT * FROM api.business_overview_kpi_module WHERE 1 = 1") == (
+        "api.business_overview_kpi_module"
+    )
+    assert sql_module_label("SELECT 1") == "unknown"
+
+
+def test_histograms_render_cumulative_prometheus_buckets():
+    metrics = DashboardQueryMetrics(latency_buckets=(0.1, 1.0), row_buckets=(10,))
+    metrics.observe_query("api.kpi_module", 0.05, rows=3)
+    metrics.observe_query("api.kpi_module", 0.5, rows=30)
+    metrics.observe_query("api.kpi_module", 2.0, rows=0, failed=True)
+    metrics.observe_cache("dashboard_kpi", "HIT")
+
+    text = "\n".join(metrics.render_prometheus())
+
+    assert "# TYPE xihong_dashboard_query_duration_seconds histogram" in text
+    assert 'xihong_dashboard_query_duration_seconds_bucket{module="api.kpi_module",le="0.1"} 1' in text
+    assert 'xihong_dashboard_query_duration_seconds_bucket{module="api.kpi_module",le="1"} 2' in text
+    assert 'xihong_dashboard_query_duration_seconds_bucket{module="api.kpi_module",le="+Inf"} 3' in text
+    assert 'xihong_dashboard_query_rows_count{module="api.kpi_module"} 2' in text
+    assert 'xihong_dashboard_query_errors_total{module="api.kpi_module"} 1' in text
+    assert 'xihong_dashboard_cache_lookups_total{cache_type="dashboard_kpi",status="hit"} 1' in text
+
+
+def test_module_split_never_reports_more_db_time_than_total():
+    metrics = DashboardQueryMetrics(latency_buckets=(1.0,))
+    metrics.observe_module("business_overview_kpi", total_seconds=0.5, db_seconds=0.8)
+
+    text = "\n".join(metrics.render_prometheus())
+
+    assert 'xihong_dashboard_module_duration_seconds_sum{module="business_overview_kpi",phase="db"} 0.5' in text
+    assert 'xihong_dashboard_module_duration_seconds_sum{module="business_overview_kpi",phase="reduce"} 0.0' in text
+
+
+@pytest.mark.asyncio
+async def test_dashboard_service_records_query_rows_and_module_phases(monkeypatch):
+    class _Result:
+        def mappings(self):
+            return self
+
+        def all(self):
+            return [
+                {"period_key": date(2026, 4, 1), "platform_code": "shopee", "gmv": 100, "order_count": 10},
+            ]
+
+    class _Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        async def execute(self, stmt, params=None):
+            return _Result()
+
+    async def fake_employee_count(_period_key):
+        return 0
+
+    monkeypatch.setattr(dashboard_service_module, "AsyncSessionLocal", lambda: _Session())
+    service = PostgresqlDashboardService()
+    monkeypatch.setattr(service, "_load_active_employee_count", fake_employee_count)
+
+    await service.get_business_overview_kpi(month="2026-04-01")
+
+    text = "\n".join(get_dashboard_query_metrics().render_prometheus())
+    assert 'xihong_dashboard_query_rows_count{module="api.business_overview_kpi_module"} 2' in text
+    assert 'xihong_dashboard_module_duration_seconds_count{module="business_overview_kpi",phase="db"} 1' in text
+    assert 'xihong_dashboard_module_duration_seconds_count{module="business_overview_kpi",phase="reduce"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_performance_middleware_records_dashboard_route_templates():
+    app = FastAPI()
+    app.add_middleware(PerformanceLoggingMiddleware)
+
+    @app.get("/api/dashboard/items/{item_id}")
+    async def _item(item_id: str):
+        return {"item_id": item_id}
+
+    @app.get("/api/other")
+    async def _other():
+        return {}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        await client.get("/api/dashboard/items/1")
+        await client.get("/api/dashboard/items/2")
+        await client.get("/api/other")
+
+    text = "\n".join(get_dashboard_query_metrics().render_prometheus())
+    assert (
+        'xihong_dashboard_request_duration_seconds_count{endpoint="/api/dashboard/items/{item_id}",method="GET",status="2xx"} 2'
+        in text
+    )
+    assert "/api/other" not in text
@@ -0,0 +1,207 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from backend.services.data_ingestion_service import DataIngestionService
+
+
+class _FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class _FakeDb:
+    def __init__(self, file_record):
+        self.file_record = file_record
+        self.commit_calls = 0
+
+    async def execute(self, _query):
+        return _FakeResult(self.file_record)
+
+    async def commit(self):
+        self.commit_calls += 1
+
+    async def rollback(self):
+        return None
+
+
+class _FakeExecutorManager:
+    async def run_cpu_intensive(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+class _FakeDeduplicationService:
+    def __init__(self, _db):
+        pass
+
+    def batch_calculate_data_hash(self, rows, identity_values=None, **_kwargs):
+        identity_values = identity_values or [{} for _ in rows]
+        return [
+            f"{row['订单号']}:{identity.get('_source_line_index', 1)}"
+            for row, identity in zip(rows, identity_values)
+        ]
+
+
+class _FakeRawImporter:
+    def __init__(self):
+        self.calls = []
+
+    async def async_batch_insert_raw_data(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"inserted": len(kwargs["rows"]), "updated": 0, "skipped": 0}
+
+
+class _FakeProgressTracker:
+    updates = []
+
+    def __init__(self, _db):
+        pass
+
+    async def queue_update(self, task_id, updates):
+        self.updates.append((task_id, updates))
+
+
+def _orders_frame():
+    return pd.DataFrame(
+        [
+            {"订单号": "A001", "买家支付": "10"},
+            {"订单号": "A002", "买家支付": "20"},
+            {"订单号": "A002", "买家支付": "20"},
+            {"订单号": "A003", "买家支付": "30"},
+            {"订单号": "A004", "买家支付": "40"},
+        ]
+    )
+
+
+@pytest.fixture
+def ingest_env(monkeypatch, tmp_path):
+    file_path = tmp_path / "orders.xlsx"
+    file_path.write_bytes(b"test")
+    file_record = SimpleNamespace(
+        id=7,
+        file_path=str(file_path),
+        file_name="orders.xlsx",
+        status="pending",
+        error_message=None,
+        data_domain="orders",
+        platform_code="shopee",
+        shop_id="shop-1",
+        granularity="daily",
+        sub_domain=None,
+        last_processed_at=None,
+    )
+    importer = _FakeRawImporter()
+    _FakeProgressTracker.updates = []
+
+    monkeypatch.setattr(
+        "backend.services.data_ingestion_service.get_executor_manager",
+        lambda: _FakeExecutorManager(),
+    )
+    monkeypatch.setattr(
+        "backend.services.data_ingestion_service.ExcelParser.read_excel",
+        lambda *_args, **_kwargs: _orders_frame(),
+    )
+    monkeypatch.setattr(
+        "backend.services.data_ingestion_service.ExcelParser.normalize_table",
+        lambda df, **_kwargs: (df, {"strategy": "none", "filled_rows": 0, "filled_columns": []}),
+    )
+    monkeypatch.setattr(
+        "backend.services.data_ingestion_service.get_raw_data_importer",
+        lambda _db: importer,
+    )
+    monkeypatch.setattr(
+        "backend.services.data_ingestion_service.DeduplicationService",
+        _FakeDeduplicationService,
+    )
+    monkeypatch.setattr(
+        "backend.services.sync_progress_tracker.SyncProgressTracker",
+        _FakeProgressTracker,
+    )
+
+    def build_service():
+        service = DataIngestionService(_FakeDb(file_record))
+        monkeypatch.setattr(service, "_safe_resolve_path", lambda _path: str(file_path))
+        monkeypatch.setattr(service, "_resolve_runtime_spreadsheet_path", lambda _path: str(file_path))
+        return service
+
+    return SimpleNamespace(file_record=file_record, importer=importer, build_service=build_service)
+
+
+@pytest.mark.asyncio
+async def test_chunked_ingest_matches_whole_file_hashes_and_commits_file_once(ingest_env):
+    whole = await ingest_env.build_service().ingest_data(
+        file_id=7, platform="shopee", domain="orders", mappings=None, chunk_rows=0, extract_images=False
+    )
+    whole_hashes = [value for call in ingest_env.importer.calls for value in call["data_hashes"]]
+
+    ingest_env.importer.calls.clear()
+    ingest_env.file_record.status = "pending"
+    service = ingest_env.build_service()
+    chunked = await service.ingest_data(
+        file_id=7,
+        platform="shopee",
+        domain="orders",
+        mappings=None,
+        task_id="task-7",
+        chunk_rows=2,
+        extract_images=False,
+    )
+
+    assert whole["success"] is True and chunked["success"] is True
+    assert [len(call["rows"]) for call in ingest_env.importer.calls] == [2, 2, 1]
+    assert [value for call in ingest_env.importer.calls for value in call["data_hashes"]] == whole_hashes
+    assert "A002:2" in whole_hashes
+    assert all(row["shop_id"] == "shop-1" for call in ingest_env.importer.calls for row in call["rows"])
+    assert chunked["import_stats"] == {"inserted": 5, "updated": 0, "skipped": 0}
+    assert service.db.commit_calls == 1
+    assert [updates["processed_rows"] for _, updates in _FakeProgressTracker.updates] == [2, 4, 5]
+    assert _FakeProgressTracker.updates[-1][1]["row_progress"] == 100.0
+
+
+@pytest.mark.asyncio
+async def test_chunked_ingest_skips_progress_without_caller_task(ingest_env):
+    result = await ingest_env.build_service().ingest_data(
+        file_id=7, platform="shopee", domain="orders", mappings=None, chunk_rows=2, extract_images=False
+    )
+
+    assert result["success"] is True
+    assert len(ingest_env.importer.calls) == 3
+    assert _FakeProgressTracker.updates == []
+
+
+@pytest.mark.asyncio
+async def test_chunk_failure_reports_committed_rows_and_retry_reuses_hashes(ingest_env):
+    healthy_insert = ingest_env.importer.async_batch_insert_raw_data
+
+    async def _fail_second_chunk(**kwargs):
+        if len(ingest_env.importer.calls) == 1:
+            raise RuntimeError("chunk 2 failed")
+        return await healthy_insert(**kwargs)
+
+    ingest_env.importer.async_batch_insert_raw_data = _fail_second_chunk
+    service = ingest_env.build_service()
+    failed = await service.ingest_data(
+        file_id=7, platform="shopee", domain="orders", mappings=None, chunk_rows=2, extract_images=False
+    )
+
+    # 第1块已由入库器提交;文件不标记为 ingested,如实返回已提交的部分
+    assert failed["success"] is False
+    assert (failed["partial"], failed["committed_rows"]) == (True, 2)
+    assert failed["import_stats"] == {"inserted": 2, "updated": 0, "skipped": 0}
+    assert ingest_env.file_record.status == "pending"
+    assert service.db.commit_calls == 0
+    committed_hashes = list(ingest_env.importer.calls[0]["data_hashes"])
+
+    # 重试整个文件:已提交行的 data_hash 不变,按 UPSERT 幂等覆盖
+    ingest_env.importer.async_batch_insert_raw_data = healthy_insert
+    ingest_env.importer.calls.clear()
+    retried = await ingest_env.build_service().ingest_data(
+        file_id=7, platform="shopee", domain="orders", mappings=None, chunk_rows=2, extract_images=False
+    )
+    assert retried["success"] is True
+    assert ingest_env.importer.calls[0]["data_hashes"] == committed_hashes
+    assert ingest_env.file_record.status == "ingested"
@@ -430,3 +430,64 @@ async def test_ingest_data_passes_date_context_to_async_raw_importer(
         "shop_id",
         "metric_date",
     ]
+
+
+def test_row_normalization_plan_matches_per_row_currency_extraction():
+    from backend.services.currency_extractor import get_currency_extractor
+    from backend.services.data_ingestion_service import (
+        apply_row_normalization_plan,
+        normalize_row_fields_for_domain,
+    )
+
+    extractor = get_currency_extractor()
+    rows = [
+        {"订单号": "A1", "销售额(BRL)": 10, "利润(RMB)": 2},
+        {"订单号": "A2", "销售额(BRL)": 20, "利润(RMB)": 3},
+        {"订单号": "A3", "访客数": 5},
+    ]
+
+    normalized_rows, currency_codes = apply_row_normalization_plan("orders", rows)
+
+    assert normalized_rows == [normalize_row_fields_for_domain(domain="orders", row=row) for row in rows]
+    assert currency_codes == [extractor.extract_currency_from_row(row) for row in rows]
+    assert currency_codes == ["BRL", "BRL", None]
+
+
+def test_row_normalization_plan_is_compiled_once_per_header_and_template_version():
+    from backend.services.currency_extractor import get_currency_extractor
+    from backend.services.data_ingestion_service import (
+        apply_row_normalization_plan,
+        get_row_normalization_plan,
+    )
+
+    class _CountingExtractor:
+        def __init__(self):
+            self.inner = get_currency_extractor()
+            self.calls = 0
+
+        def extract_currency_code(self, field_name):
+            self.calls += 1
+            return self.inner.extract_currency_code(field_name)
+
+        def normalize_field_name(self, field_name):
+            return self.inner.normalize_field_name(field_name)
+
+    extractor = _CountingExtractor()
+    rows = [{"商品ID": index, "销售额(SGD)": index * 10} for index in range(50)]
+
+    _, currency_codes = apply_row_normalization_plan(
+        "products", rows, template_id=9101, template_version=1, currency_extractor=extractor
+    )
+    apply_row_normalization_plan(
+        "products", rows, template_id=9101, template_version=1, currency_extractor=extractor
+    )
+
+    assert currency_codes == ["SGD"] * 50
+    assert extractor.calls == 2
+
+    plan = get_row_normalization_plan(
+        "products", ["商品ID", "销售额(SGD)"], template_id=9101, template_version=2, currency_extractor=extractor
+    )
+    assert extractor.calls == 4
+    assert plan.normalized_columns == ["商品ID", "销售额"]
+    assert plan.column_currencies == {"销售额(SGD)": "SGD"}
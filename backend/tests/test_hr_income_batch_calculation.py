@@ -0,0 +1,235 @@
+"""
+HRIncomeCalculationService.calculate_months 批量模式:与逐月 calculate_month 结果一致
+"""
+
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.services import hr_income_calculation_service as hr_module
+from backend.services.hr_income_calculation_service import HRIncomeCalculationService
+from backend.services.payroll_period_lock_service import PayrollPeriodLockedError
+from modules.core.db import (
+    AttendanceRecord,
+    Base,
+    EmployeeCommission,
+    EmployeePerformance,
+    EmployeePerformanceAdjustment,
+    EmployeePerformanceInput,
+    EmployeeShopAssignment,
+    PayrollRecord,
+    PerformanceScore,
+    SalaryStructure,
+    ShopAccount,
+    ShopCommissionConfig,
+    ShopProfitBasis,
+)
+
+MONTHS = ["2026-01", "2026-02", "2026-03"]
+SHOP_METRICS = {
+    "2026-01": {
+        "shopee|s1": {"monthly_sales": 10000.0, "monthly_profit": 2000.0, "achievement_rate": 80.0},
+        "shopee|s2": {"monthly_sales": 4000.0, "monthly_profit": 500.0, "achievement_rate": 1.1},
+    },
+    "2026-02": {
+        "shopee|s1": {"monthly_sales": 8000.0, "monthly_profit": 1200.0, "achievement_rate": 60.0},
+        "shopee|s2": {"monthly_sales": 3000.0, "monthly_profit": 300.0, "achievement_rate": 50.0},
+    },
+    "2026-03": {
+        "shopee|s1": {"monthly_sales": 12000.0, "monthly_profit": 2500.0, "achievement_rate": 95.0},
+        "shopee|s2": {"monthly_sales": 0.0, "monthly_profit": -200.0, "achievement_rate": 0.0},
+    },
+}
+FORMAL_SUMMARY = {"calculation_status": "complete", "ranking_pool": "official", "formal_ready": True}
+RESULT_TABLE_DDL = (
+    """
+    CREATE TABLE c_class.employee_commissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        employee_code VARCHAR(64) NOT NULL,
+        year_month VARCHAR(7) NOT NULL,
+        sales_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+        commission_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+        commission_rate FLOAT NOT NULL DEFAULT 0,
+        calculated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        CONSTRAINT uq_employee_commissions_c UNIQUE (employee_code, year_month)
+    )
+    """,
+    """
+    CREATE TABLE c_class.employee_performance (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        employee_code VARCHAR(64) NOT NULL,
+        year_month VARCHAR(7) NOT NULL,
+        actual_sales NUMERIC(15, 2) NOT NULL DEFAULT 0,
+        achievement_rate FLOAT NOT NULL DEFAULT 0,
+        performance_score FLOAT NOT NULL DEFAULT 0,
+        calculated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        CONSTRAINT uq_employee_performance_c UNIQUE (employee_code, year_month)
+    )
+    """,
+)
+SOURCE_TABLES = [
+    ShopAccount,
+    EmployeeShopAssignment,
+    ShopCommissionConfig,
+    ShopProfitBasis,
+    PerformanceScore,
+    AttendanceRecord,
+    EmployeePerformanceAdjustment,
+    EmployeePerformanceInput,
+    SalaryStructure,
+    PayrollRecord,
+]
+
+
+def _seed_rows():
+    rows = [
+        ShopAccount(platform="shopee", shop_account_id="S1", main_account_id="M1", store_name="S1", business_role="operating_store", enabled=True),
+        ShopAccount(platform="shopee", shop_account_id="S2", main_account_id="M1", store_name="S2", business_role="operating_store", enabled=True),
+        ShopAccount(platform="shopee", shop_account_id="S3", main_account_id="M1", store_name="S3", business_role="collection_source", enabled=True),
+        ShopCommissionConfig(year_month="2026-01", platform_code="shopee", shop_id="S1", allocatable_profit_rate=0.8),
+        ShopCommissionConfig(year_month="2026-03", platform_code="shopee", shop_id="S2", allocatable_profit_rate=0.5),
+        ShopProfitBasis(period_month="2026-01", platform_code="shopee", shop_id="S1", profit_basis_amount=1500.0, basis_version="A_ONLY_V1", is_locked=True),
+        ShopProfitBasis(period_month="2026-02", platform_code="shopee", shop_id="S2", profit_basis_amount=900.0, basis_version="A_ONLY_V1", is_locked=True),
+        ShopProfitBasis(period_month="2026-02", platform_code="shopee", shop_id="S1", profit_basis_amount=-300.0, basis_version="A_ONLY_V1", is_locked=True),
+        ShopProfitBasis(period_month="2026-03", platform_code="shopee", shop_id="S1", profit_basis_amount=2000.0, basis_version="A_ONLY_V1", is_locked=False),
+        PerformanceScore(platform_code="shopee", shop_id="S1", period="2026-01", total_score=90.0, performance_coefficient=1.2, score_details={"sales": {"target": 1000.0}, "summary": FORMAL_SUMMARY}),
+        PerformanceScore(platform_code="shopee", shop_id="S2", period="2026-03", total_score=70.0, performance_coefficient=0.9, score_details={"sales": {"target": 0}, "summary": FORMAL_SUMMARY}),
+        PerformanceScore(platform_code="shopee", shop_id="S2", period="2026-02", total_score=99.0, performance_coefficient=2.0, score_details={"summary": {"status": "complete"}}),
+        AttendanceRecord(employee_code="E1", attendance_date=date(2026, 1, 5), status="late"),
+        AttendanceRecord(employee_code="E1", attendance_date=date(2026, 2, 6), status="absent"),
+        AttendanceRecord(employee_code="E2", attendance_date=date(2026, 3, 31), status="early_leave"),
+        EmployeePerformanceAdjustment(employee_code="E2", year_month="2026-01", adjustment_type="manual", score_delta=3.0, status="active"),
+        EmployeePerformanceAdjustment(employee_code="E2", year_month="2026-01", adjustment_type="manual", score_delta=-9.0, status="revoked"),
+        EmployeePerformanceInput(employee_code="E1", year_month="2026-03", metric_code="m1", metric_direction="up", target_value=100.0, achieved_value=80.0, max_score=50.0, status="active"),
+        SalaryStructure(employee_code="E1", commission_ratio=0.15, effective_date=date(2026, 2, 1), status="active"),
+        SalaryStructure(employee_code="E1", commission_ratio=0.05, effective_date=date(2025, 1, 1), status="active"),
+    ]
+    assignments = [(year_month, "E1", "S1", 0.1) for year_month in MONTHS]
+    assignments += [(year_month, "E3", "S3", 0.3) for year_month in MONTHS]
+    assignments += [("2026-02", "E1", "S2", None), ("2026-01", "E2", "S2", 0.2), ("2026-03", "E2", "S2", 0.2)]
+    for year_month, employee_code, shop_id, ratio in assignments:
+        rows.append(
+            EmployeeShopAssignment(
+                year_month=year_month,
+                employee_code=employee_code,
+                platform_code="shopee",
+                shop_id=shop_id,
+                commission_ratio=ratio,
+                status="active",
+            )
+        )
+    # BIGINT 主键在 SQLite 中不会自增,显式分配
+    for row_id, row in enumerate(rows, start=1):
+        row.id = row_id
+    return rows
+
+
+@pytest_asyncio.fixture
+async def income_session_factory():
+    engines = []
+
+    async def _make():
+        engine = create_async_engine("sqlite+aiosqlite://", echo=False)
+        engines.append(engine)
+
+        # 让 SQLite 支持考勤查询使用的 SAVEPOINT(SQLAlchemy 文档中的 pysqlite 处理方式)
+        @event.listens_for(engine.sync_engine, "connect")
+        def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine.sync_engine, "begin")
+        def _emit_begin(conn):
+            conn.exec_driver_sql("BEGIN")
+
+        async with engine.begin() as conn:
+            for schema_name in ("core", "a_class", "c_class", "finance"):
+                await conn.execute(text(f"ATTACH DATABASE ':memory:' AS {schema_name}"))
+            await conn.run_sync(
+                lambda sync_conn: Base.metadata.create_all(
+                    bind=sync_conn,
+                    tables=[model.__table__ for model in SOURCE_TABLES],
+                )
+            )
+            for ddl in RESULT_TABLE_DDL:
+                await conn.execute(text(ddl))
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        session = async_sessionmaker(engine, expire_on_commit=False)()
+        session.add_all(_seed_rows())
+        session.add(EmployeeCommission(employee_code="E1", year_month="2026-01", sales_amount=1.0, commission_amount=1.0, commission_rate=1.0))
+        await session.commit()
+        statements.clear()
+        session.statements = statements
+        return session
+
+    yield _make
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _shop_metrics(monkeypatch):
+    async def _load_month(db, year_month):
+        return SHOP_METRICS.get(year_month, {})
+
+    async def _load_months(db, year_months):
+        return {year_month: SHOP_METRICS.get(year_month, {}) for year_month in year_months}
+
+    monkeypatch.setattr(hr_module, "load_shop_monthly_metrics", _load_month)
+    monkeypatch.setattr(hr_module, "load_shop_monthly_metrics_for_months", _load_months)
+
+
+async def _stored_results(session):
+    commissions = {
+        (row.employee_code, row.year_month): (float(row.sales_amount), float(row.commission_amount), row.commission_rate)
+        for row in (await session.execute(select(EmployeeCommission))).scalars().all()
+    }
+    performances = {
+        (row.employee_code, row.year_month): (float(row.actual_sales), row.achievement_rate, row.performance_score)
+        for row in (await session.execute(select(EmployeePerformance))).scalars().all()
+    }
+    return commissions, performances
+
+
+@pytest.mark.asyncio
+async def test_calculate_months_matches_per_month_calculation(income_session_factory):
+    serial_session = await income_session_factory()
+    serial_allocations = {}
+    for year_month in MONTHS:
+        result = await HRIncomeCalculationService(serial_session).calculate_month(year_month)
+        serial_allocations[year_month] = result["commission_allocations"]
+    serial_commissions, serial_performances = await _stored_results(serial_session)
+
+    batch_session = await income_session_factory()
+    result = await HRIncomeCalculationService(batch_session).calculate_months(list(reversed(MONTHS)))
+    batch_commissions, batch_performances = await _stored_results(batch_session)
+
+    assert result["year_months"] == MONTHS
+    assert set(batch_commissions) == set(serial_commissions)
+    assert set(batch_performances) == set(serial_performances)
+    for key, values in serial_commissions.items():
+        assert batch_commissions[key] == pytest.approx(values)
+    for key, values in serial_performances.items():
+        assert batch_performances[key] == pytest.approx(values)
+    for month in result["months"]:
+        assert month["commission_allocations"] == pytest.approx(serial_allocations[month["year_month"]])
+    assert ("E3", "2026-01") not in batch_performances
+    assert batch_commissions[("E1", "2026-01")] != (1.0, 1.0, 1.0)
+
+    inserts = [sql for sql in batch_session.statements if sql.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 2
+    assert len(batch_session.statements) < len(serial_session.statements)
+
+
+@pytest.mark.asyncio
+async def test_calculate_months_refuses_locked_months(income_session_factory):
+    session = await income_session_factory()
+    session.add(PayrollRecord(id=1, employee_code="E1", year_month="2026-02", status="confirmed"))
+    await session.commit()
+
+    with pytest.raises(PayrollPeriodLockedError, match="2026-02"):
+        await HRIncomeCalculationService(session).calculate_months(MONTHS)
+    assert (await _stored_results(session))[1] == {}
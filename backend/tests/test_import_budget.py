@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+HEAVY_MODULES = ("pandas", "openpyxl", "playwright")
+
+# entrypoint -> (extra modules it must not import, cumulative import budget in seconds)
+# 预算留有较大余量,只用于拦截把重依赖重新拉回顶层导入的改动
+IMPORT_BUDGETS = {
+    "modules.core": (("alembic", "modules.core.db"), 3.0),
+    "modules.core.db": (("alembic",), 6.0),
+    "backend.celery_app": (("alembic", "backend.domains"), 6.0),
+    "backend.tasks.data_sync_tasks": (("alembic", "backend.domains"), 8.0),
+    "backend.app.runtime": (
+        (
+            "backend.domains.collection.routers",
+            "backend.domains.business.routers",
+            "backend.domains.data_platform.routers",
+            "backend.domains.platform.routers",
+        ),
+        6.0,
+    ),
+}
+
+
+def _importtime(module: str) -> dict[str, int]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if cumulative_us.strip().isdigit():
+            cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def _loaded(cumulative: dict[str, int], package: str) -> list[str]:
+    return sorted(name for name in cumulative if name == package or name.startswith(package + "."))
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_worker_entrypoints_stay_within_import_budget(module):
+    forbidden, budget_seconds = IMPORT_BUDGETS[module]
+    cumulative = _importtime(module)
+
+    for package in HEAVY_MODULES + forbidden:
+        assert not _loaded(cumulative, package), f"{module} imports {package}: {_loaded(cumulative, package)[:5]}"
+    assert cumulative[module] / 1_000_000 < budget_seconds
+
+
+def test_api_entrypoint_defers_playwright_and_excel_engines():
+    cumulative = _importtime("backend.main")
+
+    assert not _loaded(cumulative, "playwright")
+    assert not _loaded(cumulative, "openpyxl")
@@ -0,0 +1,292 @@
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import modules.services.ingestion_worker as worker
+from modules.core.db.schema import DimProduct, FactProductMetric
+
+RMB_RATES = {"USD": 7.0, "PHP": 0.125}
+
+
+class _StateRecorder:
+    """Fold writer calls into the final dim_products / fact_product_metrics state."""
+
+    def __init__(self):
+        self.products = {}
+        self.metrics = {}
+        self.orders = []
+
+    def ensure_product(self, session, platform_code, shop_id, sku, product_title, image_url=None):
+        row = self.products.setdefault((platform_code, shop_id, sku), {"title": None, "image_url": None})
+        if product_title and not row["title"]:
+            row["title"] = product_title
+        if image_url and not row["image_url"]:
+            row["image_url"] = image_url
+
+    def ensure_products_bulk(self, session, platform_code, shop_id, products):
+        for sku, title, image_url in products:
+            self.ensure_product(session, platform_code, shop_id, sku, title, image_url)
+
+    def merge_metric_row(self, session, **kwargs):
+        key = (
+            kwargs["platform_code"],
+            kwargs["shop_id"],
+            kwargs["sku"],
+            kwargs["metric_date"],
+            kwargs.get("granularity") or "daily",
+            kwargs.get("sku_scope") or "product",
+        )
+        row = self.metrics.setdefault(key, {"parent_platform_sku": None, "source_catalog_id": None, "currency": None})
+        if kwargs.get("parent_platform_sku") and not row["parent_platform_sku"]:
+            row["parent_platform_sku"] = kwargs["parent_platform_sku"]
+        if kwargs.get("source_catalog_id") and not row["source_catalog_id"]:
+            row["source_catalog_id"] = kwargs["source_catalog_id"]
+        if kwargs.get("currency") is not None:
+            row["currency"] = kwargs["currency"]
+        row.update({k: v for k, v in (kwargs.get("updates") or {}).items() if v is not None})
+
+    def merge_metric_rows_bulk(self, session, merges):
+        for merge in merges:
+            self.merge_metric_row(session, **merge)
+
+    def upsert_order(self, session, platform_code, shop_id, order_id, order_date_local, currency, **amounts):
+        self.orders.append(
+            dict(order_id=order_id, order_date_local=order_date_local, currency=currency, **amounts)
+        )
+
+    def upsert_orders_bulk(self, session, platform_code, shop_id, orders):
+        self.orders.extend(orders)
+
+
+def _catalog_file(name, sub_domain=None):
+    return SimpleNamespace(
+        id=7,
+        shop_id="shop-1",
+        platform_code="shopee",
+        granularity="daily",
+        file_path=f"/data/{name}",
+        file_name=name,
+        sub_domain=sub_domain,
+    )
+
+
+def _fake_rmb(amount, currency, metric_date):
+    return amount * RMB_RATES[currency]
+
+
+def _run_both(monkeypatch, df, per_row, vectorized, reader="_read_dataframe2"):
+    monkeypatch.setattr(worker, "normalize_amount_to_rmb", _fake_rmb)
+    states = []
+    for ingest in (per_row, vectorized):
+        recorder = _StateRecorder()
+        monkeypatch.setattr(worker, reader, lambda _path: df.copy())
+        monkeypatch.setattr(worker, "_ensure_product", recorder.ensure_product)
+        monkeypatch.setattr(worker, "_ensure_products_bulk", recorder.ensure_products_bulk)
+        monkeypatch.setattr(worker, "_merge_product_metric_row", recorder.merge_metric_row)
+        monkeypatch.setattr(worker, "_merge_product_metric_rows_bulk", recorder.merge_metric_rows_bulk)
+        monkeypatch.setattr(worker, "_upsert_order", recorder.upsert_order)
+        monkeypatch.setattr(worker, "_upsert_orders_bulk", recorder.upsert_orders_bulk)
+        result = ingest()
+        states.append((result, recorder))
+    return states
+
+
+def test_parse_number_and_currency_series_match_scalar_helpers():
+    cells = pd.Series(["$1,234.50", "₱ 12", "RM3", "-4.5%", "abc", None, 7, "1 200₫", "", "¥8"])
+
+    numbers = worker._parse_number_series(cells)
+    expected_numbers = [worker._parse_number(v) for v in cells]
+    assert [None if pd.isna(v) else v for v in numbers] == expected_numbers
+
+    currencies = worker._detect_currency_series(cells)
+    expected_currencies = [worker._detect_currency_from_value(str(v)) if pd.notna(v) else None for v in cells]
+    assert [None if pd.isna(v) else v for v in currencies] == expected_currencies
+
+
+def test_vectorized_products_ingest_matches_per_row_state(monkeypatch):
+    df = pd.DataFrame(
+        {
+            "SKU": ["A1", "A1", "A1", "B2", "B2", "C3", "  ", None, "D4", "D4", "A1"],
+            "Title": ["Shirt", None, None, "Cup", "Cup", "Pen", "x", "y", None, "Dice", None],
+            "Variation ID": [None, "v1", "v2", None, None, None, None, None, "", "v9", "v1"],
+            "Color": [None, None, None, "Red", "Blue", None, None, None, "Green", None, None],
+            "Size": [None, None, None, "M", None, None, None, None, None, None, None],
+            "Units Sold": [3, 1, 2, 4, 5, 6, 1, 1, "n/a", 2, 9],
+            "Revenue": ["$30.00", "$10", "$20", "$40", "$50", "PHP 800", "$1", "$1", "abc", None, "$90"],
+            "Page Views": [100, 40, 60, 10, np.nan, 7, 1, 1, 3, 4, 5],
+            "Conversion Rate": ["5%", "2%", "0.5", None, "1%", "3%", None, None, None, "7%", None],
+            "Image": ["https://img/a1.jpg", None, None, "not-a-url", "https://img/b2.jpg", None, None, None, None, None, None],
+        }
+    )
+    cf = _catalog_file("shopee__products__20250901.xlsx")
+    mappings = {"platform_configs": {}}
+
+    (per_row_result, per_row), (vector_result, vectorized) = _run_both(
+        monkeypatch,
+        df,
+        lambda: worker._ingest_products_file(None, cf, mappings),
+        lambda: worker._ingest_products_file_vectorized(None, cf, mappings),
+    )
+
+    assert vector_result == per_row_result == (True, "rows_ingested=4")
+    assert vectorized.products == per_row.products
+    assert vectorized.metrics == per_row.metrics
+    a1 = vectorized.metrics[("shopee", "shop-1", "A1", date(2025, 9, 1), "daily", "product")]
+    assert a1["sales_amount"] == 30.0
+    assert a1["currency"] == "USD"
+    assert ("shopee", "shop-1", "B2::Red+M", date(2025, 9, 1), "daily", "variant") in vectorized.metrics
+
+
+def test_vectorized_traffic_ingest_matches_per_row_state(monkeypatch):
+    df = pd.DataFrame(
+        {
+            "Date": ["01/09/2025", "01/09/2025", "02/09/2025", None, "garbage", "03/09/2025"],
+            "Page Views": [100, 999, 200, 300, 400, None],
+            "Visitors": [10, 11, None, 30, 40, 50],
+            "Orders": ["1", "2", "3", "x", None, "6"],
+            "Conversion Rate": ["10%", "20%", "0.3", None, "5%", "0%"],
+            "GMV": ["₱1500.5", "₱99", "0", "PHP 80", "$12", None],
+            "Refund Amount": [None, "₱5", "$3", None, "₱1", "₱2"],
+        }
+    )
+    cf = _catalog_file("shopee__analytics__20250930.xlsx")
+    mappings = {"platform_configs": {}}
+
+    (per_row_result, per_row), (vector_result, vectorized) = _run_both(
+        monkeypatch,
+        df,
+        lambda: worker._ingest_traffic_store_file(None, cf, mappings),
+        lambda: worker._ingest_traffic_store_file_vectorized(None, cf, mappings),
+    )
+
+    assert vector_result == per_row_result == (True, "rows_ingested=6")
+    assert vectorized.products == per_row.products
+    assert vectorized.metrics == per_row.metrics
+    assert len(vectorized.metrics) >= 3
+
+
+def test_vectorized_orders_ingest_matches_per_row_calls(monkeypatch):
+    df = pd.DataFrame(
+        {
+            "Order ID": ["O-1", " O-2 ", None, "", "O-3"],
+            "Order Date": ["2025-09-01", "2025-09-02", "2025-09-03", "2025-09-04", None],
+            "商品金额": ["100", None, "1", "1", "30.5"],
+            "Shipping": ["5", "6", None, None, "x"],
+            "Total": ["₱105", "$6", "1", "1", None],
+        }
+    )
+    cf = _catalog_file("shopee__orders__20250905.xlsx")
+    mappings = {"platform_configs": {}}
+
+    (per_row_result, per_row), (vector_result, vectorized) = _run_both(
+        monkeypatch,
+        df,
+        lambda: worker._ingest_orders_file(None, cf, mappings),
+        lambda: worker._ingest_orders_file_vectorized(None, cf, mappings),
+        reader="_read_excel_with_header_inference",
+    )
+
+    assert vector_result == per_row_result == (True, "rows_ingested=3")
+    assert vectorized.orders == per_row.orders
+    assert [order["currency"] for order in vectorized.orders] == ["PHP", "USD", "CNY"]
+
+
+def test_vectorized_services_ai_assistant_matches_per_row_state(monkeypatch):
+    df = pd.DataFrame(
+        {
+            "日期": ["01-09-2025", "02-09-2025", "02-09-2025", None],
+            "服务的访客": [10, None, 12, None],
+            "已回答的问题": ["3", "4", None, None],
+            "好评比": ["95%", "0%", "n/a", None],
+            "备注": ["a", "b", "c", "d"],
+        }
+    )
+    cf = _catalog_file("shopee__services__ai_assistant__20250930.xlsx", sub_domain="ai_assistant")
+    mappings = {"platform_configs": {}}
+
+    (per_row_result, per_row), (vector_result, vectorized) = _run_both(
+        monkeypatch,
+        df,
+        lambda: worker._ingest_services_file(None, cf, mappings, vectorized=False),
+        lambda: worker._ingest_services_file(None, cf, mappings, vectorized=True),
+    )
+
+    assert vector_result == per_row_result == (True, "rows_ingested=3")
+    assert vectorized.metrics == per_row.metrics
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.added = []
+        self.queries = 0
+
+    def execute(self, stmt):
+        self.queries += 1
+        return _FakeResult(self.rows)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+
+def test_bulk_metric_merge_folds_calls_and_updates_existing_rows():
+    day = date(2025, 9, 1)
+    existing = FactProductMetric(
+        platform_code="shopee",
+        shop_id="shop-1",
+        platform_sku="A1",
+        metric_date=day,
+        granularity="daily",
+        sku_scope="product",
+        sales_amount=1.0,
+        currency="USD",
+    )
+    session = _FakeSession([existing])
+    base = dict(platform_code="shopee", shop_id="shop-1", metric_date=day, granularity="daily")
+
+    worker._merge_product_metric_rows_bulk(
+        session,
+        [
+            dict(base, sku="A1", sku_scope="product", updates={"sales_amount": 5.0, "page_views": None}, currency="PHP"),
+            dict(base, sku="A1", sku_scope="product", updates={"page_views": 3.0}, currency=None, source_catalog_id=7),
+            dict(base, sku="A1::v1", sku_scope="variant", parent_platform_sku="A1", updates={"sales_volume": 2.0}),
+            dict(base, sku="A1::v1", sku_scope="variant", updates={"sales_volume": 4.0}),
+        ],
+    )
+
+    assert session.queries == 2
+    assert (existing.sales_amount, existing.page_views, existing.currency) == (5.0, 3.0, "PHP")
+    assert existing.source_catalog_id == 7
+    assert len(session.added) == 1
+    variant = session.added[0]
+    assert (variant.platform_sku, variant.parent_platform_sku, variant.sales_volume) == ("A1::v1", "A1", 4.0)
+
+
+def test_bulk_product_ensure_keeps_first_non_empty_title_and_image():
+    existing = DimProduct(platform_code="shopee", shop_id="shop-1", platform_sku="A1", product_title=None)
+    session = _FakeSession([existing])
+
+    worker._ensure_products_bulk(
+        session,
+        "shopee",
+        "shop-1",
+        [("A1", None, None), ("A1", "Shirt", "https://img/a1.jpg"), ("B2", "Cup", None), ("B2", "Mug", None)],
+    )
+
+    assert session.queries == 1
+    assert existing.product_title == "Shirt"
+    assert [(p.platform_sku, p.product_title) for p in session.added] == [("B2", "Cup")]
+
@@ -0,0 +1,121 @@
+import logging
+import queue
+import sys
+import threading
+
+from modules.core import logger as logger_module
+from modules.core.logger import BoundedQueueHandler, ERPLogger, SampledLogger, _LoggerRouter
+
+
+class _CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+        self.threads = []
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.append(threading.current_thread().name)
+
+
+class _StrCounter:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "counted"
+
+
+def test_queue_mode_writes_records_on_background_thread(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LOG_QUEUE_MODE", "1")
+    manager = ERPLogger()
+    log = manager.get_logger("queue_mode.background")
+    collector = _CollectingHandler()
+    manager._router.handlers_for("queue_mode.background").append(collector)
+
+    try:
+        log.info("imported rows=%s", 42)
+        manager.flush_queue()
+    finally:
+        manager.stop_queue()
+
+    assert [type(handler) for handler in log.handlers] == [BoundedQueueHandler]
+    assert collector.records[0].getMessage() == "imported rows=42"
+    assert collector.threads[0] != threading.current_thread().name
+    assert "imported rows=42" in (tmp_path / "temp" / "logs" / "queue_mode_background.log").read_text(encoding="utf-8")
+
+
+def test_queue_handler_formats_in_caller_and_counts_overflow():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+    counter = _StrCounter()
+
+    for _ in range(3):
+        handler.handle(logging.LogRecord("overflow", logging.INFO, __file__, 1, "value=%s", (counter,), None))
+
+    assert handler.dropped == 2
+    queued = handler.queue.get_nowait()
+    assert (queued.msg, queued.args, queued.exc_info) == ("value=counted", None, None)
+
+    router = _LoggerRouter(handler)
+    collector = _CollectingHandler()
+    router.register("overflow", [collector])
+    router.handle(queued)
+
+    assert [record.getMessage() for record in collector.records] == [
+        "[Logging] 日志队列已满,已丢弃 2 条记录(累计 2 条)",
+        "value=counted",
+    ]
+
+
+def test_sampled_logger_skips_formatting_between_samples():
+    log = logging.getLogger("queue_mode.sampled")
+    log.propagate = False
+    collector = _CollectingHandler()
+    log.addHandler(collector)
+    counter = _StrCounter()
+    sampler = SampledLogger(log, every=100)
+
+    log.setLevel(logging.INFO)
+    sampler.debug("row %s", counter)
+    assert collector.records == []
+
+    log.setLevel(logging.DEBUG)
+    for index in range(250):
+        sampler.debug("row %s", index)
+
+    assert [record.getMessage() for record in collector.records] == ["row 0", "row 100", "row 200"]
+    assert collector.records[0].sample_every == 100
+    assert counter.calls == 0
+    assert logger_module.get_sampled_logger("queue_mode.shared") is logger_module.get_sampled_logger("queue_mode.shared")
+
+
+def test_queue_handler_folds_exception_text_into_message():
+    handler = BoundedQueueHandler(queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("errors", logging.ERROR, __file__, 1, "failed id=%s", (7,), sys.exc_info())
+
+    handler.handle(record)
+    queued = handler.queue.get_nowait()
+
+    assert queued.msg.startswith("failed id=7\nTraceback")
+    assert "ValueError: boom" in queued.msg
+    assert (queued.args, queued.exc_info) == (None, None)
+    assert record.exc_info is not None
+
+
+def test_router_sends_child_logger_records_to_nearest_registered_ancestor():
+    router = _LoggerRouter(BoundedQueueHandler(queue.Queue()))
+    parent = _CollectingHandler()
+    service = _CollectingHandler()
+    router.register("backend", [parent])
+    router.register("backend.services", [service])
+
+    for name in ["backend.services.export.worker", "backend.routers", "backend", "other"]:
+        router.handle(logging.LogRecord(name, logging.INFO, __file__, 1, name, None, None))
+
+    assert [record.name for record in service.records] == ["backend.services.export.worker"]
+    assert [record.name for record in parent.records] == ["backend.routers", "backend"]
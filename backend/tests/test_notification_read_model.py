@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.domains.platform.routers.notifications import create_notification, create_notifications_for_admins
+from backend.schemas.notification import NotificationType
+from backend.services.notification_read_model import NotificationReadModel
+from modules.core.db import Base, DimRole, DimUser, Notification, user_roles
+
+
+@pytest_asyncio.fixture
+async def notification_db():
+    engine = create_async_engine("sqlite+aiosqlite://", echo=False)
+
+    async with engine.begin() as conn:
+        for schema_name in ("core", "a_class", "b_class", "c_class", "finance"):
+            await conn.execute(text(f"ATTACH DATABASE ':memory:' AS {schema_name}"))
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(
+                bind=sync_conn,
+                tables=[DimUser.__table__, DimRole.__table__, user_roles, Notification.__table__],
+            )
+        )
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        for user_id, username, is_superuser in ((1, "owner", False), (2, "root", True), (3, "alice", False), (4, "bob", False)):
+            session.add(
+                DimUser(
+                    user_id=user_id,
+                    username=username,
+                    email=f"{username}@example.com",
+                    password_hash="x",
+                    status="active",
+                    is_active=True,
+                    is_superuser=is_superuser,
+                )
+            )
+        session.add(DimRole(role_id=1, role_name="Administrator", role_code="admin", permissions="[]"))
+        await session.flush()
+        await session.execute(insert(user_roles).values(user_id=3, role_id=1))
+        await session.commit()
+        statements.clear()
+        session.statements = statements
+        yield session
+
+    await engine.dispose()
+
+
+async def _seed(session, rows):
+    base = datetime(2026, 10, 1, 8, 0, 0)
+    for offset, (notification_type, related_user_id, is_read) in enumerate(rows):
+        session.add(
+            Notification(
+                recipient_id=1,
+                notification_type=notification_type,
+                title=f"{notification_type}-{offset}",
+                content="content",
+                related_user_id=related_user_id,
+                is_read=is_read,
+                priority="medium",
+                created_at=base + timedelta(minutes=offset),
+            )
+        )
+    await session.commit()
+    session.statements.clear()
+
+
+@pytest.mark.asyncio
+async def test_page_loads_related_usernames_without_per_row_queries(notification_db):
+    await _seed(notification_db, [("user_registered", 3 + index % 2, False) for index in range(25)])
+
+    rows, total = await NotificationReadModel(notification_db).list_page(1, offset=0, limit=20)
+
+    assert total == 25
+    assert len(rows) == 20
+    assert rows[0][0].title == "user_registered-24"
+    assert {username for _, username in rows} == {"alice", "bob"}
+    assert len(notification_db.statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_grouped_returns_counts_and_latest_in_one_query(notification_db):
+    await _seed(
+        notification_db,
+        [
+            ("user_registered", 3, False),
+            ("user_registered", 4, True),
+            ("user_registered", 3, False),
+            ("system_alert", None, True),
+            ("system_alert", None, True),
+        ],
+    )
+
+    groups = {row.notification_type: row for row in await NotificationReadModel(notification_db).grouped(1)}
+
+    assert len(notification_db.statements) == 1
+    registered = groups["user_registered"]
+    assert (registered.total_count, registered.unread_count) == (3, 2)
+    assert (registered.latest.title, registered.latest_related_username) == ("user_registered-2", "alice")
+    alert = groups["system_alert"]
+    assert (alert.total_count, alert.unread_count, alert.latest.title) == (2, 0, "system_alert-4")
+    assert alert.latest_related_username is None
+
+
+@pytest.mark.asyncio
+async def test_admin_fan_out_inserts_all_recipients_in_one_statement(notification_db):
+    first = await create_notification(
+        db=notification_db,
+        recipient_id=1,
+        notification_type=NotificationType.SYSTEM_ALERT,
+        title="Disk",
+        content="Disk almost full",
+        priority="urgent",
+    )
+    notification_db.statements.clear()
+
+    notifications = await create_notifications_for_admins(
+        db=notification_db,
+        notification_type=NotificationType.USER_REGISTERED,
+        title="New User Registration",
+        content="User 'bob' has registered.",
+        related_user_id=4,
+        priority="HIGH",
+    )
+    await notification_db.commit()
+
+    inserts = [sql for sql in notification_db.statements if sql.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 1
+    assert [n.recipient_id for n in notifications] == [2, 3]
+    assert {n.priority for n in notifications} == {"high"}
+    assert all(n.notification_id > first.notification_id for n in notifications)
+    assert first.priority == "medium"
+    assert len({n.notification_id for n in notifications}) == 2
+
+    stored = (await notification_db.execute(select(Notification.recipient_id))).scalars().all()
+    assert sorted(stored) == [1, 2, 3]
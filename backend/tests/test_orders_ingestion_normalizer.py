@@ -150,3 +150,31 @@ def test_raw_data_importer_merges_orders_raw_data_before_upsert():
 
     assert "merge_orders_raw_data_prefer_non_empty" in source
     assert "existing_raw_data_by_hash" in source
+
+
+def test_orders_row_preparer_numbers_lines_continuously_across_chunks():
+    from backend.services.orders_ingestion_normalizer import (
+        OrdersRowPreparer,
+        prepare_orders_rows_for_b_class,
+    )
+
+    rows = [
+        {"订单编号": "A", "买家支付(RMB)": "10"},
+        {"订单编号": "A", "买家支付(RMB)": "10"},
+        {"订单编号": "A", "买家支付(RMB)": "10"},
+        {"订单编号": "B", "买家支付(RMB)": "20"},
+        {"订单编号": "", "买家支付(RMB)": "20"},
+    ]
+
+    whole_rows, whole_identity = prepare_orders_rows_for_b_class(rows)
+
+    preparer = OrdersRowPreparer()
+    chunked_rows, chunked_identity = [], []
+    for start in range(0, len(rows), 2):
+        prepared, identity = prepare_orders_rows_for_b_class(rows[start:start + 2], preparer=preparer)
+        chunked_rows.extend(prepared)
+        chunked_identity.extend(identity)
+
+    assert chunked_rows == whole_rows
+    assert chunked_identity == whole_identity
+    assert [value.get("_source_line_index") for value in chunked_identity] == [None, 2, 3, None, 2]
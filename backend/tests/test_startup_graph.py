@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from backend.app.startup_graph import StartupGraph
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently_and_respect_dependencies():
+    graph = StartupGraph()
+    order = []
+
+    def _step(name, delay):
+        async def _run():
+            order.append(f"{name}:start")
+            await asyncio.sleep(delay)
+            order.append(f"{name}:end")
+
+        return _run
+
+    graph.add("db", _step("db", 0.05))
+    graph.add("redis", _step("redis", 0.05))
+    graph.add("schema", _step("schema", 0.0), after=["db"])
+
+    await graph.run_blocking()
+
+    assert order.index("redis:start") < order.index("db:end")
+    assert order.index("schema:start") > order.index("db:end")
+    assert graph.phase == "serving" and graph.ready
+    assert graph.snapshot()["steps"]["schema"]["after"] == ["db"]
+
+
+@pytest.mark.asyncio
+async def test_blocking_failure_aborts_startup_and_skips_dependents():
+    graph = StartupGraph()
+    ran = []
+
+    async def _fail():
+        raise RuntimeError("schema incomplete")
+
+    async def _roles():
+        ran.append("roles")
+
+    graph.add("table_init", _fail)
+    graph.add("system_roles", _roles, after=["table_init"])
+
+    with pytest.raises(RuntimeError, match="schema incomplete"):
+        await graph.run_blocking()
+
+    assert ran == []
+    assert graph.phase == "failed" and not graph.ready
+    assert graph.steps["table_init"].status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_deferred_steps_gate_readiness_without_blocking_startup():
+    graph = StartupGraph()
+    release = asyncio.Event()
+
+    async def _noop():
+        return None
+
+    async def _scheduler():
+        await release.wait()
+
+    async def _warmup():
+        raise RuntimeError("cache offline")
+
+    graph.add("table_init", _noop)
+    graph.add("collection_scheduler", _scheduler, after=["table_init"], deferred=True, required_for_ready=True)
+    graph.add("cache_warmup", _warmup, deferred=True)
+
+    await graph.run_blocking()
+    task = graph.start_deferred()
+    await asyncio.sleep(0)
+
+    assert graph.phase == "serving" and not graph.ready
+    release.set()
+    await task
+
+    steps = graph.snapshot()["steps"]
+    assert steps["collection_scheduler"]["status"] == "done"
+    assert steps["cache_warmup"] == {
+        "status": "failed",
+        "seconds": steps["cache_warmup"]["seconds"],
+        "deferred": True,
+        "required_for_ready": False,
+        "error": "cache offline",
+    }
+    assert graph.ready and graph.phase == "ready"
+
+
+def test_blocking_step_cannot_depend_on_deferred_step():
+    graph = StartupGraph()
+
+    async def _noop():
+        return None
+
+    graph.add("pool_warmup", _noop, deferred=True)
+
+    with pytest.raises(ValueError):
+        graph.add("system_roles", _noop, after=["pool_warmup"])
@@ -0,0 +1,233 @@
+"""
+流式导出引擎:分块写出的 XLSX/CSV 可被正常读取,丢失数据反连接查询,后台导出任务
+"""
+
+import io
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from openpyxl import load_workbook
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.domains.business.routers.raw_layer_export import build_lost_data_export
+from backend.domains.business.routers.task_center import download_task_center_artifact
+from backend.services import streaming_export as export_module
+from backend.services.streaming_export import (
+    CsvStreamWriter,
+    ExportSpec,
+    XlsxStreamWriter,
+    _ByteSink,
+    _TabularStreamWriter,
+    can_download_export,
+    export_response,
+    fail_orphaned_export_jobs,
+    resolve_export_artifact,
+    stream_export_chunks,
+)
+from backend.services.task_center_service import TaskCenterService
+from modules.core.db import Base, FactProductMetric, StagingProductMetrics, TaskCenterLink, TaskCenterLog, TaskCenterTask
+
+TABLES = [StagingProductMetrics, FactProductMetric, TaskCenterTask, TaskCenterLog, TaskCenterLink]
+
+
+@pytest_asyncio.fixture
+async def export_session_factory(tmp_path):
+    # 文件库:流式读取与任务状态更新使用各自的连接
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'main.db'}", echo=False)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _attach_schemas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"ATTACH DATABASE '{tmp_path / 'core.db'}' AS core")
+        cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(bind=sync_conn, tables=[model.__table__ for model in TABLES])
+        )
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        for row_id, (sku, shop_id) in enumerate(
+            [("sku-1", "s1"), ("sku-2", "s1"), ("sku-1", "s1"), ("sku-3", None), ("", "s1"), ("sku-4", "s2")],
+            start=1,
+        ):
+            session.add(
+                StagingProductMetrics(
+                    id=row_id,
+                    platform_code="shopee",
+                    shop_id=shop_id,
+                    platform_sku=sku,
+                    metric_data={"metric_date": f"2026-10-0{row_id}"},
+                    file_id=7,
+                    created_at=datetime(2026, 10, row_id),
+                )
+            )
+        session.add(
+            StagingProductMetrics(id=99, platform_code="shopee", shop_id="s1", platform_sku="sku-9", metric_data={}, file_id=8)
+        )
+        session.add(
+            FactProductMetric(
+                platform_code="shopee",
+                shop_id="s1",
+                platform_sku="sku-2",
+                metric_date=date(2026, 10, 2),
+                metric_type="daily",
+                source_catalog_id=7,
+            )
+        )
+        await session.commit()
+
+    yield session_factory
+    await engine.dispose()
+
+
+def _rows(content: bytes):
+    return list(load_workbook(io.BytesIO(content)).active.iter_rows(values_only=True))
+
+
+def test_xlsx_writer_streams_chunks_that_openpyxl_can_read():
+    sink = _ByteSink()
+    writer = XlsxStreamWriter(sink, ["ID", "名称", "时间"], sheet_name="导出:数据")
+    chunks = []
+    for start in range(0, 3000, 500):
+        writer.write_rows([[index, f"<行 {index}>\x01", datetime(2026, 1, 1)] for index in range(start, start + 500)])
+        chunks.append(sink.drain())
+    writer.close()
+    chunks.append(sink.drain())
+
+    assert sum(1 for chunk in chunks[:-1] if chunk) > 1
+    workbook = load_workbook(io.BytesIO(b"".join(chunks)))
+    sheet = workbook.active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert sheet.title == "导出_数据"
+    assert sheet["A1"].font.b is True
+    assert rows[0] == ("ID", "名称", "时间")
+    assert rows[1] == (0, "<行 0>", "2026-01-01T00:00:00")
+    assert len(rows) == 3001
+    assert writer.row_count == 3000
+
+
+def test_empty_export_writes_placeholder_and_csv_has_bom():
+    sink = _ByteSink()
+    writer = XlsxStreamWriter(sink, ["ID"], placeholder=(["提示"], ["没有丢失数据"]))
+    writer.close()
+    assert _rows(sink.drain()) == [("提示",), ("没有丢失数据",)]
+
+    output = io.BytesIO()
+    writer = CsvStreamWriter(output, ["a", "b"])
+    writer.write_rows([[1, None], ["x,y", date(2026, 1, 2)]])
+    writer.close()
+    assert output.getvalue() == "\ufeffa,b\r\n1,\r\n\"x,y\",2026-01-02\r\n".encode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_lost_data_export_streams_anti_join_rows(export_session_factory):
+    spec = build_lost_data_export(SimpleNamespace(id=7, data_domain="products", file_name="f.xlsx"))
+
+    chunks = [chunk async for chunk in stream_export_chunks(spec, session_factory=export_session_factory, chunk_size=1)]
+    rows = _rows(b"".join(chunks))
+    assert rows[0] == ("平台代码", "店铺ID", "SKU", "指标日期", "Staging ID", "创建时间")
+    # sku-2 已入 fact;sku-1 只保留第一条;空 SKU 跳过;其他文件不参与
+    assert [(row[1], row[2], row[4]) for row in rows[1:]] == [("s1", "sku-1", 1), ("", "sku-3", 4), ("s2", "sku-4", 6)]
+
+    empty = build_lost_data_export(SimpleNamespace(id=7, data_domain="inventory", file_name="f.xlsx"))
+    chunks = [chunk async for chunk in stream_export_chunks(empty, session_factory=export_session_factory)]
+    assert _rows(b"".join(chunks)) == [("提示",), ("没有丢失数据",)]
+
+
+@pytest.mark.asyncio
+async def test_large_export_runs_as_background_task_with_downloadable_artifact(
+    export_session_factory, tmp_path, monkeypatch
+):
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(export_module, "EXPORT_BACKGROUND_ROW_THRESHOLD", 2)
+    spec = ExportSpec(
+        statement=select(StagingProductMetrics).order_by(StagingProductMetrics.id),
+        headers=["ID", "SKU"],
+        row_mapper=lambda row: [row.id, row.platform_sku],
+        filename="staging",
+        format="csv",
+    )
+
+    async with export_session_factory() as db:
+        response = await export_response(
+            db, spec, task_type="staging", requested_by=5, session_factory=export_session_factory
+        )
+        assert response.status_code == 202
+        await next(iter(export_module._RUNNING_EXPORT_JOBS))
+
+        job = json.loads(response.body)["data"]
+        task = await TaskCenterService(db).get_task(job["task_id"])
+
+    assert job["download_url"] == f"/api/task-center/tasks/{task['task_id']}/artifact"
+    assert task["task_family"] == "export"
+    assert task["status"] == "completed"
+    assert task["processed_rows"] == 7
+    artifact = resolve_export_artifact(task)
+    assert artifact.filename == "staging.csv"
+    assert artifact.path.read_bytes().decode("utf-8-sig").splitlines()[:2] == ["ID,SKU", "1,sku-1"]
+    assert not list(artifact.path.parent.glob("*.part"))
+
+    owner = SimpleNamespace(user_id=5, roles=[], is_superuser=False)
+    other = SimpleNamespace(user_id=6, roles=[], is_superuser=False)
+    admin = SimpleNamespace(user_id=1, roles=["admin"], is_superuser=False)
+    async with export_session_factory() as db:
+        download = await download_task_center_artifact(task["task_id"], db=db, current_user=owner)
+        assert download.path == str(artifact.path)
+        with pytest.raises(HTTPException) as denied:
+            await download_task_center_artifact(task["task_id"], db=db, current_user=other)
+        assert denied.value.status_code == 403
+    admin_only_task = {"details_json": {"export": {"requested_by": 5, "admin_only": True}}}
+    assert not can_download_export(admin_only_task, user_id=5, is_admin=False)
+    assert can_download_export(admin_only_task, user_id=admin.user_id, is_admin=True)
+
+    async with export_session_factory() as db:
+        small = await export_response(
+            db, ExportSpec(spec.statement.limit(2), spec.headers, spec.row_mapper, "small"), task_type="staging"
+        )
+    assert small.media_type == export_module.XLSX_MEDIA_TYPE
+    assert "filename*=UTF-8''small.xlsx" in small.headers["content-disposition"]
+
+
+def test_tabular_writer_requires_format_hooks():
+    class HeaderOnlyWriter(_TabularStreamWriter):
+        def _write_data(self, rows, header=False):
+            pass
+
+    with pytest.raises(TypeError):
+        HeaderOnlyWriter(["ID"])
+
+
+@pytest.mark.asyncio
+async def test_startup_fails_export_tasks_left_unfinished_by_previous_process(export_session_factory):
+    async with export_session_factory() as db:
+        service = TaskCenterService(db)
+        for task_id, family, status in [
+            ("export-queued", "export", "queued"),
+            ("export-running", "export", "running"),
+            ("export-done", "export", "completed"),
+            ("sync-running", "cloud_sync", "running"),
+        ]:
+            await service.create_task(task_id=task_id, task_family=family, task_type="staging", status=status)
+
+        assert await fail_orphaned_export_jobs(db) == 2
+
+        statuses = {}
+        for task_id in ["export-queued", "export-running", "export-done", "sync-running"]:
+            statuses[task_id] = (await service.get_task(task_id))["status"]
+        orphan = await service.get_task("export-running")
+
+    assert statuses == {
+        "export-queued": "failed",
+        "export-running": "failed",
+        "export-done": "completed",
+        "sync-running": "running",
+    }
+    assert orphan["error_summary"] == "service restarted before export completed"
+    assert orphan["finished_at"] is not None
@@ -160,3 +160,47 @@ async def test_metrics_endpoint_exposes_cloud_sync_gauges(system_client: AsyncCl
     assert "xihong_cloud_sync_receive_log_available 1" in text
     assert 'xihong_cloud_sync_table_receive_age_seconds{source_table_name="fact_shopee_orders_monthly"}' in text
     assert 'xihong_business_table_stale_hours{side="orders",table_name="fact_shopee_orders_monthly"} 30.0' in text
+
+
+@pytest.mark.asyncio
+async def test_ready_health_endpoint_waits_for_deferred_startup_steps(monkeypatch):
+    from backend.app.startup_graph import StartupGraph
+
+    app = FastAPI()
+    app.state.runtime_mode = "collector"
+    graph = StartupGraph()
+
+    async def _noop():
+        return None
+
+    graph.add("postgres_connect", _noop)
+    graph.add("collection_queue_runner", _noop, deferred=True, required_for_ready=True)
+    await graph.run_blocking()
+    app.state.startup_graph = graph
+    app.state.startup_metrics = {"postgres_connect": 0.25, "total": 1.5}
+
+    monkeypatch.setattr(
+        "backend.app.system_routes.collect_collection_runtime_health",
+        lambda _app, _settings: {
+            "runtime_mode": "collector",
+            "deployment_role": "collector",
+            "status": "ready",
+            "checks": {},
+        },
+    )
+    register_system_routes(app, SimpleNamespace(DATABASE_URL="sqlite://"), "test-version", lambda: _FakeDbSession())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        live = await client.get("/api/healthz/live")
+        starting = await client.get("/api/healthz/ready")
+        await graph.start_deferred()
+        ready = await client.get("/api/healthz/ready")
+
+    assert live.status_code == 200 and live.json()["startup_phase"] == "serving"
+    assert starting.status_code == 503
+    assert starting.json()["checks"]["startup"] == {"status": "serving"}
+    assert starting.json()["startup"]["steps"]["collection_queue_runner"]["status"] == "pending"
+    assert starting.json()["startup"]["metrics"] == {"postgres_connect": 0.25, "total": 1.5}
+    assert ready.status_code == 200
+    assert ready.json()["startup"]["phase"] == "ready"
@@ -248,6 +248,11 @@ async def test_collection_task_log_is_mirrored_to_task_center(
         details={"step_id": "export_orders", "success": True},
     )
 
+    # 步骤进度日志进入遥测缓冲,读取时先 flush
+    from backend.services.task_telemetry_writer import task_telemetry
+
+    assert [log["message"] for log in task_telemetry.pending(task.task_id).logs] == ["采集中"]
+
     logs = await TaskCenterService(task_center_sqlite_session).list_logs(task.task_id)
 
     assert len(logs) == 1
@@ -0,0 +1,144 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.services import sync_progress_tracker as tracker_module
+from backend.services.sync_progress_tracker import SyncProgressTracker
+from backend.services.task_telemetry_writer import TaskTelemetryWriter
+from modules.core.db import TaskCenterLog, TaskCenterTask
+
+
+def _task(task_id, task_pk):
+    return TaskCenterTask(
+        id=task_pk,
+        task_id=task_id,
+        task_family="data_sync",
+        task_type="bulk_ingest",
+        status="running",
+        total_items=500,
+        processed_items=0,
+        total_rows=0,
+        processed_rows=0,
+        progress_percent=0.0,
+        details_json={"errors": [], "warnings": [], "message": None, "task_details": {"skipped_files": 0}},
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+class _Scalars:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return _Scalars(self._rows)
+
+
+class _Session:
+    def __init__(self, store):
+        self.store = store
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, _statement):
+        self.store.selects += 1
+        if self.store.fail:
+            raise RuntimeError("database unavailable")
+        return _Result(self.store.tasks.values())
+
+    def add(self, obj):
+        self.store.added.append(obj)
+
+    async def commit(self):
+        self.store.commits += 1
+
+
+class _Store:
+    def __init__(self, *tasks):
+        self.tasks = {task.task_id: task for task in tasks}
+        self.selects = 0
+        self.commits = 0
+        self.added = []
+        self.fail = False
+
+    def session(self):
+        return _Session(self)
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    store = _Store(_task("batch-1", 11), _task("batch-2", 12))
+    telemetry = TaskTelemetryWriter(session_factory=store.session, flush_interval=3600)
+    monkeypatch.setattr(tracker_module, "task_telemetry", telemetry)
+    telemetry.store = store
+    return telemetry
+
+
+@pytest.mark.asyncio
+async def test_updates_coalesce_and_flush_in_one_transaction(writer):
+    tracker = SyncProgressTracker(db=None)
+    for processed in range(1, 501):
+        await tracker.queue_update(
+            "batch-1",
+            {"processed_files": processed, "current_file": f"file-{processed}.xlsx", "task_details": {"skipped_files": processed // 100}},
+        )
+    await tracker.queue_error("batch-1", "file-7 failed")
+    await tracker.queue_update("batch-2", {"processed_files": 3, "status": "processing"})
+    writer.queue_log("batch-2", level="info", event_type="file_done", message="file-3 done")
+
+    assert writer.pending("batch-1").updates["processed_files"] == 500
+    assert writer.store.selects == 0
+
+    assert await writer.flush() == 2
+    assert (writer.store.selects, writer.store.commits) == (1, 1)
+
+    first = writer.store.tasks["batch-1"]
+    assert (first.processed_items, first.current_item, first.progress_percent) == (500, "file-500.xlsx", 100.0)
+    assert first.details_json["task_details"] == {"skipped_files": 5}
+    assert [error["message"] for error in first.details_json["errors"]] == ["file-7 failed"]
+    assert first.error_summary == "file-7 failed"
+    assert writer.store.tasks["batch-2"].status == "running"
+    (log,) = writer.store.added
+    assert isinstance(log, TaskCenterLog) and log.task_pk == 12
+    assert writer.pending("batch-1") is None
+
+
+@pytest.mark.asyncio
+async def test_readers_see_buffered_progress_before_flush(writer):
+    tracker = SyncProgressTracker(db=None)
+    row = tracker.task_center._task_to_dict(writer.store.tasks["batch-1"])
+
+    await tracker.queue_update("batch-1", {"processed_files": 42, "current_file": "a.xlsx"})
+    await tracker.queue_warning("batch-1", "products standardization warning")
+
+    view = tracker._task_to_dict(row)
+    assert (view["processed_files"], view["current_file"], view["file_progress"]) == (42, "a.xlsx", 8.4)
+    assert [warning["message"] for warning in view["warnings"]] == ["products standardization warning"]
+    assert writer.store.tasks["batch-1"].processed_items == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_under_newer_telemetry(writer):
+    writer.queue_update("batch-1", {"processed_files": 1, "task_details": {"a": 1}})
+    writer.store.fail = True
+
+    with pytest.raises(RuntimeError):
+        await writer.flush()
+
+    writer.queue_update("batch-1", {"processed_files": 2, "task_details": {"b": 2}})
+    assert writer.pending("batch-1").updates == {"processed_files": 2, "task_details": {"a": 1, "b": 2}}
+
+    writer.store.fail = False
+    await writer.flush("batch-1")
+    assert writer.store.tasks["batch-1"].processed_items == 2
@@ -82,3 +82,37 @@ def test_target_initialization_creates_only_cloud_sync_receiver_tables(monkeypat
         module.CloudSyncReceiveLog.__table__,
         module.RefreshQueueTask.__table__,
     ]
+
+
+def test_merkle_and_repair_require_table():
+    module = _load_module()
+
+    for argv in (["--merkle"], ["--merkle", "--repair"], ["--table", "fact_a", "--repair"]):
+        try:
+            module.parse_args(argv)
+        except SystemExit as exc:
+            assert exc.code == 2
+        else:
+            raise AssertionError(f"{argv} should be rejected")
+    assert module.parse_args(["--table", "fact_a", "--merkle", "--repair"]).repair is True
+
+
+def test_repair_reverifies_and_fails_on_failed_or_remaining_buckets(monkeypatch):
+    module = _load_module()
+    monkeypatch.setattr(module, "_run_command", lambda command, env=None: None)
+    monkeypatch.setattr(module, "_build_verify_database_url", lambda _: "postgresql://verify-target")
+    results = []
+    monkeypatch.setattr(module, "run_merkle_verification", lambda **kwargs: results.pop(0))
+
+    def _run():
+        return module.main(["--table", "fact_a", "--merkle", "--repair"])
+
+    diverged = {"status": "diverged", "diverged_buckets": [3]}
+    results.append({**diverged, "repairs": [{"status": "completed"}], "after_repair": {"status": "in_sync"}})
+    assert _run() == 0
+    results.append({**diverged, "repairs": [{"status": "failed"}], "after_repair": {"status": "in_sync"}})
+    assert _run() == 2
+    results.append(
+        {**diverged, "repairs": [{"status": "completed"}], "after_repair": {"status": "diverged", "diverged_buckets": [3]}}
+    )
+    assert _run() == 2
@@ -1553,6 +1553,12 @@ export default {
         }
       )
 
+      // 数据量较大时后端转为后台导出任务（202），完成后通过 download_url 下载
+      if (response.status === 202) {
+        const payload = JSON.parse(await response.data.text())
+        return { success: true, background: true, ...payload.data }
+      }
+
       // 创建下载链接
       const blob = new Blob([response.data], {
         type: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
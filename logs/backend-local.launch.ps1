@@ -0,0 +1,5 @@
+$ErrorActionPreference = 'Continue'
+$env:PYTHONPATH = '/root/package'
+$env:APP_RUNTIME_MODE = 'development'
+
+python -m uvicorn backend.app.main:app --host 127.0.0.1 --port 8001 --loop asyncio --reload 2>&1 | Tee-Object -FilePath '/root/package/logs\\backend-local.out.log'
@@ -0,0 +1,54 @@
+"""Add per-batch throughput fields to the cloud sync receive ledger.
+
+Revision ID: 20260806_cloud_sync_receive_throughput
+Revises: 20260805_payroll_backfill_audit
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20260806_cloud_sync_receive_throughput"
+down_revision = "20260805_payroll_backfill_audit"
+branch_labels = None
+depends_on = None
+
+
+THROUGHPUT_COLUMNS = (
+    ("payload_bytes", sa.BigInteger()),
+    ("duration_ms", sa.Integer()),
+    ("rows_per_second", sa.Float()),
+    ("bytes_per_second", sa.Float()),
+)
+
+
+def _column_names(connection) -> set[str]:
+    inspector = sa.inspect(connection)
+    if not inspector.has_table("cloud_sync_receive_log", schema="ops"):
+        return set()
+    return {
+        column["name"]
+        for column in inspector.get_columns("cloud_sync_receive_log", schema="ops")
+    }
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    if not sa.inspect(connection).has_table("cloud_sync_receive_log", schema="ops"):
+        return
+    columns = _column_names(connection)
+    for name, column_type in THROUGHPUT_COLUMNS:
+        if name not in columns:
+            op.add_column(
+                "cloud_sync_receive_log",
+                sa.Column(name, column_type, nullable=True),
+                schema="ops",
+            )
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    columns = _column_names(connection)
+    for name, _column_type in reversed(THROUGHPUT_COLUMNS):
+        if name in columns:
+            op.drop_column("cloud_sync_receive_log", name, schema="ops")
@@ -0,0 +1,65 @@
+"""Create per-step selector win statistics next to component version usage stats.
+
+Revision ID: 20260807_component_selector_stats
+Revises: 20260806_cloud_sync_receive_throughput
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20260807_component_selector_stats"
+down_revision = "20260806_cloud_sync_receive_throughput"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(connection) -> bool:
+    return sa.inspect(connection).has_table("component_selector_stats", schema="core")
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    if _table_exists(connection):
+        return
+
+    op.create_table(
+        "component_selector_stats",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("platform", sa.String(length=50), nullable=False, server_default=""),
+        sa.Column("component_name", sa.String(length=100), nullable=False),
+        sa.Column("version", sa.String(length=20), nullable=False, server_default=""),
+        sa.Column("step_key", sa.String(length=200), nullable=False),
+        sa.Column("selector_key", sa.String(length=500), nullable=False),
+        sa.Column("win_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_won_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            "platform",
+            "component_name",
+            "version",
+            "step_key",
+            "selector_key",
+            name="uq_component_selector_stat",
+        ),
+        schema="core",
+    )
+    op.create_index(
+        "ix_component_selector_stats_component",
+        "component_selector_stats",
+        ["platform", "component_name", "version"],
+        schema="core",
+    )
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    if not _table_exists(connection):
+        return
+    op.drop_index(
+        "ix_component_selector_stats_component",
+        table_name="component_selector_stats",
+        schema="core",
+    )
+    op.drop_table("component_selector_stats", schema="core")
@@ -0,0 +1,52 @@
+"""Back notifications.notification_id with a dedicated sequence.
+
+Revision ID: 20260808_notification_id_sequence
+Revises: 20260807_component_selector_stats
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20260808_notification_id_sequence"
+down_revision = "20260807_component_selector_stats"
+branch_labels = None
+depends_on = None
+
+
+SEQUENCE_NAME = "notifications_notification_id_seq"
+
+
+def _notifications_table(connection) -> str | None:
+    return connection.execute(sa.text("SELECT to_regclass('notifications')::text")).scalar()
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    if connection.dialect.name != "postgresql":
+        return
+    table = _notifications_table(connection)
+    if table is None:
+        return
+
+    # Tables created from the schema snapshot may lack a column default; make the
+    # sequence explicit, owned by the column and positioned after existing ids.
+    op.execute(sa.text(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME} AS BIGINT"))
+    op.execute(sa.text(f"ALTER SEQUENCE {SEQUENCE_NAME} OWNED BY {table}.notification_id"))
+    op.execute(
+        sa.text(
+            f"ALTER TABLE {table} ALTER COLUMN notification_id "
+            f"SET DEFAULT nextval('{SEQUENCE_NAME}'::regclass)"
+        )
+    )
+    op.execute(
+        sa.text(
+            f"SELECT setval('{SEQUENCE_NAME}', COALESCE(MAX(notification_id), 0) + 1, false) FROM {table}"
+        )
+    )
+
+
+def downgrade() -> None:
+    # The sequence is owned by notification_id and also backs pre-existing
+    # serial defaults, so it is left in place.
+    pass
@@ -0,0 +1,73 @@
+"""Add incremental-refresh versioning columns to shop health scores.
+
+Revision ID: 20260809_shop_health_versioning
+Revises: 20260808_notification_id_sequence
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20260809_shop_health_versioning"
+down_revision = "20260808_notification_id_sequence"
+branch_labels = None
+depends_on = None
+
+
+VERSIONING_COLUMNS = (
+    ("order_count", sa.Integer(), "0"),
+    ("input_hash", sa.String(length=64), None),
+    ("score_version", sa.Integer(), "1"),
+)
+RANK_INDEX = "ix_shop_health_rank"
+
+
+def _table_schema(connection) -> str | None:
+    inspector = sa.inspect(connection)
+    for schema in ("c_class", "public"):
+        if inspector.has_table("shop_health_scores", schema=schema):
+            return schema
+    return None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    schema = _table_schema(connection)
+    if schema is None:
+        return
+    inspector = sa.inspect(connection)
+    columns = {column["name"] for column in inspector.get_columns("shop_health_scores", schema=schema)}
+    for name, column_type, server_default in VERSIONING_COLUMNS:
+        if name not in columns:
+            op.add_column(
+                "shop_health_scores",
+                sa.Column(
+                    name,
+                    column_type,
+                    nullable=server_default is None,
+                    server_default=server_default,
+                ),
+                schema=schema,
+            )
+    indexes = {index["name"] for index in inspector.get_indexes("shop_health_scores", schema=schema)}
+    if RANK_INDEX not in indexes:
+        op.create_index(
+            RANK_INDEX,
+            "shop_health_scores",
+            ["granularity", "metric_date", "health_score"],
+            schema=schema,
+        )
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    schema = _table_schema(connection)
+    if schema is None:
+        return
+    inspector = sa.inspect(connection)
+    if RANK_INDEX in {index["name"] for index in inspector.get_indexes("shop_health_scores", schema=schema)}:
+        op.drop_index(RANK_INDEX, table_name="shop_health_scores", schema=schema)
+    columns = {column["name"] for column in inspector.get_columns("shop_health_scores", schema=schema)}
+    for name, _column_type, _server_default in reversed(VERSIONING_COLUMNS):
+        if name in columns:
+            op.drop_column("shop_health_scores", name, schema=schema)
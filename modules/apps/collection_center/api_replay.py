@@ -0,0 +1,662 @@
+"""Direct API replay of export requests learned from captured HAR traffic.
+
+Many export buttons end in a single request that returns an XLSX/CSV body.
+``learn_export_template`` picks that request out of a HAR recorded by
+``har_capture_utils.run_har_capture`` and turns it into an
+``ExportRequestTemplate``.  The template records the URL, query params, JSON or
+form body and headers, which fields carry the date range (query, URL path, JSON,
+form or plain-text body), and which values were copied from session cookies.
+A request without a recognisable date range is not learned, and rendering
+refuses a request in which a captured date survives.  ``replay_export`` renders the template for a new
+date range and calls the endpoint through the authenticated context's
+``APIRequestContext``.  A response that does not look like the learned file
+kind returns ``None`` so the caller can fall back to the UI flow.
+
+Replay skips the export component, which is what normally switches shop and
+granularity in the page, so a template only covers the scope it was recorded
+with.  Templates are stored per platform / account / domain / sub-domain /
+granularity, and the fields carrying the shop id and granularity are recorded
+as ``ScopeField``.  Rendering fills the shop fields from the task and raises
+``ReplayScopeError`` whenever the shop or granularity cannot be confirmed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+from modules.core.logger import get_logger
+from modules.core.path_manager import get_data_dir
+
+logger = get_logger(__name__)
+
+API_REPLAY_ENABLED = os.getenv("COLLECTION_API_REPLAY", "1").strip().lower() not in {"0", "false", "no"}
+
+FILE_SIGNATURES = {
+    "xlsx": b"PK\x03\x04",
+    "xls": b"\xd0\xcf\x11\xe0",
+}
+FILE_CONTENT_TYPES = {
+    "xlsx": ("spreadsheetml", "ms-excel", "octet-stream", "zip"),
+    "xls": ("ms-excel", "octet-stream"),
+    "csv": ("text/csv", "application/csv", "octet-stream", "text/plain"),
+}
+# 重放时不携带的请求头(由浏览器上下文/HTTP 客户端自行生成)
+DROPPED_HEADERS = {"cookie", "host", "content-length", "accept-encoding", "connection", "origin", "referer"}
+DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d", "%Y/%m/%d")
+DATE_KEY_PATTERN = re.compile(r"(date|time|start|end|from|to|begin)", re.IGNORECASE)
+# 文本请求体中的日期字面量(与 DATE_FORMATS 对应)
+TEXT_DATE_PATTERN = re.compile(r"\d{4}([-/])\d{2}\1\d{2}(?:[ T]\d{2}:\d{2}:\d{2})?")
+# 时间戳合理区间:2015-01-01 ~ 2040-01-01
+EPOCH_RANGE = (1420070400, 2208988800)
+# 携带店铺/粒度的字段名(去掉非字母数字并转小写后比较)
+SHOP_FIELD_KEYS = {
+    "shopid", "shopids", "shopidlist", "cnscshopid", "storeid", "storeids",
+    "sellerid", "merchantid", "merchantids", "platformshopid",
+}
+GRANULARITY_FIELD_KEYS = {
+    "granularity", "period", "periodtype", "datetype", "datedim", "timedim", "timetype",
+    "timeunit", "dateunit", "stattype", "statperiod", "cycle", "cycletype",
+}
+GRANULARITY_ALIASES = {
+    "day": "daily", "daily": "daily", "d": "daily",
+    "week": "weekly", "weekly": "weekly", "w": "weekly",
+    "month": "monthly", "monthly": "monthly", "m": "monthly",
+}
+
+
+class ReplayScopeError(ValueError):
+    """The rendered request cannot be confirmed to target the task's shop/granularity."""
+
+
+@dataclass
+class DateField:
+    """A request field holding one end of the captured date range."""
+
+    location: str  # "query" | "path" | "json" | "form" | "text"
+    path: List[str]  # path: [URL 路径段下标]; text: [录制时的日期字面量]
+    kind: str  # strftime pattern, "epoch_s" or "epoch_ms"
+    role: str = "start"  # "start" | "end"
+    captured_date: str = ""
+
+
+@dataclass
+class ScopeField:
+    """A request field carrying the shop id or the granularity of the export."""
+
+    location: str  # "query" | "json" | "form"
+    path: List[str]
+    role: str  # "shop" | "granularity"
+    captured_value: Any = None
+
+
+@dataclass
+class ExportRequestTemplate:
+    platform: str
+    data_domain: str
+    method: str
+    url: str
+    sub_domain: Optional[str] = None
+    query: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    json_body: Optional[Any] = None
+    form_body: Optional[Dict[str, str]] = None
+    text_body: Optional[str] = None
+    date_fields: List[DateField] = field(default_factory=list)
+    cookie_fields: Dict[str, str] = field(default_factory=dict)  # "query:<k>"/"form:<k>"/"header:<k>" -> cookie name
+    file_kind: str = "xlsx"
+    tz_hours: int = 8
+    source_har: Optional[str] = None
+    learned_at: Optional[str] = None
+    account_id: Optional[str] = None
+    shop_id: Optional[str] = None
+    granularity: Optional[str] = None
+    scope_fields: List[ScopeField] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExportRequestTemplate":
+        payload = dict(data)
+        payload["date_fields"] = [DateField(**item) for item in payload.get("date_fields") or []]
+        payload["scope_fields"] = [ScopeField(**item) for item in payload.get("scope_fields") or []]
+        return cls(**payload)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _headers_to_dict(items: List[Dict[str, Any]]) -> Dict[str, str]:
+    return {str(item.get("name", "")).lower(): str(item.get("value", "")) for item in items or []}
+
+
+def _response_file_kind(entry: Dict[str, Any]) -> Optional[str]:
+    response = entry.get("response") or {}
+    headers = _headers_to_dict(response.get("headers") or [])
+    disposition = headers.get("content-disposition", "").lower()
+    match = re.search(r"filename\*?=(?:utf-8'')?\"?([^\";]+)", disposition)
+    if match:
+        suffix = Path(unquote(match.group(1))).suffix.lower().lstrip(".")
+        if suffix in FILE_CONTENT_TYPES:
+            return suffix
+    mime = str((response.get("content") or {}).get("mimeType") or headers.get("content-type", "")).lower()
+    if "spreadsheetml" in mime:
+        return "xlsx"
+    if "ms-excel" in mime:
+        return "xls"
+    if "text/csv" in mime or "application/csv" in mime:
+        return "csv"
+    return None
+
+
+def _parse_date_value(key: str, value: Any, tz_hours: int) -> Optional[Tuple[str, date]]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        if not DATE_KEY_PATTERN.search(key):
+            return None
+        number = int(value)
+        kind, seconds = ("epoch_ms", number // 1000) if number > EPOCH_RANGE[1] else ("epoch_s", number)
+        if not EPOCH_RANGE[0] <= seconds <= EPOCH_RANGE[1]:
+            return None
+        return kind, datetime.fromtimestamp(seconds, tz=timezone(timedelta(hours=tz_hours))).date()
+    if isinstance(value, str):
+        for fmt in DATE_FORMATS:
+            try:
+                return fmt, datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+    return None
+
+
+def _collect_json_dates(node: Any, path: List[str], tz_hours: int, out: List[Tuple[DateField, date]]) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            _collect_json_dates(value, path + [str(key)], tz_hours, out)
+        return
+    if not path:
+        return
+    parsed = _parse_date_value(path[-1], node, tz_hours)
+    if parsed:
+        kind, day = parsed
+        out.append((DateField(location="json", path=path, kind=kind, captured_date=day.isoformat()), day))
+
+
+def _collect_path_dates(url_path: str, out: List[Tuple[DateField, date]]) -> None:
+    for index, segment in enumerate(url_path.split("/")):
+        parsed = _parse_date_value("", unquote(segment), 0) if segment and not segment.isdigit() else None
+        if parsed:
+            kind, day = parsed
+            out.append((DateField(location="path", path=[str(index)], kind=kind, captured_date=day.isoformat()), day))
+
+
+def _collect_text_dates(text_body: str, out: List[Tuple[DateField, date]]) -> None:
+    seen = set()
+    for match in TEXT_DATE_PATTERN.finditer(text_body):
+        literal = match.group(0)
+        parsed = _parse_date_value("", literal, 0)
+        if parsed and literal not in seen:
+            seen.add(literal)
+            kind, day = parsed
+            out.append((DateField(location="text", path=[literal], kind=kind, captured_date=day.isoformat()), day))
+
+
+def _parse_form_body(text_body: str, mime_type: str) -> Optional[Dict[str, str]]:
+    if "x-www-form-urlencoded" not in (mime_type or "").lower():
+        return None
+    try:
+        return dict(parse_qsl(text_body, keep_blank_values=True, strict_parsing=True))
+    except ValueError:
+        return None
+
+
+def _assign_roles(found: List[Tuple[DateField, date]]) -> List[DateField]:
+    if not found:
+        return []
+    earliest = min(day for _, day in found)
+    latest = max(day for _, day in found)
+    fields = []
+    for date_field, day in found:
+        if earliest != latest:
+            date_field.role = "end" if day == latest else "start"
+        else:
+            date_field.role = "end" if re.search(r"(end|to)$", date_field.path[-1], re.IGNORECASE) else "start"
+        fields.append(date_field)
+    # 同一天且字段名看不出起止(如 URL 路径段 /2026-09-01/2026-09-01/):按出现顺序,最后一个作为结束
+    if earliest == latest and len(fields) > 1 and not any(item.role == "end" for item in fields):
+        fields[-1].role = "end"
+    return fields
+
+
+def normalize_granularity(value: Any) -> Optional[str]:
+    text_value = str(value or "").strip().lower()
+    return GRANULARITY_ALIASES.get(text_value, text_value) or None
+
+
+def _scope_key(key: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+def _scope_role(key: str, value: Any, shop_id: Optional[str]) -> Optional[str]:
+    if isinstance(value, (dict, bool)) or value is None:
+        return None
+    normalized = _scope_key(key)
+    if normalized in SHOP_FIELD_KEYS:
+        return "shop"
+    values = value if isinstance(value, list) else [value]
+    if shop_id and any(str(item) == shop_id for item in values):
+        return "shop"
+    if normalized in GRANULARITY_FIELD_KEYS:
+        return "granularity"
+    return None
+
+
+def _collect_json_scope(node: Any, path: List[str], shop_id: Optional[str], out: List[ScopeField]) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            _collect_json_scope(value, path + [str(key)], shop_id, out)
+        return
+    if not path:
+        return
+    role = _scope_role(path[-1], node, shop_id)
+    if role:
+        out.append(ScopeField(location="json", path=path, role=role, captured_value=node))
+
+
+def _scope_slug(value: Any) -> str:
+    return re.sub(r"[^0-9A-Za-z_.-]+", "-", str(value or "").strip().lower()).strip("-") or "_"
+
+
+def learn_export_template(
+    har_path: Union[str, Path],
+    *,
+    platform: str,
+    data_domain: str,
+    sub_domain: Optional[str] = None,
+    account_id: Optional[str] = None,
+    shop_id: Optional[str] = None,
+    granularity: Optional[str] = None,
+    tz_hours: int = 8,
+) -> Optional[ExportRequestTemplate]:
+    """
+    Build a replay template from the last file-download request in a HAR file.
+
+    ``account_id``/``shop_id``/``granularity`` describe the scope the HAR was
+    recorded with; the template is only loaded again for that same scope.
+    Raises ``ReplayScopeError`` when the export request carries no date field,
+    since such a request would always replay the recorded range.
+    """
+    har = json.loads(Path(har_path).read_text(encoding="utf-8"))
+    entries = (har.get("log") or {}).get("entries") or []
+    candidates = [(entry, _response_file_kind(entry)) for entry in entries]
+    candidates = [(entry, kind) for entry, kind in candidates if kind and 200 <= int((entry.get("response") or {}).get("status") or 0) < 300]
+    if not candidates:
+        logger.info(f"[ApiReplay] No file download response found in HAR: {har_path}")
+        return None
+    entry, file_kind = candidates[-1]
+    request = entry.get("request") or {}
+
+    parts = urlsplit(str(request.get("url") or ""))
+    base_url = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    headers = {
+        name: value
+        for name, value in _headers_to_dict(request.get("headers") or []).items()
+        if name not in DROPPED_HEADERS and not name.startswith(":") and not name.startswith("sec-")
+    }
+    cookies = {str(item.get("name")): str(item.get("value")) for item in request.get("cookies") or []}
+
+    json_body = None
+    form_body = None
+    text_body = None
+    post_data = request.get("postData") or {}
+    if post_data.get("text"):
+        try:
+            json_body = json.loads(post_data["text"])
+        except ValueError:
+            form_body = _parse_form_body(post_data["text"], post_data.get("mimeType", ""))
+            if form_body is None:
+                text_body = post_data["text"]
+
+    found: List[Tuple[DateField, date]] = []
+    _collect_path_dates(parts.path, found)
+    for location, pairs in (("query", query), ("form", form_body or {})):
+        for key, value in pairs.items():
+            parsed = _parse_date_value(key, value, tz_hours)
+            if parsed:
+                kind, day = parsed
+                found.append((DateField(location=location, path=[key], kind=kind, captured_date=day.isoformat()), day))
+    if json_body is not None:
+        _collect_json_dates(json_body, [], tz_hours, found)
+    if text_body is not None:
+        _collect_text_dates(text_body, found)
+    if not found:
+        raise ReplayScopeError(f"no date range field found in export request {base_url}")
+
+    # 会话相关的值(如 CSRF/店铺 token)在重放时改为从当前上下文的 cookie 读取
+    cookie_by_value = {value: name for name, value in cookies.items() if len(value) >= 8}
+    cookie_fields = {}
+    for location, pairs in (("query", query), ("form", form_body or {})):
+        for key, value in pairs.items():
+            if value in cookie_by_value:
+                cookie_fields[f"{location}:{key}"] = cookie_by_value[value]
+    for key, value in headers.items():
+        if value in cookie_by_value:
+            cookie_fields[f"header:{key}"] = cookie_by_value[value]
+
+    shop_text = str(shop_id).strip() if shop_id not in (None, "") else None
+    date_paths = {(date_field.location, tuple(date_field.path)) for date_field, _ in found}
+    scope_fields: List[ScopeField] = []
+    for location, pairs in (("query", query), ("form", form_body or {})):
+        for key, value in pairs.items():
+            role = _scope_role(key, value, shop_text)
+            if role:
+                scope_fields.append(ScopeField(location=location, path=[key], role=role, captured_value=value))
+    if json_body is not None:
+        _collect_json_scope(json_body, [], shop_text, scope_fields)
+    scope_fields = [item for item in scope_fields if (item.location, tuple(item.path)) not in date_paths]
+
+    return ExportRequestTemplate(
+        platform=str(platform or "").strip().lower(),
+        data_domain=str(data_domain or "").strip().lower(),
+        sub_domain=(str(sub_domain).strip().lower() or None) if sub_domain else None,
+        method=str(request.get("method") or "GET").upper(),
+        url=base_url,
+        query=query,
+        headers=headers,
+        json_body=json_body,
+        form_body=form_body,
+        text_body=text_body,
+        date_fields=_assign_roles(found),
+        cookie_fields=cookie_fields,
+        file_kind=file_kind,
+        tz_hours=tz_hours,
+        source_har=str(har_path),
+        learned_at=datetime.now().isoformat(),
+        account_id=str(account_id).strip() if account_id not in (None, "") else None,
+        shop_id=shop_text,
+        granularity=normalize_granularity(granularity),
+        scope_fields=scope_fields,
+    )
+
+
+def _template_path(
+    platform: str,
+    data_domain: str,
+    sub_domain: Optional[str] = None,
+    *,
+    account_id: Optional[str] = None,
+    granularity: Optional[str] = None,
+) -> Path:
+    name = "__".join(
+        [_scope_slug(data_domain), _scope_slug(sub_domain), _scope_slug(normalize_granularity(granularity))]
+    )
+    return get_data_dir() / "api_replay" / _scope_slug(platform) / _scope_slug(account_id) / f"{name}.json"
+
+
+def save_export_template(template: ExportRequestTemplate) -> Path:
+    path = _template_path(
+        template.platform,
+        template.data_domain,
+        template.sub_domain,
+        account_id=template.account_id,
+        granularity=template.granularity,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(template.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def load_export_template(
+    platform: str,
+    data_domain: str,
+    sub_domain: Optional[str] = None,
+    *,
+    account_id: Optional[str] = None,
+    granularity: Optional[str] = None,
+) -> Optional[ExportRequestTemplate]:
+    """
+    Load the template learned for exactly this account/domain/sub-domain/granularity.
+
+    There is no fallback to a broader template: a request recorded for another
+    sub-domain or granularity would silently export the wrong data.
+    """
+    path = _template_path(platform, data_domain, sub_domain, account_id=account_id, granularity=granularity)
+    if not path.exists():
+        return None
+    try:
+        return ExportRequestTemplate.from_dict(json.loads(path.read_text(encoding="utf-8")))
+    except Exception as e:
+        logger.warning(f"[ApiReplay] Ignore unreadable template {path}: {e}")
+    return None
+
+
+def _render_date(date_field: DateField, captured: Any, target: date) -> Any:
+    shift = target - date.fromisoformat(date_field.captured_date)
+    if date_field.kind in ("epoch_s", "epoch_ms"):
+        factor = 1000 if date_field.kind == "epoch_ms" else 1
+        value = int(captured) + int(shift.total_seconds()) * factor
+        return str(value) if isinstance(captured, str) else value
+    return (datetime.strptime(str(captured), date_field.kind) + shift).strftime(date_field.kind)
+
+
+def _set_path(node: Any, path: List[str], value: Any) -> None:
+    for key in path[:-1]:
+        node = node[key]
+    node[path[-1]] = value
+
+
+def _get_path(node: Any, path: List[str]) -> Any:
+    for key in path:
+        node = node[key]
+    return node
+
+
+def _render_shop(captured: Any, shop_id: str) -> Any:
+    if isinstance(captured, list):
+        return [_render_shop(item, shop_id) for item in captured] if captured else [shop_id]
+    if isinstance(captured, int) and shop_id.isdigit():
+        return int(shop_id)
+    return shop_id
+
+
+def _check_scope(template: ExportRequestTemplate, shop_id: Optional[str], granularity: Optional[str]) -> None:
+    if normalize_granularity(granularity) != template.granularity:
+        raise ReplayScopeError(
+            f"granularity {granularity!r} does not match template granularity {template.granularity!r}"
+        )
+    if template.granularity is None and any(item.role == "granularity" for item in template.scope_fields):
+        raise ReplayScopeError("template carries a granularity field but was learned without a granularity")
+    has_shop_field = any(item.role == "shop" for item in template.scope_fields)
+    if has_shop_field and not shop_id:
+        raise ReplayScopeError("template carries a shop field but the task has no shop id")
+    if not has_shop_field and (not shop_id or shop_id != template.shop_id):
+        raise ReplayScopeError(
+            f"no shop field in template; recorded shop {template.shop_id!r} cannot be confirmed as {shop_id!r}"
+        )
+
+
+def render_export_request(
+    template: ExportRequestTemplate,
+    date_from: Union[str, date],
+    date_to: Union[str, date],
+    cookies: Optional[Dict[str, str]] = None,
+    *,
+    shop_id: Optional[str] = None,
+    granularity: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Fill the template with a new date range, the task's shop and the current session cookie values.
+
+    Raises ``ReplayScopeError`` when the granularity differs from the recorded one,
+    the request cannot be confirmed to target ``shop_id``, or the requested date
+    range cannot be expressed with the recorded date fields.
+    """
+    shop_id = str(shop_id).strip() if shop_id not in (None, "") else None
+    _check_scope(template, shop_id, granularity)
+    start = date.fromisoformat(str(date_from)[:10])
+    end = date.fromisoformat(str(date_to)[:10])
+    roles = {date_field.role for date_field in template.date_fields}
+    if not roles:
+        raise ReplayScopeError("template has no date field; replay would export the recorded range")
+    if "end" not in roles and start != end:
+        raise ReplayScopeError(f"template has no end date field; cannot render range {start}..{end}")
+    url_parts = urlsplit(template.url)
+    segments = url_parts.path.split("/")
+    query = dict(template.query)
+    form_body = dict(template.form_body) if template.form_body is not None else None
+    text_body = template.text_body
+    headers = dict(template.headers)
+    json_body = json.loads(json.dumps(template.json_body)) if template.json_body is not None else None
+
+    captured_tokens = set()
+    rendered_tokens = {start.isoformat(), end.isoformat()}
+    for date_field in template.date_fields:
+        target = end if date_field.role == "end" else start
+        key = date_field.path[0]
+        if date_field.location == "query":
+            captured = query[key]
+            rendered = query[key] = _render_date(date_field, captured, target)
+        elif date_field.location == "form" and form_body is not None:
+            captured = form_body[key]
+            rendered = form_body[key] = _render_date(date_field, captured, target)
+        elif date_field.location == "path":
+            captured = unquote(segments[int(key)])
+            rendered = _render_date(date_field, captured, target)
+            segments[int(key)] = str(rendered) if segments[int(key)] == captured else quote(str(rendered))
+        elif date_field.location == "text" and text_body is not None:
+            captured = key
+            rendered = _render_date(date_field, captured, target)
+            text_body = text_body.replace(captured, str(rendered))
+        elif date_field.location == "json" and json_body is not None:
+            captured = _get_path(json_body, date_field.path)
+            rendered = _render_date(date_field, captured, target)
+            _set_path(json_body, date_field.path, rendered)
+        else:
+            raise ReplayScopeError(f"date field {date_field.location}:{'/'.join(date_field.path)} missing from template")
+        captured_tokens.update({str(captured), date_field.captured_date})
+        rendered_tokens.add(str(rendered))
+
+    for scope_field in template.scope_fields:
+        if scope_field.role != "shop":
+            continue
+        if scope_field.location == "query":
+            key = scope_field.path[0]
+            query[key] = _render_shop(query[key], shop_id)
+        elif scope_field.location == "form" and form_body is not None:
+            key = scope_field.path[0]
+            form_body[key] = _render_shop(form_body[key], shop_id)
+        elif json_body is not None:
+            captured = _get_path(json_body, scope_field.path)
+            _set_path(json_body, scope_field.path, _render_shop(captured, shop_id))
+
+    for slot, cookie_name in template.cookie_fields.items():
+        value = (cookies or {}).get(cookie_name)
+        if value is None:
+            continue
+        location, _, key = slot.partition(":")
+        if location == "query":
+            query[key] = value
+        elif location == "form" and form_body is not None:
+            form_body[key] = value
+        elif location == "header":
+            headers[key] = value
+
+    url = urlunsplit((url_parts.scheme, url_parts.netloc, "/".join(segments), "", ""))
+    request: Dict[str, Any] = {"method": template.method, "url": url, "params": query, "headers": headers}
+    if json_body is not None:
+        request["data"] = json.dumps(json_body, ensure_ascii=False)
+        headers.setdefault("content-type", "application/json")
+    elif form_body is not None:
+        request["data"] = urlencode(form_body)
+        headers.setdefault("content-type", "application/x-www-form-urlencoded")
+    elif text_body is not None:
+        request["data"] = text_body
+
+    visible = json.dumps(
+        [url, query, {k: v for k, v in headers.items() if f"header:{k}" not in template.cookie_fields},
+         request.get("data")],
+        ensure_ascii=False,
+    )
+    # 录制店铺的 ID 仍出现在请求里(未识别的字段/文本体),说明无法确认店铺,拒绝重放
+    recorded_shop = template.shop_id
+    if recorded_shop and recorded_shop != shop_id and len(recorded_shop) >= 4 and recorded_shop in visible:
+        raise ReplayScopeError(f"recorded shop id {recorded_shop!r} is still present in the rendered request")
+    # 同理,录制的日期仍残留在请求里(未识别的日期字段),重放会导出错误的日期范围
+    leaked = sorted(token for token in captured_tokens - rendered_tokens if token and token in visible)
+    if leaked:
+        raise ReplayScopeError(f"captured date {leaked[0]!r} is still present in the rendered request")
+    return request
+
+
+def validate_export_body(file_kind: str, content_type: str, body: bytes) -> bool:
+    """Check that a replayed response is the learned file kind rather than an error page/JSON."""
+    if not body:
+        return False
+    content_type = (content_type or "").lower()
+    if "json" in content_type or "text/html" in content_type:
+        return False
+    signature = FILE_SIGNATURES.get(file_kind)
+    if signature is not None:
+        return body.startswith(signature)
+    head = body[:1024].lstrip()
+    return not head.startswith((b"{", b"[", b"<")) and any(token in content_type for token in FILE_CONTENT_TYPES["csv"])
+
+
+async def replay_export(
+    context: Any,
+    template: ExportRequestTemplate,
+    *,
+    date_from: Union[str, date],
+    date_to: Union[str, date],
+    download_dir: Union[str, Path],
+    shop_id: Optional[str] = None,
+    granularity: Optional[str] = None,
+    timeout_ms: int = 60000,
+) -> Optional[str]:
+    """
+    Call the learned export endpoint with the context's cookies and save the file.
+
+    Returns the saved path, or None when the response does not validate.
+    Raises ``ReplayScopeError`` before any request is sent when the shop or
+    granularity cannot be confirmed.
+    """
+    cookie_values = {}
+    if template.cookie_fields:
+        for cookie in await context.cookies(template.url):
+            cookie_values[cookie.get("name")] = cookie.get("value")
+    request = render_export_request(
+        template, date_from, date_to, cookie_values, shop_id=shop_id, granularity=granularity
+    )
+    response = await context.request.fetch(
+        request.pop("url"),
+        method=request.pop("method"),
+        timeout=timeout_ms,
+        fail_on_status_code=False,
+        **request,
+    )
+    try:
+        body = await response.body()
+        content_type = (response.headers or {}).get("content-type", "")
+        if not (200 <= response.status < 300) or not validate_export_body(template.file_kind, content_type, body):
+            logger.info(
+                f"[ApiReplay] {template.platform}/{template.data_domain} response rejected: "
+                f"status={response.status} content_type={content_type} size={len(body)}"
+            )
+            return None
+    finally:
+        try:
+            await response.dispose()
+        except Exception:
+            pass
+
+    target_dir = Path(download_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    stem = "_".join(filter(None, [template.platform, template.data_domain, template.sub_domain, "api"]))
+    target = target_dir / f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{template.file_kind}"
+    target.write_bytes(body)
+    return str(target)
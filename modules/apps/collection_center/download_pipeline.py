@@ -0,0 +1,245 @@
+"""Event-driven download capture and hashed raw landing for collected files.
+
+``DownloadCapture`` listens for Playwright ``download`` events (plus a
+watchfiles/inotify watcher on the download directory for files written outside
+Playwright) so the executor resumes as soon as a file is available instead of
+sleeping and globbing the directory.  ``land_file`` moves a downloaded file into
+its ``data/raw/YYYY/`` landing path while hashing it in the same pass, so
+catalog registration can reuse the digest rather than reading the file again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import errno
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
+
+from modules.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DOWNLOAD_EXTENSIONS = (".xlsx", ".xls", ".csv", ".xlsm")
+PARTIAL_SUFFIXES = (".crdownload", ".tmp", ".part")
+LANDING_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class LandedFile:
+    """A file promoted into data/raw together with the digests computed while landing it."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    content_sha256: str
+    catalog_hashes: Dict[str, str] = field(default_factory=dict)
+
+    def to_meta(self) -> Dict[str, Any]:
+        """Serialize as the ``collection_info.landing_hash`` hint read by register_single_file."""
+        return {
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "content_sha256": self.content_sha256,
+            "catalog_hashes": dict(self.catalog_hashes),
+        }
+
+
+def _new_hashers(identities: Iterable[Tuple[Optional[str], Optional[str]]]) -> Dict[str, Any]:
+    from modules.services.catalog_scanner import catalog_hash_key, catalog_hash_prefix
+
+    hashers = {}
+    for shop_id, platform_code in identities:
+        key = catalog_hash_key(shop_id, platform_code)
+        if key not in hashers:
+            hashers[key] = hashlib.sha256(catalog_hash_prefix(shop_id, platform_code))
+    return hashers
+
+
+def land_file(
+    source: Union[str, Path],
+    target: Union[str, Path],
+    identities: Iterable[Tuple[Optional[str], Optional[str]]] = (),
+    chunk_size: int = LANDING_CHUNK_SIZE,
+) -> LandedFile:
+    """
+    Move ``source`` to ``target`` and hash it in a single read of the content.
+
+    On the same filesystem the file is renamed and then read once for hashing;
+    across filesystems it is streamed into ``<target>.part`` with every chunk fed
+    to the hashers, then atomically renamed into place.  ``identities`` are the
+    ``(shop_id, platform_code)`` pairs catalog registration may key the file hash
+    with (see ``catalog_scanner._compute_sha256``).
+    """
+    source = Path(source)
+    target = Path(target)
+    content = hashlib.sha256()
+    hashers = _new_hashers(identities)
+
+    def _feed(chunk: bytes) -> None:
+        content.update(chunk)
+        for hasher in hashers.values():
+            hasher.update(chunk)
+
+    try:
+        os.replace(source, target)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        partial = target.with_name(target.name + ".part")
+        try:
+            with open(source, "rb") as src, open(partial, "wb") as dst:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    _feed(chunk)
+                    dst.write(chunk)
+            os.replace(partial, target)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        source.unlink(missing_ok=True)
+    else:
+        with open(target, "rb") as landed:
+            while True:
+                chunk = landed.read(chunk_size)
+                if not chunk:
+                    break
+                _feed(chunk)
+
+    stat = target.stat()
+    return LandedFile(
+        path=target,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        content_sha256=content.hexdigest(),
+        catalog_hashes={key: hasher.hexdigest() for key, hasher in hashers.items()},
+    )
+
+
+class DownloadCapture:
+    """
+    Collect downloads that happen while an export component runs.
+
+    Listeners are attached on entry, so downloads triggered by a click before a
+    ``wait_for_download`` step are queued rather than missed.  Playwright
+    ``Download`` objects are saved lazily into ``download_dir`` when consumed;
+    files that land in ``download_dir`` by other means are picked up by a
+    watchfiles watcher (polling only if watchfiles is unavailable).
+    """
+
+    def __init__(
+        self,
+        page,
+        download_dir: Union[str, Path],
+        file_extensions: Tuple[str, ...] = DOWNLOAD_EXTENSIONS,
+        watch_directory: bool = True,
+        poll_interval: float = 1.0,
+    ):
+        self.page = page
+        self.download_dir = Path(download_dir)
+        self.file_extensions = tuple(ext.lower() for ext in file_extensions)
+        self.watch_directory = watch_directory
+        self.poll_interval = poll_interval
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._known: Set[Path] = set()
+        self._stop = asyncio.Event()
+        self._watch_task: Optional[asyncio.Task] = None
+        self._listening = False
+
+    async def __aenter__(self) -> "DownloadCapture":
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        self._known = {path.resolve() for path in self.download_dir.iterdir() if path.is_file()}
+        if hasattr(self.page, "on"):
+            self.page.on("download", self._on_download)
+            self._listening = True
+        if self.watch_directory:
+            self._watch_task = asyncio.create_task(self._watch())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._listening:
+            try:
+                self.page.remove_listener("download", self._on_download)
+            except Exception as e:
+                logger.debug(f"[DownloadCapture] remove_listener failed: {e}")
+            self._listening = False
+        self._stop.set()
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._watch_task = None
+
+    def _on_download(self, download) -> None:
+        self._queue.put_nowait(download)
+
+    def _accept_path(self, path: Path) -> bool:
+        name = path.name.lower()
+        if name.endswith(PARTIAL_SUFFIXES) or not name.endswith(self.file_extensions):
+            return False
+        resolved = path.resolve()
+        if resolved in self._known:
+            return False
+        try:
+            if not path.is_file() or path.stat().st_size <= 0:
+                return False
+        except OSError:
+            return False
+        self._known.add(resolved)
+        return True
+
+    async def _watch(self) -> None:
+        try:
+            from watchfiles import Change, awatch
+        except ImportError:
+            await self._poll()
+            return
+        async for changes in awatch(self.download_dir, stop_event=self._stop, recursive=False):
+            for change, raw_path in sorted(changes, key=lambda item: item[1]):
+                if change is Change.deleted:
+                    continue
+                path = Path(raw_path)
+                if self._accept_path(path):
+                    self._queue.put_nowait(path)
+
+    async def _poll(self) -> None:
+        while not self._stop.is_set():
+            for path in sorted(self.download_dir.iterdir()):
+                if self._accept_path(path):
+                    self._queue.put_nowait(path)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _materialize(self, item, save_as: Optional[str]) -> str:
+        if isinstance(item, Path):
+            if save_as and item.name != save_as:
+                target = self.download_dir / save_as
+                self._known.add(target.resolve())
+                os.replace(item, target)
+                return str(target)
+            return str(item)
+        target = self.download_dir / (save_as or item.suggested_filename)
+        # 自己保存的文件不再被目录监听重复入队
+        self._known.add(target.resolve())
+        await item.save_as(str(target))
+        return str(target)
+
+    async def next_download(self, timeout: float, save_as: Optional[str] = None) -> str:
+        """Return the next captured download, saved into download_dir; raise asyncio.TimeoutError."""
+        item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        return await self._materialize(item, save_as)
+
+    async def wait_for_file(self, timeout: float) -> Optional[str]:
+        """Like next_download, but return None when nothing arrives within ``timeout`` seconds."""
+        try:
+            return await self.next_download(timeout)
+        except asyncio.TimeoutError:
+            return None
@@ -42,6 +42,14 @@ from modules.apps.collection_center.browser_config_helper import (
 from modules.apps.collection_center.popup_handler import UniversalPopupHandler, StepPopupHandler
 from modules.apps.collection_center.python_component_adapter import PythonComponentAdapter, create_adapter
 from modules.apps.collection_center.landing_semantics import resolve_business_granularity
+from modules.apps.collection_center.api_replay import (
+    API_REPLAY_ENABLED,
+    ReplayScopeError,
+    load_export_template,
+    replay_export,
+)
+from modules.apps.collection_center.download_pipeline import DownloadCapture, land_file
+from modules.apps.collection_center.network_policy import apply_network_policy, get_network_stats
 from modules.apps.collection_center.transition_gates import (
     GateStatus,
     evaluate_export_complete,
@@ -64,6 +72,11 @@ MAIN_ACCOUNT_SESSION_STEP_MESSAGES = {
     "target_shop_ready": "目标店铺已就绪",
 }
 
+# 多选择器步骤:所有候选并发探测,取第一个出现在 DOM 中的(COLLECTION_SELECTOR_RACE=0 恢复逐个尝试)
+SELECTOR_RACE_ENABLED = os.getenv("COLLECTION_SELECTOR_RACE", "1").strip().lower() not in {"0", "false", "no"}
+# 单个候选选择器的快速探测超时(毫秒);竞速与逐个尝试共用,全部未命中时尽快降级到 legacy selector
+SELECTOR_PROBE_TIMEOUT_MS = 1000
+
 # 用于 SessionManager/DeviceFingerprintManager 同步 IO 的线程池(避免阻塞事件循环)
 _executor_pool: Optional[ThreadPoolExecutor] = None
 
@@ -425,6 +438,7 @@ async def _prepare_runtime_page_bundle(
     use_account_session_fingerprint: bool,
     browser_instance: Any,
     runtime_manifests: Optional[Dict[str, Any]],
+    headless: bool,
     proxy: Optional[Dict[str, str]] = None,
 ) -> Dict[str, Any]:
     storage_state: Optional[Dict[str, Any]] = None
@@ -504,6 +518,7 @@ async def _prepare_runtime_page_bundle(
 
     play_context = await browser_instance.new_context(**context_options)
     await runtime_session.apply_stealth_init_scripts(play_context)
+    await apply_network_policy(play_context, platform, headless=headless)
     page = await play_context.new_page()
     params["reused_session"] = reused_session
 
@@ -599,6 +614,56 @@ def _record_component_version_usage_sync(
         except Exception:
             pass
 
+
+def _load_selector_win_counts_sync(
+    *,
+    platform: str,
+    component_name: str,
+    version: str,
+) -> Dict[str, Dict[str, int]]:
+    """Sync DB lookup of per-step selector win counts. Run in thread executor."""
+    from backend.models.database import SessionLocal
+    from backend.services.component_version_service import ComponentVersionService
+
+    db = SessionLocal()
+    try:
+        return ComponentVersionService(db).get_selector_win_counts(
+            platform=platform,
+            component_name=component_name,
+            version=version,
+        )
+    finally:
+        try:
+            db.close()
+        except Exception:
+            pass
+
+
+def _record_selector_wins_sync(
+    *,
+    platform: str,
+    component_name: str,
+    version: str,
+    wins: Dict[str, Dict[str, int]],
+) -> None:
+    """Sync DB writeback of per-step selector wins. Run in thread executor."""
+    from backend.models.database import SessionLocal
+    from backend.services.component_version_service import ComponentVersionService
+
+    db = SessionLocal()
+    try:
+        ComponentVersionService(db).record_selector_wins(
+            platform=platform,
+            component_name=component_name,
+            version=version,
+            wins=wins,
+        )
+    finally:
+        try:
+            db.close()
+        except Exception:
+            pass
+
 @dataclass
 class CollectionResult:
     """采集结果(v4.7.0)"""
@@ -687,6 +752,7 @@ class CollectionExecutorV2:
     DEFAULT_COMPONENT_TIMEOUT = int(os.getenv('COMPONENT_TIMEOUT', 300))  # 5分钟
     DEFAULT_TASK_TIMEOUT = int(os.getenv('TASK_TIMEOUT', 1800))  # 30分钟
     DEFAULT_DOWNLOAD_TIMEOUT = int(os.getenv('DOWNLOAD_TIMEOUT', 120))  # 2分钟
+    AUTO_DOWNLOAD_WAIT_SECONDS = 30  # 无 wait_for_download 步骤时等待下载事件的上限
     
     def __init__(
         self,
@@ -720,6 +786,9 @@ class CollectionExecutorV2:
         self._task_contexts: Dict[str, TaskContext] = {}
         self._task_progress_state: Dict[str, Dict[str, Any]] = {}
         self._browser_diagnostics: Dict[str, List[BrowserDiagnosticsSession]] = {}
+        # 多选择器胜出统计: (platform, component_name, version) -> {step_key: {selector_key: wins}}
+        self._selector_win_counts: Dict[Tuple[str, str, str], Dict[str, Dict[str, int]]] = {}
+        self._selector_wins_pending: Dict[Tuple[str, str, str], Dict[str, Dict[str, int]]] = {}
         
         # 下载目录
         self.temp_dir = Path(os.getenv('TEMP_DIR', 'temp'))
@@ -2008,6 +2077,9 @@ class CollectionExecutorV2:
                     params['params']['data_domain'] = domain
                     if sub_domain:
                         params['params']['sub_domain'] = sub_domain
+                    else:
+                        # 不能沿用上一个数据域的子类型
+                        params['params'].pop('sub_domain', None)
                     
                     try:
                         # 加载并执行导出组件
@@ -2433,6 +2505,7 @@ class CollectionExecutorV2:
         platform: str,
         account: Dict[str, Any],
         account_id: str,
+        headless: bool,
     ):
         storage_state = None
         if account_id:
@@ -2466,6 +2539,7 @@ class CollectionExecutorV2:
 
         new_context = await browser.new_context(**context_options)
         await runtime_session.apply_stealth_init_scripts(new_context)
+        await apply_network_policy(new_context, platform, headless=headless)
         new_page = await new_context.new_page()
         await self._prime_runtime_page_for_login_gate(new_page, platform, account)
         return new_context, new_page
@@ -2580,6 +2654,8 @@ class CollectionExecutorV2:
             platform=platform,
             account=account,
             account_id=account_id,
+            # 回到任务自身的浏览器,沿用它的启动模式(而不是上面有头兜底登录的模式)
+            headless=params.get("_actual_execution_mode", "headless") != "headed",
         )
         return True, new_context, new_page, "success"
 
@@ -2763,6 +2839,8 @@ class CollectionExecutorV2:
                 }
                 if sub_domain:
                     export_params['params']['sub_domain'] = sub_domain
+                else:
+                    export_params['params'].pop('sub_domain', None)
                 
                 try:
                     # 回调更新 current_domain
@@ -2977,6 +3055,9 @@ class CollectionExecutorV2:
         if popup_handling.get('check_before_steps', True):
             await self.popup_handler.close_popups(page, platform=component.get('platform'))
         
+        # 多选择器步骤按历史胜率排序候选
+        await self._load_selector_history(component)
+        
         # 执行所有步骤(v4.7.2增强:智能重试+Optional步骤处理)
         step_failed = False
         for i, step in enumerate(steps):
@@ -3039,6 +3120,8 @@ class CollectionExecutorV2:
             # 步骤执行后检查弹窗
             await step_popup_handler.after_step(page, step, component)
         
+        await self._flush_selector_wins(component)
+        
         # 组件执行后检查弹窗
         if popup_handling.get('check_after_steps', True):
             await self.popup_handler.close_popups(page, platform=component.get('platform'))
@@ -3258,7 +3341,7 @@ class CollectionExecutorV2:
                 await page.wait_for_selector(wait_for, timeout=timeout)
             
             # Phase 10: 使用多选择器降级
-            locator = await self._get_locator_with_fallback(page, step, timeout)
+            locator = await self._get_locator_with_fallback(page, step, timeout, component)
             await locator.click(timeout=timeout)
             
             if delay > 0:
@@ -3269,7 +3352,7 @@ class CollectionExecutorV2:
             clear = step.get('clear', True)
             
             # Phase 10: 使用多选择器降级
-            locator = await self._get_locator_with_fallback(page, step, timeout)
+            locator = await self._get_locator_with_fallback(page, step, timeout, component)
             
             if clear:
                 await locator.clear(timeout=timeout)
@@ -3304,7 +3387,7 @@ class CollectionExecutorV2:
             by = step.get('by', 'value')
             
             # Phase 10: 使用多选择器降级
-            locator = await self._get_locator_with_fallback(page, step, timeout)
+            locator = await self._get_locator_with_fallback(page, step, timeout, component)
             
             if by == 'value':
                 await locator.select_option(value=value, timeout=timeout)
@@ -3382,23 +3465,186 @@ class CollectionExecutorV2:
         except Exception:
             return False
     
+    @staticmethod
+    def _selector_stats_key(component: Optional[Dict[str, Any]]) -> Optional[Tuple[str, str, str]]:
+        """(platform, component_name, version) 统计键;组件名与 component_versions 一致(如 shopee/login)"""
+        if not component:
+            return None
+        name = str(component.get('name') or '').strip()
+        if not name or name == 'unknown':
+            return None
+        platform = str(component.get('platform') or '').strip()
+        component_name = name if ('/' in name or not platform) else f"{platform}/{name}"
+        version = str(component.get('_version_number') or component.get('version') or '')
+        return platform, component_name, version
+    
+    @staticmethod
+    def _selector_key(sel_config: Dict[str, Any]) -> str:
+        return f"{sel_config.get('type', 'css')}={sel_config.get('value', '')}"[:500]
+    
+    @classmethod
+    def _selector_step_key(cls, step: Dict[str, Any]) -> str:
+        """步骤标识:优先 id/name,否则 action + 候选选择器集合(跨运行稳定)"""
+        explicit = step.get('id') or step.get('name')
+        if explicit:
+            return str(explicit)[:200]
+        candidates = sorted(cls._selector_key(sel) for sel in step.get('selectors', []) if sel.get('value'))
+        return f"{step.get('action', '')}|{'|'.join(candidates)}"[:200]
+    
+    async def _load_selector_history(self, component: Dict[str, Any]) -> None:
+        """加载组件各步骤的选择器历史胜出次数(每个执行器实例每组件版本加载一次)"""
+        stats_key = self._selector_stats_key(component)
+        if stats_key is None or stats_key in self._selector_win_counts:
+            return
+        platform, component_name, version = stats_key
+        try:
+            loop = asyncio.get_running_loop()
+            counts = await loop.run_in_executor(
+                _get_executor_pool(),
+                lambda: _load_selector_win_counts_sync(
+                    platform=platform,
+                    component_name=component_name,
+                    version=version,
+                ),
+            )
+        except Exception as e:
+            logger.debug(f"Failed to load selector history for {component_name}: {e}")
+            counts = {}
+        self._selector_win_counts[stats_key] = counts or {}
+    
+    def _note_selector_win(self, component: Optional[Dict[str, Any]], step: Dict[str, Any], sel_config: Dict[str, Any]) -> None:
+        stats_key = self._selector_stats_key(component)
+        if stats_key is None:
+            return
+        step_key = self._selector_step_key(step)
+        selector_key = self._selector_key(sel_config)
+        for store in (self._selector_wins_pending, self._selector_win_counts):
+            step_counts = store.setdefault(stats_key, {}).setdefault(step_key, {})
+            step_counts[selector_key] = step_counts.get(selector_key, 0) + 1
+    
+    async def _flush_selector_wins(self, component: Dict[str, Any]) -> None:
+        """把本次组件执行中各步骤的胜出选择器写回统计表"""
+        stats_key = self._selector_stats_key(component)
+        wins = self._selector_wins_pending.pop(stats_key, None) if stats_key else None
+        if not wins:
+            return
+        platform, component_name, version = stats_key
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                _get_executor_pool(),
+                lambda: _record_selector_wins_sync(
+                    platform=platform,
+                    component_name=component_name,
+                    version=version,
+                    wins=wins,
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record selector wins for {component_name}: {e}")
+    
+    def _order_selectors(
+        self,
+        selectors: List[Dict[str, Any]],
+        step: Dict[str, Any],
+        component: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """按 priority 排序,有历史胜出记录时按胜率重排(胜率相同保持 priority 顺序)"""
+        ordered = sorted(selectors, key=lambda x: x.get('priority', 99))
+        stats_key = self._selector_stats_key(component)
+        history = self._selector_win_counts.get(stats_key, {}).get(self._selector_step_key(step)) if stats_key else None
+        total = sum(history.values()) if history else 0
+        if not total:
+            return ordered
+        return sorted(ordered, key=lambda sel: -history.get(self._selector_key(sel), 0) / total)
+    
+    @staticmethod
+    def _build_selector_locator(page, sel_config: Dict[str, Any]):
+        """根据选择器类型构建定位器"""
+        sel_type = sel_config.get('type', 'css')
+        sel_value = sel_config.get('value', '')
+        if sel_type == 'role':
+            # 解析 role[name="xxx"] 格式
+            if '[name=' in sel_value:
+                role = sel_value.split('[')[0]
+                name = sel_value.split('name="')[1].rstrip('"]')
+                return page.get_by_role(role, name=name)
+            return page.get_by_role(sel_value)
+        if sel_type == 'text':
+            return page.get_by_text(sel_value)
+        if sel_type == 'xpath':
+            return page.locator(f'xpath={sel_value}')
+        return page.locator(sel_value)
+    
+    async def _race_selectors(
+        self,
+        page,
+        candidates: List[Dict[str, Any]],
+        timeout: int,
+        errors: List[str],
+    ) -> Optional[Tuple[Dict[str, Any], Any]]:
+        """
+        并发探测所有候选选择器,返回第一个已挂载(attached)的 (sel_config, locator)
+        
+        与逐个尝试相同,按 attached 状态、最多 timeout 毫秒探测;同一轮同时命中的多个候选
+        按 candidates 顺序取第一个;其余等待任务被取消。
+        """
+        locators = []
+        for sel_config in candidates:
+            try:
+                locators.append((sel_config, self._build_selector_locator(page, sel_config).first))
+            except Exception as e:
+                errors.append(f"{self._selector_key(sel_config)}: {str(e)[:50]}")
+        if not locators:
+            return None
+        
+        tasks = {
+            asyncio.ensure_future(locator.wait_for(state='attached', timeout=timeout)): index
+            for index, (_, locator) in enumerate(locators)
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = []
+                for task in done:
+                    sel_config = locators[tasks[task]][0]
+                    if task.exception() is None:
+                        winners.append(tasks[task])
+                    else:
+                        errors.append(f"{self._selector_key(sel_config)}: {str(task.exception())[:50]}")
+                if winners:
+                    return locators[min(winners)]
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
     async def _get_locator_with_fallback(
         self,
         page,
         step: Dict[str, Any],
-        timeout: int = 5000
+        timeout: int = 5000,
+        component: Optional[Dict[str, Any]] = None,
     ):
         """
         获取元素定位器,支持多选择器降级(Phase 10)
         
-        按优先级尝试多个选择器:
-        1. 如果配置了 selectors 数组,按优先级逐个尝试
+        1. 如果配置了 selectors 数组:
+           - 竞速模式(默认,step.selector_race=false 或 COLLECTION_SELECTOR_RACE=0 关闭):
+             所有候选并发探测,取第一个已挂载的
+           - 顺序模式:按顺序逐个快速检测
+           两种模式每个候选都只探测 SELECTOR_PROBE_TIMEOUT_MS(且不超过 timeout)
+           候选按 priority 排序,有历史记录时按 (platform, component, version, step) 胜率重排
         2. 降级到传统 selector 字段
         
         Args:
             page: Playwright Page对象
             step: 步骤配置(包含 selector 或 selectors)
             timeout: 超时时间(毫秒)
+            component: 组件配置(用于胜出统计,可选)
             
         Returns:
             Locator: 成功匹配的定位器
@@ -3413,44 +3659,32 @@ class CollectionExecutorV2:
         if not selectors and legacy_selector:
             return page.locator(legacy_selector).first
         
-        # 按优先级排序
-        sorted_selectors = sorted(selectors, key=lambda x: x.get('priority', 99))
+        candidates = [sel for sel in self._order_selectors(selectors, step, component) if sel.get('value', '')]
         
         errors = []
-        for sel_config in sorted_selectors:
-            sel_type = sel_config.get('type', 'css')
-            sel_value = sel_config.get('value', '')
-            
-            if not sel_value:
-                continue
-            
-            try:
-                # 根据类型构建定位器
-                if sel_type == 'role':
-                    # 解析 role[name="xxx"] 格式
-                    if '[name=' in sel_value:
-                        role = sel_value.split('[')[0]
-                        name = sel_value.split('name="')[1].rstrip('"]')
-                        locator = page.get_by_role(role, name=name)
-                    else:
-                        locator = page.get_by_role(sel_value)
-                elif sel_type == 'text':
-                    locator = page.get_by_text(sel_value)
-                elif sel_type == 'css':
-                    locator = page.locator(sel_value)
-                elif sel_type == 'xpath':
-                    locator = page.locator(f'xpath={sel_value}')
-                else:
-                    locator = page.locator(sel_value)
-                
-                # 快速验证元素是否存在
-                await locator.first.wait_for(state='attached', timeout=1000)
-                logger.debug(f"Selector matched: {sel_type}={sel_value}")
-                return locator.first
-                
-            except Exception as e:
-                errors.append(f"{sel_type}={sel_value}: {str(e)[:50]}")
-                continue
+        race = step.get('selector_race', SELECTOR_RACE_ENABLED) and len(candidates) > 1
+        probe_timeout = min(timeout, SELECTOR_PROBE_TIMEOUT_MS)
+        if race:
+            matched = await self._race_selectors(page, candidates, probe_timeout, errors)
+            if matched is not None:
+                sel_config, locator = matched
+                logger.debug("Selector race won by: %s", self._selector_key(sel_config))
+                self._note_selector_win(component, step, sel_config)
+                return locator
+        else:
+            for sel_config in candidates:
+                try:
+                    locator = self._build_selector_locator(page, sel_config)
+                    
+                    # 快速验证元素是否存在
+                    await locator.first.wait_for(state='attached', timeout=probe_timeout)
+                    logger.debug("Selector matched: %s", self._selector_key(sel_config))
+                    self._note_selector_win(component, step, sel_config)
+                    return locator.first
+                    
+                except Exception as e:
+                    errors.append(f"{self._selector_key(sel_config)}: {str(e)[:50]}")
+                    continue
         
         # 所有 selectors 都失败,尝试 legacy selector
         if legacy_selector:
@@ -3495,14 +3729,14 @@ class CollectionExecutorV2:
         
         # 策略1: 快速检测(1秒)
         try:
-            logger.debug(f"Smart wait strategy 1: Quick check (1s) for {selector}")
+            logger.debug("Smart wait strategy 1: Quick check (1s) for %s", selector)
             await page.wait_for_selector(selector, state=state, timeout=1000)
-            logger.debug(f"Element found immediately: {selector}")
+            logger.debug("Element found immediately: %s", selector)
             return True
         except Exception:
             elapsed = int((asyncio.get_event_loop().time() - start_time) * 1000)
             remaining_timeout = max(0, max_timeout - elapsed)
-            logger.debug(f"Quick check failed, remaining timeout: {remaining_timeout}ms")
+            logger.debug("Quick check failed, remaining timeout: %sms", remaining_timeout)
         
         # 策略2: 关闭弹窗 + 重试(10秒)
         if remaining_timeout > 0:
@@ -3969,7 +4203,12 @@ class CollectionExecutorV2:
         """
         执行导出组件并等待文件下载。
         迁离 YAML：若组件含 _python_component_class 则通过 adapter.export 执行。
+        已从 HAR 学到导出请求模板时,优先直接调用导出接口(API 回放),失败再走 UI 流程。
         """
+        replayed_path = await self._try_api_replay_export(page, component, download_dir)
+        if replayed_path:
+            return replayed_path
+
         # Python 组件：通过 adapter.export 执行
         if component.get("_python_component_class"):
             params = component.get("_params", {})
@@ -4004,123 +4243,116 @@ class CollectionExecutorV2:
         if popup_handling.get('check_before_steps', True):
             await self.popup_handler.close_popups(page, platform=component.get('platform'))
         
-        for i, step in enumerate(steps):
-            action = step.get('action')
-            
-            # 步骤执行前检查弹窗
-            await step_popup_handler.before_step(page, step, component)
-            
-            try:
-                if action == 'wait_for_download':
-                    # 等待文件下载
-                    timeout = step.get('timeout', self.DEFAULT_DOWNLOAD_TIMEOUT * 1000)
-                    save_as = step.get('save_as')
-                    
-                    async with page.expect_download(timeout=timeout) as download_info:
-                        # 下载会在前面的点击操作触发
-                        pass
-                    
-                    download = await download_info.value
+        # 在执行步骤前挂上 download 事件与目录监听,点击先于 wait_for_download 触发的下载也不会丢
+        async with DownloadCapture(page, download_dir) as capture:
+            for i, step in enumerate(steps):
+                action = step.get('action')
+                
+                # 步骤执行前检查弹窗
+                await step_popup_handler.before_step(page, step, component)
+                
+                try:
+                    if action == 'wait_for_download':
+                        # 等待文件下载
+                        timeout = step.get('timeout', self.DEFAULT_DOWNLOAD_TIMEOUT * 1000)
+                        download_path = await capture.next_download(timeout / 1000, save_as=step.get('save_as'))
+                        logger.info(f"Downloaded file: {download_path}")
                     
-                    # 确定保存路径
-                    if save_as:
-                        file_path = download_dir / save_as
                     else:
-                        file_path = download_dir / download.suggested_filename
+                        # 执行普通步骤
+                        await self._execute_step(page, step, component)
+                
+                except Exception as e:
+                    # 错误时检查弹窗
+                    await step_popup_handler.on_error(page, step, component)
                     
-                    await download.save_as(str(file_path))
-                    download_path = str(file_path)
+                    # 检查是否是验证码
+                    if await self._check_verification(page):
+                        screenshot_path = await self._save_verification_screenshot(page, component.get('platform'))
+                        raise VerificationRequiredError('unknown', screenshot_path)
                     
-                    logger.info(f"Downloaded file: {download_path}")
+                    raise StepExecutionError(f"Export step {i} failed: {e}") from e
                 
-                else:
-                    # 执行普通步骤
-                    await self._execute_step(page, step, component)
+                # 步骤执行后检查弹窗
+                await step_popup_handler.after_step(page, step, component)
             
-            except Exception as e:
-                # 错误时检查弹窗
-                await step_popup_handler.on_error(page, step, component)
-                
-                # 检查是否是验证码
-                if await self._check_verification(page):
-                    screenshot_path = await self._save_verification_screenshot(page, component.get('platform'))
-                    raise VerificationRequiredError('unknown', screenshot_path)
-                
-                raise StepExecutionError(f"Export step {i} failed: {e}") from e
-            
-            # 步骤执行后检查弹窗
-            await step_popup_handler.after_step(page, step, component)
-        
-        # Phase 12.4: 如果没有 wait_for_download 步骤,自动扫描下载目录
-        if download_path is None:
-            logger.info("No wait_for_download step found, scanning download directory...")
-            download_path = await self._scan_latest_download(download_dir, timeout=30)
-            if download_path:
-                logger.info(f"Auto-detected downloaded file: {download_path}")
+            # Phase 12.4: 如果没有 wait_for_download 步骤,等待下载事件/目录新文件(兜底机制)
+            if download_path is None:
+                logger.info("No wait_for_download step found, waiting for download events...")
+                download_path = await capture.wait_for_file(timeout=self.AUTO_DOWNLOAD_WAIT_SECONDS)
+                if download_path:
+                    logger.info(f"Auto-detected downloaded file: {download_path}")
+                else:
+                    logger.warning(f"No new download detected within {self.AUTO_DOWNLOAD_WAIT_SECONDS} seconds")
         
         return download_path
     
-    async def _scan_latest_download(
-        self, 
-        download_dir: Path, 
-        timeout: int = 30,
-        file_extensions: tuple = ('.xlsx', '.xls', '.csv', '.xlsm')
+    async def _try_api_replay_export(
+        self,
+        page,
+        component: Dict[str, Any],
+        download_dir: Path,
     ) -> Optional[str]:
         """
-        扫描下载目录,查找最新下载的文件(兜底机制)
-        
-        Args:
-            download_dir: 下载目录
-            timeout: 超时时间(秒)
-            file_extensions: 允许的文件扩展名
-            
-        Returns:
-            Optional[str]: 最新文件的路径,如果未找到则返回None
+        API 回放:用当前已登录上下文的 cookie 直接请求学到的导出接口。
+
+        回放跳过了导出组件(切店铺/切粒度都在组件里),因此模板按账号/子域/粒度精确匹配,
+        请求里的店铺字段用任务店铺填充,无法确认店铺或粒度时拒绝回放。
+        无模板、缺少日期范围、响应未通过校验或出错时返回 None,由调用方回退到 UI 导出。
+        组件可通过 api_replay=False 单独关闭。
         """
-        import time
-        
-        start_time = time.time()
-        
-        # 记录执行前的文件列表
-        before_files = set()
-        for ext in file_extensions:
-            before_files.update(download_dir.glob(f"*{ext}"))
-        
-        logger.debug(f"Before files count: {len(before_files)}")
-        
-        # 等待一段时间让文件下载完成
-        await asyncio.sleep(2)
-        
-        # 轮询检查新文件
-        check_interval = 1  # 每秒检查一次
-        while time.time() - start_time < timeout:
-            current_files = set()
-            for ext in file_extensions:
-                current_files.update(download_dir.glob(f"*{ext}"))
-            
-            new_files = current_files - before_files
-            
-            if new_files:
-                # 过滤掉临时文件(.crdownload, .tmp等)
-                valid_files = [
-                    f for f in new_files 
-                    if not any(f.name.endswith(ext) for ext in ['.crdownload', '.tmp', '.part'])
-                ]
-                
-                if valid_files:
-                    # 找到最新的文件(按修改时间)
-                    latest_file = max(valid_files, key=lambda f: f.stat().st_mtime)
-                    
-                    # 检查文件是否完整(大小>0且不是临时文件)
-                    if latest_file.stat().st_size > 0:
-                        logger.info(f"Found new download: {latest_file.name} ({latest_file.stat().st_size} bytes)")
-                        return str(latest_file)
-            
-            await asyncio.sleep(check_interval)
-        
-        logger.warning(f"No new download detected within {timeout} seconds")
-        return None
-    
+        if not API_REPLAY_ENABLED or component.get("api_replay") is False:
+            return None
+        params = component.get("_params") or {}
+        task_params = params.get("params") if isinstance(params.get("params"), dict) else params
+        account = params.get("account") if isinstance(params.get("account"), dict) else {}
+        data_domain = task_params.get("data_domain") or component.get("data_domain")
+        date_from = task_params.get("date_from") or params.get("start_date")
+        date_to = task_params.get("date_to") or params.get("end_date")
+        granularity = task_params.get("granularity") or params.get("granularity")
+        account_id = params.get("shop_account_id") or account.get("shop_account_id") or account.get("account_id")
+        shop_id = str(
+            account.get("shop_id") or account.get("cnsc_shop_id") or account.get("platform_shop_id") or ""
+        ).strip()
+        if not (data_domain and date_from and date_to and account_id):
+            return None
+        template = load_export_template(
+            component.get("platform"),
+            data_domain,
+            task_params.get("sub_domain"),
+            account_id=account_id,
+            granularity=granularity,
+        )
+        if template is None:
+            return None
+        play_context = getattr(page, "context", None)
+        if play_context is None or getattr(play_context, "request", None) is None:
+            return None
+
+        label = f"{template.platform}/{template.data_domain}"
+        try:
+            file_path = await replay_export(
+                play_context,
+                template,
+                date_from=date_from,
+                date_to=date_to,
+                download_dir=download_dir,
+                shop_id=shop_id or None,
+                granularity=granularity,
+                timeout_ms=self.DEFAULT_DOWNLOAD_TIMEOUT * 1000,
+            )
+        except ReplayScopeError as e:
+            logger.warning(f"[ApiReplay] {label} scope not confirmed, falling back to UI export: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"[ApiReplay] {label} replay failed, falling back to UI export: {e}")
+            return None
+        if file_path:
+            logger.info(f"[ApiReplay] {label} exported via API: {file_path}")
+        else:
+            logger.info(f"[ApiReplay] {label} response did not validate, falling back to UI export")
+        return file_path
+
     async def _check_verification(self, page) -> bool:
         """
         检查是否出现验证码
@@ -4462,8 +4694,19 @@ class CollectionExecutorV2:
                         target_path = target_dir / f"{base_name}_{counter}{target_path.suffix}"
                         counter += 1
                 
-                # 3. 移动文件
-                shutil.move(str(source_path), str(target_path))
+                # 3. 移动文件(同一遍读取内完成哈希,注册时复用,不再重读文件)
+                landed = land_file(
+                    source_path,
+                    target_path,
+                    identities=[
+                        (shop_id or "none", candidate_platform)
+                        for candidate_platform in (
+                            semantic_result.normalized_platform,
+                            landing_semantics["business_platform"],
+                        )
+                        if candidate_platform
+                    ],
+                )
                 summary["raw_promoted_count"] += 1
                 logger.info(f"[OK] File moved: {source_path.name} -> {target_path}")
                 
@@ -4493,7 +4736,8 @@ class CollectionExecutorV2:
                         "store_name": file_store_name,
                         "platform_shop_id": platform_shop_id,
                         "original_path": str(source_path),
-                        "collected_at": datetime.now().isoformat()
+                        "collected_at": datetime.now().isoformat(),
+                        "landing_hash": landed.to_meta(),
                     }
                     
                     meta_path = MetadataManager.create_meta_file(
@@ -4670,7 +4914,7 @@ class CollectionExecutorV2:
             "progress": progress,
             "current_domain": current_domain,
         }
-        logger.debug(f"Task {task_id}: {progress}% - {message}")
+        logger.debug("Task %s: %s%% - %s", task_id, progress, message)
         if self.status_callback:
             try:
                 if details is not None:
@@ -4856,6 +5100,19 @@ class CollectionExecutorV2:
         failed: bool = False,
         scope: str = "runtime",
     ) -> None:
+        network_stats = get_network_stats(play_context)
+        if network_stats is not None and network_stats.blocked_requests:
+            summary = network_stats.summary()
+            await self._emit_browser_diagnostic(
+                task_id,
+                f"网络策略拦截 {summary['blocked_requests']} 个请求,预计节省 "
+                f"{summary['estimated_bytes_saved'] / 1024 / 1024:.1f} MB / {summary['estimated_seconds_saved']} 秒",
+                details={
+                    "diagnostic_event": "network_policy_summary",
+                    "scope": scope,
+                    **summary,
+                },
+            )
         if diagnostics is None or diagnostics.trace_path is None:
             return
         tracing = getattr(play_context, "tracing", None)
@@ -5237,6 +5494,7 @@ class CollectionExecutorV2:
 
         semaphore = asyncio.Semaphore(max(1, int(max_parallel or 1)))
         total_domains = len(data_domains)
+        browser_headless = bool(self._build_runtime_launch_kwargs(debug_mode=debug_mode).get("headless", True))
 
         async def _run_domain(domain: str, domain_index: int):
             await self._check_cancelled(task_id)
@@ -5258,6 +5516,7 @@ class CollectionExecutorV2:
                         total_domains=total_domains,
                         context_options=domain_context_options,
                         runtime_manifests=runtime_manifests,
+                        headless=browser_headless,
                     )
                     return domain, file_path, ok, None
                 except Exception as e:
@@ -5351,6 +5610,8 @@ class CollectionExecutorV2:
         total_domains: int,
         context_options: Optional[Dict[str, Any]] = None,
         runtime_manifests: Optional[Dict[str, Any]] = None,
+        *,
+        headless: bool,
     ) -> tuple:
         """
         [*] Phase 9.1: 在独立浏览器上下文中执行单个数据域采集(带指纹与会话)
@@ -5368,6 +5629,7 @@ class CollectionExecutorV2:
         try:
             domain_context = await browser.new_context(**opts)
             await runtime_session.apply_stealth_init_scripts(domain_context)
+            await apply_network_policy(domain_context, platform, headless=headless)
             domain_page = await domain_context.new_page()
             diagnostics_session = await self._start_browser_diagnostics(
                 task_id=task_id,
@@ -1364,6 +1364,42 @@ with sync_playwright() as playwright:
         )
         print(f"[FILES] HAR 已保存: {har_path}")
 
+        # 从 HAR 中学习导出请求模板,供执行器 API 回放模式直接调用导出接口
+        try:
+            from modules.apps.collection_center.api_replay import (
+                ReplayScopeError,
+                learn_export_template,
+                save_export_template,
+            )
+
+            # 回放模板按账号/子类型/粒度精确匹配,需与录制时页面上选择的一致
+            sub_domain = None
+            if dt_key == "services":
+                sub_choice = input("本次录制的服务子类型 (1=agent, 2=ai_assistant, 回车=不区分): ").strip()
+                sub_domain = {"1": "agent", "2": "ai_assistant"}.get(sub_choice)
+            gran_choice = input("本次录制导出的时间粒度 (1=daily, 2=weekly, 3=monthly, 回车=daily): ").strip()
+            granularity = {"2": "weekly", "3": "monthly"}.get(gran_choice, "daily")
+            template = learn_export_template(
+                har_path,
+                platform=plat,
+                data_domain=dt_key,
+                sub_domain=sub_domain,
+                account_id=account.get('shop_account_id') or account.get('account_id'),
+                shop_id=account.get('shop_id') or account.get('cnsc_shop_id') or account.get('platform_shop_id'),
+                granularity=granularity,
+            )
+            if template is not None and not any(item.role == "shop" for item in template.scope_fields) and not template.shop_id:
+                print("[WARN] 导出请求中未识别到店铺字段且账号缺少店铺ID,回放时将拒绝并回退到 UI 导出")
+            if template is not None:
+                template_path = save_export_template(template)
+                print(f"[OK] 已学习导出接口模板: {template.method} {template.url} -> {template_path}")
+            else:
+                print("[TIP] HAR 中未发现文件下载响应,该数据域继续使用 UI 导出流程")
+        except ReplayScopeError as e:
+            print(f"[TIP] 导出请求中未识别到日期范围字段,不学习回放模板,继续使用 UI 导出流程: {e}")
+        except Exception as e:
+            print(f"[WARN] 学习导出接口模板失败: {e}")
+
     def _execute_complete_recording(self, page, account: Dict, platform: str, login_url: str):
         """执行完整流程录制"""
         print("[RETRY] 开始完整流程录制(登录 + 数据采集)...")
@@ -0,0 +1,227 @@
+"""Per-platform network policy for collection browser contexts.
+
+Export components only need the seller-center DOM and its export APIs, so a
+context routed through ``apply_network_policy`` aborts images, media, fonts and
+known analytics/tracking hosts.  Login and verification stay intact: hosts and
+URLs that look like captcha/verification endpoints are always allowed.  Each
+context keeps a ``NetworkPolicyStats`` counter that browser diagnostics report
+at the end of the run (``COLLECTION_NETWORK_POLICY=0`` turns routing off).
+"""
+
+from __future__ import annotations
+
+import os
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from urllib.parse import urlsplit
+
+from modules.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+NETWORK_POLICY_ENABLED = os.getenv("COLLECTION_NETWORK_POLICY", "1").strip().lower() not in {"0", "false", "no"}
+# 估算节省时间时假定的代理/链路吞吐(KB/s)
+ASSUMED_THROUGHPUT_KBPS = max(1, int(os.getenv("COLLECTION_NETWORK_ASSUMED_KBPS", "2048")))
+
+BLOCKED_RESOURCE_TYPES: FrozenSet[str] = frozenset({"image", "media", "font"})
+
+TRACKING_HOSTS: Tuple[str, ...] = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "connect.facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "bat.bing.com",
+    "mixpanel.com",
+    "segment.io",
+    "sentry.io",
+)
+
+# 登录/验证码相关: 命中即放行,避免打断滑块/图形验证码与人工验证截图
+VERIFICATION_MARKERS: Tuple[str, ...] = ("captcha", "verify", "verification", "geetest")
+
+# allowed_hosts: 登录页/验证码使用的 CDN,其域名与路径不含上面的验证码标记,按域名整体放行
+PLATFORM_POLICY_OVERRIDES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "shopee": {
+        "allowed_hosts": ("accounts.shopee.cn", "deo.shopeemobile.com"),
+    },
+    "tiktok": {
+        "blocked_hosts": ("analytics.tiktok.com", "mon-va.byteoversea.com", "mcs-va.tiktokv.com"),
+        "allowed_hosts": (
+            "p16-security-sg.ibyteimg.com",
+            "p16-security-va.ibyteimg.com",
+            "p19-security-va.ibyteimg.com",
+            "sf16-website-login.neutral.ttwstatic.com",
+        ),
+    },
+    "miaoshou": {
+        "blocked_hosts": ("hm.baidu.com", "cnzz.com"),
+        # 阿里云滑块验证(nc.js)的脚本与图标字体
+        "allowed_hosts": ("g.alicdn.com", "at.alicdn.com"),
+    },
+}
+
+# 被拦截资源的平均体积估算(字节),仅用于诊断中的节省量展示
+ESTIMATED_RESOURCE_BYTES: Dict[str, int] = {
+    "image": 40 * 1024,
+    "media": 512 * 1024,
+    "font": 64 * 1024,
+    "tracking": 24 * 1024,
+}
+
+
+def _host_matches(host: str, patterns: Tuple[str, ...]) -> bool:
+    return any(host == pattern or host.endswith("." + pattern) for pattern in patterns)
+
+
+@dataclass(frozen=True)
+class NetworkPolicy:
+    platform: str
+    blocked_resource_types: FrozenSet[str] = BLOCKED_RESOURCE_TYPES
+    blocked_hosts: Tuple[str, ...] = TRACKING_HOSTS
+    allowed_hosts: Tuple[str, ...] = ()
+
+    def classify(self, url: str, resource_type: str) -> Optional[str]:
+        """Return the block reason for a request, or None when it should go through."""
+        parts = urlsplit(str(url or ""))
+        if parts.scheme not in {"http", "https"}:
+            return None
+        host = (parts.hostname or "").lower()
+        if _host_matches(host, self.allowed_hosts):
+            return None
+        lowered = f"{host}{parts.path}".lower()
+        if any(marker in lowered for marker in VERIFICATION_MARKERS):
+            return None
+        if _host_matches(host, self.blocked_hosts):
+            return "tracking"
+        if resource_type in self.blocked_resource_types:
+            return resource_type
+        return None
+
+
+@dataclass
+class NetworkPolicyStats:
+    platform: str
+    allowed_requests: int = 0
+    blocked_requests: int = 0
+    blocked_by_reason: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, reason: Optional[str]) -> None:
+        if reason is None:
+            self.allowed_requests += 1
+            return
+        self.blocked_requests += 1
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+
+    @property
+    def estimated_bytes_saved(self) -> int:
+        return sum(ESTIMATED_RESOURCE_BYTES.get(reason, 0) * count for reason, count in self.blocked_by_reason.items())
+
+    def summary(self) -> Dict[str, Any]:
+        bytes_saved = self.estimated_bytes_saved
+        return {
+            "platform": self.platform,
+            "allowed_requests": self.allowed_requests,
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "estimated_bytes_saved": bytes_saved,
+            "estimated_seconds_saved": round(bytes_saved / 1024 / ASSUMED_THROUGHPUT_KBPS, 2),
+        }
+
+
+_context_stats: "weakref.WeakKeyDictionary[Any, NetworkPolicyStats]" = weakref.WeakKeyDictionary()
+
+
+def get_network_policy(platform: str) -> NetworkPolicy:
+    normalized = str(platform or "").strip().lower()
+    override = PLATFORM_POLICY_OVERRIDES.get(normalized, {})
+    return NetworkPolicy(
+        platform=normalized,
+        blocked_hosts=TRACKING_HOSTS + override.get("blocked_hosts", ()),
+        allowed_hosts=override.get("allowed_hosts", ()),
+    )
+
+
+def get_network_stats(context: Any) -> Optional[NetworkPolicyStats]:
+    try:
+        return _context_stats.get(context)
+    except TypeError:
+        return None
+
+
+def _register_stats(context: Any, platform: str) -> Optional[NetworkPolicyStats]:
+    stats = NetworkPolicyStats(platform=str(platform or "").strip().lower())
+    try:
+        _context_stats[context] = stats
+    except TypeError:
+        return None
+    return stats
+
+
+async def apply_network_policy(context: Any, platform: str, *, headless: bool) -> Optional[NetworkPolicyStats]:
+    """
+    Route every request of ``context`` through the platform policy.
+
+    ``headless`` is the real launch mode of the browser that owns ``context``;
+    there is no default so every caller has to pass it.  Headed contexts are
+    left untouched: someone may be solving a verification in that window and
+    needs the page rendered in full.
+    """
+    if not NETWORK_POLICY_ENABLED or not headless or get_network_stats(context) is not None:
+        return None
+    route = getattr(context, "route", None)
+    if route is None:
+        return None
+    policy = get_network_policy(platform)
+    stats = _register_stats(context, platform)
+    if stats is None:
+        return None
+
+    async def _handle(route_obj, request) -> None:
+        reason = policy.classify(request.url, request.resource_type)
+        stats.record(reason)
+        if reason is None:
+            # 用 fallback 而非 continue_,让其它已注册的路由仍有机会处理该请求
+            await route_obj.fallback()
+        else:
+            await route_obj.abort("blockedbyclient")
+
+    try:
+        await route("**/*", _handle)
+    except Exception as e:
+        logger.debug(f"[NetworkPolicy] route registration failed for {platform}: {e}")
+        _context_stats.pop(context, None)
+        return None
+    return stats
+
+
+def apply_network_policy_sync(context: Any, platform: str, *, headless: bool) -> Optional[NetworkPolicyStats]:
+    """Sync-API variant of ``apply_network_policy`` for playwright.sync_api contexts."""
+    if not NETWORK_POLICY_ENABLED or not headless or get_network_stats(context) is not None:
+        return None
+    route = getattr(context, "route", None)
+    if route is None:
+        return None
+    policy = get_network_policy(platform)
+    stats = _register_stats(context, platform)
+    if stats is None:
+        return None
+
+    def _handle(route_obj, request) -> None:
+        reason = policy.classify(request.url, request.resource_type)
+        stats.record(reason)
+        if reason is None:
+            route_obj.fallback()
+        else:
+            route_obj.abort("blockedbyclient")
+
+    try:
+        route("**/*", _handle)
+    except Exception as e:
+        logger.debug(f"[NetworkPolicy] route registration failed for {platform}: {e}")
+        _context_stats.pop(context, None)
+        return None
+    return stats
@@ -14,6 +14,7 @@ from modules.apps.collection_center.browser_config_helper import (
     enforce_official_playwright_browser,
     get_browser_context_args,
 )
+from modules.apps.collection_center.network_policy import apply_network_policy
 from modules.apps.collection_center.transition_gates import (
     GateResult,
     GateStatus,
@@ -760,6 +761,7 @@ async def open_persistent_runtime_bundle(
         **launch_options,
         **context_options,
     )
+    await apply_network_policy(context, platform, headless=bool(launch_options.get("headless", True)))
     page_urls = list_context_page_urls(context)
     if getattr(context, "pages", None):
         page = context.pages[0]
@@ -817,6 +819,7 @@ async def open_storage_state_runtime_bundle(
         headless=headless,
     )
     context = await browser.new_context(**context_options)
+    await apply_network_policy(context, platform, headless=headless)
     page = await context.new_page()
     return RuntimeContextBundle(
         mode="storage_state_fanout",
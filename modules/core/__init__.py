@@ -25,24 +25,24 @@ from .secrets_manager import (
     get_database_path,
     get_encryption_key
 )
-from .config_validator import (
-    ConfigValidator,
-    ConfigValidationError,
-    validate_configs,
-    validate_configs_strict
-)
-from .migration_manager import (
-    MigrationManager,
-    MigrationError,
-    get_migration_manager,
-    auto_migrate,
-    check_migration_status
-)
-from .data_quality import (
-    DataQualityScorer,
-    score_dataframe,
-    validate_schema
-)
+
+# 以下子模块依赖 pydantic schema / alembic / pandas,首次访问时才导入(见 __getattr__),
+# 避免 worker 与脚本仅为 get_logger / 路径工具就加载这些重依赖
+_LAZY_EXPORTS = {
+    "ConfigValidator": ".config_validator",
+    "ConfigValidationError": ".config_validator",
+    "validate_configs": ".config_validator",
+    "validate_configs_strict": ".config_validator",
+    "MigrationManager": ".migration_manager",
+    "MigrationError": ".migration_manager",
+    "get_migration_manager": ".migration_manager",
+    "auto_migrate": ".migration_manager",
+    "check_migration_status": ".migration_manager",
+    "DataQualityScorer": ".data_quality",
+    "score_dataframe": ".data_quality",
+    "validate_schema": ".data_quality",
+}
+
 from .file_naming import (
     StandardFileName,
     generate_filename,
@@ -110,4 +110,15 @@ __all__ = [
     "get_media_dir",
     "get_path",
     "reset_cache"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_path = _LAZY_EXPORTS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module_path, __name__), name)
+    globals()[name] = value
+    return value
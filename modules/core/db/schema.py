@@ -80,6 +80,7 @@ from .schema_parts.collection import (
     CloudSyncReceiveLog,
     RefreshQueueTask,
     ComponentVersion,
+    ComponentSelectorStat,
     ComponentTestHistory,
 )
 from .schema_parts.platform import (
@@ -258,6 +259,7 @@ _COLLECTION_EXPORTS = (
     "CloudSyncReceiveLog",
     "RefreshQueueTask",
     "ComponentVersion",
+    "ComponentSelectorStat",
     "ComponentTestHistory",
 )
 _PLATFORM_EXPORTS = (
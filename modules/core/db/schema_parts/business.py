@@ -17,6 +17,7 @@ from sqlalchemy import (
     Integer,
     JSON,
     Numeric,
+    Sequence,
     String,
     Table,
     Text,
@@ -1558,10 +1559,16 @@ class ShopHealthScore(Base):
     inventory_turnover = Column(Float, nullable=False, default=0.0, comment="库存周转率")
     customer_satisfaction = Column(Float, nullable=False, default=0.0, comment="客户满意度(0-5分)")
     
+    order_count = Column(Integer, nullable=False, default=0, server_default="0", comment="订单数")
+    
     # 风险等级
     risk_level = Column(String(16), nullable=False, default="low", comment="风险等级:low/medium/high")
     risk_factors = Column(JSON, nullable=True, comment="风险因素列表")
     
+    # 增量计算版本:输入指纹不变则不重算;每次重算写入版本号 +1
+    input_hash = Column(String(64), nullable=True, comment="输入指标指纹(SHA-256)")
+    score_version = Column(Integer, nullable=False, default=1, server_default="1", comment="评分版本号")
+    
     # 审计字段
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -1579,6 +1586,7 @@ class ShopHealthScore(Base):
         Index("ix_shop_health_date", "metric_date"),
         Index("ix_shop_health_score", "health_score"),
         Index("ix_shop_health_risk", "risk_level"),
+        Index("ix_shop_health_rank", "granularity", "metric_date", "health_score"),
         {"schema": "c_class"},
     )
 
@@ -2908,7 +2916,13 @@ class Notification(Base):
     """
     __tablename__ = "notifications"
     
-    notification_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # ID 由序列分配(并发写入无需 max()+1);SQLite 下退化为 INTEGER rowid 自增
+    notification_id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        Sequence("notifications_notification_id_seq"),
+        primary_key=True,
+        autoincrement=True,
+    )
     recipient_id = Column(
         BigInteger,
         ForeignKey('core.dim_users.user_id', ondelete='CASCADE'),
@@ -876,6 +876,10 @@ class CloudSyncReceiveLog(Base):
     business_date_max = Column(Date, nullable=True)
     source_latest_ingest_timestamp = Column(DateTime(timezone=True), nullable=True)
     written_rows = Column(Integer, nullable=False, default=0)
+    payload_bytes = Column(BigInteger, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    rows_per_second = Column(Float, nullable=True)
+    bytes_per_second = Column(Float, nullable=True)
     status = Column(String(32), nullable=False, default="completed")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     error_message = Column(Text, nullable=True)
@@ -974,6 +978,40 @@ class ComponentVersion(Base):
         {"schema": "core"},
     )
 
+class ComponentSelectorStat(Base):
+    """
+    组件步骤选择器胜出统计表
+
+    记录多选择器步骤中每个候选选择器的胜出次数,
+    执行器据此按历史胜率重排候选(与 component_versions 使用统计并列)
+    """
+    __tablename__ = "component_selector_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # 步骤标识
+    platform = Column(String(50), nullable=False, default="", comment="平台代码: shopee")
+    component_name = Column(String(100), nullable=False, comment="组件名称: shopee/login")
+    version = Column(String(20), nullable=False, default="", comment="组件版本号(无版本时为空串)")
+    step_key = Column(String(200), nullable=False, comment="步骤标识(id/name 或 action+候选选择器)")
+    selector_key = Column(String(500), nullable=False, comment="选择器标识: type=value")
+
+    # 统计信息
+    win_count = Column(Integer, nullable=False, default=0, comment="胜出次数")
+    last_won_at = Column(DateTime(timezone=True), nullable=True, comment="最近一次胜出时间")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "platform", "component_name", "version", "step_key", "selector_key",
+            name="uq_component_selector_stat",
+        ),
+        Index("ix_component_selector_stats_component", "platform", "component_name", "version"),
+        {"schema": "core"},
+    )
+
 class ComponentTestHistory(Base):
     """
     组件测试历史记录表 (Phase 8.2 - 2025-12-17)
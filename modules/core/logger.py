@@ -1,12 +1,32 @@
 """
 统一日志管理模块。
+
+队列模式(LOG_QUEUE_MODE=1,生产环境默认开启)下,调用线程只做消息插值并把 LogRecord
+放进有界队列,控制台/文件格式化与写入都在后台线程完成;队列满时丢弃并计数,不会阻塞事件循环。
 """
 
+import atexit
+import copy
+import itertools
 import logging
 import os
+import queue
 import sys
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Dict, List, Optional
+
+LOG_QUEUE_MAXSIZE = max(1, int(os.getenv("LOG_QUEUE_MAXSIZE", "10000")))
+LOG_DEBUG_SAMPLE_EVERY = max(1, int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "100")))
+
+
+def _queue_mode_enabled() -> bool:
+    raw_value = os.getenv("LOG_QUEUE_MODE", "").strip().lower()
+    if raw_value:
+        return raw_value not in ("0", "false", "off", "no")
+    return os.getenv("ENVIRONMENT", "").strip().lower() == "production"
 
 
 class ColoredFormatter(logging.Formatter):
@@ -71,13 +91,167 @@ class ColoredFormatter(logging.Formatter):
         return formatted_message
 
 
+class BoundedQueueHandler(QueueHandler):
+    """把日志记录放入有界队列;队列满时丢弃并计数,调用方永不阻塞。"""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 与标准库 QueueHandler 一致:在调用线程把消息与异常文本合并进 msg,清空 args/exc_info。
+        # args 可能是调用方随后会修改的可变对象,异常的 traceback 也不应跨线程持有。
+        message = self.format(record)
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Handler.handle 已持有 self.lock,计数无需额外加锁
+            self.dropped += 1
+
+
+class _LoggerRouter(logging.Handler):
+    """后台线程中按 logger 名称把记录分发给该 logger 自己的控制台/文件 handler。"""
+
+    def __init__(self, queue_handler: BoundedQueueHandler):
+        super().__init__(logging.NOTSET)
+        self.queue_handler = queue_handler
+        self.reported_dropped = 0
+        self._handlers: Dict[str, List[logging.Handler]] = {}
+        self._resolved: Dict[str, List[logging.Handler]] = {}
+
+    def register(self, name: str, handlers: List[logging.Handler]) -> None:
+        self._handlers[name] = handlers
+        self._resolved = {}
+
+    def handlers_for(self, name: str) -> List[logging.Handler]:
+        """子 logger(如 a.b.c)的记录经 propagate 到达时,交给最近的已注册祖先处理。"""
+        resolved = self._resolved
+        handlers = resolved.get(name)
+        if handlers is None:
+            handlers = []
+            candidate = name
+            while candidate:
+                if candidate in self._handlers:
+                    handlers = self._handlers[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            resolved[name] = handlers
+        return handlers
+
+    def _dispatch(self, record: logging.LogRecord) -> None:
+        for handler in self.handlers_for(record.name):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        dropped = self.queue_handler.dropped
+        if dropped > self.reported_dropped:
+            notice = logging.LogRecord(
+                record.name,
+                logging.WARNING,
+                __file__,
+                0,
+                "[Logging] 日志队列已满,已丢弃 %s 条记录(累计 %s 条)",
+                (dropped - self.reported_dropped, dropped),
+                None,
+            )
+            self.reported_dropped = dropped
+            self._dispatch(notice)
+        self._dispatch(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+
+
+class _BlockingSentinelListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # 队列满时 put_nowait 会失败;后台线程仍在消费,阻塞等待即可
+        self.queue.put(self._sentinel)
+
+
+class SampledLogger:
+    """
+    高频 debug 调用点的采样包装。
+
+    每 ``every`` 次调用只真正记录一次;DEBUG 未启用或未命中采样时直接返回,
+    不构造 LogRecord、不做任何格式化。调用方应使用 % 风格参数而非 f-string。
+    """
+
+    def __init__(self, logger: logging.Logger, every: int):
+        self.logger = logger
+        self.every = max(1, int(every))
+        self._counter = itertools.count()
+
+    def debug(self, msg: str, *args) -> None:
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if next(self._counter) % self.every:
+            return
+        self.logger.debug(msg, *args, extra={"sample_every": self.every}, stacklevel=2)
+
+
 class ERPLogger:
     """ERP 系统日志管理器。"""
 
     def __init__(self):
         self.loggers = {}
+        self.samplers: Dict[str, SampledLogger] = {}
         self.log_dir = Path("temp/logs")
         self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.queue_mode = _queue_mode_enabled()
+        self._queue_handler: Optional[BoundedQueueHandler] = None
+        self._router: Optional[_LoggerRouter] = None
+        self._listener: Optional[QueueListener] = None
+        self._queue_lock = threading.Lock()
+
+    def _ensure_queue(self) -> BoundedQueueHandler:
+        with self._queue_lock:
+            if self._queue_handler is None:
+                self._queue_handler = BoundedQueueHandler(queue.Queue(maxsize=LOG_QUEUE_MAXSIZE))
+                self._router = _LoggerRouter(self._queue_handler)
+                self._start_listener()
+                atexit.register(self.stop_queue)
+                if hasattr(os, "register_at_fork"):
+                    os.register_at_fork(after_in_child=self._restart_after_fork)
+            return self._queue_handler
+
+    def _start_listener(self) -> None:
+        self._listener = _BlockingSentinelListener(self._queue_handler.queue, self._router)
+        self._listener.start()
+
+    def _restart_after_fork(self) -> None:
+        # 子进程(如 Celery prefork)不会继承后台线程,队列锁也可能处于不一致状态,整体重建
+        if self._queue_handler is None:
+            return
+        self._queue_lock = threading.Lock()
+        self._queue_handler.queue = queue.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+        self._start_listener()
+
+    def flush_queue(self) -> None:
+        """等待队列中已有记录全部写出(仅队列模式有效)。"""
+        listener = self._listener
+        if listener is not None and getattr(listener, "_thread", None) is not None:
+            listener.queue.join()
+
+    def stop_queue(self) -> None:
+        listener = self._listener
+        if listener is not None and getattr(listener, "_thread", None) is not None:
+            listener.stop()
+
+    @property
+    def dropped_records(self) -> int:
+        return self._queue_handler.dropped if self._queue_handler is not None else 0
 
     def get_logger(self, name: str, level: str = "INFO") -> logging.Logger:
         if name in self.loggers:
@@ -90,7 +264,6 @@ class ERPLogger:
             console_handler = logging.StreamHandler(sys.stdout)
             console_handler.setLevel(logging.DEBUG)
             console_handler.setFormatter(ColoredFormatter())
-            logger.addHandler(console_handler)
 
             log_file = self.log_dir / f"{name.replace('.', '_')}.log"
             file_handler = logging.FileHandler(log_file, encoding="utf-8")
@@ -98,12 +271,26 @@ class ERPLogger:
             file_handler.setFormatter(
                 logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
             )
-            logger.addHandler(file_handler)
+
+            if self.queue_mode:
+                queue_handler = self._ensure_queue()
+                self._router.register(name, [console_handler, file_handler])
+                logger.addHandler(queue_handler)
+            else:
+                logger.addHandler(console_handler)
+                logger.addHandler(file_handler)
 
         logger.propagate = False
         self.loggers[name] = logger
         return logger
 
+    def get_sampled_logger(self, name: str, every: Optional[int] = None) -> SampledLogger:
+        sampler = self.samplers.get(name)
+        if sampler is None:
+            sampler = SampledLogger(self.get_logger(name), every or LOG_DEBUG_SAMPLE_EVERY)
+            self.samplers[name] = sampler
+        return sampler
+
     def set_level(self, name: str, level: str):
         if name in self.loggers:
             self.loggers[name].setLevel(getattr(logging, level.upper()))
@@ -128,6 +315,15 @@ def get_logger(name: str, level: str = "INFO") -> logging.Logger:
     return _logger_manager.get_logger(name, level)
 
 
+def get_sampled_logger(name: str, every: Optional[int] = None) -> SampledLogger:
+    """按 logger 名称共享的 debug 采样器,用于逐行/逐元素的热循环。"""
+    return _logger_manager.get_sampled_logger(name, every)
+
+
+def flush_logs() -> None:
+    _logger_manager.flush_queue()
+
+
 def set_log_level(name: str, level: str):
     _logger_manager.set_level(name, level)
 
@@ -0,0 +1,3 @@
+from modules.components.login.base import LoginResult
+async def run(page):
+    return LoginResult(success=True, message='ok')
@@ -161,14 +161,9 @@ def _compute_sha256(file_path: Path, block_size: int = 1024 * 1024, shop_id: str
     Returns:
         SHA256哈希值(hex字符串)
     """
-    h = hashlib.sha256()
-    
     # [*] v4.17.3修复:先加入shop_id和platform_code(如果存在)
     # 这样可以区分不同店铺/平台的相同内容文件
-    if shop_id:
-        h.update(f"shop_id:{shop_id}".encode('utf-8'))
-    if platform_code:
-        h.update(f"platform:{platform_code}".encode('utf-8'))
+    h = hashlib.sha256(catalog_hash_prefix(shop_id, platform_code))
     
     # 再加入文件内容
     with open(file_path, "rb") as f:
@@ -181,6 +176,47 @@ def _compute_sha256(file_path: Path, block_size: int = 1024 * 1024, shop_id: str
     return h.hexdigest()
 
 
+def catalog_hash_prefix(shop_id: Optional[str] = None, platform_code: Optional[str] = None) -> bytes:
+    """catalog_files.file_hash 在文件内容之前混入的店铺/平台前缀。"""
+    prefix = b""
+    if shop_id:
+        prefix += f"shop_id:{shop_id}".encode('utf-8')
+    if platform_code:
+        prefix += f"platform:{platform_code}".encode('utf-8')
+    return prefix
+
+
+def catalog_hash_key(shop_id: Optional[str], platform_code: Optional[str]) -> str:
+    """落盘哈希提示(.meta.json collection_info.landing_hash)中按身份索引的键。"""
+    return f"{shop_id or ''}|{platform_code or ''}"
+
+
+def _landing_hash_hint(
+    file_path: Path,
+    collection_info: Optional[dict],
+    shop_id: Optional[str],
+    platform_code: Optional[str],
+) -> Optional[str]:
+    """
+    复用采集落盘时边拷贝边计算的哈希,避免注册时再读一遍文件。
+
+    仅当文件大小与 mtime 与落盘时记录一致、且身份(shop_id, platform_code)命中时返回。
+    """
+    hint = (collection_info or {}).get('landing_hash')
+    if not isinstance(hint, dict):
+        return None
+    try:
+        stat = file_path.stat()
+        if int(hint.get('size', -1)) != stat.st_size or int(hint.get('mtime_ns', -1)) != stat.st_mtime_ns:
+            return None
+    except (OSError, TypeError, ValueError):
+        return None
+    catalog_hashes = hint.get('catalog_hashes') or {}
+    if not isinstance(catalog_hashes, dict):
+        return None
+    return catalog_hashes.get(catalog_hash_key(shop_id, platform_code)) or None
+
+
 def _sha256(file_path: Path) -> str:
     """兼容测试与旧调用方的 SHA256 助手。"""
     return _compute_sha256(Path(file_path))
@@ -1077,7 +1113,13 @@ def register_single_file(file_path: str) -> Optional[int]:
         
         # 5. [*] v4.17.3修复:计算文件哈希(包含shop_id和platform_code)
         # 这样可以区分不同店铺/平台的相同内容文件
-        file_hash = _compute_sha256(
+        # 采集器落盘时已边拷贝边计算过哈希(.meta.json landing_hash),命中则不再重读文件
+        file_hash = _landing_hash_hint(
+            file_path_obj,
+            collection_info,
+            shop_id=initial_shop_id,
+            platform_code=norm_platform,
+        ) or _compute_sha256(
             file_path_obj,
             shop_id=initial_shop_id,
             platform_code=norm_platform
@@ -22,6 +22,7 @@ import json
 import os
 from time import sleep
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, select, text
 from sqlalchemy.engine import Engine
@@ -581,44 +582,216 @@ def _merge_product_metric_row(
             parent_platform_sku=parent_platform_sku,
             source_catalog_id=source_catalog_id,
         )
-        # apply updates
-        for k, v in (updates or {}).items():
-            try:
-                if v is not None and hasattr(obj, k):
-                    setattr(obj, k, v)
-            except Exception:
-                pass
-        if currency is not None:
-            obj.currency = currency
+        _apply_product_metric_updates(obj, updates=updates, currency=currency)
         session.add(obj)
     else:
-        # update in place
-        if parent_platform_sku and not existing.parent_platform_sku:
-            existing.parent_platform_sku = parent_platform_sku
-        if source_catalog_id and not existing.source_catalog_id:
-            existing.source_catalog_id = source_catalog_id
-        if currency is not None:
-            existing.currency = currency
-        for k, v in (updates or {}).items():
-            try:
-                if v is not None and hasattr(existing, k):
-                    setattr(existing, k, v)
-            except Exception:
-                pass
+        _apply_product_metric_updates(
+            existing,
+            parent_platform_sku=parent_platform_sku,
+            source_catalog_id=source_catalog_id,
+            updates=updates,
+            currency=currency,
+        )
+
+
+def _apply_product_metric_updates(
+    obj: FactProductMetric,
+    *,
+    parent_platform_sku: Optional[str] = None,
+    source_catalog_id: Optional[int] = None,
+    updates: Dict[str, Optional[float]] | None = None,
+    currency: Optional[str] = None,
+) -> None:
+    """Merge one update into a metric row: lineage fills blanks, non-None values overwrite."""
+    if parent_platform_sku and not obj.parent_platform_sku:
+        obj.parent_platform_sku = parent_platform_sku
+    if source_catalog_id and not obj.source_catalog_id:
+        obj.source_catalog_id = source_catalog_id
+    if currency is not None:
+        obj.currency = currency
+    for k, v in (updates or {}).items():
+        try:
+            if v is not None and hasattr(obj, k):
+                setattr(obj, k, v)
+        except Exception:
+            pass
+
+
+_BULK_KEY_CHUNK = 1000
+
+MetricKey = Tuple[str, str, str, date, str, str]
+
+
+def _ensure_products_bulk(
+    session: Session,
+    platform_code: str,
+    shop_id: str,
+    products: List[Tuple[str, Optional[str], Optional[str]]],
+) -> None:
+    """Bulk variant of `_ensure_product` for ``(sku, title, image_url)`` items.
+
+    Existing rows are loaded with one IN query per chunk of skus; repeated skus
+    merge like repeated `_ensure_product` calls (first non-empty value wins).
+    """
+    merged: Dict[str, List[Optional[str]]] = {}
+    for sku, title, image_url in products:
+        current = merged.setdefault(sku, [None, None])
+        if title and not current[0]:
+            current[0] = title
+        if image_url and not current[1]:
+            current[1] = image_url
+    if not merged:
+        return
+
+    skus = list(merged)
+    existing: Dict[str, DimProduct] = {}
+    for start in range(0, len(skus), _BULK_KEY_CHUNK):
+        rows = session.execute(
+            select(DimProduct).where(
+                DimProduct.platform_code == platform_code,
+                DimProduct.shop_id == shop_id,
+                DimProduct.platform_sku.in_(skus[start:start + _BULK_KEY_CHUNK]),
+            )
+        ).scalars().all()
+        existing.update({row.platform_sku: row for row in rows})
+
+    for sku, (title, image_url) in merged.items():
+        row = existing.get(sku)
+        if row is None:
+            session.add(
+                DimProduct(
+                    platform_code=platform_code,
+                    shop_id=shop_id,
+                    platform_sku=sku,
+                    product_title=title,
+                    image_url=image_url,
+                )
+            )
+            continue
+        if title and not row.product_title:
+            row.product_title = title
+        if image_url and not getattr(row, "image_url", None):
+            row.image_url = image_url
+
+
+def _merge_product_metric_rows_bulk(session: Session, merges: List[Dict]) -> None:
+    """Bulk variant of `_merge_product_metric_row`.
+
+    ``merges`` holds the keyword arguments of `_merge_product_metric_row` calls, in
+    call order. Calls sharing a natural key are folded first, then existing rows
+    are loaded with one query per (platform, shop, granularity, scope) and chunk
+    of skus instead of one SELECT per call.
+    """
+    folded: Dict[MetricKey, Dict] = {}
+    for merge in merges:
+        key: MetricKey = (
+            merge["platform_code"],
+            merge["shop_id"],
+            merge["sku"],
+            merge["metric_date"],
+            merge.get("granularity") or "daily",
+            merge.get("sku_scope") or "product",
+        )
+        current = folded.get(key)
+        if current is None:
+            folded[key] = {
+                "parent_platform_sku": merge.get("parent_platform_sku"),
+                "source_catalog_id": merge.get("source_catalog_id"),
+                "updates": {k: v for k, v in (merge.get("updates") or {}).items() if v is not None},
+                "currency": merge.get("currency"),
+            }
+            continue
+        if merge.get("parent_platform_sku") and not current["parent_platform_sku"]:
+            current["parent_platform_sku"] = merge["parent_platform_sku"]
+        if merge.get("source_catalog_id") and not current["source_catalog_id"]:
+            current["source_catalog_id"] = merge["source_catalog_id"]
+        if merge.get("currency") is not None:
+            current["currency"] = merge["currency"]
+        current["updates"].update({k: v for k, v in (merge.get("updates") or {}).items() if v is not None})
+    if not folded:
+        return
+
+    scopes: Dict[Tuple[str, str, str, str], List[MetricKey]] = {}
+    for key in folded:
+        scopes.setdefault((key[0], key[1], key[4], key[5]), []).append(key)
+
+    existing: Dict[MetricKey, FactProductMetric] = {}
+    for (platform_code, shop_id, granularity, sku_scope), keys in scopes.items():
+        skus = sorted({key[2] for key in keys})
+        dates = sorted({key[3] for key in keys})
+        for start in range(0, len(skus), _BULK_KEY_CHUNK):
+            rows = session.execute(
+                select(FactProductMetric).where(
+                    FactProductMetric.platform_code == platform_code,
+                    FactProductMetric.shop_id == shop_id,
+                    FactProductMetric.platform_sku.in_(skus[start:start + _BULK_KEY_CHUNK]),
+                    FactProductMetric.metric_date.in_(dates),
+                    FactProductMetric.granularity == granularity,
+                    FactProductMetric.sku_scope == sku_scope,
+                )
+            ).scalars().all()
+            for row in rows:
+                existing[
+                    (row.platform_code, row.shop_id, row.platform_sku, row.metric_date, row.granularity, row.sku_scope)
+                ] = row
+
+    for key, merge in folded.items():
+        row = existing.get(key)
+        if row is None:
+            row = FactProductMetric(
+                platform_code=key[0],
+                shop_id=key[1],
+                platform_sku=key[2],
+                metric_date=key[3],
+                granularity=key[4],
+                sku_scope=key[5],
+                parent_platform_sku=merge["parent_platform_sku"],
+                source_catalog_id=merge["source_catalog_id"],
+            )
+            _apply_product_metric_updates(row, updates=merge["updates"], currency=merge["currency"])
+            session.add(row)
+            continue
+        _apply_product_metric_updates(row, **merge)
 
 
 # ---------- Core ingestion ----------
 
-def _ingest_products_file(session: Session, cf: CatalogFile, mappings: Dict) -> Tuple[bool, str]:
-    """Ingest products file with hierarchy support (product-level + variant-level)."""
-    
+@dataclass
+class _ProductsFileSpec:
+    """Resolved frame, columns and file-level context of one products file."""
+
+    df: pd.DataFrame
+    platform_code: str
+    sku_col: str
+    name_col: Optional[str]
+    sales_col: Optional[str]
+    revenue_col: Optional[str]
+    views_col: Optional[str]
+    visitors_col: Optional[str]
+    atc_col: Optional[str]
+    conv_col: Optional[str]
+    image_col: Optional[str]
+    variant_col: Optional[str]
+    attr_cols: List[str]
+    shop_col: Optional[str]
+    metric_date: date
+    default_currency: Optional[str]
+
+
+def _prepare_products_file(
+    cf: CatalogFile, mappings: Dict
+) -> Tuple[Optional[_ProductsFileSpec], Optional[Tuple[bool, str]]]:
+    """Read a products file and resolve its columns.
+
+    Returns ``(spec, None)`` or ``(None, (ok, msg))`` when the file ends early.
+    """
     # 强校验:必须有shop_id
     if not cf.shop_id:
-        return False, "missing shop_id (needs assignment)"
+        return None, (False, "missing shop_id (needs assignment)")
     
     df = _read_dataframe2(Path(cf.file_path))
     if df is None:
-        return True, "empty or unreadable skipped"
+        return None, (True, "empty or unreadable skipped")
     # Basic cleanup: drop unnamed cols and fully empty rows/cols
     try:
         df = df.copy()
@@ -628,12 +801,12 @@ def _ingest_products_file(session: Session, cf: CatalogFile, mappings: Dict) ->
     except Exception:
         pass
     if df.empty:
-        return True, "empty file skipped"
+        return None, (True, "empty file skipped")
 
     # Skip manifest-like JSON rows (export metadata without product-level metrics)
     cols = set(str(c).strip().lower() for c in df.columns)
     if {'data_type', 'file_path'}.issubset(cols) and not any(k in cols for k in ['sku', 'id', 'item_id', 'product_id']):
-        return True, 'manifest skipped'
+        return None, (True, 'manifest skipped')
 
 
     platform_code = cf.platform_code or canonicalize_platform(Path(cf.file_path).as_posix()) or "generic"
@@ -702,13 +875,13 @@ def _ingest_products_file(session: Session, cf: CatalogFile, mappings: Dict) ->
             traf_keys = {'曝光', '浏览', '访客', '页面浏览次数', '转化率', '点击', 'sku 订单数', '订单数'}
             if any(any(k in c for k in svc_keys) for c in lowcols):
                 cf.data_domain = 'service'
-                return False, "looks like service metrics; not implemented yet"
+                return None, (False, "looks like service metrics; not implemented yet")
             if any(any(k in c for k in traf_keys) for c in lowcols):
                 cf.data_domain = 'analytics'  # v4.10.0更新:traffic统一映射到analytics
-                return False, "looks like traffic/analytics metrics; not implemented yet"
+                return None, (False, "looks like traffic/analytics metrics; not implemented yet")
         except Exception:
             pass
-        return False, "missing sku column"
+        return None, (False, "missing sku column")
 
     # Detect shop_id column in data (optional, for row-level override if present)
     shop_col = _detect_shop_id_column(df)
@@ -719,6 +892,61 @@ def _ingest_products_file(session: Session, cf: CatalogFile, mappings: Dict) ->
     # Currency: platform default if not present
     default_currency = (mappings.get("platform_configs", {}).get(platform_code, {}) or {}).get("currency")
 
+    return _ProductsFileSpec(
+        df=df,
+        platform_code=platform_code,
+        sku_col=sku_col,
+        name_col=name_col,
+        sales_col=sales_col,
+        revenue_col=revenue_col,
+        views_col=views_col,
+        visitors_col=visitors_col,
+        atc_col=atc_col,
+        conv_col=conv_col,
+        image_col=image_col,
+        variant_col=variant_col,
+        attr_cols=attr_cols,
+        shop_col=shop_col,
+        metric_date=metric_date,
+        default_currency=default_currency,
+    ), None
+
+
+def _metrics_close(a: Optional[float], b: Optional[float], tol: float) -> bool:
+    if a is None or b is None:
+        return False
+    ma = abs(float(a)); mb = abs(float(b))
+    if ma == 0 and mb == 0:
+        return True
+    return abs(ma - mb) / max(ma, mb) <= tol
+
+
+def _prefer_summary_metrics(summary: Dict[str, Optional[float]], variants_total: Dict[str, Optional[float]]) -> bool:
+    """Use a product's summary row when it agrees with the sum of its variant rows."""
+    if not summary:
+        return False
+    # choose tolerance based on metrics available (sales_amount or sales_volume or page_views)
+    return any((
+        _metrics_close(summary.get("sales_amount"), variants_total.get("sales_amount"), 0.05),
+        _metrics_close(summary.get("sales_volume"), variants_total.get("sales_volume"), 0.05),
+        _metrics_close(summary.get("page_views"), variants_total.get("page_views"), 0.1),
+    ))
+
+
+def _ingest_products_file(session: Session, cf: CatalogFile, mappings: Dict) -> Tuple[bool, str]:
+    """Ingest products file with hierarchy support (product-level + variant-level)."""
+    spec, early = _prepare_products_file(cf, mappings)
+    if spec is None:
+        return early
+    df = spec.df
+    platform_code = spec.platform_code
+    sku_col, name_col, image_col = spec.sku_col, spec.name_col, spec.image_col
+    sales_col, revenue_col, views_col = spec.sales_col, spec.revenue_col, spec.views_col
+    visitors_col, atc_col, conv_col = spec.visitors_col, spec.atc_col, spec.conv_col
+    variant_col, attr_cols, shop_col = spec.variant_col, spec.attr_cols, spec.shop_col
+    metric_date = spec.metric_date
+    default_currency = spec.default_currency
+
     # Build groups by product sku for hierarchy handling
     succeeded_rows = 0
     groups = df.groupby(sku_col, dropna=False)
@@ -818,7 +1046,7 @@ def _ingest_products_file(session: Session, cf: CatalogFile, mappings: Dict) ->
             for k, v in b.items():
                 if v is None:
                     continue
-                if k in {"conversion_rate"}:  # handled later
+                if k in {"conversion_rate", "currency"}:  # rate handled later; currency is a label
                     continue
                 cur = a.get(k)
                 a[k] = (cur or 0.0) + float(v)
@@ -839,22 +1067,7 @@ def _ingest_products_file(session: Session, cf: CatalogFile, mappings: Dict) ->
             summary_m = row_metrics(summary_rows[0])
 
         # Decide product-level metrics: prefer summary if close to variants sum
-        def close(a: Optional[float], b: Optional[float], tol: float) -> bool:
-            if a is None or b is None:
-                return False
-            ma = abs(float(a)); mb = abs(float(b))
-            if ma == 0 and mb == 0:
-                return True
-            return abs(ma - mb) / max(ma, mb) <= tol
-
-        prefer_summary = False
-        if summary_m:
-            # choose tolerance based on metrics available (sales_amount or sales_volume or page_views)
-            checks: List[bool] = []
-            checks.append(close(summary_m.get("sales_amount"), agg_variants.get("sales_amount"), 0.05))
-            checks.append(close(summary_m.get("sales_volume"), agg_variants.get("sales_volume"), 0.05))
-            checks.append(close(summary_m.get("page_views"), agg_variants.get("page_views"), 0.1))
-            prefer_summary = any(checks)
+        prefer_summary = _prefer_summary_metrics(summary_m, agg_variants)
 
         product_updates = summary_m if (prefer_summary and summary_m) else agg_variants
         # 提取currency(字符串类型,不是float)
@@ -904,19 +1117,37 @@ def _ingest_products_file(session: Session, cf: CatalogFile, mappings: Dict) ->
     return (succeeded_rows > 0), f"rows_ingested={succeeded_rows}"
 
 
-def _ingest_traffic_store_file(
-    session: Session,
+@dataclass
+class _TrafficFileSpec:
+    """Resolved frame, columns and file-level context of one store traffic file."""
+
+    df: pd.DataFrame
+    platform_code: str
+    shop_id: str
+    default_currency: Optional[str]
+    date_col: Optional[str]
+    views_col: Optional[str]
+    visitors_col: Optional[str]
+    orders_col: Optional[str]
+    conv_col: Optional[str]
+    gmv_col: Optional[str]
+    refund_col: Optional[str]
+    metric_date_from_name: Optional[date]
+    prefer_dayfirst: Optional[bool]
+
+
+def _prepare_traffic_file(
     cf: CatalogFile,
     mappings: Dict,
     progress_cb: Optional[Callable[["CatalogFile", str, Optional[str]], None]] = None,
-) -> Tuple[bool, str]:
-    """Ingest store-level daily traffic metrics as a pseudo SKU '__STORE__'.
-    Expected columns (any subset): 日期/Date, 页面浏览次数(Page Views), 访客/客户数(Visitors), 订单数(Orders), 转化率(%),
-    金额类(如: 商品交易总额(₱), 退款金额(₱) 等)。
+) -> Tuple[Optional[_TrafficFileSpec], Optional[Tuple[bool, str]]]:
+    """Read a store traffic file and resolve its columns.
+
+    Returns ``(spec, None)`` or ``(None, (ok, msg))`` when the file ends early.
     """
     # 强校验:必须有shop_id
     if not cf.shop_id:
-        return False, "missing shop_id (needs assignment)"
+        return None, (False, "missing shop_id (needs assignment)")
     
     # parse
     df = _read_dataframe2(Path(cf.file_path))
@@ -926,7 +1157,7 @@ def _ingest_traffic_store_file(
         except Exception:
             pass
     if df is None:
-        return True, "empty or unreadable skipped"
+        return None, (True, "empty or unreadable skipped")
 
     # cleanup
     try:
@@ -948,9 +1179,9 @@ def _ingest_traffic_store_file(
             pass
 
     if df.empty:
-        return True, "empty file skipped"
+        return None, (True, "empty file skipped")
     if _is_manifest_df(df):
-        return True, 'manifest skipped'
+        return None, (True, 'manifest skipped')
 
     platform_code = (cf.platform_code or canonicalize_platform(Path(cf.file_path).as_posix()) or "generic").lower()
     shop_id = cf.shop_id  # 已在扫描阶段通过ShopResolver解析
@@ -988,6 +1219,42 @@ def _ingest_traffic_store_file(
         except Exception:
             pass
 
+    return _TrafficFileSpec(
+        df=df,
+        platform_code=platform_code,
+        shop_id=shop_id,
+        default_currency=default_currency,
+        date_col=date_col,
+        views_col=views_col,
+        visitors_col=visitors_col,
+        orders_col=orders_col,
+        conv_col=conv_col,
+        gmv_col=gmv_col,
+        refund_col=refund_col,
+        metric_date_from_name=metric_date_from_name,
+        prefer_dayfirst=prefer_dayfirst,
+    ), None
+
+
+def _ingest_traffic_store_file(
+    session: Session,
+    cf: CatalogFile,
+    mappings: Dict,
+    progress_cb: Optional[Callable[["CatalogFile", str, Optional[str]], None]] = None,
+) -> Tuple[bool, str]:
+    """Ingest store-level daily traffic metrics as a pseudo SKU '__STORE__'.
+    Expected columns (any subset): 日期/Date, 页面浏览次数(Page Views), 访客/客户数(Visitors), 订单数(Orders), 转化率(%),
+    金额类(如: 商品交易总额(₱), 退款金额(₱) 等)。
+    """
+    spec, early = _prepare_traffic_file(cf, mappings, progress_cb)
+    if spec is None:
+        return early
+    df = spec.df
+    platform_code, shop_id, default_currency = spec.platform_code, spec.shop_id, spec.default_currency
+    date_col, views_col, visitors_col = spec.date_col, spec.views_col, spec.visitors_col
+    orders_col, conv_col, gmv_col, refund_col = spec.orders_col, spec.conv_col, spec.gmv_col, spec.refund_col
+    metric_date_from_name, prefer_dayfirst = spec.metric_date_from_name, spec.prefer_dayfirst
+
     succeeded_rows = 0
     sku = "__STORE__"
     product_title = "STORE_METRICS"
@@ -1041,38 +1308,38 @@ def _ingest_traffic_store_file(
         else:
             md = metric_date_from_name or _infer_metric_date_from_filename(Path(cf.file_name).name)
 
-    def emit(metric_type: str, value: float, currency: Optional[str] = None, rmb: Optional[float] = None) -> None:
-        key = (md, metric_type)
-        if key in seen:
-            return
-        seen.add(key)
-        # map metric_type to wide table columns
-        updates: Dict[str, Optional[float]] = {}
-        if metric_type == "page_views":
-            updates["page_views"] = value
-        elif metric_type in {"visitors", "unique_visitors"}:
-            updates["unique_visitors"] = value
-        elif metric_type == "orders":
-            updates["order_count"] = value
-        elif metric_type == "conversion_rate":
-            updates["conversion_rate"] = value
-        elif metric_type == "gmv":
-            updates["sales_amount"] = value
-            if rmb is not None:
-                updates["sales_amount_rmb"] = rmb
-        _merge_product_metric_row(
-            session,
-            platform_code=platform_code,
-            shop_id=shop_id,
-            sku=sku,
-            metric_date=md,
-            granularity=(cf.granularity or "daily") if hasattr(cf, "granularity") else "daily",
-            sku_scope="product",
-            parent_platform_sku=None,
-            source_catalog_id=getattr(cf, "id", None),
-            updates=updates,
-            currency=currency,
-        )
+        def emit(metric_type: str, value: float, currency: Optional[str] = None, rmb: Optional[float] = None) -> None:
+            key = (md, metric_type)
+            if key in seen:
+                return
+            seen.add(key)
+            # map metric_type to wide table columns
+            updates: Dict[str, Optional[float]] = {}
+            if metric_type == "page_views":
+                updates["page_views"] = value
+            elif metric_type in {"visitors", "unique_visitors"}:
+                updates["unique_visitors"] = value
+            elif metric_type == "orders":
+                updates["order_count"] = value
+            elif metric_type == "conversion_rate":
+                updates["conversion_rate"] = value
+            elif metric_type == "gmv":
+                updates["sales_amount"] = value
+                if rmb is not None:
+                    updates["sales_amount_rmb"] = rmb
+            _merge_product_metric_row(
+                session,
+                platform_code=platform_code,
+                shop_id=shop_id,
+                sku=sku,
+                metric_date=md,
+                granularity=(cf.granularity or "daily") if hasattr(cf, "granularity") else "daily",
+                sku_scope="product",
+                parent_platform_sku=None,
+                source_catalog_id=getattr(cf, "id", None),
+                updates=updates,
+                currency=currency,
+            )
 
         # numeric metrics
         if views_col and pd.notna(row.get(views_col)):
@@ -1164,14 +1431,37 @@ def _upsert_order(session: Session,
     return  # 直接返回,不执行任何操作
 
 
-def _ingest_orders_file(session: Session, cf: CatalogFile, mappings: Dict,
-                        progress_cb: Optional[Callable[["CatalogFile", str, Optional[str]], None]] = None) -> Tuple[bool, str]:
-    """Minimal orders ingestion (schema-first, tolerant mapping).
-    Targets fact_orders; items omitted for first cut.
+@dataclass
+class _OrdersFileSpec:
+    """Resolved frame, columns and file-level context of one orders file."""
+
+    df: pd.DataFrame
+    platform_code: str
+    shop_id: str
+    default_currency: Optional[str]
+    order_id_col: str
+    date_col: Optional[str]
+    subtotal_col: Optional[str]
+    ship_col: Optional[str]
+    tax_col: Optional[str]
+    discount_col: Optional[str]
+    total_col: Optional[str]
+    metric_date_from_name: date
+    prefer_dayfirst: Optional[bool]
+
+
+def _prepare_orders_file(
+    cf: CatalogFile,
+    mappings: Dict,
+    progress_cb: Optional[Callable[["CatalogFile", str, Optional[str]], None]] = None,
+) -> Tuple[Optional[_OrdersFileSpec], Optional[Tuple[bool, str]]]:
+    """Read an orders file (with HTML/CSV fallbacks) and resolve its columns.
+
+    Returns ``(spec, None)`` or ``(None, (ok, msg))`` when the file ends early.
     """
     # 强校验:必须有shop_id
     if not cf.shop_id:
-        return False, "missing shop_id (needs assignment)"
+        return None, (False, "missing shop_id (needs assignment)")
     
     # parse
     if progress_cb:
@@ -1220,7 +1510,7 @@ def _ingest_orders_file(session: Session, cf: CatalogFile, mappings: Dict,
 
     if df is None:
         # failure (do not mark as ingested)
-        return False, "empty or unreadable"
+        return None, (False, "empty or unreadable")
 
     # cleanup
     try:
@@ -1239,9 +1529,9 @@ def _ingest_orders_file(session: Session, cf: CatalogFile, mappings: Dict,
             pass
 
     if df.empty:
-        return False, "empty file"
+        return None, (False, "empty file")
     if _is_manifest_df(df):
-        return True, 'manifest skipped'
+        return None, (True, 'manifest skipped')
 
     platform_code = (cf.platform_code or canonicalize_platform(Path(cf.file_path).as_posix()) or "generic").lower()
     shop_id = cf.shop_id  # 已在扫描阶段通过ShopResolver解析
@@ -1262,7 +1552,7 @@ def _ingest_orders_file(session: Session, cf: CatalogFile, mappings: Dict,
             pass
 
     if not order_id_col:
-        return False, "missing order_id column"
+        return None, (False, "missing order_id column")
 
     # Default currency: Miaoshou 报表默认视为 CNY;其余平台沿用平台默认或值内探测
     default_currency = (mappings.get("platform_configs", {}).get(platform_code, {}) or {}).get("currency")
@@ -1282,6 +1572,37 @@ def _ingest_orders_file(session: Session, cf: CatalogFile, mappings: Dict,
         except Exception:
             pass
 
+    return _OrdersFileSpec(
+        df=df,
+        platform_code=platform_code,
+        shop_id=shop_id,
+        default_currency=default_currency,
+        order_id_col=order_id_col,
+        date_col=date_col,
+        subtotal_col=subtotal_col,
+        ship_col=ship_col,
+        tax_col=tax_col,
+        discount_col=discount_col,
+        total_col=total_col,
+        metric_date_from_name=metric_date_from_name,
+        prefer_dayfirst=prefer_dayfirst,
+    ), None
+
+
+def _ingest_orders_file(session: Session, cf: CatalogFile, mappings: Dict,
+                        progress_cb: Optional[Callable[["CatalogFile", str, Optional[str]], None]] = None) -> Tuple[bool, str]:
+    """Minimal orders ingestion (schema-first, tolerant mapping).
+    Targets fact_orders; items omitted for first cut.
+    """
+    spec, early = _prepare_orders_file(cf, mappings, progress_cb)
+    if spec is None:
+        return early
+    df = spec.df
+    platform_code, shop_id, default_currency = spec.platform_code, spec.shop_id, spec.default_currency
+    order_id_col, date_col, total_col = spec.order_id_col, spec.date_col, spec.total_col
+    subtotal_col, ship_col, tax_col, discount_col = spec.subtotal_col, spec.ship_col, spec.tax_col, spec.discount_col
+    metric_date_from_name, prefer_dayfirst = spec.metric_date_from_name, spec.prefer_dayfirst
+
     succeeded_rows = 0
     total = int(df.shape[0])
     for idx, (_, row) in enumerate(df.iterrows()):
@@ -1333,6 +1654,7 @@ def _ingest_services_file(
     cf: CatalogFile,
     mappings: Dict,
     progress_cb: Optional[Callable[["CatalogFile", str, Optional[str]], None]] = None,
+    vectorized: bool = False,
 ) -> Tuple[bool, str]:
     """
     Ingest services domain files (agent/ai_assistant sub-types).
@@ -1367,13 +1689,25 @@ def _ingest_services_file(
     
     # 根据sub_domain分流
     if sub_domain == 'ai_assistant':
-        return _ingest_services_ai_assistant(session, cf, df, platform_code, shop_id, mappings, progress_cb)
+        ingest_ai_assistant = _ingest_services_ai_assistant_vectorized if vectorized else _ingest_services_ai_assistant
+        return ingest_ai_assistant(session, cf, df, platform_code, shop_id, mappings, progress_cb)
     elif sub_domain == 'agent':
         return _ingest_services_agent(session, cf, df, platform_code, shop_id, mappings, progress_cb)
     else:
         return False, f"unsupported services sub_domain: {sub_domain}"
 
 
+def _resolve_ai_assistant_columns(
+    df: pd.DataFrame,
+) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """Resolve (date, visitors, questions, satisfaction) columns of an AI assistant export."""
+    date_col = _find_column_by_keywords(df, ["日期", "date", "日期期间"])
+    visitors_col = _find_column_by_keywords(df, ["服务的访客", "访客", "visitors"])
+    questions_col = _find_column_by_keywords(df, ["已回答的问题", "问题数", "questions"])
+    satisfaction_col = _find_column_by_keywords(df, ["好评", "满意度", "satisfaction", "好评比"])
+    return date_col, visitors_col, questions_col, satisfaction_col
+
+
 def _ingest_services_ai_assistant(
     session: Session,
     cf: CatalogFile,
@@ -1386,10 +1720,7 @@ def _ingest_services_ai_assistant(
     """AI Assistant逐日数据入库(每行一天,店铺级)"""
     
     # 识别列
-    date_col = _find_column_by_keywords(df, ["日期", "date", "日期期间"])
-    visitors_col = _find_column_by_keywords(df, ["服务的访客", "访客", "visitors"])
-    questions_col = _find_column_by_keywords(df, ["已回答的问题", "问题数", "questions"])
-    satisfaction_col = _find_column_by_keywords(df, ["好评", "满意度", "satisfaction", "好评比"])
+    date_col, visitors_col, questions_col, satisfaction_col = _resolve_ai_assistant_columns(df)
     
     metric_date = _infer_metric_date_from_filename(Path(cf.file_name).name)
     
@@ -1551,6 +1882,430 @@ def _ingest_services_agent(
     return False, "no_metrics_found"
 
 
+# ---------- Vectorized ingestion ----------
+#
+# Column-wise counterparts of the per-row loops above: numbers, currencies and
+# dates are parsed once per column (or per distinct value), variant rollups use
+# groupby, and writes go through the bulk upserts keyed by natural keys. The
+# per-row functions stay as the reference implementation (INGEST_WORKER_VECTORIZED=0).
+
+VECTORIZED_INGEST = os.getenv("INGEST_WORKER_VECTORIZED", "1").strip().lower() not in {"0", "false", "no"}
+
+_NUMBER_PATTERN = r"(-?\d+(?:\.\d+)?)"
+
+# (currency, prefixes, suffixes) in the precedence order of `_detect_currency_from_value`
+_CURRENCY_MARKERS: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...] = (
+    ("MYR", ("RM",), ()),
+    ("PHP", ("PHP", "₱"), ()),
+    ("THB", ("THB", "฿"), ()),
+    ("VND", ("VND",), ("₫",)),
+    ("IDR", ("IDR", "RP"), ()),
+    ("SGD", ("SGD",), ()),
+    ("USD", ("USD", "$"), ()),
+    ("CNY", ("CNY", "RMB", "￥", "¥"), ()),
+)
+
+# (metric, wide-table column) in the emit order of `_ingest_traffic_store_file`
+_TRAFFIC_METRICS: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("page_views", "page_views"),
+    ("visitors", "unique_visitors"),
+    ("orders", "order_count"),
+    ("conversion_rate", "conversion_rate"),
+    ("gmv", "sales_amount"),
+    ("refunds", None),
+)
+
+
+def _report_phase(progress_cb: Optional[Callable], cf: CatalogFile, message: str) -> None:
+    if progress_cb:
+        try:
+            progress_cb(cf, "phase", message)
+        except Exception:
+            pass
+
+
+def _text_series(series: pd.Series) -> pd.Series:
+    """``str(v).strip()`` of every non-null cell; null cells stay NaN."""
+    return series[series.notna()].astype(str).str.strip().reindex(series.index)
+
+
+def _parse_number_series(series: pd.Series) -> pd.Series:
+    """Column-wise `_parse_number`: first signed decimal of each cell, NaN when absent."""
+    cell_text = _text_series(series).str.replace(",", " ", regex=False).str.replace("\u00A0", " ", regex=False)
+    return cell_text.str.extract(_NUMBER_PATTERN, expand=False).astype(float)
+
+
+def _percent_adjusted(values: pd.Series, raw: pd.Series) -> pd.Series:
+    """Divide values whose raw cell carries a '%' sign by 100."""
+    percent = _text_series(raw).str.contains("%", regex=False, na=False)
+    return values.where(~percent, values / 100.0)
+
+
+def _detect_currency_series(series: pd.Series) -> pd.Series:
+    """Column-wise `_detect_currency_from_value`; NaN where no currency marker is found."""
+    cell_text = _text_series(series).str.upper()
+    result = pd.Series(np.nan, index=series.index, dtype=object)
+    undecided = cell_text.notna()
+    for code, prefixes, suffixes in _CURRENCY_MARKERS:
+        hit = cell_text.str.startswith(prefixes, na=False)
+        if suffixes:
+            hit |= cell_text.str.endswith(suffixes, na=False)
+        hit &= undecided
+        result[hit] = code
+        undecided &= ~hit
+    return result
+
+
+def _resolve_currency_series(series: pd.Series, default_currency: Optional[str], fallback: str) -> pd.Series:
+    """``default_currency or detected or fallback`` for every row."""
+    if default_currency:
+        return pd.Series(default_currency, index=series.index, dtype=object)
+    return _detect_currency_series(series).fillna(fallback)
+
+
+def _amounts_to_rmb(amounts: pd.Series, currencies: pd.Series, metric_dates: pd.Series) -> pd.Series:
+    """`normalize_amount_to_rmb` once per distinct (amount, currency, date); NaN on failure."""
+    frame = pd.DataFrame({"amount": amounts, "currency": currencies, "metric_date": metric_dates}).dropna()
+    converted: Dict[Tuple[float, str, date], Optional[float]] = {}
+    for key in frame.drop_duplicates().itertuples(index=False, name=None):
+        try:
+            converted[key] = normalize_amount_to_rmb(*key)
+        except Exception:
+            converted[key] = None
+    values = [converted[key] for key in frame.itertuples(index=False, name=None)]
+    return pd.Series(values, index=frame.index, dtype=float).reindex(amounts.index)
+
+
+def _metric_date_series(
+    df: pd.DataFrame, date_col: Optional[str], prefer_dayfirst: Optional[bool], fallback: date
+) -> pd.Series:
+    """Parse each distinct value of ``date_col`` once; rows without a parsable date get ``fallback``."""
+    dates = pd.Series(fallback, index=df.index, dtype=object)
+    if not date_col:
+        return dates
+    raw = df[date_col]
+    present = raw.notna()
+    codes, uniques = pd.factorize(raw[present])
+    parsed = np.array([parse_date(v, prefer_dayfirst=prefer_dayfirst) or fallback for v in uniques], dtype=object)
+    if len(parsed):
+        dates[present] = parsed[codes]
+    return dates
+
+
+def _present_values(record: Dict) -> Dict:
+    """Drop missing (None/NaN) entries from one ``to_dict("records")`` row."""
+    return {k: v for k, v in record.items() if v is not None and not (isinstance(v, float) and v != v)}
+
+
+def _product_metrics_frame(spec: _ProductsFileSpec) -> pd.DataFrame:
+    """Per-row product metrics parsed column-wise; NaN where a row has no value."""
+    df = spec.df
+    metrics = pd.DataFrame(index=df.index)
+    if spec.sales_col:
+        metrics["sales_volume"] = _parse_number_series(df[spec.sales_col])
+    if spec.revenue_col:
+        amounts = _parse_number_series(df[spec.revenue_col])
+        currencies = _resolve_currency_series(df[spec.revenue_col], spec.default_currency, "USD")
+        currencies = currencies.where(amounts.notna())
+        metrics["sales_amount"] = amounts
+        metrics["sales_amount_rmb"] = _amounts_to_rmb(
+            amounts, currencies, pd.Series(spec.metric_date, index=df.index, dtype=object)
+        )
+        metrics["currency"] = currencies
+    for column, name in (
+        (spec.views_col, "page_views"),
+        (spec.visitors_col, "unique_visitors"),
+        (spec.atc_col, "add_to_cart_count"),
+    ):
+        if column:
+            metrics[name] = _parse_number_series(df[column])
+    if spec.conv_col:
+        metrics["conversion_rate"] = _percent_adjusted(_parse_number_series(df[spec.conv_col]), df[spec.conv_col])
+    return metrics
+
+
+def _variant_id_series(spec: _ProductsFileSpec) -> pd.Series:
+    """Column-wise variant id: explicit variant column, else attribute values joined by '+'."""
+    df = spec.df
+    joined = pd.Series(np.nan, index=df.index, dtype=object)
+    for column in spec.attr_cols:
+        cell_text = _text_series(df[column])
+        piece = cell_text.where((cell_text != "") & (cell_text.str.lower() != "nan"))
+        both = joined.notna() & piece.notna()
+        combined = joined.where(joined.notna(), piece).astype(object)
+        combined[both] = joined[both] + "+" + piece[both]
+        joined = combined
+    if not spec.variant_col:
+        return joined
+    explicit = _text_series(df[spec.variant_col])
+    explicit = explicit.where(explicit != "").astype(object)
+    # an explicit but blank variant cell marks a summary row, it does not fall back to attributes
+    return explicit.where(df[spec.variant_col].notna(), joined)
+
+
+def _ingest_products_file_vectorized(session: Session, cf: CatalogFile, mappings: Dict) -> Tuple[bool, str]:
+    """Column-wise `_ingest_products_file`: groupby variant rollups and bulk upserts."""
+    spec, early = _prepare_products_file(cf, mappings)
+    if spec is None:
+        return early
+    df = spec.df
+    shop_id = cf.shop_id
+    granularity = (cf.granularity or "daily") if hasattr(cf, "granularity") else "daily"
+    source_catalog_id = getattr(cf, "id", None)
+
+    sku_text = _text_series(df[spec.sku_col])
+    keep = sku_text.notna() & (sku_text != "")
+    if not keep.any():
+        return False, "rows_ingested=0"
+    # group by the raw sku cell like the per-row path (sorted, one product row per group)
+    keys = df.loc[keep, spec.sku_col]
+    skus = sku_text[keep].groupby(keys, sort=True).first()
+
+    titles: Dict = {}
+    if spec.name_col:
+        titles = _text_series(df.loc[keep, spec.name_col].groupby(keys, sort=True).first()).dropna().to_dict()
+    images: Dict = {}
+    if spec.image_col:
+        for key, cell in df.loc[keep, spec.image_col].groupby(keys, sort=True).first().dropna().items():
+            url = _extract_url_from_cell(cell)
+            if url and url.lower().startswith(("http://", "https://")):
+                images[key] = url
+
+    metrics = _product_metrics_frame(spec)[keep]
+    variant_ids = _variant_id_series(spec)[keep]
+    is_variant = variant_ids.notna()
+
+    summed = [c for c in metrics.columns if c not in ("conversion_rate", "currency")]
+    variant_totals = metrics.loc[is_variant, summed].groupby(keys[is_variant], sort=True).sum(min_count=1)
+    summaries = metrics[~is_variant].assign(_key=keys[~is_variant]).drop_duplicates("_key").set_index("_key")
+
+    variant_records: Dict = {}
+    variant_frame = metrics[is_variant].assign(_key=keys[is_variant], _vid=variant_ids[is_variant])
+    for record in variant_frame.to_dict("records"):
+        variant_records.setdefault(record.pop("_key"), []).append(record)
+
+    products: List[Tuple[str, Optional[str], Optional[str]]] = []
+    merges: List[Dict] = []
+    common = dict(
+        platform_code=spec.platform_code,
+        shop_id=shop_id,
+        metric_date=spec.metric_date,
+        granularity=granularity,
+        source_catalog_id=source_catalog_id,
+    )
+    for key, sku in skus.items():
+        title, image_url = titles.get(key), images.get(key)
+        products.append((sku, title, image_url))
+
+        summary = _present_values(summaries.loc[key].to_dict()) if key in summaries.index else {}
+        totals = _present_values(variant_totals.loc[key].to_dict()) if key in variant_totals.index else {}
+        product_updates = summary if _prefer_summary_metrics(summary, totals) else totals
+        product_currency = product_updates.pop("currency", None)
+        merges.append(dict(
+            common, sku=sku, sku_scope="product", parent_platform_sku=None,
+            updates=product_updates, currency=product_currency,
+        ))
+
+        for record in variant_records.get(key, []):
+            var_sku = f"{sku}::{record.pop('_vid')}"
+            products.append((var_sku, title, image_url))
+            v_updates = _present_values(record)
+            var_currency = v_updates.pop("currency", None)
+            merges.append(dict(
+                common, sku=var_sku, sku_scope="variant", parent_platform_sku=sku,
+                updates=v_updates, currency=var_currency,
+            ))
+
+    _ensure_products_bulk(session, spec.platform_code, shop_id, products)
+    _merge_product_metric_rows_bulk(session, merges)
+    succeeded_rows = len(skus)
+    return (succeeded_rows > 0), f"rows_ingested={succeeded_rows}"
+
+
+def _ingest_traffic_store_file_vectorized(
+    session: Session,
+    cf: CatalogFile,
+    mappings: Dict,
+    progress_cb: Optional[Callable[["CatalogFile", str, Optional[str]], None]] = None,
+) -> Tuple[bool, str]:
+    """Column-wise `_ingest_traffic_store_file`: first value per (date, metric) wins."""
+    spec, early = _prepare_traffic_file(cf, mappings, progress_cb)
+    if spec is None:
+        return early
+    df = spec.df
+    sku = "__STORE__"
+    _ensure_product(session, spec.platform_code, spec.shop_id, sku, "STORE_METRICS", image_url=None)
+
+    total = int(df.shape[0])
+    _report_phase(progress_cb, cf, f"convert/write: vectorized rows={total}")
+    fallback = spec.metric_date_from_name or _infer_metric_date_from_filename(Path(cf.file_name).name)
+    metric_dates = _metric_date_series(df, spec.date_col, spec.prefer_dayfirst, fallback)
+    positions = pd.Series(np.arange(total), index=df.index)
+
+    columns = {
+        "page_views": spec.views_col,
+        "visitors": spec.visitors_col,
+        "orders": spec.orders_col,
+        "conversion_rate": spec.conv_col,
+        "gmv": spec.gmv_col,
+        "refunds": spec.refund_col,
+    }
+    granularity = (cf.granularity or "daily") if hasattr(cf, "granularity") else "daily"
+    emitted: List[Tuple[int, int, Dict]] = []
+    for order, (metric, target) in enumerate(_TRAFFIC_METRICS):
+        column = columns[metric]
+        if not column:
+            continue
+        values = _parse_number_series(df[column])
+        if metric == "conversion_rate":
+            values = _percent_adjusted(values, df[column])
+        firsts = pd.DataFrame({"md": metric_dates, "value": values, "pos": positions})
+        firsts = firsts.dropna(subset=["value"]).drop_duplicates("md")
+        currencies = None
+        rmb = None
+        if metric in ("gmv", "refunds"):
+            currencies = _resolve_currency_series(df[column], spec.default_currency, "USD")[firsts.index]
+        if metric == "gmv":
+            rmb = _amounts_to_rmb(firsts["value"], currencies.str.upper(), firsts["md"])
+            rmb = rmb.mask(firsts["value"] == 0, 0.0)
+        for idx, md, value, pos in firsts[["md", "value", "pos"]].itertuples(name=None):
+            updates: Dict[str, Optional[float]] = {}
+            if target:
+                updates[target] = value
+            if rmb is not None and pd.notna(rmb[idx]):
+                updates["sales_amount_rmb"] = float(rmb[idx])
+            emitted.append((int(pos), order, dict(
+                platform_code=spec.platform_code,
+                shop_id=spec.shop_id,
+                sku=sku,
+                metric_date=md,
+                granularity=granularity,
+                sku_scope="product",
+                parent_platform_sku=None,
+                source_catalog_id=getattr(cf, "id", None),
+                updates=updates,
+                currency=currencies[idx] if currencies is not None else None,
+            )))
+
+    # keep the per-row call order so the last currency written per row matches
+    emitted.sort(key=lambda item: (item[0], item[1]))
+    _merge_product_metric_rows_bulk(session, [merge for _, _, merge in emitted])
+
+    _report_phase(progress_cb, cf, "commit:pending")
+    return (total > 0), f"rows_ingested={total}"
+
+
+# [DELETED] v4.19.0: FactOrder 已删除,此函数已废弃
+def _upsert_orders_bulk(session: Session, platform_code: str, shop_id: str, orders: List[Dict]) -> None:
+    """
+    [DEPRECATED] v4.19.0: `_upsert_order` 的批量版本,FactOrder 表已删除
+    每个文件只记录一次告警,不执行任何写入
+    """
+    if not orders:
+        return
+    logger.warning(
+        f"[IngestionWorker] _upsert_orders_bulk 函数已废弃,FactOrder 表已删除。"
+        f"{len(orders)} 条订单 {platform_code}/{shop_id} 应导入到 b_class.fact_{platform_code}_orders_daily"
+    )
+
+
+def _ingest_orders_file_vectorized(
+    session: Session,
+    cf: CatalogFile,
+    mappings: Dict,
+    progress_cb: Optional[Callable[["CatalogFile", str, Optional[str]], None]] = None,
+) -> Tuple[bool, str]:
+    """Column-wise `_ingest_orders_file` with one bulk upsert per file."""
+    spec, early = _prepare_orders_file(cf, mappings, progress_cb)
+    if spec is None:
+        return early
+    df = spec.df
+    _report_phase(progress_cb, cf, f"convert/write: vectorized rows={int(df.shape[0])}")
+
+    order_ids = _text_series(df[spec.order_id_col])
+    keep = order_ids.notna() & (order_ids != "")
+    orders = pd.DataFrame({
+        "order_id": order_ids,
+        "order_date_local": _metric_date_series(df, spec.date_col, spec.prefer_dayfirst, spec.metric_date_from_name),
+    })
+    if spec.total_col:
+        orders["currency"] = _resolve_currency_series(df[spec.total_col], spec.default_currency, "CNY")
+    else:
+        orders["currency"] = spec.default_currency or "CNY"
+    for name, column in (
+        ("subtotal", spec.subtotal_col),
+        ("shipping_fee", spec.ship_col),
+        ("tax_amount", spec.tax_col),
+        ("discount_amount", spec.discount_col),
+        ("total_amount", spec.total_col),
+    ):
+        orders[name] = _parse_number_series(df[column]) if column else np.nan
+    orders = orders[keep].astype(object)
+    records = orders.where(orders.notna(), None).to_dict("records")
+    _upsert_orders_bulk(session, spec.platform_code, spec.shop_id, records)
+
+    _report_phase(progress_cb, cf, "commit:pending")
+    succeeded_rows = len(records)
+    return (succeeded_rows > 0), f"rows_ingested={succeeded_rows}"
+
+
+def _ingest_services_ai_assistant_vectorized(
+    session: Session,
+    cf: CatalogFile,
+    df: pd.DataFrame,
+    platform_code: str,
+    shop_id: str,
+    mappings: Dict,
+    progress_cb: Optional[Callable],
+) -> Tuple[bool, str]:
+    """Column-wise `_ingest_services_ai_assistant` (每行一天,店铺级)."""
+    date_col, visitors_col, questions_col, satisfaction_col = _resolve_ai_assistant_columns(df)
+    metric_date = _infer_metric_date_from_filename(Path(cf.file_name).name)
+
+    prefer_dayfirst = None
+    if date_col:
+        try:
+            samples = df[date_col].head(10).dropna().astype(str).tolist()
+            prefer_dayfirst = detect_dayfirst(samples)
+        except Exception:
+            pass
+
+    sku = "__SERVICES_AI__"
+    _ensure_product(session, platform_code, shop_id, sku, "AI_ASSISTANT_METRICS", image_url=None)
+
+    metric_dates = _metric_date_series(df, date_col, prefer_dayfirst, metric_date)
+    values = pd.DataFrame(index=df.index)
+    present = pd.Series(False, index=df.index)
+    for name, column in (
+        ("unique_visitors", visitors_col),
+        ("order_count", questions_col),
+        ("conversion_rate", satisfaction_col),
+    ):
+        if not column:
+            continue
+        parsed = _parse_number_series(df[column])
+        if name == "conversion_rate":
+            parsed = _percent_adjusted(parsed, df[column])
+        values[name] = parsed
+        present |= df[column].notna()
+
+    merges = [
+        dict(
+            platform_code=platform_code,
+            shop_id=shop_id,
+            sku=sku,
+            metric_date=md,
+            granularity='daily',
+            sku_scope='product',
+            source_catalog_id=getattr(cf, 'id', None),
+            updates=_present_values(updates),
+        )
+        for md, updates in zip(metric_dates[present], values[present].to_dict("records"))
+    ]
+    _merge_product_metric_rows_bulk(session, merges)
+    return (len(merges) > 0), f"rows_ingested={len(merges)}"
+
+
 def run_once(limit: int = 20,
              domains: Optional[List[str]] = None,
              recent_hours: Optional[int] = None,
@@ -1584,13 +2339,20 @@ def run_once(limit: int = 20,
                 domain = (cf.data_domain or "").lower()
                 with session.no_autoflush:
                     if domain == "products":
-                        ok, msg = _ingest_products_file(session, cf, mappings)
+                        ingest_products = _ingest_products_file_vectorized if VECTORIZED_INGEST else _ingest_products_file
+                        ok, msg = ingest_products(session, cf, mappings)
                     elif domain == "analytics":  # v4.10.0更新:traffic统一为analytics
-                        ok, msg = _ingest_traffic_store_file(session, cf, mappings, progress_cb=progress_cb)
+                        ingest_traffic = (
+                            _ingest_traffic_store_file_vectorized if VECTORIZED_INGEST else _ingest_traffic_store_file
+                        )
+                        ok, msg = ingest_traffic(session, cf, mappings, progress_cb=progress_cb)
                     elif domain == "orders":
-                        ok, msg = _ingest_orders_file(session, cf, mappings, progress_cb=progress_cb)
+                        ingest_orders = _ingest_orders_file_vectorized if VECTORIZED_INGEST else _ingest_orders_file
+                        ok, msg = ingest_orders(session, cf, mappings, progress_cb=progress_cb)
                     elif domain in ("services", "service"):
-                        ok, msg = _ingest_services_file(session, cf, mappings, progress_cb=progress_cb)
+                        ok, msg = _ingest_services_file(
+                            session, cf, mappings, progress_cb=progress_cb, vectorized=VECTORIZED_INGEST
+                        )
                     else:
                         ok, msg = _ingest_unknown_or_manifest(session, cf)
             except Exception as e:
@@ -22,6 +22,7 @@ from playwright.sync_api import Browser, BrowserContext, Page, Playwright
 from modules.apps.collection_center.browser_config_helper import (
     enforce_official_playwright_browser,
 )
+from modules.apps.collection_center.network_policy import apply_network_policy_sync
 from .sessions.session_manager import SessionManager
 from .sessions.device_fingerprint import DeviceFingerprintManager
 
@@ -202,6 +203,8 @@ class PersistentBrowserManager:
                     )
                     # 设置额外的反检测措施
                     self._setup_anti_detection(context)
+                    # 无头运行时按平台网络策略拦截图片/字体/埋点等重资源(未指定 headless 时 Playwright 默认无头)
+                    apply_network_policy_sync(context, platform, headless=bool(launch_options.get('headless', True)))
                     logger.success(f"持久化上下文创建成功: {platform}/{account_id}")
                     return context
                 except Exception as e:
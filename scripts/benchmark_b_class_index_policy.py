@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Insert/UPSERT throughput of a b_class fact table under the legacy index set vs the index profile.
+
+Rows are sampled from an existing table and replayed in batches into two scratch copies
+(same columns, unique hash index plus the respective secondary indexes). The scratch tables
+are dropped afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark b_class insert throughput per index set")
+    parser.add_argument("--table", required=True, help="Source b_class fact table to sample rows from")
+    parser.add_argument("--data-domain", required=True)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    return parser.parse_args(argv)
+
+
+def _index_sets(scratch_table: str, data_domain: str) -> dict[str, list[tuple[str, str]]]:
+    from backend.services.b_class_index_policy import index_profile, legacy_index_definitions
+
+    return {
+        "legacy": legacy_index_definitions(scratch_table, data_domain, None),
+        "profile": index_profile(scratch_table, data_domain),
+    }
+
+
+def _replay(conn, scratch: str, source: str, rows: int, batch_size: int, conflict_action: str) -> float:
+    from backend.services.platform_table_manager import UNIQUE_HASH_INDEX_COLUMNS
+
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        conn.execute(
+            text(
+                f'INSERT INTO b_class."{scratch}" '
+                f'SELECT * FROM b_class."{source}" ORDER BY id LIMIT :limit OFFSET :offset '
+                f"ON CONFLICT ({UNIQUE_HASH_INDEX_COLUMNS}) {conflict_action}"
+            ),
+            {"limit": min(batch_size, rows - offset), "offset": offset},
+        )
+        conn.commit()
+    elapsed = time.perf_counter() - started
+    return rows / elapsed if elapsed > 0 else 0.0
+
+
+def run_benchmark(engine, source: str, data_domain: str, rows: int, batch_size: int) -> dict[str, dict[str, float]]:
+    from backend.services.platform_table_manager import UNIQUE_HASH_INDEX_COLUMNS
+
+    results: dict[str, dict[str, float]] = {}
+    with engine.connect() as conn:
+        available = conn.execute(text(f'SELECT COUNT(*) FROM b_class."{source}"')).scalar() or 0
+        rows = min(rows, int(available))
+        if rows == 0:
+            raise SystemExit(f"source table b_class.{source} is empty")
+
+        for variant in ("legacy", "profile"):
+            scratch = f"{source[:40]}_bench_{variant}"
+            conn.execute(text(f'DROP TABLE IF EXISTS b_class."{scratch}"'))
+            conn.execute(text(f'CREATE TABLE b_class."{scratch}" (LIKE b_class."{source}" INCLUDING DEFAULTS)'))
+            conn.execute(
+                text(f'CREATE UNIQUE INDEX "uq_{scratch}_hash" ON b_class."{scratch}" ({UNIQUE_HASH_INDEX_COLUMNS})')
+            )
+            definitions = _index_sets(scratch, data_domain)[variant]
+            for index_name, index_body in definitions:
+                conn.execute(text(f'CREATE INDEX "{index_name}" ON b_class."{scratch}" {index_body}'))
+            conn.commit()
+            try:
+                insert_rate = _replay(conn, scratch, source, rows, batch_size, "DO NOTHING")
+                upsert_rate = _replay(
+                    conn,
+                    scratch,
+                    source,
+                    rows,
+                    batch_size,
+                    "DO UPDATE SET raw_data = EXCLUDED.raw_data, ingest_timestamp = EXCLUDED.ingest_timestamp",
+                )
+            finally:
+                conn.rollback()
+                conn.execute(text(f'DROP TABLE IF EXISTS b_class."{scratch}"'))
+                conn.commit()
+            results[variant] = {
+                "secondary_indexes": len(definitions),
+                "insert_rows_per_sec": round(insert_rate, 1),
+                "upsert_rows_per_sec": round(upsert_rate, 1),
+            }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    from backend.models.database import engine
+
+    results = run_benchmark(engine, args.table, args.data_domain, args.rows, args.batch_size)
+    for variant, stats in results.items():
+        print(
+            f"{variant:8s} indexes={stats['secondary_indexes']:2d} "
+            f"insert={stats['insert_rows_per_sec']:.1f} rows/s upsert={stats['upsert_rows_per_sec']:.1f} rows/s"
+        )
+    legacy, profile = results["legacy"], results["profile"]
+    if legacy["insert_rows_per_sec"] and legacy["upsert_rows_per_sec"]:
+        print(
+            f"speedup insert={profile['insert_rows_per_sec'] / legacy['insert_rows_per_sec']:.2f}x "
+            f"upsert={profile['upsert_rows_per_sec'] / legacy['upsert_rows_per_sec']:.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Converge b_class fact table indexes to the per-domain index profile."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Converge b_class table indexes to the index profile")
+    parser.add_argument("--table", type=str, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without changing indexes")
+    parser.add_argument(
+        "--min-scans",
+        type=int,
+        default=1,
+        help="Keep non-profile indexes with at least this many scans in pg_stat_user_indexes (default: 1)",
+    )
+    parser.add_argument("--force", action="store_true", help="Drop non-profile indexes even if they are still scanned")
+    return parser.parse_args(argv)
+
+
+def build_policy(db):
+    from backend.services.b_class_index_policy import get_b_class_index_policy
+
+    return get_b_class_index_policy(db)
+
+
+def main(argv: list[str] | None = None, session_factory=None, policy_factory=build_policy) -> int:
+    args = parse_args(argv)
+    if session_factory is None:
+        from backend.models.database import SessionLocal
+
+        session_factory = SessionLocal
+
+    db = session_factory()
+    try:
+        policy = policy_factory(db)
+        plans = policy.plan(table_name=args.table, min_scans=args.min_scans, force=args.force)
+        for plan in plans:
+            if not args.dry_run and not plan.is_converged:
+                policy.converge(plan)
+            print(json.dumps(plan.to_dict(), ensure_ascii=False))
+
+        pending = [plan for plan in plans if not plan.is_converged]
+        print(
+            f"tables={len(plans)} pending={len(pending)} "
+            f"reclaimed_bytes={sum(plan.reclaimed_bytes for plan in pending)} dry_run={args.dry_run}"
+        )
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
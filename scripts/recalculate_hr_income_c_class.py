@@ -9,6 +9,9 @@
 
 可被定时任务调用:
   python scripts/recalculate_hr_income_c_class.py --year-month 2026-03
+
+年终重算/回填多个月份(批量模式,每个数据源只查询一次):
+  python scripts/recalculate_hr_income_c_class.py --year-month 2026-01 --to-month 2026-12
 """
 
 import argparse
@@ -32,6 +35,16 @@ def _default_year_month() -> str:
     return f"{now.year:04d}-{now.month:02d}"
 
 
+def _month_range(start: str, end: str) -> list[str]:
+    year, month = (int(part) for part in start.split("-"))
+    end_year, end_month = (int(part) for part in end.split("-"))
+    months = []
+    while (year, month) <= (end_year, end_month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
 async def _run(year_month: str) -> int:
     async with AsyncSessionLocal() as db:
         service = HRIncomeCalculationService(db=db)
@@ -45,11 +58,28 @@ async def _run(year_month: str) -> int:
     return 0
 
 
+async def _run_batch(year_months: list[str]) -> int:
+    async with AsyncSessionLocal() as db:
+        service = HRIncomeCalculationService(db=db)
+        result = await service.calculate_months(year_months)
+        for month in result["months"]:
+            print(
+                f"[OK] income c_class recalculated: month={month['year_month']} "
+                f"employees={month['employee_count']} "
+                f"commission_upserts={month['commission_upserts']} "
+                f"performance_upserts={month['performance_upserts']}"
+            )
+    return 0
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="重算员工收入 C 类数据")
     parser.add_argument("--year-month", dest="year_month", default=_default_year_month(), help="月份 YYYY-MM")
+    parser.add_argument("--to-month", dest="to_month", default=None, help="结束月份 YYYY-MM(指定时批量重算区间内所有月份)")
     args = parser.parse_args()
     try:
+        if args.to_month:
+            return asyncio.run(_run_batch(_month_range(args.year_month, args.to_month)))
         return asyncio.run(_run(args.year_month))
     except Exception as e:
         print(f"[FAIL] recalculate income c_class failed: {e}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+回填/刷新预计算的店铺健康度评分(c_class.shop_health_scores)
+
+mart 刷新后会自动增量刷新最近 C_CLASS_METRICS_LOOKBACK_DAYS 天;首次上线或规则调整后用本脚本回填更早的周期。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.models.database import AsyncSessionLocal
+from backend.services.c_class_metrics_engine import MART_SOURCES, CClassMetricsEngine
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Refresh precomputed shop health scores")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="First period to refresh (YYYY-MM-DD)")
+    parser.add_argument(
+        "--granularity",
+        action="append",
+        choices=sorted(MART_SOURCES),
+        help="Granularity to refresh (repeatable, default: all)",
+    )
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with AsyncSessionLocal() as session:
+        return await CClassMetricsEngine(session).refresh(args.granularity, since=args.since)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -20,6 +20,12 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--batch-size", type=int, default=1000)
     parser.add_argument("--table", type=str, default=None)
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--table-concurrency",
+        type=int,
+        default=None,
+        help="Sync up to N tables at once with round-robin batches (default: CLOUD_SYNC_TABLE_CONCURRENCY or 1)",
+    )
     return parser.parse_args(argv)
 
 
@@ -40,7 +46,15 @@ def main(argv: list[str] | None = None, service_factory=None) -> int:
             result = asyncio.run(service.sync_table(args.table, batch_size=args.batch_size))
             failed_tables = 0 if result.get("status") == "completed" else 1
         else:
-            result = asyncio.run(service.sync_all_tables(batch_size=args.batch_size))
+            if args.table_concurrency:
+                result = asyncio.run(
+                    service.sync_all_tables(
+                        batch_size=args.batch_size,
+                        max_concurrency=args.table_concurrency,
+                    )
+                )
+            else:
+                result = asyncio.run(service.sync_all_tables(batch_size=args.batch_size))
             failed_tables = int(result.get("failed_tables", 0))
         return 0 if failed_tables == 0 else 2
     finally:
@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import subprocess
 import sys
@@ -22,7 +23,23 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Verify local-to-cloud B-class sync against a local target DB")
     parser.add_argument("--verify-db", default="xihong_erp_cloud_sync_verify")
     parser.add_argument("--table", default=None)
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--merkle",
+        action="store_true",
+        help="After syncing --table, compare local and target by bucket hashes instead of counts",
+    )
+    parser.add_argument("--repair", action="store_true", help="Re-sync buckets that differ (requires --merkle)")
+    parser.add_argument(
+        "--delete-extraneous",
+        action="store_true",
+        help="When repairing, also delete target rows missing locally",
+    )
+    args = parser.parse_args(argv)
+    if (args.merkle or args.repair) and not args.table:
+        parser.error("--merkle/--repair require --table")
+    if args.repair and not args.merkle:
+        parser.error("--repair requires --merkle")
+    return args
 
 
 def _run_command(command: list[str], env: dict[str, str] | None = None) -> None:
@@ -68,7 +85,71 @@ def _build_verify_database_url(verify_db: str) -> str:
     return f"postgresql://localhost:15432/{verify_db}"
 
 
-def run_verification(*, verify_db: str, table: str | None) -> bool:
+def run_merkle_verification(
+    *,
+    verify_database_url: str,
+    table: str,
+    repair: bool = False,
+    delete_extraneous: bool = False,
+) -> dict:
+    from sqlalchemy import create_engine
+
+    from backend.models.database import DATABASE_URL, SessionLocal
+    from backend.services.cloud_b_class_auto_sync_factory import _build_checkpoint_scope_key
+    from backend.services.cloud_b_class_sync_checkpoint_service import CloudBClassSyncCheckpointService
+    from backend.services.cloud_b_class_sync_service import SourceBatchCursor, SQLAlchemyCloudWriter
+    from backend.services.cloud_b_class_sync_verifier import (
+        CloudBClassBucketRepairer,
+        CloudBClassMerkleVerifier,
+        SQLAlchemyBucketHashReader,
+    )
+
+    local_engine = create_engine(DATABASE_URL)
+    cloud_engine = create_engine(verify_database_url)
+    db = SessionLocal()
+    try:
+        checkpoint = CloudBClassSyncCheckpointService(db).get_checkpoint(
+            table,
+            table_schema=_build_checkpoint_scope_key(verify_database_url, dry_run=False),
+        )
+        upper_bound = None
+        if checkpoint is not None and checkpoint.last_ingest_timestamp is not None:
+            upper_bound = SourceBatchCursor(
+                last_ingest_timestamp=checkpoint.last_ingest_timestamp,
+                last_source_id=checkpoint.last_source_id,
+            )
+        verifier = CloudBClassMerkleVerifier(
+            SQLAlchemyBucketHashReader(local_engine, upper_bound=upper_bound),
+            SQLAlchemyBucketHashReader(cloud_engine),
+        )
+        result = verifier.verify_table(table)
+        if repair and result["diverged_buckets"]:
+            repairer = CloudBClassBucketRepairer(
+                local_engine,
+                cloud_engine,
+                SQLAlchemyCloudWriter(cloud_engine),
+            )
+            result["repairs"] = [
+                repairer.repair_bucket(table, bucket, delete_extraneous=delete_extraneous)
+                for bucket in result["diverged_buckets"]
+            ]
+            # 修复后重新比对,确认分桶哈希已一致
+            result["after_repair"] = verifier.verify_table(table)
+        return result
+    finally:
+        db.close()
+        local_engine.dispose()
+        cloud_engine.dispose()
+
+
+def run_verification(
+    *,
+    verify_db: str,
+    table: str | None,
+    merkle: bool = False,
+    repair: bool = False,
+    delete_extraneous: bool = False,
+) -> bool:
     _run_command([sys.executable, "scripts/migrate_cloud_sync_tables.py"])
     _run_command([sys.executable, "scripts/sync_b_class_to_cloud.py", "--dry-run", "--batch-size", "10"])
 
@@ -91,7 +172,33 @@ def run_verification(*, verify_db: str, table: str | None) -> bool:
             ],
             env=env,
         )
+        if merkle:
+            result = run_merkle_verification(
+                verify_database_url=verify_database_url,
+                table=table,
+                repair=repair,
+                delete_extraneous=delete_extraneous,
+            )
+            print(json.dumps(result, ensure_ascii=False, default=str, indent=2))
+            return _merkle_result_ok(result)
+
+    return True
+
 
+def _merkle_result_ok(result: dict) -> bool:
+    """一致,或全部分桶修复成功且修复后重新比对一致"""
+    if result["status"] == "in_sync":
+        return True
+    if "after_repair" not in result:
+        return False
+    failed = [repair for repair in result.get("repairs") or [] if repair.get("status") != "completed"]
+    if failed:
+        print(f"[ERROR] {len(failed)} bucket repair(s) failed", file=sys.stderr)
+        return False
+    if result["after_repair"]["status"] != "in_sync":
+        remaining = result["after_repair"].get("diverged_buckets")
+        print(f"[ERROR] Buckets still diverged after repair: {remaining}", file=sys.stderr)
+        return False
     return True
 
 
@@ -100,7 +207,16 @@ def main(
     runner=run_verification,
 ) -> int:
     args = parse_args(argv)
-    ok = runner(verify_db=args.verify_db, table=args.table)
+    if args.merkle:
+        ok = runner(
+            verify_db=args.verify_db,
+            table=args.table,
+            merkle=True,
+            repair=args.repair,
+            delete_extraneous=args.delete_extraneous,
+        )
+    else:
+        ok = runner(verify_db=args.verify_db, table=args.table)
     return 0 if ok else 2
 
 
@@ -69,3 +69,101 @@ def test_sync_all_tables_records_partial_success_summary():
 
     assert result["status"] == "partial_success"
     assert recorder.finished == [("run-1", "partial_success", 1, 1, "1 tables failed")]
+
+
+class _RoundRobinCheckpointService:
+    def __init__(self):
+        self.checkpoints = {}
+        self.advanced = []
+
+    def create_or_get_checkpoint(self, table_name, table_schema="b_class"):
+        from types import SimpleNamespace
+
+        return self.checkpoints.setdefault(
+            table_name,
+            SimpleNamespace(last_ingest_timestamp=None, last_source_id=None),
+        )
+
+    def advance_checkpoint(self, table_name, ingest_timestamp, source_id, status, table_schema="b_class"):
+        checkpoint = self.checkpoints[table_name]
+        checkpoint.last_ingest_timestamp = ingest_timestamp
+        checkpoint.last_source_id = source_id
+        self.advanced.append((table_name, source_id))
+
+    def mark_failure(self, table_name, message, table_schema="b_class"):
+        raise AssertionError(message)
+
+
+class _NoOpMirrorManager:
+    def ensure_cloud_mirror_table(self, table_name, data_domain):
+        return None
+
+
+def test_concurrent_sync_interleaves_batches_so_small_tables_finish_first():
+    from datetime import datetime, timezone
+
+    table_sizes = {"fact_shopee_orders_daily": 6, "fact_shopee_analytics_daily": 1}
+    written = []
+
+    def reader(table_name, checkpoint, batch_size):
+        start = (checkpoint.last_source_id or 0) + 1
+        end = min(start + batch_size, table_sizes[table_name] + 1)
+        return [
+            {"id": source_id, "ingest_timestamp": datetime(2026, 3, 24, tzinfo=timezone.utc)}
+            for source_id in range(start, end)
+        ]
+
+    def writer(table_name, rows, data_domain):
+        written.append((table_name, len(rows)))
+        return {"success": True, "written_rows": len(rows), "payload_bytes": 10 * len(rows), "duration_seconds": 0.01}
+
+    checkpoint_service = _RoundRobinCheckpointService()
+    service = CloudBClassSyncService(
+        checkpoint_service=checkpoint_service,
+        mirror_manager=_NoOpMirrorManager(),
+        source_batch_reader=reader,
+        remote_writer=writer,
+        table_inspector=lambda: list(table_sizes),
+        table_concurrency=1,
+    )
+
+    result = asyncio.run(service.sync_all_tables(batch_size=2, max_concurrency=2))
+
+    assert result["status"] == "completed"
+    assert [item["table_name"] for item in result["results"]] == list(table_sizes)
+    assert [item["written_rows"] for item in result["results"]] == [6, 1]
+    assert result["results"][0]["rows_per_second"] > 0
+    assert result["results"][0]["payload_bytes"] == 60
+    # The small table's only batch is written before the large table's last batch.
+    analytics_index = written.index(("fact_shopee_analytics_daily", 1))
+    assert analytics_index < len(written) - 1
+    assert checkpoint_service.checkpoints["fact_shopee_orders_daily"].last_source_id == 6
+    assert checkpoint_service.checkpoints["fact_shopee_analytics_daily"].last_source_id == 1
+
+
+def test_concurrent_sync_bounds_handler_parallelism():
+    running = 0
+    peak = 0
+
+    async def handler(table_name, batch_size=1000):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"status": "completed", "table_name": table_name, "written_rows": 0}
+
+    service = CloudBClassSyncService(
+        checkpoint_service=None,
+        mirror_manager=None,
+        source_batch_reader=lambda *args, **kwargs: [],
+        remote_writer=lambda *args, **kwargs: {"success": True},
+        table_inspector=lambda: [f"fact_shopee_table{index}_daily" for index in range(5)],
+        sync_table_handler=handler,
+        table_concurrency=2,
+    )
+
+    result = asyncio.run(service.sync_all_tables(batch_size=100))
+
+    assert result["succeeded_tables"] == 5
+    assert peak == 2
@@ -0,0 +1,331 @@
+import asyncio
+import threading
+from datetime import date, datetime, timezone
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import backend.services.cloud_b_class_sync_service as sync_service_module
+from backend.services.cloud_b_class_mirror_manager import build_canonical_columns
+from backend.services.cloud_b_class_sync_service import (
+    CloudBClassSyncService,
+    SQLAlchemyBClassSourceReader,
+)
+from backend.services.cloud_b_class_sync_transport import (
+    AdaptiveBatchSizer,
+    CopyLineStream,
+    SQLAlchemyCloudCopyWriter,
+    encode_copy_value,
+    iter_copy_lines,
+    normalize_transport,
+)
+
+
+class FakeCheckpoint:
+    def __init__(self):
+        self.last_ingest_timestamp = None
+        self.last_source_id = None
+
+
+class FakeCheckpointService:
+    def __init__(self):
+        self.checkpoint = FakeCheckpoint()
+        self.advanced = []
+        self.failures = []
+
+    def create_or_get_checkpoint(self, table_name, table_schema="b_class"):
+        return self.checkpoint
+
+    def advance_checkpoint(self, table_name, ingest_timestamp, source_id, status, table_schema="b_class"):
+        self.advanced.append(source_id)
+        self.checkpoint.last_ingest_timestamp = ingest_timestamp
+        self.checkpoint.last_source_id = source_id
+
+    def mark_failure(self, table_name, message, table_schema="b_class"):
+        self.failures.append(message)
+
+
+class FakeMirrorManager:
+    def ensure_cloud_mirror_table(self, table_name, data_domain):
+        return None
+
+
+def _rows(start, count):
+    return [
+        {"id": source_id, "ingest_timestamp": datetime(2026, 3, 24, tzinfo=timezone.utc)}
+        for source_id in range(start, start + count)
+    ]
+
+
+def test_copy_value_encoding_escapes_text_format_specials():
+    assert encode_copy_value(None) == "\\N"
+    assert encode_copy_value(True) == "t"
+    assert encode_copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+    assert encode_copy_value(date(2026, 3, 1)) == "2026-03-01"
+    assert encode_copy_value({"订单号": "A-1"}) == '{"订单号": "A-1"}'
+
+
+def test_copy_lines_follow_canonical_columns_and_sequence():
+    lines = list(iter_copy_lines([{"platform_code": "shopee", "data_hash": "h1"}, {"data_hash": "h2"}]))
+
+    first = lines[0].rstrip("\n").split("\t")
+    assert len(first) == len(build_canonical_columns()) + 1
+    assert first[0] == "shopee"
+    assert first[-1] == "0"
+    assert lines[1].rstrip("\n").split("\t")[-1] == "1"
+
+
+def test_copy_line_stream_reads_lazily_in_chunks():
+    consumed = []
+
+    def lines():
+        for index in range(3):
+            consumed.append(index)
+            yield f"row-{index}\n"
+
+    stream = CopyLineStream(lines())
+    assert stream.read(4) == "row-"
+    assert consumed == [0]
+    assert stream.read(-1) == "0\nrow-1\nrow-2\n"
+    assert stream.read(8) == ""
+
+
+def test_copy_writer_stages_copies_then_merges_once():
+    class FakeCursor:
+        def __init__(self):
+            self.copied = None
+            self.closed = False
+
+        def copy_expert(self, sql, stream):
+            self.copied = (sql, stream.read())
+
+        def close(self):
+            self.closed = True
+
+    class FakeConnection:
+        def __init__(self):
+            self.statements = []
+            self.cursor_instance = FakeCursor()
+            self.connection = type(
+                "Proxy",
+                (),
+                {"dbapi_connection": type("Raw", (), {"cursor": lambda _self: self.cursor_instance})()},
+            )()
+
+        def execute(self, statement, params=None):
+            self.statements.append(str(statement))
+
+    conn = FakeConnection()
+    writer = SQLAlchemyCloudCopyWriter(engine=None)
+    writer._write_rows(
+        conn,
+        "fact_shopee_orders_daily",
+        [{"data_hash": "h1", "raw_data": {"k": "v"}}, {"data_hash": "h2"}],
+        "orders",
+    )
+
+    assert conn.statements[0].startswith("CREATE TEMP TABLE")
+    assert "ON COMMIT DROP" in conn.statements[0]
+    assert 'INSERT INTO b_class."fact_shopee_orders_daily"' in conn.statements[1]
+    assert "DISTINCT ON (platform_code, shop_id, data_domain, granularity, data_hash)" in conn.statements[1]
+    assert "ON CONFLICT (platform_code, shop_id, data_domain, granularity, data_hash)" in conn.statements[1]
+    copy_sql, payload = conn.cursor_instance.copied
+    assert copy_sql.startswith("COPY ")
+    assert payload.count("\n") == 2
+    assert conn.cursor_instance.closed is True
+
+
+def test_copy_writer_merge_uses_services_conflict_key():
+    sql = SQLAlchemyCloudCopyWriter._build_merge_sql("fact_shopee_services_agent_daily", "_stage", "services")
+
+    assert "ON CONFLICT (data_domain, sub_domain, granularity, data_hash)" in sql
+
+
+def test_adaptive_batch_sizer_grows_and_shrinks_within_bounds():
+    sizer = AdaptiveBatchSizer(1000, min_size=500, max_size=4000, target_seconds=2.0)
+
+    assert sizer.observe(rows=1000, seconds=0.1) == 2000
+    assert sizer.observe(rows=2000, seconds=0.1) == 4000
+    assert sizer.observe(rows=4000, seconds=0.1) == 4000
+    assert sizer.observe(rows=4000, seconds=60) == 2000
+    assert sizer.observe(rows=10, seconds=0.001, full_batch=False) == 2000
+
+
+def test_normalize_transport_rejects_unknown_value():
+    assert normalize_transport(None) == "upsert"
+    assert normalize_transport(" COPY ") == "copy"
+    try:
+        normalize_transport("rsync")
+    except ValueError as exc:
+        assert "rsync" in str(exc)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_source_reader_reflects_columns_once_per_table(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("ATTACH DATABASE ':memory:' AS b_class"))
+        conn.execute(
+            text(
+                "CREATE TABLE b_class.fact_shopee_orders_daily "
+                "(id INTEGER PRIMARY KEY, platform_code TEXT, data_hash TEXT, ingest_timestamp TEXT)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO b_class.fact_shopee_orders_daily VALUES "
+                "(1, 'shopee', 'h1', '2026-03-24'), (2, 'shopee', 'h2', '2026-03-25')"
+            )
+        )
+
+    inspect_calls = []
+    real_inspect = sync_service_module.sa_inspect
+
+    def counting_inspect(bind):
+        inspect_calls.append(bind)
+        return real_inspect(bind)
+
+    monkeypatch.setattr(sync_service_module, "sa_inspect", counting_inspect)
+    reader = SQLAlchemyBClassSourceReader(engine)
+
+    first = reader("fact_shopee_orders_daily", FakeCheckpoint(), batch_size=1)
+    second = reader("fact_shopee_orders_daily", FakeCheckpoint(), batch_size=2)
+
+    assert [row["id"] for row in first] == [1]
+    assert [row["id"] for row in second] == [1, 2]
+    assert second[0]["period_start_date"] is None
+    assert len(inspect_calls) == 1
+
+    reader.invalidate_columns("fact_shopee_orders_daily")
+    reader("fact_shopee_orders_daily", FakeCheckpoint(), batch_size=1)
+    assert len(inspect_calls) == 2
+
+
+def test_source_reader_rereflects_after_column_dropped_mid_sync():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("ATTACH DATABASE ':memory:' AS b_class"))
+        conn.execute(
+            text(
+                "CREATE TABLE b_class.fact_shopee_orders_daily "
+                "(id INTEGER PRIMARY KEY, platform_code TEXT, data_hash TEXT, ingest_timestamp TEXT)"
+            )
+        )
+        conn.execute(text("INSERT INTO b_class.fact_shopee_orders_daily VALUES (1, 'shopee', 'h1', '2026-03-24')"))
+    reader = SQLAlchemyBClassSourceReader(engine)
+    assert reader("fact_shopee_orders_daily", FakeCheckpoint(), batch_size=1)[0]["platform_code"] == "shopee"
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE b_class.fact_shopee_orders_daily DROP COLUMN platform_code"))
+
+    rows = reader("fact_shopee_orders_daily", FakeCheckpoint(), batch_size=1)
+
+    assert rows[0]["id"] == 1
+    assert rows[0]["platform_code"] is None
+    assert "platform_code" not in reader.get_available_columns("fact_shopee_orders_daily")
+
+
+def test_sync_table_invalidates_reader_columns_when_table_starts():
+    class RecordingReader:
+        def __init__(self):
+            self.invalidated = []
+
+        def invalidate_columns(self, table_name=None):
+            self.invalidated.append(table_name)
+
+        def __call__(self, table_name, checkpoint, batch_size):
+            return []
+
+    reader = RecordingReader()
+    service = CloudBClassSyncService(
+        checkpoint_service=FakeCheckpointService(),
+        mirror_manager=FakeMirrorManager(),
+        source_batch_reader=reader,
+        remote_writer=lambda **kwargs: {"success": True, "written_rows": len(kwargs["rows"])},
+    )
+
+    asyncio.run(service.sync_table("fact_shopee_orders_daily", batch_size=2))
+
+    assert reader.invalidated == ["fact_shopee_orders_daily"]
+
+
+def test_pipelined_sync_prefetches_next_batch_while_writing():
+    batches = {0: _rows(1, 2), 2: _rows(3, 2), 4: _rows(5, 1)}
+    read_cursors = []
+    next_batch_read = threading.Event()
+
+    def reader(table_name, checkpoint, batch_size):
+        cursor = checkpoint.last_source_id or 0
+        read_cursors.append(cursor)
+        if cursor == 2:
+            next_batch_read.set()
+        return batches.get(cursor, [])
+
+    def writer(table_name, rows, data_domain):
+        if len(rows) == 2 and not next_batch_read.is_set():
+            # The read for batch two must run while batch one is still being written.
+            if not next_batch_read.wait(timeout=5):
+                return {"success": False, "error": "prefetch did not overlap write"}
+        return {"success": True, "written_rows": len(rows)}
+
+    checkpoint_service = FakeCheckpointService()
+    service = CloudBClassSyncService(
+        checkpoint_service=checkpoint_service,
+        mirror_manager=FakeMirrorManager(),
+        source_batch_reader=reader,
+        remote_writer=writer,
+        pipeline_prefetch=True,
+    )
+
+    result = asyncio.run(service.sync_table("fact_shopee_orders_daily", batch_size=2))
+
+    assert result["status"] == "completed"
+    assert result["written_rows"] == 5
+    assert read_cursors == [0, 2, 4]
+    assert checkpoint_service.advanced == [2, 4, 5]
+
+
+def test_pipelined_sync_does_not_advance_checkpoint_after_failed_write():
+    def reader(table_name, checkpoint, batch_size):
+        return _rows((checkpoint.last_source_id or 0) + 1, batch_size)
+
+    checkpoint_service = FakeCheckpointService()
+    service = CloudBClassSyncService(
+        checkpoint_service=checkpoint_service,
+        mirror_manager=FakeMirrorManager(),
+        source_batch_reader=reader,
+        remote_writer=lambda **kwargs: {"success": False, "error": "cloud down"},
+        pipeline_prefetch=True,
+    )
+
+    result = asyncio.run(service.sync_table("fact_shopee_orders_daily", batch_size=2))
+
+    assert result["status"] == "failed"
+    assert result["error"] == "cloud down"
+    assert checkpoint_service.advanced == []
+
+
+def test_sync_table_requests_adaptive_batch_sizes():
+    requested_sizes = []
+
+    def reader(table_name, checkpoint, batch_size):
+        requested_sizes.append(batch_size)
+        if len(requested_sizes) >= 3:
+            return []
+        return _rows((checkpoint.last_source_id or 0) + 1, batch_size)
+
+    service = CloudBClassSyncService(
+        checkpoint_service=FakeCheckpointService(),
+        mirror_manager=FakeMirrorManager(),
+        source_batch_reader=reader,
+        remote_writer=lambda **kwargs: {"success": True, "written_rows": len(kwargs["rows"])},
+        batch_sizer_factory=lambda initial: AdaptiveBatchSizer(initial, min_size=1, max_size=8, target_seconds=60),
+    )
+
+    result = asyncio.run(service.sync_table("fact_shopee_orders_daily", batch_size=2))
+
+    assert result["status"] == "completed"
+    assert requested_sizes == [2, 4, 8]
+    assert result["written_rows"] == 6
+    assert result["final_batch_size"] == 8
@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from backend.services.cloud_b_class_sync_service import SourceBatchCursor
+from backend.services.cloud_b_class_sync_verifier import (
+    BUCKET_KEYS,
+    CloudBClassBucketRepairer,
+    CloudBClassMerkleVerifier,
+    SQLAlchemyBucketHashReader,
+)
+
+
+class InMemoryBucketReader:
+    """Compute the same bucket digests as the SQL reader over a row list."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+
+    def fetch_bucket_hashes(self, table_name, level, prefix):
+        self.requests.append((level, prefix))
+        digests = {}
+        for row in self.rows:
+            key = tuple(str(row.get(name) or "") for name in BUCKET_KEYS)
+            if key[: len(prefix)] != prefix:
+                continue
+            bucket = key[: level + 1]
+            count, total = digests.get(bucket, (0, 0))
+            digests[bucket] = (count + 1, total + hash(row["data_hash"]))
+        return {bucket: (count, str(total)) for bucket, (count, total) in digests.items()}
+
+
+def _row(platform, shop, day, data_hash):
+    return {"platform_code": platform, "shop_id": shop, "metric_date": day, "data_hash": data_hash}
+
+
+def _mirror_rows():
+    return [
+        _row("shopee", "shop-1", "2026-03-01", "h1"),
+        _row("shopee", "shop-1", "2026-03-02", "h2"),
+        _row("shopee", "shop-2", "2026-03-01", "h3"),
+        _row("tiktok", "shop-9", "2026-03-01", "h4"),
+    ]
+
+
+def test_verifier_stops_at_top_level_when_tables_match():
+    local = InMemoryBucketReader(_mirror_rows())
+    cloud = InMemoryBucketReader(_mirror_rows())
+
+    result = CloudBClassMerkleVerifier(local, cloud).verify_table("fact_shopee_orders_daily")
+
+    assert result["status"] == "in_sync"
+    assert result["diverged_buckets"] == []
+    assert local.requests == [(0, ())]
+    assert result["hash_requests"] == 2
+
+
+def test_verifier_descends_only_into_divergent_buckets():
+    cloud_rows = [row for row in _mirror_rows() if row["data_hash"] != "h2"]
+    cloud_rows.append(_row("shopee", "shop-1", "2026-03-02", "stale"))
+    local = InMemoryBucketReader(_mirror_rows())
+    cloud = InMemoryBucketReader(cloud_rows)
+
+    result = CloudBClassMerkleVerifier(local, cloud).verify_table("fact_shopee_orders_daily")
+
+    assert result["status"] == "diverged"
+    assert result["diverged_buckets"] == [
+        {
+            "platform_code": "shopee",
+            "shop_id": "shop-1",
+            "metric_date": "2026-03-02",
+            "local_rows": 1,
+            "cloud_rows": 1,
+        }
+    ]
+    assert local.requests == [(0, ()), (1, ("shopee",)), (2, ("shopee", "shop-1"))]
+
+
+def test_verifier_reports_buckets_missing_on_one_side():
+    local = InMemoryBucketReader(_mirror_rows())
+    cloud = InMemoryBucketReader([row for row in _mirror_rows() if row["platform_code"] != "tiktok"])
+
+    result = CloudBClassMerkleVerifier(local, cloud).verify_table("fact_shopee_orders_daily")
+
+    assert result["diverged_buckets"] == [
+        {"platform_code": "tiktok", "shop_id": "shop-9", "metric_date": "2026-03-01", "local_rows": 1, "cloud_rows": 0}
+    ]
+
+
+def test_bucket_hash_sql_filters_prefix_and_checkpoint_upper_bound():
+    bound = SourceBatchCursor(last_ingest_timestamp=datetime(2026, 3, 24, tzinfo=timezone.utc), last_source_id=9)
+    reader = SQLAlchemyBucketHashReader(engine=None, upper_bound=bound)
+
+    sql, params = reader._build_bucket_hash_sql("fact_shopee_orders_daily", 2, ("shopee", "shop-1"))
+
+    assert 'FROM "b_class"."fact_shopee_orders_daily"' in sql
+    assert "md5(data_hash)" in sql
+    assert "GROUP BY COALESCE(platform_code, ''), COALESCE(shop_id, ''), COALESCE(CAST(metric_date AS TEXT), '')" in sql
+    assert params["prefix_0"] == "shopee"
+    assert params["prefix_1"] == "shop-1"
+    assert params["upper_source_id"] == 9
+
+
+def test_repairer_resyncs_only_rows_of_the_divergent_bucket():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("ATTACH DATABASE ':memory:' AS b_class"))
+        conn.execute(
+            text(
+                "CREATE TABLE b_class.fact_shopee_orders_daily "
+                "(id INTEGER PRIMARY KEY, platform_code TEXT, shop_id TEXT, data_domain TEXT, "
+                "granularity TEXT, metric_date TEXT, data_hash TEXT, ingest_timestamp TEXT, raw_data TEXT)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO b_class.fact_shopee_orders_daily VALUES "
+                "(1, 'shopee', 'shop-1', 'orders', 'daily', '2026-03-01', 'h1', '2026-03-24', '{}'), "
+                "(2, 'shopee', 'shop-1', 'orders', 'daily', '2026-03-02', 'h2', '2026-03-24', '{}'), "
+                "(3, 'shopee', 'shop-1', 'orders', 'daily', '2026-03-02', 'h3', '2026-03-24', '{}')"
+            )
+        )
+
+    written = []
+
+    def writer(table_name, rows, data_domain):
+        written.append((table_name, data_domain, [row["data_hash"] for row in rows]))
+        return {"success": True, "written_rows": len(rows)}
+
+    repairer = CloudBClassBucketRepairer(engine, engine, writer, batch_size=1)
+    result = repairer.repair_bucket(
+        "fact_shopee_orders_daily",
+        {"platform_code": "shopee", "shop_id": "shop-1", "metric_date": "2026-03-02"},
+    )
+
+    assert result["status"] == "completed"
+    assert result["written_rows"] == 2
+    assert written == [
+        ("fact_shopee_orders_daily", "orders", ["h2"]),
+        ("fact_shopee_orders_daily", "orders", ["h3"]),
+    ]